@@ -5,8 +5,9 @@ import json
 import re
 import shutil
 import hashlib
+import sqlite3
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass, field
 
@@ -19,8 +20,20 @@ from PyQt6.QtWidgets import (
     QDateTimeEdit, QTableWidgetItem, QProgressDialog, QStyle, QGroupBox, QComboBox,
     QSizePolicy, QScrollArea, QStatusBar, QToolBar
 )
-from PyQt6.QtCore import Qt, QDateTime, QTime, QSize
-from PyQt6.QtGui import QAction
+from PyQt6.QtCore import Qt, QDateTime, QTime, QSize, QThread, QTimer, QObject, QFileSystemWatcher, pyqtSignal
+from PyQt6.QtGui import QAction, QKeySequence
+
+from generate_precache import regenerate as regenerate_precache
+from validate_content import validate_corpus, format_issue
+from json_repair import repair_json, JSONRepairError
+from edit_journal import EditJournal
+from edit_history import UndoHistory
+from manifest_store import ManifestStore, ManifestLockError, write_shards
+from chapter_db import ChapterDB, CHAPTERS_DIR, DB_PATH as CHAPTER_DB_PATH
+from corpus_stats import COUNTERS as STATS_COUNTERS, StatsAggregator
+from item_bank import (REF_KEY as BANK_REF_KEY, ItemBankError, conflicting_pushes, publish as publish_shared_items,
+                       push_shared_items)
+from item_stats import load_sidecar as load_item_stats
 
 
 # =============================================================================
@@ -50,6 +63,7 @@ class QuizQuestion:
     type: str = "mcq"  # Par défaut de type MCQ (choix multiple)
     options: List[QuizOption] = field(default_factory=list)
     steps: List[str] = field(default_factory=list)  # Pour les questions de type "ordering"
+    bank_ref: str = ""  # Élément partagé de la banque (item_bank.py)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'QuizQuestion':
@@ -58,7 +72,8 @@ class QuizQuestion:
         question = cls(
             id=data.get('id', ''),
             question=data.get('question', ''),
-            type=question_type
+            type=question_type,
+            bank_ref=data.get(BANK_REF_KEY, '')
         )
         
         main_explanation = data.get('explanation', '')
@@ -120,7 +135,9 @@ class QuizQuestion:
                 if opt.is_correct and opt.explanation:
                     result['explanation'] = opt.explanation
                     break
-                    
+
+        if self.bank_ref:
+            result[BANK_REF_KEY] = self.bank_ref
         return result
 
 @dataclass
@@ -269,6 +286,7 @@ class Exercise:
     sub_questions: List[SubQuestion] = field(default_factory=list)
     images: List[ExerciseImage] = field(default_factory=list)
     hint: List[Hint] = field(default_factory=list)
+    bank_ref: str = ""  # Élément partagé de la banque (item_bank.py)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Exercise':
@@ -300,7 +318,8 @@ class Exercise:
             statement=data.get('statement', ''),
             sub_questions=sub_questions,
             images=images,
-            hint=hints
+            hint=hints,
+            bank_ref=data.get(BANK_REF_KEY, '')
         )
 
     def to_dict(self) -> Dict[str, Any]:
@@ -316,6 +335,8 @@ class Exercise:
             result['images'] = [img.to_dict() for img in self.images]
         if self.hint:
             result['hint'] = [h.to_dict() for h in self.hint]
+        if self.bank_ref:
+            result[BANK_REF_KEY] = self.bank_ref
         return result
 
 class ChapterData:
@@ -329,9 +350,12 @@ class ChapterData:
         self.class_type: str = ""
         self.chapter_name: str = ""
         self.session_dates: List[str] = []
+        self.lesson_file: Optional[str] = None  # Leçon associée (lessons/...), conservée telle quelle
         self.videos: List[Video] = []
         self.quiz_questions: List[QuizQuestion] = []
         self.exercises: List[Exercise] = []
+        self.shared_items_changed: List[str] = []  # Éléments de la banque modifiés par la dernière sauvegarde
+        self.saved_content_version: Optional[str] = None  # Contenu du fichier au dernier chargement/sauvegarde
 
     def load_from_manifest(self, data: Dict[str, Any], class_type: str):
         """Charge les métadonnées depuis le fichier manifest.json."""
@@ -357,42 +381,13 @@ class ChapterData:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
                 
-            # Charger les données de base
-            self.chapter_name = data.get('chapter', self.id.replace('-', ' ').title())
-            self.class_type = data.get('class', self.class_type)
-            self.session_dates = sorted(data.get('sessionDates', []))
-
-            # Charger les vidéos avec gestion d'erreurs
-            self.videos = []
-            for i, v_data in enumerate(data.get('videos', [])):
-                try:
-                    video = Video.from_dict(v_data)
-                    self.videos.append(video)
-                except Exception as e:
-                    print(f"Avertissement: Vidéo #{i+1} dans {file_path} ignorée en raison d'une erreur: {e}")
+            self.load_content(data)
 
-            # Charger les quiz avec gestion d'erreurs
-            self.quiz_questions = []
-            for i, q_data in enumerate(data.get('quiz', [])):
-                try:
-                    quiz = QuizQuestion.from_dict(q_data)
-                    self.quiz_questions.append(quiz)
-                except Exception as e:
-                    print(f"Avertissement: Quiz #{i+1} dans {file_path} ignoré en raison d'une erreur: {e}")
-                    
-            # Charger les exercices avec gestion d'erreurs
-            self.exercises = []
-            for i, e_data in enumerate(data.get('exercises', [])):
-                try:
-                    exercise = Exercise.from_dict(e_data)
-                    self.exercises.append(exercise)
-                except Exception as e:
-                    print(f"Avertissement: Exercice #{i+1} dans {file_path} ignoré en raison d'une erreur: {e}")
-                    
             # Utiliser la version du fichier si elle existe, sinon garder celle du manifest
             file_version = data.get('version', '')
             if file_version:
                 self.version = file_version
+            self.mark_clean()
             return True
             
         except json.JSONDecodeError as e:
@@ -436,27 +431,99 @@ class ChapterData:
             print(f"Erreur inattendue lors du chargement de {file_path}: {e}")
             return False
             
+    def load_content(self, data: Dict[str, Any]):
+        """Charge le nom, les dates, les vidéos, les quiz et les exercices depuis un dictionnaire
+        (contenu d'un fichier de chapitre, éventuellement complété par son journal d'édition)."""
+        # Charger les données de base
+        self.chapter_name = data.get('chapter', self.id.replace('-', ' ').title())
+        self.class_type = data.get('class', self.class_type)
+        self.session_dates = sorted(data.get('sessionDates', []))
+        self.lesson_file = data.get('lessonFile')
+
+        # Charger les vidéos avec gestion d'erreurs
+        self.videos = []
+        for i, v_data in enumerate(data.get('videos', [])):
+            try:
+                video = Video.from_dict(v_data)
+                self.videos.append(video)
+            except Exception as e:
+                print(f"Avertissement: Vidéo #{i+1} dans {self.file_path} ignorée en raison d'une erreur: {e}")
+
+        # Charger les quiz avec gestion d'erreurs
+        self.quiz_questions = []
+        for i, q_data in enumerate(data.get('quiz', [])):
+            try:
+                quiz = QuizQuestion.from_dict(q_data)
+                self.quiz_questions.append(quiz)
+            except Exception as e:
+                print(f"Avertissement: Quiz #{i+1} dans {self.file_path} ignoré en raison d'une erreur: {e}")
+                
+        # Charger les exercices avec gestion d'erreurs
+        self.exercises = []
+        for i, e_data in enumerate(data.get('exercises', [])):
+            try:
+                exercise = Exercise.from_dict(e_data)
+                self.exercises.append(exercise)
+            except Exception as e:
+                print(f"Avertissement: Exercice #{i+1} dans {self.file_path} ignoré en raison d'une erreur: {e}")
+
+    def content_dict(self) -> Dict[str, Any]:
+        """Contenu du chapitre tel qu'il est écrit dans son fichier (sans la version)."""
+        data = {
+            'class': self.class_type,
+            'chapter': self.chapter_name,
+            'sessionDates': sorted(self.session_dates),
+        }
+        if self.lesson_file:
+            data['lessonFile'] = self.lesson_file
+        data.update({
+            'videos': [v.to_dict() for v in self.videos],
+            'quiz': [q.to_dict() for q in self.quiz_questions],
+            'exercises': [e.to_dict() for e in self.exercises]
+        })
+        return data
+
+    def mark_clean(self):
+        """Mémorise le contenu actuel comme identique au fichier sur disque."""
+        self.saved_content_version = self._calculate_content_version(self.content_dict())
+
+    def has_unsaved_edits(self) -> bool:
+        """Modifications en mémoire depuis le dernier chargement ou la dernière sauvegarde
+        (contrairement à has_changed, indépendant du contenu actuel du fichier)."""
+        return self._calculate_content_version(self.content_dict()) != self.saved_content_version
+
+    def apply_journal(self, force: bool = False) -> int:
+        """Rejoue les modifications non sauvegardées d'une session précédente.
+        Un journal ouvert sur une autre version du fichier (is_stale) désigne les
+        éléments par des positions qui ne sont plus fiables: il n'est rejoué qu'avec
+        force=True. Retourne le nombre de modifications appliquées."""
+        if not self.file_path:
+            return 0
+        journal = EditJournal(self.file_path)
+        records = journal.read()['records']
+        if not records:
+            journal.compact()
+            return 0
+        if journal.is_stale() and not force:
+            return 0
+        self.load_content(journal.replay(self.content_dict()))
+        return len(records)
+
     def _attempt_json_fix(self, content: str) -> Optional[str]:
-        """Tente de corriger les erreurs courantes dans un fichier JSON."""
+        """Tente de corriger les erreurs courantes dans un fichier JSON (virgules en trop,
+        guillemets simples, clés sans guillemets, fin tronquée...) sans changer le type des valeurs."""
         try:
-            # Correction 1: Virgules en trop à la fin des objets ou tableaux
-            content = re.sub(r',\s*}', '}', content)
-            content = re.sub(r',\s*]', ']', content)
-            
-            # Correction 2: Guillemets simples au lieu de doubles
-            content = re.sub(r"'([^']*)':", r'"\1":', content)
-            
-            # Correction 3: Booléens JavaScript (true/false) vs Python (True/False)
-            content = re.sub(r':\s*true', ': true', content)
-            content = re.sub(r':\s*false', ': false', content)
-            content = content.replace(': true', ': "true"').replace(': false', ': "false"')
-            
-            # Vérifier si les corrections ont fonctionné
-            json.loads(content)
-            return content
-        except:
+            result = repair_json(content)
+        except JSONRepairError as e:
+            print(f"  {e}")
             return None
 
+        for line in result.describe(content, limit=20):
+            print(f"  Correction {line}")
+        if len(result.repairs) > 20:
+            print(f"  ... et {len(result.repairs) - 20} autres corrections")
+        return result.text
+
     def save_to_file(self) -> bool:
         """Sauvegarde le contenu du chapitre dans son fichier JSON, en calculant et en inscrivant sa nouvelle version."""
         if not self.file_path: return False
@@ -464,18 +531,9 @@ class ChapterData:
         # Ne plus créer de sauvegarde avant modification
         backup_path = None
 
-        data_to_save = {
-            'class': self.class_type,
-            'chapter': self.chapter_name,
-            'sessionDates': sorted(self.session_dates)
-        }
-
-        # Toujours sauvegarder la liste de vidéos (même si vide) pour permettre la suppression
-        data_to_save['videos'] = [v.to_dict() for v in self.videos]
-
-        # Préserver l'ordre actuel des quiz et des exercices tel quel
-        data_to_save['quiz'] = [q.to_dict() for q in self.quiz_questions]
-        data_to_save['exercises'] = [e.to_dict() for e in self.exercises]
+        # Toujours sauvegarder la liste de vidéos (même si vide) pour permettre la suppression,
+        # et préserver l'ordre actuel des quiz et des exercices tel quel
+        data_to_save = self.content_dict()
         
         # Vérifier si le contenu a réellement changé avant de modifier la version
         new_content_version = self._calculate_content_version(data_to_save)
@@ -516,6 +574,18 @@ class ChapterData:
             if self.file_path.exists():
                 self.file_path.unlink()
             temp_path.rename(self.file_path)
+
+            # Le journal d'édition est désormais intégré au fichier
+            EditJournal(self.file_path).compact()
+            self.mark_clean()
+            self._mirror_to_db(data_to_save)
+
+            # Les éléments partagés modifiés ici sont reportés dans la banque
+            try:
+                self.shared_items_changed = push_shared_items(data_to_save)
+            except (OSError, ItemBankError) as e:
+                self.shared_items_changed = []
+                print(f"Avertissement: banque d'éléments non mise à jour pour {self.file_path}: {e}")
             
             print(f"✓ Sauvegarde réussie: {self.file_path}")
             return True
@@ -530,6 +600,20 @@ class ChapterData:
                     print(f"ERREUR lors de la restauration de la sauvegarde: {e2}")
             return False
 
+    def _mirror_to_db(self, data: Dict[str, Any]):
+        """Reporte la sauvegarde dans la base SQLite des chapitres, si elle a été créée
+        (python chapter_db.py import). Seuls les éléments modifiés y sont réécrits."""
+        if not CHAPTER_DB_PATH.exists():
+            return
+        try:
+            db = ChapterDB(CHAPTER_DB_PATH)
+            try:
+                db.save_chapter(self.file_path.resolve().relative_to(CHAPTERS_DIR.resolve()).as_posix(), data)
+            finally:
+                db.close()
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Avertissement: base des chapitres non mise à jour pour {self.file_path}: {e}")
+
     def _calculate_content_version(self, data_to_hash: Dict[str, Any]) -> str:
         """Calcule un hash MD5 unique basé sur une sérialisation canonique du contenu."""
         content_string = json.dumps(data_to_hash, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
@@ -612,13 +696,56 @@ class ChapterData:
 # des composants complexes mais très bien écrits dans le script original.
 # Leur code sera repris ici avec des adaptations mineures pour les nouveaux modèles de données.
 
-class QuizEditor(QWidget):
+class UndoableListMixin:
+    """Annuler/rétablir pour les éditeurs de listes (questions, vidéos, exercices).
+
+    L'éditeur fournit le signal `history_changed`, `current_index` et
+    `refresh_list()`, puis appelle init_history() une fois sa liste créée.
+    """
+
+    def init_history(self, items: Callable[[], list], list_widget: QListWidget):
+        """`items` renvoie la liste éditée (réassignée par set_questions()...),
+        `list_widget` est la liste affichée à resélectionner après annuler/rétablir."""
+        self.history = UndoHistory()
+        self.history_items = items
+        self.history_list = list_widget
+
+    def record_history(self, index: Optional[int] = None):
+        """À appeler après chaque modification; `index` est l'élément modifié."""
+        if self.history.record(self.history_items(), index):
+            self.history_changed.emit()
+
+    def undo(self):
+        self._show_history_step(self.history.undo(self.history_items()))
+
+    def redo(self):
+        self._show_history_step(self.history.redo(self.history_items()))
+
+    def _show_history_step(self, index: Optional[int]):
+        if index is None:
+            return
+        with self.history.paused():
+            # Ne pas réécrire l'élément restauré avec le contenu des champs d'édition
+            self.current_index = -1
+            self.refresh_list()
+            if index >= 0:
+                self.history_list.setCurrentRow(index)
+        self.setProperty("modified", True)
+        self.history_changed.emit()
+
+
+class QuizEditor(QWidget, UndoableListMixin):
     """Éditeur de questions de quiz."""
+    history_changed = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.questions: List[QuizQuestion] = []
         self.current_index = -1
+        self.item_stats: Dict[str, Dict[str, Any]] = {}  # Statistiques par question (item_stats.py)
+        self.item_stats_stale = False  # Statistiques calculées sur une autre version du chapitre
         self.init_ui()
+        self.init_history(lambda: self.questions, self.question_list)
 
     def init_ui(self):
         # Interface pour l'éditeur de quiz
@@ -705,6 +832,12 @@ class QuizEditor(QWidget):
         type_layout.addWidget(self.type_label)
         type_layout.addStretch()
         editor_main_layout.addLayout(type_layout)
+
+        # Statistiques des réponses des élèves (item_analysis.py)
+        self.item_stats_label = QLabel("")
+        self.item_stats_label.setObjectName("helpLabel")
+        self.item_stats_label.setWordWrap(True)
+        editor_main_layout.addWidget(self.item_stats_label)
         
         # Conteneur pour les widgets spécifiques au type de question
         self.type_specific_container = QWidget()
@@ -799,20 +932,33 @@ class QuizEditor(QWidget):
 
     def set_questions(self, questions: List[QuizQuestion]):
         self.questions = [QuizQuestion.from_dict(q.to_dict()) for q in questions] # Deep copy
+        self.history.reset(self.questions)
         self.refresh_list()
         if self.questions: self.question_list.setCurrentRow(0)
 
     def get_questions(self) -> List[QuizQuestion]:
         return self.questions
 
+    def set_item_stats(self, sidecar: Dict[str, Any], version: str):
+        """Statistiques des réponses des élèves, affichées à côté de chaque question.
+        Comme item_analysis.py, celles d'une autre version du chapitre sont ignorées."""
+        self.item_stats_stale = bool(sidecar) and sidecar.get('version') != version
+        self.item_stats = sidecar.get('items', {}) if sidecar and not self.item_stats_stale else {}
+
+    def list_label(self, i: int, q: QuizQuestion) -> str:
+        # Préfixer avec le numéro et le type de question pour une meilleure visibilité
+        prefix = f"#{i+1} - [MCQ] " if q.type == "mcq" else f"#{i+1} - [ORD] "
+        if self.item_stats.get(q.id, {}).get('flags'):
+            prefix = "⚠️ " + prefix
+        text = q.question.strip().split('\n')[0] or f"Question {i+1} (vide)"
+        return prefix + (text[:60] + "..." if len(text) > 60 else text)
+
     def refresh_list(self):
         self.question_list.clear()
         for i, q in enumerate(self.questions):
-            # Préfixer avec le numéro et le type de question pour une meilleure visibilité
-            prefix = f"#{i+1} - [MCQ] " if q.type == "mcq" else f"#{i+1} - [ORD] "
-            text = q.question.strip().split('\n')[0] or f"Question {i+1} (vide)"
-            self.question_list.addItem(prefix + (text[:60] + "..." if len(text) > 60 else text))
+            self.question_list.addItem(self.list_label(i, q))
         self.count_label.setText(f"{len(self.questions)} question(s)")
+        self.record_history()
 
     def on_selection_changed(self, index: int):
         self.current_index = index
@@ -855,8 +1001,35 @@ class QuizEditor(QWidget):
             self.load_ordering_question(question)
             self.type_specific_layout.addWidget(self.ordering_widget)
             self.ordering_widget.show()
-            
+
+        self.load_item_stats(question)
         self.block_all_signals(False)
+
+    def load_item_stats(self, question: QuizQuestion):
+        """Affiche difficulté, discrimination et choix des options par les élèves."""
+        stats = self.item_stats.get(question.id)
+        for i, (radio, edit) in enumerate(self.option_widgets):
+            option = stats['options'][i] if stats and question.type == "mcq" and i < len(stats['options']) else None
+            edit.setToolTip(f"Choisie par {option['rate']:.0%} des élèves" if option and option['rate'] is not None else "")
+        if not stats:
+            self.item_stats_label.setText(
+                "🕓 Statistiques calculées sur une version précédente du chapitre: relancez item_analysis.py"
+                if self.item_stats_stale else ""
+            )
+            return
+        parts = [f"{stats['responses']} réponse(s)"]
+        if stats['p_value'] is not None:
+            parts.append(f"réussite {stats['p_value']:.0%}")
+        if stats['discrimination'] is not None:
+            parts.append(f"discrimination {stats['discrimination']:.2f}")
+        if question.type == "mcq":
+            rates = [f"{chr(65 + i)} {o['rate']:.0%}" for i, o in enumerate(stats['options']) if o['rate'] is not None]
+            if rates:
+                parts.append("choix: " + ", ".join(rates))
+        text = "📊 " + " · ".join(parts)
+        if stats['flags']:
+            text += "\n⚠️ " + "; ".join(stats['flags'])
+        self.item_stats_label.setText(text)
         
     def load_mcq_question(self, question: QuizQuestion):
         """Charge une question à choix multiples."""
@@ -908,9 +1081,8 @@ class QuizEditor(QWidget):
         # Mettre à jour le titre dans la liste
         item = self.question_list.item(self.current_index)
         if item:
-            prefix = f"#{self.current_index + 1} - [MCQ] " if q.type == "mcq" else f"#{self.current_index + 1} - [ORD] "
-            text = q.question.strip().split('\n')[0] or f"Question {self.current_index + 1} (vide)"
-            item.setText(prefix + (text[:60] + "..." if len(text) > 60 else text))
+            item.setText(self.list_label(self.current_index, q))
+        self.record_history(self.current_index)
             
     def save_mcq_question(self, question: QuizQuestion, explanation: str):
         """Sauvegarde une question à choix multiples."""
@@ -1007,9 +1179,11 @@ class QuizEditor(QWidget):
         for radio, edit in self.option_widgets:
             radio.setChecked(False)
             edit.clear()
+            edit.setToolTip("")
             
         # Nettoyer la liste des étapes
         self.steps_list.clear()
+        self.item_stats_label.setText("")
         
         self.block_all_signals(False)
 
@@ -1103,13 +1277,16 @@ class QuizEditor(QWidget):
 # seraient ici, adaptées pour utiliser les modèles de données robustes.
 # Pour la concision, je vais simplifier l'éditeur d'exercices.
 
-class VideoEditor(QWidget):
+class VideoEditor(QWidget, UndoableListMixin):
     """Éditeur de vidéos YouTube pour les capsules pédagogiques."""
+    history_changed = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.videos: List[Video] = []
         self.current_index = -1
         self.init_ui()
+        self.init_history(lambda: self.videos, self.video_list)
 
     def init_ui(self):
         layout = QVBoxLayout(self)
@@ -1202,6 +1379,7 @@ class VideoEditor(QWidget):
 
     def set_videos(self, videos: List[Video]):
         self.videos = videos
+        self.history.reset(self.videos)
         self.refresh_list()
         if videos:
             self.video_list.setCurrentRow(0)
@@ -1215,6 +1393,7 @@ class VideoEditor(QWidget):
             title = video.title if video.title else f"Vidéo {i+1}"
             self.video_list.addItem(f"{i+1}. {title}")
         self.count_label.setText(f"{len(self.videos)} vidéo(s)")
+        self.record_history()
 
     def add_video(self):
         new_video = Video(
@@ -1309,6 +1488,7 @@ class VideoEditor(QWidget):
             video.description = self.description_edit.toPlainText()
             video.thumbnail = self.thumbnail_edit.text()
             self.setProperty("modified", True)
+            self.record_history(self.current_index)
 
     def on_video_modified(self):
         if self.current_index >= 0:
@@ -1318,14 +1498,17 @@ class VideoEditor(QWidget):
                 title = self.title_edit.text() if self.title_edit.text() else f"Vidéo {self.current_index+1}"
                 item.setText(f"{self.current_index+1}. {title}")
 
-class ExerciseEditor(QWidget):
+class ExerciseEditor(QWidget, UndoableListMixin):
     """Éditeur d'exercices amélioré avec plus de fonctionnalités."""
+    history_changed = pyqtSignal()
+
     def __init__(self, chapter: ChapterData = None, parent=None):
         super().__init__(parent)
         self.chapter = chapter  # Référence au chapitre pour obtenir class_type et chapter_id
         self.exercises: List[Exercise] = []
         self.current_index = -1
         self.init_ui()
+        self.init_history(lambda: self.exercises, self.exercise_list)
 
     def init_ui(self):
         layout = QVBoxLayout(self)
@@ -1781,6 +1964,7 @@ class ExerciseEditor(QWidget):
 
     def set_exercises(self, exercises: List[Exercise]):
         self.exercises = [Exercise.from_dict(e.to_dict()) for e in exercises]
+        self.history.reset(self.exercises)
         self.refresh_list()
         if self.exercises: self.exercise_list.setCurrentRow(0)
 
@@ -1794,6 +1978,7 @@ class ExerciseEditor(QWidget):
             # Ajouter le numéro au début pour une meilleure identification
             self.exercise_list.addItem(f"#{i+1} - {text}")
         self.count_label.setText(f"{len(self.exercises)} exercice(s)")
+        self.record_history()
 
     def on_selection_changed(self, index: int):
         if index < 0 or index >= len(self.exercises):
@@ -1898,6 +2083,7 @@ class ExerciseEditor(QWidget):
         if item:
             title = ex.title or f"Exercice {self.current_index + 1} (sans titre)"
             item.setText(f"#{self.current_index + 1} - {title}")
+        self.record_history(self.current_index)
 
     def add_exercise(self):
         new_ex = Exercise(
@@ -2009,6 +2195,7 @@ class ExerciseEditor(QWidget):
             
             # Mettre à jour le compteur d'images
             self.update_images_count()
+            self.record_history(self.current_index)
         else:
             QMessageBox.information(
                 self,
@@ -2404,6 +2591,9 @@ class ImageManager(QWidget):
 
 class ChapterContentEditor(QDialog):
     """Éditeur complet du contenu d'un chapitre."""
+    # Intervalle d'ajout des modifications au journal d'édition
+    JOURNAL_INTERVAL_MS = 1500
+
     def __init__(self, chapter: ChapterData, parent=None):
         super().__init__(parent)
         self.chapter = chapter
@@ -2416,6 +2606,40 @@ class ChapterContentEditor(QDialog):
         self.init_ui()
         self.load_chapter_data()
 
+        # Journal d'édition: les éléments modifiés y sont ajoutés en continu pour survivre à un plantage
+        self.journal = EditJournal(chapter.file_path) if chapter.file_path else None
+        if self.journal:
+            self.journal_start = self.journal.start(self.current_content())
+            self.journal_timer = QTimer(self)
+            self.journal_timer.timeout.connect(self.journal_edits)
+            self.journal_timer.start(self.JOURNAL_INTERVAL_MS)
+
+    def current_content(self) -> Dict[str, Any]:
+        """État courant des éditeurs, au format du fichier de chapitre."""
+        return {
+            'chapter': self.name_edit.text().strip(),
+            'sessionDates': sorted(self.chapter.session_dates),
+            'videos': [v.to_dict() for v in self.video_editor.get_videos()],
+            'quiz': [q.to_dict() for q in self.quiz_editor.get_questions()],
+            'exercises': [e.to_dict() for e in self.exercise_editor.get_exercises()]
+        }
+
+    def journal_edits(self):
+        """Ajoute au journal les éléments modifiés depuis le dernier passage."""
+        if not self.journal:
+            return
+        try:
+            self.journal.track(self.current_content())
+        except OSError as e:
+            print(f"⚠️ Journal d'édition indisponible: {e}")
+
+    def reject(self):
+        """Annulation: les modifications de cette session sont retirées du journal."""
+        if self.journal:
+            self.journal_timer.stop()
+            self.journal.truncate(self.journal_start)
+        super().reject()
+
     def init_ui(self):
         layout = QVBoxLayout(self)
         
@@ -2437,6 +2661,29 @@ class ChapterContentEditor(QDialog):
         buttons = QDialogButtonBox()
         save_btn = QPushButton("Sauvegarder")
         cancel_btn = QPushButton("Annuler")
+
+        # Annuler/rétablir la dernière modification de l'onglet courant
+        self.undo_btn = QPushButton("↶ Défaire")
+        self.undo_btn.setToolTip("Annuler la dernière modification (Ctrl+Z)")
+        self.undo_btn.clicked.connect(self.undo)
+        self.redo_btn = QPushButton("↷ Rétablir")
+        self.redo_btn.setToolTip("Rétablir la modification annulée (Ctrl+Y)")
+        self.redo_btn.clicked.connect(self.redo)
+        buttons.addButton(self.undo_btn, QDialogButtonBox.ButtonRole.ActionRole)
+        buttons.addButton(self.redo_btn, QDialogButtonBox.ButtonRole.ActionRole)
+
+        undo_action = QAction(self)
+        undo_action.setShortcuts(QKeySequence.StandardKey.Undo)
+        undo_action.triggered.connect(self.undo)
+        self.addAction(undo_action)
+        redo_action = QAction(self)
+        redo_action.setShortcuts([QKeySequence("Ctrl+Y"), QKeySequence("Ctrl+Shift+Z")])
+        redo_action.triggered.connect(self.redo)
+        self.addAction(redo_action)
+
+        for editor in (self.video_editor, self.quiz_editor, self.exercise_editor):
+            editor.history_changed.connect(self.update_history_buttons)
+        self.tabs.currentChanged.connect(self.update_history_buttons)
         
         buttons.addButton(save_btn, QDialogButtonBox.ButtonRole.AcceptRole)
         buttons.addButton(cancel_btn, QDialogButtonBox.ButtonRole.RejectRole)
@@ -2444,6 +2691,26 @@ class ChapterContentEditor(QDialog):
         buttons.rejected.connect(self.reject)
         
         layout.addWidget(buttons)
+        self.update_history_buttons()
+
+    def current_list_editor(self) -> Optional[UndoableListMixin]:
+        editor = self.tabs.currentWidget()
+        return editor if isinstance(editor, UndoableListMixin) else None
+
+    def undo(self):
+        editor = self.current_list_editor()
+        if editor:
+            editor.undo()
+
+    def redo(self):
+        editor = self.current_list_editor()
+        if editor:
+            editor.redo()
+
+    def update_history_buttons(self):
+        editor = self.current_list_editor()
+        self.undo_btn.setEnabled(bool(editor and editor.history.can_undo))
+        self.redo_btn.setEnabled(bool(editor and editor.history.can_redo))
         
     def create_info_tab(self):
         widget = QWidget()
@@ -2530,6 +2797,8 @@ class ChapterContentEditor(QDialog):
 
     def load_chapter_data(self):
         self.video_editor.set_videos(self.chapter.videos)
+        if self.chapter.file_path:
+            self.quiz_editor.set_item_stats(load_item_stats(self.chapter.file_path), self.chapter.version)
         self.quiz_editor.set_questions(self.chapter.quiz_questions)
         self.exercise_editor.set_exercises(self.chapter.exercises)
 
@@ -2671,6 +2940,11 @@ class ChapterContentEditor(QDialog):
         original_quiz_count = len(self.chapter.quiz_questions)
         original_exercises_count = len(self.chapter.exercises)
 
+        # Dernières modifications au journal, jusqu'à la sauvegarde du chapitre
+        if self.journal:
+            self.journal_timer.stop()
+            self.journal_edits()
+
         # Récupérer les nouvelles données
         new_name = self.name_edit.text().strip()
         # Pour les dates, on utilise les données déjà mises à jour dans self.chapter.session_dates
@@ -2727,6 +3001,88 @@ class ChapterContentEditor(QDialog):
         
         self.accept()
 
+class IntegrityCheckWorker(QThread):
+    """Exécute la validation approfondie du contenu hors du thread de l'interface."""
+    report_ready = pyqtSignal(object)
+
+    def __init__(self, public_dir: Path, parent=None):
+        super().__init__(parent)
+        self.public_dir = public_dir
+
+    def run(self):
+        try:
+            # Pas de fork depuis ce processus Qt multithread: processus fils lancés à neuf
+            report = validate_corpus(self.public_dir, start_method='spawn')
+        except Exception as e:
+            report = {'exception': e}
+        self.report_ready.emit(report)
+
+class ContentWatcher(QObject):
+    """Surveille manifest.json et les fichiers de chapitres modifiés hors de l'application.
+
+    Les rafales d'événements (éditeur qui écrit en plusieurs fois, script qui
+    réécrit tout un dossier) sont regroupées: après DEBOUNCE_MS sans nouvel
+    événement, seuls les fichiers dont la taille ou la date a changé sont signalés.
+    """
+    changed = pyqtSignal(list)  # Liste de Path
+    DEBOUNCE_MS = 300
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._schedule)
+        self.watcher.directoryChanged.connect(self._schedule)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._flush)
+        self.signatures: Dict[Path, Optional[Tuple[int, int]]] = {}
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def watch(self, files: List[Path]):
+        """Remplace l'ensemble des fichiers surveillés (et de leurs dossiers)."""
+        self.timer.stop()
+        watched = self.watcher.files() + self.watcher.directories()
+        if watched:
+            self.watcher.removePaths(watched)
+        self.signatures = {path: self._signature(path) for path in files}
+        paths = {str(path) for path in files if path.exists()}
+        # Les dossiers signalent aussi les remplacements atomiques (écriture puis renommage)
+        paths.update(str(path.parent) for path in files if path.parent.exists())
+        if paths:
+            self.watcher.addPaths(sorted(paths))
+
+    def acknowledge(self, path: Path):
+        """Écriture faite par l'application elle-même: ne pas la signaler."""
+        if path in self.signatures:
+            self.signatures[path] = self._signature(path)
+
+    def _schedule(self, _path: str):
+        self.timer.start(self.DEBOUNCE_MS)
+
+    def _flush(self):
+        changed = []
+        for path, signature in self.signatures.items():
+            current = self._signature(path)
+            if current != signature:
+                self.signatures[path] = current
+                changed.append(path)
+
+        # Un fichier remplacé par renommage n'est plus surveillé: le réarmer
+        watched = set(self.watcher.files())
+        lost = [str(path) for path in self.signatures if str(path) not in watched and path.exists()]
+        if lost:
+            self.watcher.addPaths(lost)
+
+        if changed:
+            self.changed.emit(changed)
+
 # =============================================================================
 # SECTION 3: APPLICATION PRINCIPALE
 # La fenêtre principale qui orchestre l'ensemble de l'application.
@@ -2748,9 +3104,14 @@ class SmartChapterManager(QMainWindow):
     def __init__(self):
         super().__init__()
         self.manifest_path: Optional[Path] = None
+        self.manifest_store: Optional[ManifestStore] = None
         self.chapters_dir: Optional[Path] = None
         self.chapters_by_class: Dict[str, List[ChapterData]] = {cls: [] for cls in self.CLASSES}
         self.all_chapters: Dict[str, ChapterData] = {}
+        self.editing_chapter: Optional[ChapterData] = None
+        self.stats = StatsAggregator.load()
+        self.content_watcher = ContentWatcher(self)
+        self.content_watcher.changed.connect(self.on_files_changed_on_disk)
         self.init_ui()
         # Ouvrir en mode maximisé
         self.showMaximized()
@@ -2969,6 +3330,13 @@ class SmartChapterManager(QMainWindow):
         recalc_action.triggered.connect(self.recalculate_all_versions)
         tools_menu.addAction(recalc_action)
         
+        precache_action = QAction(
+            self.style().standardIcon(QStyle.StandardPixmap.SP_DriveNetIcon),
+            "Régénérer le précache du Service Worker", self
+        )
+        precache_action.triggered.connect(lambda: self.refresh_service_worker_precache(notify=True))
+        tools_menu.addAction(precache_action)
+        
         # Menu Aide
         help_menu = menubar.addMenu("&Aide")
         
@@ -3425,59 +3793,80 @@ class SmartChapterManager(QMainWindow):
         msg.exec()
     
     def export_statistics(self):
-        """Exporte les statistiques du projet."""
+        """Affiche les statistiques du projet (agrégats tenus à jour à chaque sauvegarde)
+        et propose leur export en JSON ou CSV, ou un instantané horodaté."""
         if not self.all_chapters:
             QMessageBox.warning(self, "Attention", "Aucun chapitre chargé.")
             return
-        
-        # Calculer les statistiques
-        stats = {
-            'total_chapters': len(self.all_chapters),
-            'active_chapters': sum(1 for ch in self.all_chapters.values() if ch.is_active),
-            'total_quiz': sum(len(ch.quiz_questions) for ch in self.all_chapters.values()),
-            'total_exercises': sum(len(ch.exercises) for ch in self.all_chapters.values()),
-            'by_class': {}
-        }
-        
-        for class_id in self.CLASSES:
-            chapters = self.chapters_by_class[class_id]
-            stats['by_class'][class_id] = {
-                'chapters': len(chapters),
-                'quiz': sum(len(ch.quiz_questions) for ch in chapters),
-                'exercises': sum(len(ch.exercises) for ch in chapters)
-            }
-        
-        # Afficher les statistiques
-        stats_text = f"""
-        <h2>📊 Statistiques du Projet</h2>
-        
-        <h3>Vue d'ensemble</h3>
-        <p><b>Chapitres totaux :</b> {stats['total_chapters']}</p>
-        <p><b>Chapitres actifs :</b> {stats['active_chapters']}</p>
-        <p><b>Questions de quiz :</b> {stats['total_quiz']}</p>
-        <p><b>Exercices :</b> {stats['total_exercises']}</p>
-        
-        <h3>Par classe</h3>
-        """
-        
+
+        labels = {'chapters': 'Chapitres', 'active_chapters': 'Actifs', 'quiz': 'Quiz', 'exercises': 'Exercices',
+                  'hints': 'Indices', 'images': 'Images', 'videos': 'Vidéos', 'formulas': 'Formules',
+                  'lesson_elements': 'Éléments de leçon', 'lesson_formulas': 'Formules de leçon'}
+        totals = self.stats.totals
+        stats_text = "<h2>📊 Statistiques du Projet</h2><h3>Vue d'ensemble</h3>"
+        stats_text += "".join(f"<p><b>{labels[c]} :</b> {totals[c]}</p>" for c in STATS_COUNTERS)
+        stats_text += "<h3>Par classe</h3>"
         for class_id in self.CLASSES:
-            class_stats = stats['by_class'][class_id]
-            if class_stats['chapters'] > 0:
-                stats_text += f"""
-                <p><b>{self.CLASS_LABELS[class_id]}</b><br>
-                &nbsp;&nbsp;Chapitres: {class_stats['chapters']} | 
-                Quiz: {class_stats['quiz']} | 
-                Exercices: {class_stats['exercises']}</p>
-                """
-        
+            class_stats = self.stats.by_class.get(class_id)
+            if class_stats and class_stats['chapters'] > 0:
+                stats_text += (f"<p><b>{self.CLASS_LABELS[class_id]}</b><br>&nbsp;&nbsp;"
+                               + " | ".join(f"{labels[c]}: {class_stats[c]}" for c in STATS_COUNTERS if c != 'chapters')
+                               + f" | Chapitres: {class_stats['chapters']}</p>")
+
         msg = QMessageBox(self)
         msg.setWindowTitle("Statistiques")
         msg.setTextFormat(Qt.TextFormat.RichText)
         msg.setText(stats_text)
         msg.setIcon(QMessageBox.Icon.Information)
-        msg.setStandardButtons(QMessageBox.StandardButton.Ok)
+        json_button = msg.addButton("Exporter JSON", QMessageBox.ButtonRole.ActionRole)
+        csv_button = msg.addButton("Exporter CSV", QMessageBox.ButtonRole.ActionRole)
+        snapshot_button = msg.addButton("📸 Instantané", QMessageBox.ButtonRole.ActionRole)
+        msg.addButton(QMessageBox.StandardButton.Ok)
         msg.exec()
-    
+
+        clicked = msg.clickedButton()
+        if clicked in (json_button, csv_button):
+            output_format = 'json' if clicked is json_button else 'csv'
+            default_name = f"statistiques_{datetime.now().strftime('%Y%m%d')}.{output_format}"
+            path, _ = QFileDialog.getSaveFileName(self, "Exporter les statistiques", default_name,
+                                                  f"{output_format.upper()} (*.{output_format})")
+            if path:
+                with open(path, 'w', encoding='utf-8', newline='') as f:
+                    self.stats.export(f, output_format)
+                self.update_status(f"📊 Statistiques exportées: {path}")
+        elif clicked is snapshot_button:
+            snapshot_path = self.stats.snapshot()
+            self.update_status(f"📸 Instantané des statistiques: {snapshot_path.name}")
+
+    @staticmethod
+    def chapter_lesson_path(chapter: ChapterData) -> Optional[Path]:
+        return chapter.file_path.parent / chapter.lesson_file if chapter.file_path and chapter.lesson_file else None
+
+    def record_chapter_stats(self, chapter: ChapterData):
+        """Remplace les compteurs d'un chapitre dans les agrégats (sans relire les autres)."""
+        self.stats.update_chapter(chapter.id, chapter.class_type, chapter.content_dict(),
+                                  chapter.is_active, chapter.version, self.chapter_lesson_path(chapter))
+
+    def sync_statistics(self):
+        """Aligne les agrégats enregistrés sur les chapitres chargés: seuls les chapitres
+        dont la version ou le fichier de leçon (date, taille) a changé depuis la dernière
+        session sont recomptés."""
+        for chapter in self.all_chapters.values():
+            row = self.stats.chapters.get(chapter.id)
+            if (not self.stats.is_current(chapter.id, chapter.version, self.chapter_lesson_path(chapter))
+                    or row['class'] != chapter.class_type):
+                self.record_chapter_stats(chapter)
+            else:
+                self.stats.set_active(chapter.id, chapter.is_active)
+        self.stats.retain(self.all_chapters)
+        self.save_statistics()
+
+    def save_statistics(self):
+        try:
+            self.stats.save()
+        except OSError as e:
+            print(f"⚠️ Statistiques non enregistrées: {e}")
+
     def update_header_info(self):
         """Met à jour les informations dans l'en-tête."""
         if self.manifest_path:
@@ -3485,12 +3874,9 @@ class SmartChapterManager(QMainWindow):
         else:
             self.project_label.setText("Aucun projet chargé")
         
-        total_chapters = len(self.all_chapters)
-        total_quiz = sum(len(ch.quiz_questions) for ch in self.all_chapters.values())
-        total_exercises = sum(len(ch.exercises) for ch in self.all_chapters.values())
-        
+        totals = self.stats.totals
         self.stats_label.setText(
-            f"{total_chapters} chapitres | {total_quiz} questions | {total_exercises} exercices"
+            f"{totals['chapters']} chapitres | {totals['quiz']} questions | {totals['exercises']} exercices"
         )
     
     def apply_style(self):
@@ -3911,8 +4297,9 @@ class SmartChapterManager(QMainWindow):
         
         # Charger le fichier manifest
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                manifest_data = json.load(f)
+            # Le contenu lu sert de base à la fusion si une autre session écrit entre-temps
+            self.manifest_store = ManifestStore(path)
+            manifest_data = self.manifest_store.read()
         except json.JSONDecodeError as e:
             # Afficher des informations détaillées sur l'erreur de syntaxe JSON
             line_info = f", ligne {e.lineno}, colonne {e.colno}" if hasattr(e, 'lineno') else ""
@@ -3977,10 +4364,27 @@ class SmartChapterManager(QMainWindow):
                     error_details.append(f"Erreur inattendue: {e}")
                     error_count += 1
         
+        # Rejouer les modifications non sauvegardées d'une session interrompue
+        restored = self.replay_edit_journals()
+
+        # Suivre les modifications faites hors de l'application (éditeur de texte, scripts)
+        self.watch_content()
+        self.sync_statistics()
+
         self.refresh_all_tabs()
         
         # Mettre à jour l'en-tête avec les informations du projet
         self.update_header_info()
+
+        if restored:
+            QMessageBox.information(
+                self,
+                "Modifications restaurées",
+                f"Des modifications non sauvegardées ont été retrouvées et réappliquées:\n\n"
+                + "\n".join(restored[:10])
+                + ("\n..." if len(restored) > 10 else "")
+                + "\n\nSauvegardez (Ctrl+S) pour les conserver."
+            )
         
         # Afficher un rapport détaillé
         status_message = f"{loaded_count} chapitres chargés avec succès."
@@ -4000,6 +4404,159 @@ class SmartChapterManager(QMainWindow):
             
         self.update_status(status_message)
         
+    def replay_edit_journals(self) -> List[str]:
+        """Réapplique les journaux d'édition restés sur disque (fermeture brutale).
+        Retourne la description des chapitres restaurés."""
+        restored = []
+        for chapter in self.all_chapters.values():
+            if not chapter.file_path:
+                continue
+            journal = EditJournal(chapter.file_path)
+            if not journal.path.exists():
+                continue
+            force = False
+            try:
+                if journal.has_records() and journal.is_stale():
+                    msg = QMessageBox(self)
+                    msg.setWindowTitle("Journal d'édition obsolète")
+                    msg.setIcon(QMessageBox.Icon.Warning)
+                    msg.setText(
+                        f"Des modifications non sauvegardées de '{chapter.chapter_name}' ont été retrouvées, "
+                        f"mais le fichier du chapitre a été modifié depuis (autre session, publication, "
+                        f"édition à la main).\n\nLes rejouer risque de modifier les mauvaises questions "
+                        f"ou les mauvais exercices."
+                    )
+                    replay_button = msg.addButton("Rejouer quand même", QMessageBox.ButtonRole.AcceptRole)
+                    delete_button = msg.addButton("Supprimer le journal", QMessageBox.ButtonRole.DestructiveRole)
+                    keep_button = msg.addButton("Mettre de côté", QMessageBox.ButtonRole.RejectRole)
+                    msg.setDefaultButton(keep_button)
+                    msg.exec()
+                    clicked = msg.clickedButton()
+                    if clicked is delete_button:
+                        journal.compact()
+                        print(f"🗑️ Journal obsolète supprimé pour '{chapter.chapter_name}'")
+                        continue
+                    if clicked is not replay_button:
+                        aside = journal.set_aside()
+                        print(f"⚠️ Journal obsolète mis de côté pour '{chapter.chapter_name}': {aside}")
+                        continue
+                    force = True
+                count = chapter.apply_journal(force=force)
+            except Exception as e:
+                print(f"❌ Journal d'édition illisible pour {chapter.file_name}: {e}")
+                continue
+            if count:
+                print(f"↩️ {count} modification(s) restaurée(s) pour '{chapter.chapter_name}'")
+                restored.append(f"{chapter.chapter_name} ({count} modification(s))")
+        return restored
+
+    def watch_content(self):
+        """(Re)définit les fichiers surveillés: le manifest et les fichiers des chapitres chargés."""
+        files = [self.manifest_path] + [ch.file_path for ch in self.all_chapters.values() if ch.file_path]
+        self.content_watcher.watch(files)
+
+    def on_files_changed_on_disk(self, paths: List[Path]):
+        """Recharge uniquement les chapitres dont le fichier a été modifié hors de l'application."""
+        by_path = {ch.file_path: ch for ch in self.all_chapters.values() if ch.file_path}
+        for path in paths:
+            if path in by_path:
+                self.reload_chapter_from_disk(by_path[path])
+        if self.manifest_path in paths:
+            self.sync_manifest_from_disk()
+
+    def reload_chapter_from_disk(self, chapter: ChapterData):
+        """Recharge un chapitre modifié sur le disque et met à jour sa seule ligne."""
+        if not chapter.file_path.exists():
+            self.update_status(f"⚠️ Fichier supprimé hors de l'application: {chapter.file_name}")
+            return
+        try:
+            with open(chapter.file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            # Fichier en cours d'écriture ou invalide: ne pas le réparer sous les pieds de l'auteur
+            self.update_status(f"⚠️ {chapter.file_name} illisible, rechargement ignoré: {e}")
+            return
+
+        on_disk = ChapterData()
+        on_disk.load_from_manifest(chapter.to_manifest_dict(), chapter.class_type)
+        on_disk.file_path = chapter.file_path
+        on_disk.load_content(data)
+        if on_disk.content_dict() == chapter.content_dict():
+            # Écriture faite par l'application elle-même, ou sans effet sur le contenu
+            chapter.version = data.get('version', chapter.version)
+            chapter.mark_clean()
+            return
+
+        if self.editing_chapter is chapter:
+            QMessageBox.warning(
+                self,
+                "Conflit de modification",
+                f"Le fichier de '{chapter.chapter_name}' a été modifié sur le disque pendant son édition.\n\n"
+                "Sauvegarder l'éditeur écrasera ces modifications externes."
+            )
+            return
+
+        if chapter.has_unsaved_edits():
+            reply = QMessageBox.question(
+                self,
+                "Conflit de modification",
+                f"Le fichier de '{chapter.chapter_name}' a été modifié sur le disque, "
+                "mais le chapitre a des modifications non sauvegardées.\n\n"
+                "Recharger depuis le disque (vos modifications seront perdues) ?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                self.update_status(f"⚠️ '{chapter.chapter_name}': modifications externes ignorées")
+                return
+
+        chapter.load_content(data)
+        chapter.version = data.get('version', chapter.version)
+        chapter.mark_clean()
+        self.record_chapter_stats(chapter)
+        self.save_statistics()
+        self.refresh_chapter_row(chapter)
+        self.update_status(f"🔄 '{chapter.chapter_name}' rechargé depuis le disque")
+
+    def sync_manifest_from_disk(self):
+        """Applique une modification externe du manifest: état actif des chapitres,
+        ou rechargement complet si des chapitres ont été ajoutés, retirés ou déplacés."""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest_data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.update_status(f"⚠️ manifest.json illisible, rechargement ignoré: {e}")
+            return
+
+        same_structure = all(
+            [(e.get('id'), e.get('file')) for e in manifest_data.get(class_id, [])]
+            == [(ch.id, ch.file_name) for ch in self.chapters_by_class[class_id]]
+            for class_id in self.CLASSES
+        )
+        if not same_structure:
+            if self.has_unsaved_changes() or self.editing_chapter:
+                QMessageBox.warning(
+                    self,
+                    "Manifest modifié",
+                    "La liste des chapitres a été modifiée sur le disque.\n\n"
+                    "Sauvegardez vos modifications puis actualisez (F5) pour la recharger."
+                )
+                return
+            self.load_manifest(self.manifest_path)
+            return
+
+        toggled = False
+        for class_id in self.CLASSES:
+            for entry, chapter in zip(manifest_data.get(class_id, []), self.chapters_by_class[class_id]):
+                is_active = entry.get('isActive', False)
+                if chapter.is_active != is_active:
+                    chapter.is_active = is_active
+                    self.stats.set_active(chapter.id, is_active)
+                    toggled = True
+                    self.refresh_chapter_row(chapter)
+                    self.update_status(f"🔄 '{chapter.chapter_name}' {'activé' if is_active else 'désactivé'} hors de l'application")
+        if toggled:
+            self.save_statistics()
+
     def _attempt_manifest_recovery(self, path: Path) -> bool:
         """Tente de récupérer un fichier manifest corrompu."""
         try:
@@ -4011,27 +4568,30 @@ class SmartChapterManager(QMainWindow):
             with open(path, 'r', encoding='utf-8') as f:
                 content = f.read()
                 
-            # Tenter les corrections courantes
-            content = re.sub(r',\s*}', '}', content)
-            content = re.sub(r',\s*]', ']', content)
-            content = re.sub(r"'([^']*)':", r'"\1":', content)
-            
-            # Tenter de parser le JSON corrigé
+            # Réparer en un seul passage (virgules, guillemets, clés, fin tronquée)
             try:
-                data = json.loads(content)
+                result = repair_json(content)
+                data = json.loads(result.text)
                 
                 # Réécrire le fichier avec un format correct
                 with open(path, 'w', encoding='utf-8') as f:
                     json.dump(data, f, indent=2, ensure_ascii=False)
-                    
+                # Les fragments par classe sont lus en priorité par l'application
+                if isinstance(data, dict):
+                    write_shards(data, path)
+                
+                details = "\n".join(result.describe(content, limit=10))
+                if len(result.repairs) > 10:
+                    details += f"\n... et {len(result.repairs) - 10} autres corrections."
                 QMessageBox.information(
                     self,
                     "Récupération réussie",
-                    f"Le fichier manifest a été réparé. Une sauvegarde du fichier original a été créée: {backup_path}"
+                    f"Le fichier manifest a été réparé ({len(result.repairs)} correction(s)):\n\n{details}\n\n"
+                    f"Une sauvegarde du fichier original a été créée: {backup_path}"
                 )
                 return True
                 
-            except json.JSONDecodeError:
+            except JSONRepairError:
                 # Si la correction simple ne fonctionne pas, créer un nouveau manifest minimal
                 reply = QMessageBox.question(
                     self,
@@ -4045,6 +4605,7 @@ class SmartChapterManager(QMainWindow):
                     minimal_manifest = {cls: [] for cls in self.CLASSES}
                     with open(path, 'w', encoding='utf-8') as f:
                         json.dump(minimal_manifest, f, indent=2, ensure_ascii=False)
+                    write_shards(minimal_manifest, path)
                     return True
                     
             return False
@@ -4068,136 +4629,150 @@ class SmartChapterManager(QMainWindow):
         table.setRowCount(len(chapters))
 
         for row, chapter in enumerate(chapters):
-            # Colonne 0 : Icône de statut
-            status_label = QLabel()
-            if chapter.is_active:
-                status_icon = self.style().standardIcon(QStyle.StandardPixmap.SP_DialogYesButton)
-                status_label.setPixmap(status_icon.pixmap(16, 16))
-                status_label.setToolTip("Chapitre actif")
-            else:
-                status_icon = self.style().standardIcon(QStyle.StandardPixmap.SP_DialogNoButton)
-                status_label.setPixmap(status_icon.pixmap(16, 16))
-                status_label.setToolTip("Chapitre inactif")
-            
-            status_widget = QWidget()
-            status_layout = QHBoxLayout(status_widget)
-            status_layout.addWidget(status_label)
-            status_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            status_layout.setContentsMargins(0, 0, 0, 0)
-            table.setCellWidget(row, 0, status_widget)
-            
-            # Colonne 1 : Actif (Checkbox)
-            check = QCheckBox()
-            check.setChecked(chapter.is_active)
-            check.toggled.connect(lambda state, ch=chapter: self.set_chapter_active(ch, state))
-            cell_widget = QWidget()
-            layout = QHBoxLayout(cell_widget)
-            layout.addWidget(check)
-            layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            layout.setContentsMargins(0, 0, 0, 0)
-            table.setCellWidget(row, 1, cell_widget)
-            
-            # Colonne 2 : Nom du chapitre
-            name_item = QTableWidgetItem(chapter.chapter_name)
-            name_item.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_FileIcon))
-            table.setItem(row, 2, name_item)
-            
-            # Colonne 3 : Version avec badge
-            version_widget = QWidget()
-            version_layout = QHBoxLayout(version_widget)
-            version_layout.setContentsMargins(4, 0, 4, 0)
-            
-            version_label = QLabel(chapter.version)
-            version_label.setStyleSheet("""
-                QLabel {
-                    background-color: #e8f4f8;
-                    color: #0078d4;
-                    padding: 4px 8px;
-                    border-radius: 3px;
-                    font-family: 'Courier New', monospace;
-                    font-size: 10px;
-                    font-weight: 600;
-                }
-            """)
-            version_layout.addWidget(version_label)
-            version_layout.addStretch()
-            table.setCellWidget(row, 3, version_widget)
-            
-            # Colonne 4 : Quiz avec icône
-            quiz_item = QTableWidgetItem(f"  {len(chapter.quiz_questions)}")
-            quiz_item.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_MessageBoxQuestion))
-            quiz_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            table.setItem(row, 4, quiz_item)
-            
-            # Colonne 5 : Exercices avec icône
-            ex_item = QTableWidgetItem(f"  {len(chapter.exercises)}")
-            ex_item.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_FileDialogDetailedView))
-            ex_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            table.setItem(row, 5, ex_item)
-
-            # Colonne 6 : Actions avec boutons natifs
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout(actions_widget)
-            actions_layout.setContentsMargins(4, 4, 4, 4)
-            actions_layout.setSpacing(4)
-            
-            # Bouton Éditer
-            edit_btn = QPushButton(" Éditer")
-            edit_btn.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_FileDialogContentsView))
-            edit_btn.setFixedSize(70, 30)
-            edit_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            edit_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #0078d4;
-                    color: white;
-                    border: none;
-                    border-radius: 3px;
-                    font-weight: 500;
-                    font-size: 11px;
-                }
-                QPushButton:hover {
-                    background-color: #106ebe;
-                }
-                QPushButton:pressed {
-                    background-color: #005a9e;
-                }
-            """)
-            edit_btn.clicked.connect(lambda _, ch=chapter: self.edit_chapter(ch))
-            actions_layout.addWidget(edit_btn)
-            
-            # Bouton Supprimer
-            del_btn = QPushButton(" Suppr.")
-            del_btn.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_TrashIcon))
-            del_btn.setFixedSize(70, 30)
-            del_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            del_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #d13438;
-                    color: white;
-                    border: none;
-                    border-radius: 3px;
-                    font-weight: 500;
-                    font-size: 11px;
-                }
-                QPushButton:hover {
-                    background-color: #a72d2f;
-                }
-                QPushButton:pressed {
-                    background-color: #8b2426;
-                }
-            """)
-            del_btn.clicked.connect(lambda _, ch=chapter: self.delete_chapter(ch))
-            actions_layout.addWidget(del_btn)
-            
-            actions_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            table.setCellWidget(row, 6, actions_widget)
-            
-            # Hauteur de ligne
-            table.setRowHeight(row, 50)
+            self.fill_chapter_row(table, row, chapter)
         
         # Mise à jour de l'en-tête
         self.update_header_info()
 
+    def refresh_chapter_row(self, chapter: ChapterData):
+        """Met à jour la seule ligne d'un chapitre, sans reconstruire tout le tableau."""
+        chapters = self.chapters_by_class.get(chapter.class_type, [])
+        idx = self.CLASSES.index(chapter.class_type)
+        table: QTableWidget = self.tabs.widget(idx).findChild(QTableWidget, f"table_{chapter.class_type}")
+        if not table or chapter not in chapters:
+            return
+        self.fill_chapter_row(table, chapters.index(chapter), chapter)
+        self.update_header_info()
+
+    def fill_chapter_row(self, table: QTableWidget, row: int, chapter: ChapterData):
+        """Remplit une ligne du tableau d'une classe avec les informations du chapitre."""
+        # Colonne 0 : Icône de statut
+        status_label = QLabel()
+        if chapter.is_active:
+            status_icon = self.style().standardIcon(QStyle.StandardPixmap.SP_DialogYesButton)
+            status_label.setPixmap(status_icon.pixmap(16, 16))
+            status_label.setToolTip("Chapitre actif")
+        else:
+            status_icon = self.style().standardIcon(QStyle.StandardPixmap.SP_DialogNoButton)
+            status_label.setPixmap(status_icon.pixmap(16, 16))
+            status_label.setToolTip("Chapitre inactif")
+        
+        status_widget = QWidget()
+        status_layout = QHBoxLayout(status_widget)
+        status_layout.addWidget(status_label)
+        status_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        status_layout.setContentsMargins(0, 0, 0, 0)
+        table.setCellWidget(row, 0, status_widget)
+        
+        # Colonne 1 : Actif (Checkbox)
+        check = QCheckBox()
+        check.setChecked(chapter.is_active)
+        check.toggled.connect(lambda state, ch=chapter: self.set_chapter_active(ch, state))
+        cell_widget = QWidget()
+        layout = QHBoxLayout(cell_widget)
+        layout.addWidget(check)
+        layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.setContentsMargins(0, 0, 0, 0)
+        table.setCellWidget(row, 1, cell_widget)
+        
+        # Colonne 2 : Nom du chapitre
+        name_item = QTableWidgetItem(chapter.chapter_name)
+        name_item.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_FileIcon))
+        table.setItem(row, 2, name_item)
+        
+        # Colonne 3 : Version avec badge
+        version_widget = QWidget()
+        version_layout = QHBoxLayout(version_widget)
+        version_layout.setContentsMargins(4, 0, 4, 0)
+        
+        version_label = QLabel(chapter.version)
+        version_label.setStyleSheet("""
+            QLabel {
+                background-color: #e8f4f8;
+                color: #0078d4;
+                padding: 4px 8px;
+                border-radius: 3px;
+                font-family: 'Courier New', monospace;
+                font-size: 10px;
+                font-weight: 600;
+            }
+        """)
+        version_layout.addWidget(version_label)
+        version_layout.addStretch()
+        table.setCellWidget(row, 3, version_widget)
+        
+        # Colonne 4 : Quiz avec icône
+        quiz_item = QTableWidgetItem(f"  {len(chapter.quiz_questions)}")
+        quiz_item.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_MessageBoxQuestion))
+        quiz_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        table.setItem(row, 4, quiz_item)
+        
+        # Colonne 5 : Exercices avec icône
+        ex_item = QTableWidgetItem(f"  {len(chapter.exercises)}")
+        ex_item.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_FileDialogDetailedView))
+        ex_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        table.setItem(row, 5, ex_item)
+
+        # Colonne 6 : Actions avec boutons natifs
+        actions_widget = QWidget()
+        actions_layout = QHBoxLayout(actions_widget)
+        actions_layout.setContentsMargins(4, 4, 4, 4)
+        actions_layout.setSpacing(4)
+        
+        # Bouton Éditer
+        edit_btn = QPushButton(" Éditer")
+        edit_btn.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_FileDialogContentsView))
+        edit_btn.setFixedSize(70, 30)
+        edit_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        edit_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #0078d4;
+                color: white;
+                border: none;
+                border-radius: 3px;
+                font-weight: 500;
+                font-size: 11px;
+            }
+            QPushButton:hover {
+                background-color: #106ebe;
+            }
+            QPushButton:pressed {
+                background-color: #005a9e;
+            }
+        """)
+        edit_btn.clicked.connect(lambda _, ch=chapter: self.edit_chapter(ch))
+        actions_layout.addWidget(edit_btn)
+        
+        # Bouton Supprimer
+        del_btn = QPushButton(" Suppr.")
+        del_btn.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_TrashIcon))
+        del_btn.setFixedSize(70, 30)
+        del_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        del_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #d13438;
+                color: white;
+                border: none;
+                border-radius: 3px;
+                font-weight: 500;
+                font-size: 11px;
+            }
+            QPushButton:hover {
+                background-color: #a72d2f;
+            }
+            QPushButton:pressed {
+                background-color: #8b2426;
+            }
+        """)
+        del_btn.clicked.connect(lambda _, ch=chapter: self.delete_chapter(ch))
+        actions_layout.addWidget(del_btn)
+        
+        actions_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        table.setCellWidget(row, 6, actions_widget)
+        
+        # Hauteur de ligne
+        table.setRowHeight(row, 50)
+
     def set_chapter_active(self, chapter: ChapterData, state: bool):
         """
         Active ou désactive un chapitre et met à jour le manifest immédiatement.
@@ -4242,6 +4817,7 @@ class SmartChapterManager(QMainWindow):
             self.chapters_by_class[class_id].append(new_chapter)
             self.edit_chapter(new_chapter) # Ouvrir l'éditeur pour finaliser
             self.refresh_class_tab(class_id)
+            self.watch_content()
 
     def on_table_double_click(self, model_index):
         row = model_index.row()
@@ -4267,7 +4843,12 @@ class SmartChapterManager(QMainWindow):
             editor.exercise_editor.setProperty("modified", False)
         
         # Exécuter l'éditeur
-        if editor.exec() == QDialog.DialogCode.Accepted:
+        self.editing_chapter = chapter
+        try:
+            accepted = editor.exec() == QDialog.DialogCode.Accepted
+        finally:
+            self.editing_chapter = None
+        if accepted:
             # Vérifier si des modifications ont été apportées
             content_modified = (
                 chapter.has_changed() or 
@@ -4282,9 +4863,16 @@ class SmartChapterManager(QMainWindow):
                 # Force la sauvegarde immédiate du fichier
                 if chapter.save_to_file():
                     # ✅ CORRECTION CRITIQUE : Mise à jour du manifest APRÈS sauvegarde
+                    # Republier d'abord les chapitres qui partagent ses éléments: le précache
+                    # régénéré par update_manifest_entry inclut alors leurs nouvelles versions
+                    self.propagate_shared_items([chapter])
                     success = self.update_manifest_entry(chapter)
                     
                     if success:
+                        # Statistiques alignées sur le manifest: sinon, recomptées à la
+                        # prochaine session (version différente)
+                        self.record_chapter_stats(chapter)
+                        self.save_statistics()
                         self.update_status(f"✅ Chapitre '{chapter.chapter_name}' sauvegardé (version: {chapter.version})")
                     else:
                         QMessageBox.warning(
@@ -4299,11 +4887,34 @@ class SmartChapterManager(QMainWindow):
                         f"Impossible de sauvegarder le chapitre '{chapter.chapter_name}'."
                     )
             else:
+                # Modifications annulées entre-temps: le journal n'a plus d'effet
+                if chapter.file_path:
+                    EditJournal(chapter.file_path).compact()
                 self.update_status(f"ℹ️ Aucune modification dans '{chapter.chapter_name}'")
             
             # Rafraîchir l'interface
             self.refresh_class_tab(chapter.class_type)
     
+    def propagate_shared_items(self, saved_chapters: List[ChapterData]):
+        """Republie les autres chapitres qui référencent un élément partagé modifié par ces sauvegardes.
+        Seuls ces chapitres sont réécrits et re-versionnés; le ContentWatcher les recharge ensuite."""
+        changed = {ref for chapter in saved_chapters for ref in chapter.shared_items_changed}
+        if not changed:
+            return
+        try:
+            results = publish_shared_items(chapters_dir=self.chapters_dir, manifest_path=self.manifest_path, only=changed)
+        except (OSError, json.JSONDecodeError, ManifestLockError, ValueError) as e:
+            QMessageBox.warning(self, "Éléments partagés",
+                                f"Les autres chapitres utilisant ces éléments n'ont pas pu être mis à jour:\n{e}\n\n"
+                                "Lancez 'python item_bank.py publish'.")
+            return
+        for chapter in saved_chapters:
+            chapter.shared_items_changed = []
+        if results:
+            print(f"🔗 Éléments partagés republiés dans {len(results)} chapitre(s): "
+                  + ", ".join(result['file'] for result in results))
+            self.update_status(f"🔗 {len(results)} autre(s) chapitre(s) mis à jour (éléments partagés)")
+
     def update_manifest_entry(self, chapter: ChapterData) -> bool:
         """
         Met à jour l'entrée d'un chapitre dans le manifest.json.
@@ -4314,47 +4925,27 @@ class SmartChapterManager(QMainWindow):
             return False
         
         try:
-            # Charger le manifest actuel
-            with open(self.manifest_path, 'r', encoding='utf-8') as f:
-                manifest_data = json.load(f)
-            
-            # Trouver et mettre à jour l'entrée du chapitre
-            updated = False
-            for class_id, chapters_list in manifest_data.items():
-                for ch_data in chapters_list:
-                    if ch_data.get('id') == chapter.id:
-                        # Mettre à jour toutes les informations
-                        ch_data['version'] = chapter.version
-                        ch_data['isActive'] = chapter.is_active
-                        ch_data['file'] = chapter.file_name
-                        updated = True
-                        print(f"✅ Manifest mis à jour pour '{chapter.id}' -> version: {chapter.version}, actif: {chapter.is_active}")
-                        break
-                if updated:
-                    break
-            
+            # Mise à jour de la seule entrée du chapitre, sous verrou, sur la version actuelle
+            # du disque: les modifications faites par d'autres sessions sont conservées
+            updated = self.manifest_store.update_entry(chapter.id, {
+                'version': chapter.version,
+                'isActive': chapter.is_active,
+                'file': chapter.file_name
+            })
             if not updated:
                 print(f"⚠️ Chapitre '{chapter.id}' non trouvé dans le manifest")
                 return False
-            
-            # Sauvegarder le manifest avec fichier temporaire pour sécurité
-            temp_manifest = self.manifest_path.with_suffix('.tmp.json')
-            
-            with open(temp_manifest, 'w', encoding='utf-8') as f:
-                json.dump(manifest_data, f, indent=2, ensure_ascii=False)
-            
-            # Valider le JSON
-            with open(temp_manifest, 'r', encoding='utf-8') as f:
-                json.load(f)  # Lève une exception si invalide
-            
-            # Remplacer l'ancien manifest
-            if self.manifest_path.exists():
-                self.manifest_path.unlink()
-            temp_manifest.rename(self.manifest_path)
-            
-            print(f"✅ Fichier manifest.json mis à jour avec succès")
+
+            self.content_watcher.acknowledge(self.manifest_path)
+            self.stats.set_active(chapter.id, chapter.is_active)
+            self.save_statistics()
+            print(f"✅ Manifest mis à jour pour '{chapter.id}' -> version: {chapter.version}, actif: {chapter.is_active}")
+            self.refresh_service_worker_precache()
             return True
             
+        except ManifestLockError as e:
+            print(f"❌ {e}")
+            return False
         except json.JSONDecodeError as e:
             print(f"❌ Erreur JSON lors de la mise à jour du manifest: {e}")
             return False
@@ -4370,7 +4961,10 @@ class SmartChapterManager(QMainWindow):
             
             self.chapters_by_class[chapter.class_type].remove(chapter)
             del self.all_chapters[chapter.id]
+            self.stats.remove_chapter(chapter.id)
+            self.save_statistics()
             self.refresh_class_tab(chapter.class_type)
+            self.watch_content()
             self.update_status(f"'{chapter.chapter_name}' supprimé.")
 
     def save_all(self, specific_chapter_id=None):
@@ -4413,7 +5007,25 @@ class SmartChapterManager(QMainWindow):
                 return True
                 
         # Ne plus créer de sauvegarde du manifest
-        
+
+        # Un même élément partagé modifié différemment dans deux chapitres: la banque ne
+        # garderait que la dernière version, republiée ensuite par-dessus l'autre
+        try:
+            conflicts = conflicting_pushes((ch.chapter_name, ch.content_dict()) for ch in chapters_to_save)
+        except (OSError, ItemBankError, json.JSONDecodeError) as e:
+            conflicts = {}
+            print(f"Avertissement: banque d'éléments illisible: {e}")
+        if conflicts:
+            QMessageBox.warning(
+                self,
+                "Conflit d'éléments partagés",
+                "Ces éléments partagés ont été modifiés différemment dans plusieurs chapitres:\n\n"
+                + "\n".join(f"- {ref}: {', '.join(names)}" for ref, names in sorted(conflicts.items()))
+                + "\n\nAlignez les modifications (ou ne gardez que celles d'un chapitre) avant de sauvegarder."
+            )
+            self.update_status(f"⚠️ Sauvegarde annulée: {len(conflicts)} élément(s) partagé(s) en conflit")
+            return False
+
         progress = QProgressDialog("Sauvegarde des chapitres...", "Annuler", 0, len(chapters_to_save), self)
         progress.setWindowModality(Qt.WindowModality.WindowModal)
 
@@ -4452,29 +5064,17 @@ class SmartChapterManager(QMainWindow):
         # 2. Construire et sauvegarder le nouveau manifest
         manifest_data = {cid: [ch.to_manifest_dict() for ch in clist] for cid, clist in self.chapters_by_class.items()}
         try:
-            # Écriture sécurisée avec fichier temporaire
-            temp_path = self.manifest_path.with_suffix('.tmp.json')
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(manifest_data, f, indent=2, ensure_ascii=False)
-            
-            # Vérifier que le JSON est valide
-            try:
-                with open(temp_path, 'r', encoding='utf-8') as f:
-                    json.load(f)
-                print("Validation du manifest réussie")
-            except json.JSONDecodeError:
-                temp_path.unlink(missing_ok=True)
-                QMessageBox.critical(
-                    self, 
-                    "Erreur", 
-                    "Le manifest généré est corrompu. Aucun changement n'a été effectué."
-                )
-                return False
-                
-            # Remplacer le fichier original
-            if self.manifest_path.exists():
-                self.manifest_path.unlink()
-            temp_path.rename(self.manifest_path)
+            # Écriture sous verrou; si une autre session a modifié le manifest depuis
+            # son chargement, les deux versions sont fusionnées entrée par entrée
+            merged, conflicts = self.manifest_store.save(manifest_data)
+            for conflict in conflicts:
+                print(f"⚠️ Conflit de manifest: {conflict}")
+            self.content_watcher.acknowledge(self.manifest_path)
+            for chapter in chapters_to_save:
+                self.record_chapter_stats(chapter)
+            self.save_statistics()
+            self.propagate_shared_items(chapters_to_save)
+            self.refresh_service_worker_precache()
             
             # Message de succès
             if specific_chapter_id:
@@ -4483,6 +5083,9 @@ class SmartChapterManager(QMainWindow):
                 self.update_status(f"✅ {len(chapters_to_save)} chapitres sauvegardés avec succès.")
             
             self.refresh_all_tabs()
+            if merged != manifest_data:
+                # Reprendre les modifications de l'autre session (activation, nouveaux chapitres)
+                self.sync_manifest_from_disk()
             return True
             
         except Exception as e:
@@ -4491,10 +5094,40 @@ class SmartChapterManager(QMainWindow):
 
     # --- Outils ---
     def check_integrity(self):
+        """Lance la validation approfondie de tout le contenu en arrière-plan."""
         if not self.chapters_dir: return
-        missing = [ch.file_name for ch in self.all_chapters.values() if not (self.chapters_dir / ch.file_name).exists()]
-        if not missing: QMessageBox.information(self, "Intégrité", "✅ Tous les fichiers des chapitres sont présents.")
-        else: QMessageBox.warning(self, "Intégrité", "Fichiers manquants:\n\n" + "\n".join(missing))
+        if getattr(self, 'integrity_worker', None) and self.integrity_worker.isRunning():
+            self.update_status("Vérification d'intégrité déjà en cours...")
+            return
+        self.update_status("Vérification d'intégrité en cours...")
+        self.integrity_worker = IntegrityCheckWorker(self.chapters_dir.parent, self)
+        self.integrity_worker.report_ready.connect(self.show_integrity_report)
+        self.integrity_worker.start()
+
+    def show_integrity_report(self, report: Dict[str, Any]):
+        """Affiche le rapport produit par IntegrityCheckWorker."""
+        if 'exception' in report:
+            QMessageBox.critical(self, "Intégrité", f"La vérification a échoué: {report['exception']}")
+            return
+
+        errors, warnings = report['errors'], report['warnings']
+        summary = (
+            f"{report['files']} fichiers analysés en {report['duration'] * 1000:.0f} ms.\n"
+            f"{len(errors)} erreur(s), {len(warnings)} avertissement(s)."
+        )
+        self.update_status(f"Intégrité: {len(errors)} erreur(s), {len(warnings)} avertissement(s)")
+
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Intégrité")
+        if not errors and not warnings:
+            msg.setIcon(QMessageBox.Icon.Information)
+            msg.setText("✅ Tout le contenu est valide.\n\n" + summary)
+        else:
+            msg.setIcon(QMessageBox.Icon.Warning if errors else QMessageBox.Icon.Information)
+            msg.setText(summary)
+            msg.setDetailedText("\n\n".join(format_issue(issue) for issue in errors + warnings))
+        msg.setStandardButtons(QMessageBox.StandardButton.Ok)
+        msg.exec()
 
     def detect_content_changes(self):
         changed = []
@@ -4514,6 +5147,29 @@ class SmartChapterManager(QMainWindow):
         else:
             QMessageBox.information(self, "Changements détectés", "Les chapitres suivants ont été modifiés:\n\n" + "\n".join(changed))
 
+    def refresh_service_worker_precache(self, notify: bool = False):
+        """Régénère la liste de précache de sw.js à partir des versions du manifest."""
+        if not self.manifest_path:
+            return
+        sw_path = self.manifest_path.parent.parent / "sw.js"
+        if not sw_path.exists():
+            return
+        try:
+            precache = regenerate_precache(self.manifest_path, sw_path)
+        except Exception as e:
+            print(f"⚠️ Impossible de régénérer le précache du Service Worker: {e}")
+            if notify:
+                QMessageBox.warning(self, "Précache", f"Impossible de régénérer le précache: {e}")
+            return
+        print(f"✅ Précache du Service Worker: {len(precache['entries'])} URL(s), version {precache['version']}")
+        if notify:
+            QMessageBox.information(
+                self,
+                "Précache",
+                f"{len(precache['entries'])} URL(s) en précache (version {precache['version']})."
+                + ("" if precache['changed'] else "\nsw.js était déjà à jour.")
+            )
+
     def recalculate_all_versions(self):
         if QMessageBox.question(self, "Confirmation", "Recalculer et sauvegarder TOUTES les versions ?") == QMessageBox.StandardButton.Yes:
             self.save_all()
@@ -4563,6 +5219,10 @@ class SmartChapterManager(QMainWindow):
                     else:
                         event.ignore()
             elif reply == QMessageBox.StandardButton.Discard:
+                # Abandon explicite: ne pas rejouer ces modifications au prochain lancement
+                for chapter in self.all_chapters.values():
+                    if chapter.file_path:
+                        EditJournal(chapter.file_path).compact()
                 event.accept()
             else:
                 event.ignore()
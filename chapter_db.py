@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Stockage optionnel des chapitres dans une base SQLite normalisée.
+
+Les fichiers public/chapters/<classe>/*.json restent la source publiée pour
+l'application web; la base en est une représentation fidèle:
+1. Tables chapters, videos, quiz, quiz_options, exercises, hints et images,
+   une ligne par élément (position dans la liste du fichier)
+2. Les champs connus ont leur colonne; les autres champs, l'ordre des clés et
+   les valeurs d'un type inattendu sont conservés (colonnes `keys` et `extra`),
+   si bien que l'export reproduit les fichiers à l'octet près
+3. Une sauvegarde ne réécrit que les éléments modifiés, dans une transaction
+4. Les requêtes sur tout le corpus (recherche, statistiques) sont de simples SELECT
+
+Utilisation:
+    python chapter_db.py import              # fichiers JSON -> base
+    python chapter_db.py export [--check]    # base -> fichiers JSON (--check: vérifier sans écrire)
+    python chapter_db.py search "produit scalaire"
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Configuration
+ROOT_DIR = Path(__file__).parent
+CHAPTERS_DIR = ROOT_DIR / "public" / "chapters"
+DB_PATH = ROOT_DIR / ".chapters.sqlite3"
+
+TOP_LEVEL = -1  # Valeur de `parent` pour les éléments directement dans le chapitre
+
+
+@dataclass
+class Table:
+    """Correspondance entre un objet JSON et une table: clé JSON -> (colonne, type)."""
+    name: str
+    fields: Dict[str, Tuple[str, type]]
+    children: Dict[str, 'Table'] = field(default_factory=dict)
+
+    @property
+    def columns(self) -> List[Tuple[str, type]]:
+        seen = {}
+        for column, kind in self.fields.values():
+            seen.setdefault(column, kind)
+        return list(seen.items())
+
+
+QUIZ_OPTIONS = Table('quiz_options', {
+    'text': ('text', str), 'is_correct': ('is_correct', bool), 'isCorrect': ('is_correct', bool),
+    'explanation': ('explanation', str),
+})
+HINTS = Table('hints', {
+    'text': ('text', str), 'questionNumber': ('question_number', int),
+})
+IMAGES = Table('images', {
+    'id': ('item_id', str), 'path': ('path', str), 'caption': ('caption', str), 'size': ('size', str),
+    'position': ('placement', str), 'alignment': ('alignment', str), 'alt': ('alt', str),
+    'customWidth': ('custom_width', int), 'custom_width': ('custom_width', int),
+    'customHeight': ('custom_height', int), 'custom_height': ('custom_height', int),
+})
+VIDEOS = Table('videos', {
+    'id': ('item_id', str), 'title': ('title', str), 'youtubeId': ('youtube_id', str),
+    'duration': ('duration', str), 'description': ('description', str), 'thumbnail': ('thumbnail', str),
+})
+QUIZ = Table('quiz', {
+    'id': ('item_id', str), 'type': ('type', str), 'question': ('question', str),
+    'steps': ('steps', list), 'explanation': ('explanation', str),
+}, children={'options': QUIZ_OPTIONS})
+EXERCISES = Table('exercises', {
+    'id': ('item_id', str), 'title': ('title', str), 'statement': ('statement', str),
+    'sub_questions': ('sub_questions', list),
+}, children={'hint': HINTS, 'images': IMAGES})
+CHAPTERS = Table('chapters', {
+    'class': ('class_id', str), 'chapter': ('title', str), 'sessionDates': ('session_dates', list),
+    'lessonFile': ('lesson_file', str), 'version': ('version', str),
+}, children={'videos': VIDEOS, 'quiz': QUIZ, 'exercises': EXERCISES})
+
+SECTIONS = CHAPTERS.children
+ITEM_TABLES = [VIDEOS, QUIZ, QUIZ_OPTIONS, EXERCISES, HINTS, IMAGES]
+SQL_TYPES = {str: 'TEXT', bool: 'INTEGER', int: 'INTEGER', list: 'TEXT'}
+
+
+def _matches(value: Any, kind: type) -> bool:
+    if kind is bool or kind is int:
+        return type(value) is kind
+    return isinstance(value, kind)
+
+
+def _encode(value: Any, kind: type) -> Any:
+    if kind is list:
+        return json.dumps(value, ensure_ascii=False)
+    if kind is bool:
+        return int(value)
+    return value
+
+
+def _decode(value: Any, kind: type) -> Any:
+    if kind is list:
+        return json.loads(value)
+    if kind is bool:
+        return bool(value)
+    return value
+
+
+def _split(obj: Dict[str, Any], table: Table) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, List[Dict]]]:
+    """Répartit un objet JSON entre colonnes, champs supplémentaires et listes enfants."""
+    columns: Dict[str, Any] = {}
+    extra: Dict[str, Any] = {}
+    children: Dict[str, List[Dict]] = {}
+    for key, value in obj.items():
+        spec = table.fields.get(key)
+        if key in table.children and isinstance(value, list) and all(isinstance(v, dict) for v in value):
+            children[key] = value
+        elif spec and spec[0] not in columns and _matches(value, spec[1]):
+            columns[spec[0]] = _encode(value, spec[1])
+        else:
+            extra[key] = value
+    return columns, extra, children
+
+
+def _format(data: Dict[str, Any], indent: Optional[int], trailing_newline: bool) -> str:
+    if indent:
+        text = json.dumps(data, ensure_ascii=False, indent=indent)
+    else:
+        text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return text + '\n' if trailing_newline else text
+
+
+def _detect_indent(text: str) -> Optional[int]:
+    for line in text.splitlines()[1:]:
+        stripped = line.lstrip(' ')
+        if stripped:
+            return len(line) - len(stripped) or None
+    return None
+
+
+class ChapterDB:
+    """Base SQLite des chapitres (chemins relatifs à public/chapters, ex: tcs/tcs_x.json)."""
+
+    def __init__(self, db_path: Path = DB_PATH):
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _create_schema(self) -> None:
+        cols = ', '.join(f"{name} {SQL_TYPES[kind]}" for name, kind in CHAPTERS.columns)
+        statements = [
+            f"CREATE TABLE IF NOT EXISTS chapters (path TEXT PRIMARY KEY, keys TEXT NOT NULL, extra TEXT, "
+            f"indent INTEGER, trailing_newline INTEGER NOT NULL DEFAULT 0, {cols})"
+        ]
+        for table in ITEM_TABLES:
+            cols = ', '.join(f"{name} {SQL_TYPES[kind]}" for name, kind in table.columns)
+            statements.append(
+                f"CREATE TABLE IF NOT EXISTS {table.name} (chapter TEXT NOT NULL, parent INTEGER NOT NULL, "
+                f"position INTEGER NOT NULL, keys TEXT NOT NULL, extra TEXT, {cols}, "
+                f"PRIMARY KEY (chapter, parent, position))"
+            )
+            if any(name == 'item_id' for name, _ in table.columns):
+                statements.append(f"CREATE INDEX IF NOT EXISTS {table.name}_item_id ON {table.name} (item_id)")
+        with self.conn:
+            for statement in statements:
+                self.conn.execute(statement)
+
+    # --- Écriture ------------------------------------------------------------
+
+    def _insert_item(self, table: Table, chapter: str, parent: int, position: int, obj: Dict[str, Any]) -> None:
+        columns, extra, children = _split(obj, table)
+        names = ['chapter', 'parent', 'position', 'keys', 'extra'] + list(columns)
+        values = [chapter, parent, position, json.dumps(list(obj), ensure_ascii=False),
+                  json.dumps(extra, ensure_ascii=False) if extra else None] + list(columns.values())
+        self.conn.execute(
+            f"INSERT INTO {table.name} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})", values
+        )
+        for key, items in children.items():
+            child = table.children[key]
+            for child_position, item in enumerate(items):
+                self._insert_item(child, chapter, position, child_position, item)
+
+    def _delete_items(self, table: Table, chapter: str, first_position: int = 0) -> None:
+        """Supprime les éléments d'une section à partir d'une position (et leurs enfants)."""
+        for child in table.children.values():
+            self.conn.execute(f"DELETE FROM {child.name} WHERE chapter = ? AND parent >= ?",
+                              (chapter, first_position))
+        self.conn.execute(f"DELETE FROM {table.name} WHERE chapter = ? AND parent = ? AND position >= ?",
+                          (chapter, TOP_LEVEL, first_position))
+
+    def _delete_item(self, table: Table, chapter: str, position: int) -> None:
+        for child in table.children.values():
+            self.conn.execute(f"DELETE FROM {child.name} WHERE chapter = ? AND parent = ?", (chapter, position))
+        self.conn.execute(f"DELETE FROM {table.name} WHERE chapter = ? AND parent = ? AND position = ?",
+                          (chapter, TOP_LEVEL, position))
+
+    def _write_chapter_row(self, path: str, data: Dict[str, Any], indent: Optional[int],
+                           trailing_newline: bool) -> None:
+        columns, extra, _ = _split(data, CHAPTERS)
+        names = ['path', 'keys', 'extra', 'indent', 'trailing_newline'] + list(columns)
+        values = [path, json.dumps(list(data), ensure_ascii=False),
+                  json.dumps(extra, ensure_ascii=False) if extra else None,
+                  indent, int(trailing_newline)] + list(columns.values())
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO chapters ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})", values
+        )
+
+    def save_chapter(self, path: str, data: Dict[str, Any], indent: Optional[int] = 2,
+                     trailing_newline: bool = False) -> int:
+        """Enregistre un chapitre en ne réécrivant que les éléments modifiés.
+        Retourne le nombre d'éléments réécrits."""
+        try:
+            previous = self.load_chapter(path)
+        except KeyError:
+            previous = {}
+        written = 0
+        with self.conn:
+            self._write_chapter_row(path, data, indent, trailing_newline)
+            for key, table in SECTIONS.items():
+                old_items = previous.get(key) if isinstance(previous.get(key), list) else []
+                new_items = data.get(key) if isinstance(data.get(key), list) else []
+                if not all(isinstance(item, dict) for item in new_items):
+                    new_items = []  # Section conservée telle quelle dans `extra`
+                common = min(len(old_items), len(new_items))
+                for position in range(common):
+                    if old_items[position] != new_items[position] or list(old_items[position]) != list(new_items[position]):
+                        self._delete_item(table, path, position)
+                        self._insert_item(table, path, TOP_LEVEL, position, new_items[position])
+                        written += 1
+                if len(old_items) != len(new_items):
+                    self._delete_items(table, path, common)
+                    for position in range(common, len(new_items)):
+                        self._insert_item(table, path, TOP_LEVEL, position, new_items[position])
+                        written += 1
+        return written
+
+    def put_item(self, path: str, section: str, position: int, item: Dict[str, Any]) -> None:
+        """Remplace (ou ajoute en fin de liste) un seul élément d'une section, en une transaction."""
+        table = SECTIONS[section]
+        with self.conn:
+            self._delete_item(table, path, position)
+            self._insert_item(table, path, TOP_LEVEL, position, item)
+
+    def import_file(self, file_path: Path, chapters_dir: Path = CHAPTERS_DIR) -> int:
+        text = file_path.read_text(encoding='utf-8')
+        data = json.loads(text)
+        indent = _detect_indent(text)
+        trailing_newline = text.endswith('\n')
+        path = file_path.relative_to(chapters_dir).as_posix()
+        written = self.save_chapter(path, data, indent, trailing_newline)
+        if _format(data, indent, trailing_newline) != text:
+            print(f"  ⚠️  {path}: mise en forme non standard, l'export sera normalisé")
+        return written
+
+    def delete_chapter(self, path: str) -> None:
+        with self.conn:
+            for table in ITEM_TABLES:
+                self.conn.execute(f"DELETE FROM {table.name} WHERE chapter = ?", (path,))
+            self.conn.execute("DELETE FROM chapters WHERE path = ?", (path,))
+
+    # --- Lecture et export ---------------------------------------------------
+
+    def _join(self, row: sqlite3.Row, table: Table, children: Dict[str, List[Dict]]) -> Dict[str, Any]:
+        extra = json.loads(row['extra']) if row['extra'] else {}
+        obj = {}
+        for key in json.loads(row['keys']):
+            if key in extra:
+                obj[key] = extra[key]
+            elif key in table.children:
+                obj[key] = children.get(key, [])
+            else:
+                column, kind = table.fields[key]
+                obj[key] = _decode(row[column], kind)
+        return obj
+
+    def _load_items(self, table: Table, path: str, parent_filter: Optional[int] = TOP_LEVEL) -> Dict[int, List[Dict]]:
+        """Éléments d'une table pour un chapitre, groupés par parent."""
+        child_rows = {key: self._load_items(child, path, None) for key, child in table.children.items()}
+        query = f"SELECT * FROM {table.name} WHERE chapter = ?"
+        params: List[Any] = [path]
+        if parent_filter is not None:
+            query += " AND parent = ?"
+            params.append(parent_filter)
+        grouped: Dict[int, List[Dict]] = {}
+        for row in self.conn.execute(query + " ORDER BY parent, position", params):
+            children = {key: rows.get(row['position'], []) for key, rows in child_rows.items()}
+            grouped.setdefault(row['parent'], []).append(self._join(row, table, children))
+        return grouped
+
+    def load_chapter(self, path: str) -> Dict[str, Any]:
+        row = self.conn.execute("SELECT * FROM chapters WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            raise KeyError(path)
+        sections = {key: self._load_items(table, path).get(TOP_LEVEL, []) for key, table in SECTIONS.items()}
+        return self._join(row, CHAPTERS, sections)
+
+    def export_text(self, path: str) -> str:
+        row = self.conn.execute("SELECT indent, trailing_newline FROM chapters WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            raise KeyError(path)
+        return _format(self.load_chapter(path), row['indent'], bool(row['trailing_newline']))
+
+    def paths(self) -> List[str]:
+        return [row['path'] for row in self.conn.execute("SELECT path FROM chapters ORDER BY path")]
+
+    def export_tree(self, chapters_dir: Path = CHAPTERS_DIR, check: bool = False) -> List[str]:
+        """Écrit les fichiers dont le contenu diffère de la base. Retourne leurs chemins."""
+        different = []
+        for path in self.paths():
+            target = chapters_dir / path
+            text = self.export_text(path)
+            if target.exists() and target.read_text(encoding='utf-8') == text:
+                continue
+            different.append(path)
+            if not check:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = target.with_suffix('.tmp.json')
+                with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+                    f.write(text)
+                os.replace(temp_path, target)
+        return different
+
+    def search(self, text: str) -> Iterable[sqlite3.Row]:
+        """Recherche dans les questions, énoncés, options et indices de tout le corpus."""
+        pattern = f"%{text}%"
+        return self.conn.execute(
+            "SELECT chapter, 'quiz' AS section, position, question AS content FROM quiz WHERE question LIKE ? "
+            "UNION ALL SELECT chapter, 'quiz_options', parent, text FROM quiz_options WHERE text LIKE ? "
+            "UNION ALL SELECT chapter, 'exercises', position, statement FROM exercises WHERE statement LIKE ? "
+            "UNION ALL SELECT chapter, 'hints', parent, text FROM hints WHERE text LIKE ? "
+            "ORDER BY chapter, section, position",
+            (pattern, pattern, pattern, pattern)
+        )
+
+
+def chapter_files(chapters_dir: Path = CHAPTERS_DIR) -> List[Path]:
+    """Fichiers de chapitres (les leçons, dans lessons/, ne sont pas concernées)."""
+    return sorted(
+        path for path in chapters_dir.rglob("*.json")
+        if 'lessons' not in path.relative_to(chapters_dir).parts and not path.name.endswith('.tmp.json')
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Base SQLite des chapitres (import, export JSON, recherche)")
+    parser.add_argument('--db', type=Path, default=DB_PATH, help="Fichier de la base")
+    parser.add_argument('--chapters', type=Path, default=CHAPTERS_DIR, help="Dossier public/chapters")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('import', help="Importer les fichiers JSON dans la base")
+    export = sub.add_parser('export', help="Écrire les fichiers JSON depuis la base")
+    export.add_argument('--check', action='store_true', help="Vérifier sans écrire (code 1 si différence)")
+    search = sub.add_parser('search', help="Rechercher un texte dans tout le corpus")
+    search.add_argument('text')
+    args = parser.parse_args()
+
+    db = ChapterDB(args.db)
+    try:
+        if args.command == 'import':
+            files = chapter_files(args.chapters)
+            known = set(db.paths())
+            written = sum(db.import_file(path, args.chapters) for path in files)
+            for path in known - {p.relative_to(args.chapters).as_posix() for p in files}:
+                db.delete_chapter(path)
+            print(f"✓ {len(files)} chapitre(s) importé(s), {written} élément(s) réécrit(s)")
+        elif args.command == 'export':
+            different = db.export_tree(args.chapters, check=args.check)
+            for path in different:
+                print(f"  {'≠' if args.check else '✓'} {path}")
+            if args.check:
+                print(f"{'❌' if different else '✓'} {len(different)} fichier(s) différent(s) de la base")
+                return 1 if different else 0
+            print(f"✓ {len(different)} fichier(s) écrit(s)")
+        else:
+            rows = list(db.search(args.text))
+            for row in rows:
+                content = ' '.join(row['content'].split())
+                print(f"  {row['chapter']} [{row['section']} #{row['position'] + 1}] {content[:100]}")
+            print(f"✓ {len(rows)} résultat(s)")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
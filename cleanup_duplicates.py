@@ -1,118 +1,278 @@
 #!/usr/bin/env python3
-"""Nettoyage des doublons de lessons et génération du rapport final"""
+"""
+Détection et nettoyage des leçons en double, pour toutes les classes.
 
+Remplace la liste DUPLICATES_TO_REMOVE tenue à la main pour 1BSM. Dans chaque
+classe, les fichiers de lessons/ sont regroupés quand ils sont:
+1. identiques: même hash du contenu canonique (clés triées, sans mise en forme)
+2. sur le même sujet: même titre de leçon une fois normalisé
+   ("Rotations dans le plan" = "La Rotation dans le Plan")
+3. de structure voisine: plan (titres des sections et sous-sections) et
+   texte des éléments proches (similarité ≥ --threshold)
+
+Chaque groupe est comparé aux références lessonFile des chapitres: la leçon
+conservée est celle qu'un chapitre utilise (sinon la plus complète). Une leçon
+référencée n'est jamais supprimée. --delete supprime les copies identiques non
+référencées; avec --include-similar, aussi les autres leçons non référencées du
+groupe. Une sauvegarde (snapshot_store.py) est créée avant toute suppression.
+
+Utilisation:
+    python cleanup_duplicates.py [--class 1bsm] [--json]
+    python cleanup_duplicates.py --delete [--include-similar]
+"""
+
+import argparse
+import hashlib
 import json
-import os
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from itertools import combinations
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
 
-lessons_dir = Path("public/chapters/1bsm/lessons")
-
-# Les doublons à supprimer (on garde les versions avec préfixe 1bsm_)
-DUPLICATES_TO_REMOVE = [
-    "denombrement.json",
-    "arithmetique_dans_Z.json",
-    "logique_mathematique.json"
-]
-
-# Fichiers supplémentaires sans correspondance de chapitre
-EXTRA_FILES = [
-    "1bsm_fonctions_numeriques.json",  # Semble être un doublon de generalites_sur_les_fonctions
-    "1bsm_trigonometrie.json"  # Peut-être lié à calcul_trigonometrique
-]
-
-print("=" * 80)
-print("NETTOYAGE DES FICHIERS DUPLIQUÉS")
-print("=" * 80)
-print()
-
-print("Fichiers doublons à supprimer (contenu déjà copié dans les versions 1bsm_):")
-for filename in DUPLICATES_TO_REMOVE:
-    filepath = lessons_dir / filename
-    if filepath.exists():
-        print(f"  - {filename} ({filepath.stat().st_size / 1024:.1f} KB)")
-    else:
-        print(f"  - {filename} (déjà supprimé)")
-
-print()
-print("Fichiers supplémentaires sans chapitre correspondant:")
-for filename in EXTRA_FILES:
-    filepath = lessons_dir / filename
-    if filepath.exists():
-        # Lire le titre
+from near_duplicates import fold_accents, jaccard, normalize_tokens, shingle_set
+from snapshot_store import SnapshotStore
+from validate_content import iter_strings
+
+# Configuration
+PUBLIC_DIR = Path(__file__).parent / "public"
+CHAPTERS_DIR = PUBLIC_DIR / "chapters"
+
+SIMILARITY_THRESHOLD = 0.6
+CONTENT_WEIGHT = 0.6   # Part du texte des éléments dans la similarité (le reste: le plan)
+
+STOPWORDS = set("""
+le la les l un une des du de d et en dans sur pour par au aux a à ou ce cette ces
+""".split())
+
+
+@dataclass
+class Lesson:
+    """Un fichier de leçon et ses empreintes."""
+    class_id: str
+    file: str                      # Relatif à public/chapters
+    title: str
+    content_hash: str
+    topic: str
+    elements: int
+    completeness_score: float
+    size: int
+    referenced_by: List[str] = field(default_factory=list)
+    outline: Set[str] = field(default_factory=set, repr=False)
+    shingles: Set[int] = field(default_factory=set, repr=False)
+
+
+def canonical_hash(data: Any) -> str:
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def title_words(text: str) -> List[str]:
+    """Mots significatifs d'un titre: sans accents, articles ni pluriels."""
+    words = re.findall(r'\w+', fold_accents(text))
+    return [word.rstrip('s') if len(word) > 3 else word for word in words if word not in STOPWORDS]
+
+
+def load_lesson(path: Path, chapters_dir: Path) -> Optional[Lesson]:
+    rel = path.relative_to(chapters_dir).as_posix()
+    try:
+        raw = path.read_bytes()
+        data = json.loads(raw.decode('utf-8'))
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        print(f"⚠️  {rel}: ignoré ({e})", file=sys.stderr)
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    header = data.get('header') if isinstance(data.get('header'), dict) else {}
+    title = str(header.get('title', ''))
+    outline = set(title_words(title))
+    element_types: Set[str] = set()
+    elements = 0
+    sections = data.get('sections') if isinstance(data.get('sections'), list) else []
+    for section in sections:
+        if not isinstance(section, dict):
+            continue
+        outline.update(title_words(str(section.get('title', ''))))
+        for subsection in section.get('subsections') or []:
+            if not isinstance(subsection, dict):
+                continue
+            outline.update(title_words(str(subsection.get('title', ''))))
+            for element in subsection.get('elements') or []:
+                elements += 1
+                element_types.add(element.get('type', 'unknown') if isinstance(element, dict) else 'unknown')
+
+    text = '\n'.join(value for _, value in iter_strings(sections))
+    return Lesson(
+        class_id=rel.split('/')[0],
+        file=rel,
+        title=title,
+        content_hash=canonical_hash(data),
+        topic=' '.join(sorted(set(title_words(title)))),
+        elements=elements,
+        completeness_score=round(elements * (1 + len(element_types) * 0.1), 2),
+        size=len(raw),
+        outline=outline,
+        shingles=shingle_set(normalize_tokens(text)) if text.strip() else set(),
+    )
+
+
+def lesson_references(chapters_dir: Path) -> Dict[str, List[str]]:
+    """Leçon (relative à public/chapters) -> chapitres qui la référencent par lessonFile."""
+    references: Dict[str, List[str]] = {}
+    for path in sorted(chapters_dir.rglob("*.json")):
+        rel = path.relative_to(chapters_dir)
+        if 'lessons' in rel.parts or path.name.endswith('.tmp.json'):
+            continue
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                title = data.get('header', {}).get('title', 'Unknown')
-            print(f"  - {filename}")
-            print(f"    Titre: {title}")
-            print(f"    Taille: {filepath.stat().st_size / 1024:.1f} KB")
-        except Exception as e:
-            print(f"  - {filename} (erreur de lecture: {e})")
-    else:
-        print(f"  - {filename} (n'existe pas)")
-
-print()
-print("=" * 80)
-print("RAPPORT FINAL - STRUCTURE DES LESSONS 1BSM")
-print("=" * 80)
-print()
-
-# Compter les fichiers
-all_lessons = list(lessons_dir.glob("*.json"))
-backup_files = list(lessons_dir.glob("*.backup"))
-
-print(f"Total de fichiers lessons: {len(all_lessons)}")
-print(f"Fichiers de backup: {len(backup_files)}")
-print(f"Doublons identifiés: {len(DUPLICATES_TO_REMOVE)}")
-print(f"Fichiers supplémentaires: {len(EXTRA_FILES)}")
-print()
-
-# Liste les chapitres avec leurs lessons
-chapters_dir = Path("public/chapters/1bsm")
-chapter_files = sorted([f for f in chapters_dir.glob("*.json")])
-
-print("=" * 80)
-print("MAPPING CHAPITRES → LESSONS")
-print("=" * 80)
-print()
-
-for chapter_file in chapter_files:
-    with open(chapter_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    chapter_name = data.get('chapter', 'Unknown')
-    lesson_file = data.get('lessonFile', 'N/A')
-
-    # Vérifier si le fichier existe
-    if lesson_file != 'N/A':
-        lesson_path = chapters_dir / lesson_file
-        exists = "✓" if lesson_path.exists() else "✗"
-        size = f"({lesson_path.stat().st_size / 1024:.1f} KB)" if lesson_path.exists() else ""
+            lesson_file = json.loads(path.read_text(encoding='utf-8')).get('lessonFile')
+        except (OSError, json.JSONDecodeError, AttributeError):
+            continue
+        if isinstance(lesson_file, str) and lesson_file:
+            target = (path.parent / lesson_file).resolve()
+            try:
+                key = target.relative_to(chapters_dir.resolve()).as_posix()
+            except ValueError:
+                continue
+            references.setdefault(key, []).append(rel.as_posix())
+    return references
+
+
+def similarity(a: Lesson, b: Lesson) -> float:
+    """Similarité de structure: texte des éléments et plan de la leçon."""
+    return CONTENT_WEIGHT * jaccard(a.shingles, b.shingles) + (1 - CONTENT_WEIGHT) * jaccard(a.outline, b.outline)
+
+
+def find_duplicate_groups(lessons: List[Lesson], threshold: float = SIMILARITY_THRESHOLD) -> List[Dict[str, Any]]:
+    """Groupes de leçons d'une même classe identiques, de même sujet ou de structure voisine."""
+    parent = {lesson.file: lesson.file for lesson in lessons}
+
+    def find(key: str) -> str:
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    pairs: List[Dict[str, Any]] = []
+    for a, b in combinations(lessons, 2):
+        if a.class_id != b.class_id:
+            continue
+        if a.content_hash == b.content_hash:
+            reason, score = 'identique', 1.0
+        else:
+            score = similarity(a, b)
+            if a.topic and a.topic == b.topic:
+                reason = 'même sujet'
+            elif score >= threshold:
+                reason = 'structure voisine'
+            else:
+                continue
+        pairs.append({'a': a.file, 'b': b.file, 'reason': reason, 'similarity': round(score, 3)})
+        parent[find(a.file)] = find(b.file)
+
+    by_file = {lesson.file: lesson for lesson in lessons}
+    groups: Dict[str, List[Lesson]] = {}
+    for lesson in lessons:
+        if any(lesson.file in (pair['a'], pair['b']) for pair in pairs):
+            groups.setdefault(find(lesson.file), []).append(lesson)
+
+    result = []
+    for members in groups.values():
+        # Conserver la leçon utilisée par un chapitre, sinon la plus complète
+        keep = max(members, key=lambda l: (bool(l.referenced_by), l.completeness_score,
+                                           Path(l.file).name.startswith(f"{l.class_id}_"), -len(l.file)))
+        candidates = []
+        for lesson in members:
+            if lesson is keep or lesson.referenced_by:
+                continue
+            candidates.append({'file': lesson.file, 'exact': lesson.content_hash == keep.content_hash})
+        files = {lesson.file for lesson in members}
+        result.append({
+            'class': keep.class_id,
+            'keep': keep.file,
+            'lessons': [
+                {k: v for k, v in asdict(by_file[lesson.file]).items() if k not in ('outline', 'shingles')}
+                for lesson in sorted(members, key=lambda l: l.file)
+            ],
+            'pairs': [pair for pair in pairs if pair['a'] in files],
+            'removable': candidates,
+        })
+    result.sort(key=lambda group: (group['class'], group['keep']))
+    return result
+
+
+def scan(chapters_dir: Path = CHAPTERS_DIR, threshold: float = SIMILARITY_THRESHOLD) -> List[Dict[str, Any]]:
+    references = lesson_references(chapters_dir)
+    lessons = []
+    for path in sorted(chapters_dir.glob("*/lessons/*.json")):
+        lesson = load_lesson(path, chapters_dir)
+        if lesson:
+            lesson.referenced_by = references.get(lesson.file, [])
+            lessons.append(lesson)
+    return find_duplicate_groups(lessons, threshold)
+
+
+def remove_lessons(files: List[str], chapters_dir: Path = CHAPTERS_DIR) -> Optional[str]:
+    """Supprime les leçons après une sauvegarde de public/ (restaurable avec snapshot_store.py)."""
+    if not files:
+        return None
+    snapshot = SnapshotStore(chapters_dir.parent / "backups").create(
+        chapters_dir.parent, label=f"cleanup_duplicates: {len(files)} leçon(s)"
+    )
+    for rel in files:
+        (chapters_dir / rel).unlink()
+    return snapshot['id']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leçons en double: détection et suppression des copies non utilisées")
+    parser.add_argument('--chapters', type=Path, default=CHAPTERS_DIR, help="Dossier public/chapters")
+    parser.add_argument('--class', dest='class_id', help="Limiter à une classe (ex: 1bsm)")
+    parser.add_argument('--threshold', type=float, default=SIMILARITY_THRESHOLD,
+                        help=f"Similarité de structure minimale (défaut: {SIMILARITY_THRESHOLD})")
+    parser.add_argument('--delete', action='store_true', help="Supprimer les copies identiques non référencées")
+    parser.add_argument('--include-similar', action='store_true',
+                        help="Avec --delete: supprimer aussi les leçons similaires non référencées")
+    parser.add_argument('--json', action='store_true', help="Sortie au format JSON")
+    args = parser.parse_args()
+
+    groups = scan(args.chapters, args.threshold)
+    if args.class_id:
+        groups = [group for group in groups if group['class'] == args.class_id]
+    to_remove = [item['file'] for group in groups for item in group['removable']
+                 if item['exact'] or args.include_similar]
+
+    if args.json:
+        json.dump({'groups': groups, 'removable': to_remove}, sys.stdout, indent=2, ensure_ascii=False)
+        print()
     else:
-        exists = "✗"
-        size = ""
-
-    print(f"{exists} {chapter_name:<45} → {lesson_file} {size}")
-
-print()
-print("=" * 80)
-print("RECOMMANDATIONS")
-print("=" * 80)
-print()
-print("1. Les doublons suivants peuvent être supprimés en toute sécurité:")
-for filename in DUPLICATES_TO_REMOVE:
-    print(f"   rm public/chapters/1bsm/lessons/{filename}")
-
-print()
-print("2. Les fichiers de backup peuvent être supprimés après validation:")
-print("   rm public/chapters/1bsm/lessons/*.backup")
-
-print()
-print("3. Analyser les fichiers supplémentaires pour décider de leur sort:")
-for filename in EXTRA_FILES:
-    print(f"   - {filename}")
-
-print()
-print("✓ Tous les chapitres ont maintenant un lessonFile configuré")
-print("✓ Les lessons incomplètes ont été remplacées par les versions complètes")
-print("✓ Structure cohérente et organisée")
+        print("=" * 80)
+        print("LEÇONS EN DOUBLE")
+        print("=" * 80)
+        for group in groups:
+            print(f"\n[{group['class']}] conserver: {group['keep']}")
+            for lesson in group['lessons']:
+                used = f"utilisée par {', '.join(lesson['referenced_by'])}" if lesson['referenced_by'] else "non référencée"
+                print(f"   • {lesson['file']} — \"{lesson['title']}\" ({lesson['elements']} éléments, "
+                      f"score {lesson['completeness_score']:.1f}, {lesson['size'] / 1024:.1f} KB, {used})")
+            for pair in group['pairs']:
+                print(f"     {pair['reason']} ({pair['similarity']:.0%}): {Path(pair['a']).name} ↔ {Path(pair['b']).name}")
+            for item in group['removable']:
+                status = "supprimable" if item['exact'] else "à examiner (--include-similar)"
+                print(f"   → {item['file']}: {status}")
+        print("=" * 80)
+        print(f"📋 {len(groups)} groupe(s), {len(to_remove)} leçon(s) à supprimer")
+
+    if args.delete:
+        snapshot_id = remove_lessons(to_remove, args.chapters)
+        for rel in to_remove:
+            print(f"🗑️  {rel}", file=sys.stderr if args.json else sys.stdout)
+        if snapshot_id:
+            print(f"✓ {len(to_remove)} leçon(s) supprimée(s); sauvegarde {snapshot_id} "
+                  f"(python snapshot_store.py restore {snapshot_id})", file=sys.stderr if args.json else sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import React, { useEffect, useRef } from 'react';
+import { applyPrerenderedMath } from '../utils/katexPrerender';
 
 interface MathContentProps {
     content: string;
@@ -73,8 +74,9 @@ const MathContent: React.FC<MathContentProps> = ({ content, className = '', inli
         // Ajouter la classe pour masquer le contenu non compilé
         el.classList.remove('math-initialized');
 
-        // Traiter le Markdown en protégeant les expressions LaTeX
-        const processedContent = processMarkdown(content);
+        // Traiter le Markdown en protégeant les expressions LaTeX, puis
+        // substituer les formules déjà rendues au build par KaTeX
+        const { html: processedContent, complete } = applyPrerenderedMath(processMarkdown(content));
 
         logDebug('Content update:', {
             raw: content,
@@ -88,6 +90,12 @@ const MathContent: React.FC<MathContentProps> = ({ content, className = '', inli
             logDebug('DOM updated with:', processedContent);
         }
 
+        // Toutes les formules sont pré-rendues: MathJax est inutile
+        if (complete) {
+            el.classList.add('math-initialized');
+            return;
+        }
+
         const typeset = async () => {
             if (!containerRef.current || cancelled) {
                 return;
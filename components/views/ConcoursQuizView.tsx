@@ -6,6 +6,7 @@ import OrderingQuestion from '../quiz/OrderingQuestion';
 import FormattedText from '../FormattedText';
 import ConcoursBackground from '../ConcoursBackground';
 import type { ConcoursData, ConcoursQuestion } from '../../types';
+import { preloadFormulaShard } from '../../utils/katexPrerender';
 
 const ConcoursQuizView: React.FC = () => {
     const dispatch = useAppDispatch();
@@ -42,7 +43,7 @@ const ConcoursQuizView: React.FC = () => {
             const files: string[] = JSON.parse(filesJson);
 
             // Charger tous les fichiers en parallèle
-            Promise.all(files.map(file => fetch(file).then(r => r.json())))
+            Promise.all(files.map(file => Promise.all([fetch(file).then(r => r.json()), preloadFormulaShard(file)]).then(([data]) => data)))
                 .then((allData: ConcoursData[]) => {
                     // Agréger toutes les questions
                     const allQuestions: ConcoursQuestion[] = [];
@@ -77,8 +78,8 @@ const ConcoursQuizView: React.FC = () => {
                 return;
             }
 
-            fetch(concoursFile)
-                .then(res => res.json())
+            Promise.all([fetch(concoursFile).then(res => res.json()), preloadFormulaShard(concoursFile)])
+                .then(([data]) => data)
                 .then((data: ConcoursData) => {
                     setConcoursData(data);
                     setLoading(false);
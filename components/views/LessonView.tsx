@@ -12,6 +12,7 @@ import type { LessonContent } from '../../types';
 import StageBreadcrumb, { StageBreadcrumbStage } from '../StageBreadcrumb';
 import { LessonProvider } from '../../utils/lessonContentParser';
 import { blankRevealService } from '../../services/blankRevealService';
+import { preloadFormulaShard } from '../../utils/katexPrerender';
 
 const LessonView: React.FC = () => {
     const state = useAppState();
@@ -163,6 +164,7 @@ const LessonView: React.FC = () => {
                         // ⚡ IMPORTANT: Ajouter cacheBuster pour forcer rechargement
                         const cacheBuster = `?t=${Date.now()}`;
                         const lessonPath = `/chapters/${chapter.class}/${chapter.lessonFile}${cacheBuster}`;
+                        const formulasReady = preloadFormulaShard(lessonPath);
                         const response = await fetch(lessonPath);
 
                         if (!response.ok) {
@@ -193,6 +195,9 @@ const LessonView: React.FC = () => {
                         storageService.cacheLessonContent(chapterId, lessonData, chapterVersion);
                         console.log(`💾 Leçon "${chapter.chapter}" mise à jour dans le cache (v${chapterVersion})`);
 
+                        // Formules pré-rendues disponibles avant le premier affichage
+                        await formulasReady;
+
                         // Extraire la propriété 'lesson' du JSON si elle existe
                         const lesson = lessonData.lesson || lessonData;
                         setLesson(lesson);
@@ -5,6 +5,7 @@ import { useNotification } from './NotificationContext';
 import { isChapterCompleted, determineInitialStatus } from '../utils/chapterStatusHelpers';
 import { pushNavigationState, replaceNavigationState, getCurrentNavigationState, parseURL } from '../utils/browserNavigation';
 import { storageService, STORAGE_KEYS } from '../services/StorageService';
+import { preloadFormulaShard } from '../utils/katexPrerender';
 
 const initialState: AppState = {
     view: 'login',
@@ -831,13 +832,27 @@ export const AppProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
                 console.log('AppContext - Fetching manifest...');
                 // Ajouter un timestamp pour forcer le rechargement et éviter le cache
                 const cacheBuster = `?t=${Date.now()}`;
-                const manifestRes = await fetch(`/manifest.json${cacheBuster}`);
-                if (!manifestRes.ok) throw new Error("Manifest file not found");
-                const manifest: { [id: string]: any[] } = await manifestRes.json();
-                
-                console.log('AppContext - Manifest loaded:', manifest);
-                
-                const chapterInfos = manifest[classId] || [];
+                // Index des fragments par classe: seule la liste de la classe est téléchargée,
+                // et l'URL versionnée par hash reste en cache tant que la classe ne change pas
+                let chapterInfos: any[] | null = null;
+                try {
+                    const indexRes = await fetch(`/manifests/index.json${cacheBuster}`);
+                    if (indexRes.ok) {
+                        const index: { [id: string]: { file: string; hash: string } } = await indexRes.json();
+                        const shard = index[classId];
+                        const shardRes = shard ? await fetch(`/manifests/${shard.file}?v=${shard.hash}`) : null;
+                        chapterInfos = shard ? (shardRes?.ok ? await shardRes.json() : null) : [];
+                    }
+                } catch (err) {
+                    console.warn('AppContext - Manifest fragments unavailable, using manifest.json', err);
+                }
+                if (chapterInfos === null) {
+                    // Déploiement sans fragments: manifest complet
+                    const manifestRes = await fetch(`/manifest.json${cacheBuster}`);
+                    if (!manifestRes.ok) throw new Error("Manifest file not found");
+                    const manifest: { [id: string]: any[] } = await manifestRes.json();
+                    chapterInfos = manifest[classId] || [];
+                }
                 console.log('AppContext - Chapter infos for class:', chapterInfos);
                 
                 const allActivities: { [id: string]: Chapter } = {};
@@ -845,6 +860,8 @@ export const AppProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
 
                 if (chapterInfos.length > 0) {
                     console.log('AppContext - Loading chapter files...');
+                    // Formules KaTeX pré-rendues, chargées en parallèle des chapitres
+                    const formulaShards = chapterInfos.map(info => preloadFormulaShard(`/chapters/${info.file}`));
                     const chapterPromises = chapterInfos.map(info => 
                         // Ajouter un timestamp unique pour chaque fichier pour éviter le cache
                         fetch(`/chapters/${info.file}${cacheBuster}`)
@@ -886,6 +903,7 @@ export const AppProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
                             })
                     );
                     const loadedChapters = (await Promise.all(chapterPromises)).filter(Boolean) as Chapter[];
+                    await Promise.all(formulaShards);
                     console.log('AppContext - Loaded chapters:', loadedChapters);
                     loadedChapters.forEach(ch => allActivities[ch.id] = ch);
                 }
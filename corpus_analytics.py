@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Statistiques de tout le corpus (remplace analyze_lessons.py et analyze_chapters.py).
+
+Pour chaque classe, en un seul passage parallèle:
+- leçons: histogramme des types d'éléments, score de complétude
+  (éléments × (1 + 0.1 × nombre de types)), taille, nombre de formules
+- chapitres: nombre de questions, d'exercices, de vidéos et de formules
+- correspondance chapitre ↔ leçon: lessonFile absent ou introuvable, leçon
+  disponible sous le même nom, leçons qu'aucun chapitre ne référence
+
+Les résultats sont mis en cache par hash de fichier: après une modification,
+seul le fichier modifié est réanalysé.
+
+Utilisation:
+    python corpus_analytics.py [--class 1bsm]
+    python corpus_analytics.py --json > rapport.json
+    python corpus_analytics.py --csv lessons --output lessons.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from lint_latex import tokenize
+from validate_content import iter_strings
+
+# Configuration
+PUBLIC_DIR = Path(__file__).parent / "public"
+CACHE_PATH = Path(__file__).parent / ".analytics_cache.json"
+
+# À incrémenter dès que le contenu d'une analyse change: invalide le cache
+ANALYSIS_VERSION = 1
+
+ENRICH_THRESHOLD = 50  # Leçons à enrichir: score de complétude inférieur
+
+LESSON_COLUMNS = ['class', 'file', 'title', 'sections', 'subsections', 'total_elements', 'element_types',
+                  'completeness_score', 'formulas', 'file_size', 'chapters']
+CHAPTER_COLUMNS = ['class', 'file', 'chapter', 'quiz', 'exercises', 'videos', 'formulas', 'file_size',
+                   'lessonFile', 'lesson_status', 'suggested_lesson']
+
+
+def count_formulas(data: Any) -> int:
+    """Nombre de formules ($...$, $$...$$, \\(...\\), \\[...\\]) dans toutes les chaînes."""
+    return sum(1 for _, text in iter_strings(data) for token in tokenize(text) if token.kind == 'open')
+
+
+def analyze_lesson(data: Dict[str, Any]) -> Dict[str, Any]:
+    sections = data.get('sections', [])
+    total_elements = 0
+    subsections = 0
+    element_types: Dict[str, int] = {}
+    for section in sections:
+        for subsection in section.get('subsections', []):
+            subsections += 1
+            elements = subsection.get('elements', [])
+            total_elements += len(elements)
+            for element in elements:
+                element_type = element.get('type', 'unknown') if isinstance(element, dict) else 'unknown'
+                element_types[element_type] = element_types.get(element_type, 0) + 1
+
+    return {
+        'kind': 'lesson',
+        'title': data.get('header', {}).get('title', 'Unknown'),
+        'sections': len(sections),
+        'subsections': subsections,
+        'total_elements': total_elements,
+        'element_types': dict(sorted(element_types.items())),
+        # Score de complétude basé sur le nombre d'éléments et la diversité
+        'completeness_score': round(total_elements * (1 + len(element_types) * 0.1), 2),
+        'formulas': count_formulas(sections),
+    }
+
+
+def analyze_chapter(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'kind': 'chapter',
+        'chapter': data.get('chapter', 'Unknown'),
+        'lessonFile': data.get('lessonFile', ''),
+        'quiz': len(data.get('quiz', [])),
+        'exercises': len(data.get('exercises', [])),
+        'videos': len(data.get('videos', [])),
+        'formulas': count_formulas({key: data.get(key) for key in ('quiz', 'exercises')}),
+    }
+
+
+def analyze_file(args: Tuple[Path, Path]) -> Dict[str, Any]:
+    """Analyse d'un fichier (exécutée dans un processus de travail)."""
+    file_path, chapters_dir = args
+    relative = file_path.relative_to(chapters_dir)
+    raw = file_path.read_bytes()
+    result: Dict[str, Any] = {'hash': hashlib.sha256(raw).hexdigest(), 'file_size': len(raw)}
+    try:
+        data = json.loads(raw.decode('utf-8'))
+        if not isinstance(data, dict):
+            raise ValueError("le JSON doit être un objet")
+        result.update(analyze_lesson(data) if 'lessons' in relative.parts else analyze_chapter(data))
+    except (UnicodeDecodeError, ValueError, AttributeError, TypeError) as e:
+        result.update({'kind': 'error', 'error': str(e)})
+    return result
+
+
+class AnalysisCache:
+    """Résultats par fichier, réutilisés tant que le hash du fichier ne change pas."""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path and path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == ANALYSIS_VERSION:
+                    self.entries = data.get('entries', {})
+            except (OSError, json.JSONDecodeError):
+                self.entries = {}
+
+    def save(self, entries: Dict[str, Dict[str, Any]]):
+        if not self.path:
+            return
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': ANALYSIS_VERSION, 'entries': entries}, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def analyze_corpus(public_dir: Path = PUBLIC_DIR, cache_path: Optional[Path] = CACHE_PATH,
+                   jobs: Optional[int] = None) -> Dict[str, Any]:
+    """Analyse tous les chapitres et leçons; seuls les fichiers modifiés depuis le cache sont relus."""
+    start = time.perf_counter()
+    chapters_dir = public_dir / "chapters"
+    files = sorted(f for f in chapters_dir.rglob("*.json") if not f.name.endswith('.tmp.json'))
+    cache = AnalysisCache(cache_path)
+
+    entries: Dict[str, Dict[str, Any]] = {}
+    pending: List[Path] = []
+    for file_path in files:
+        rel = file_path.relative_to(chapters_dir).as_posix()
+        cached = cache.entries.get(rel)
+        if cached and cached.get('hash') == _file_hash(file_path):
+            entries[rel] = cached
+        else:
+            pending.append(file_path)
+
+    jobs = jobs or os.cpu_count() or 1
+    tasks = [(file_path, chapters_dir) for file_path in pending]
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(analyze_file, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
+    else:
+        results = [analyze_file(task) for task in tasks]
+    for file_path, result in zip(pending, results):
+        entries[file_path.relative_to(chapters_dir).as_posix()] = result
+    cache.save(entries)
+
+    report = build_report(entries, chapters_dir)
+    report.update({'files': len(files), 'analyzed': len(pending), 'duration': time.perf_counter() - start})
+    return report
+
+
+def build_report(entries: Dict[str, Dict[str, Any]], chapters_dir: Path) -> Dict[str, Any]:
+    """Assemble les résultats par fichier et établit la correspondance chapitre ↔ leçon."""
+    lessons: Dict[str, Dict[str, Any]] = {}
+    chapters: List[Dict[str, Any]] = []
+    errors: List[Dict[str, str]] = []
+    for rel, entry in sorted(entries.items()):
+        class_id = rel.split('/')[0]
+        row = {'class': class_id, 'file': rel, **{k: v for k, v in entry.items() if k not in ('kind', 'hash')}}
+        if entry['kind'] == 'lesson':
+            lessons[rel] = {**row, 'chapters': []}
+        elif entry['kind'] == 'chapter':
+            chapters.append(row)
+        else:
+            errors.append({'file': rel, 'error': entry.get('error', '')})
+
+    for chapter in chapters:
+        class_dir = chapter['class']
+        lesson_file = chapter['lessonFile']
+        chapter['suggested_lesson'] = ''
+        if lesson_file:
+            target = f"{class_dir}/{lesson_file}"
+            chapter['lesson_status'] = 'ok' if target in lessons else 'missing'
+            if target in lessons:
+                lessons[target]['chapters'].append(chapter['file'])
+        else:
+            chapter['lesson_status'] = 'none'
+            candidate = f"lessons/{Path(chapter['file']).name}"
+            if f"{class_dir}/{candidate}" in lessons:
+                chapter['suggested_lesson'] = candidate
+
+    lesson_rows = sorted(lessons.values(), key=lambda lesson: lesson['completeness_score'], reverse=True)
+    classes: Dict[str, Dict[str, Any]] = {}
+    for row in chapters + lesson_rows:
+        stats = classes.setdefault(row['class'], {'chapters': 0, 'lessons': 0, 'elements': 0, 'formulas': 0})
+        stats['chapters' if 'chapter' in row else 'lessons'] += 1
+        stats['elements'] += row.get('total_elements', 0)
+        stats['formulas'] += row['formulas']
+    return {'classes': dict(sorted(classes.items())), 'lessons': lesson_rows, 'chapters': chapters, 'errors': errors}
+
+
+def filter_class(report: Dict[str, Any], class_id: str) -> Dict[str, Any]:
+    return {
+        **report,
+        'classes': {k: v for k, v in report['classes'].items() if k == class_id},
+        'lessons': [row for row in report['lessons'] if row['class'] == class_id],
+        'chapters': [row for row in report['chapters'] if row['class'] == class_id],
+        'errors': [row for row in report['errors'] if row['file'].startswith(f"{class_id}/")],
+    }
+
+
+def write_csv(rows: List[Dict[str, Any]], columns: List[str], output) -> None:
+    writer = csv.DictWriter(output, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({
+            key: (json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value)
+            for key, value in row.items()
+        })
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("=" * 80)
+    print("ANALYSE DU CORPUS")
+    print("=" * 80)
+    for class_id, stats in report['classes'].items():
+        print(f"  {class_id}: {stats['chapters']} chapitre(s), {stats['lessons']} leçon(s), "
+              f"{stats['elements']} élément(s) de leçon, {stats['formulas']} formule(s)")
+
+    print()
+    print("LEÇONS CLASSÉES PAR COMPLÉTUDE")
+    print("-" * 80)
+    for i, lesson in enumerate(report['lessons'], 1):
+        print(f"{i}. {lesson['file']}")
+        print(f"   Titre: {lesson['title']}")
+        print(f"   Sections: {lesson['sections']} | Éléments: {lesson['total_elements']} | "
+              f"Formules: {lesson['formulas']} | Taille: {lesson['file_size'] / 1024:.1f} KB")
+        print(f"   Score de complétude: {lesson['completeness_score']:.1f}")
+        if lesson['element_types']:
+            print(f"   Types d'éléments: {', '.join(f'{k}: {v}' for k, v in lesson['element_types'].items())}")
+
+    print()
+    print(f"LEÇONS À ENRICHIR (score < {ENRICH_THRESHOLD})")
+    print("-" * 80)
+    to_enrich = [lesson for lesson in report['lessons'] if lesson['completeness_score'] < ENRICH_THRESHOLD]
+    for lesson in to_enrich:
+        print(f"- {lesson['file']} (score: {lesson['completeness_score']:.1f}, éléments: {lesson['total_elements']})")
+
+    print()
+    print("CORRESPONDANCE CHAPITRES ↔ LEÇONS")
+    print("-" * 80)
+    for chapter in report['chapters']:
+        if chapter['lesson_status'] == 'missing':
+            print(f"  ✗ {chapter['file']}: lessonFile introuvable ({chapter['lessonFile']})")
+        elif chapter['suggested_lesson']:
+            print(f"  → {chapter['file']}: ajouter \"lessonFile\": \"{chapter['suggested_lesson']}\"")
+    for lesson in report['lessons']:
+        if not lesson['chapters']:
+            print(f"  ? {lesson['file']}: aucun chapitre ne référence cette leçon")
+    for error in report['errors']:
+        print(f"  ⚠️  {error['file']}: {error['error']}")
+
+    linked = sum(1 for chapter in report['chapters'] if chapter['lesson_status'] == 'ok')
+    print("=" * 80)
+    print(f"📄 {report['files']} fichiers ({report['analyzed']} analysé(s), les autres repris du cache) "
+          f"en {report['duration'] * 1000:.0f} ms")
+    print(f"📚 {linked}/{len(report['chapters'])} chapitre(s) reliés à leur leçon | "
+          f"{len(to_enrich)} leçon(s) à enrichir")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statistiques des chapitres et des leçons de toutes les classes")
+    parser.add_argument('--public', type=Path, default=PUBLIC_DIR, help="Dossier public/ à analyser")
+    parser.add_argument('--class', dest='class_id', help="Limiter le rapport à une classe (ex: 1bsm)")
+    parser.add_argument('--jobs', type=int, default=None, help="Nombre de processus (défaut: nombre de cœurs)")
+    parser.add_argument('--no-cache', action='store_true', help="Ignorer et ne pas écrire le cache")
+    output_format = parser.add_mutually_exclusive_group()
+    output_format.add_argument('--json', action='store_true', help="Rapport complet au format JSON")
+    output_format.add_argument('--csv', choices=['lessons', 'chapters'], help="Tableau CSV des leçons ou des chapitres")
+    parser.add_argument('--output', type=Path, help="Fichier de sortie (défaut: sortie standard)")
+    args = parser.parse_args()
+
+    report = analyze_corpus(args.public, None if args.no_cache else CACHE_PATH, args.jobs)
+    if args.class_id:
+        report = filter_class(report, args.class_id)
+
+    if not args.json and not args.csv:
+        print_report(report)
+        return 0
+
+    output = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        if args.json:
+            json.dump({**report, 'duration': round(report['duration'], 3)}, output, indent=2, ensure_ascii=False)
+            output.write('\n')
+        else:
+            rows, columns = ((report['lessons'], LESSON_COLUMNS) if args.csv == 'lessons'
+                             else (report['chapters'], CHAPTER_COLUMNS))
+            write_csv(rows, columns, output)
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Statistiques du corpus tenues à jour de façon incrémentale.
+
+L'application d'administration met à jour les agrégats à chaque sauvegarde
+d'un chapitre: les compteurs de l'ancienne version du chapitre sont retirés
+des totaux de sa classe et du total général, ceux de la nouvelle version
+ajoutés. Afficher ou exporter les statistiques ne relit donc jamais le corpus.
+
+Compteurs suivis par chapitre, par classe et au total: chapitres (actifs),
+questions, exercices, indices, images, vidéos, formules, éléments et formules
+de la leçon associée (relue seulement si son fichier a changé).
+
+Des instantanés horodatés (stats/snapshots/) permettent de suivre l'évolution
+du corpus dans le temps.
+
+Utilisation:
+    python corpus_stats.py show
+    python corpus_stats.py export --format csv --output stats.csv
+    python corpus_stats.py snapshot [--label "fin du trimestre"]
+    python corpus_stats.py history [--csv]
+    python corpus_stats.py rebuild        # recalcul complet depuis le manifest (initialisation)
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from corpus_analytics import analyze_lesson, count_formulas
+
+# Configuration
+ROOT_DIR = Path(__file__).parent
+PUBLIC_DIR = ROOT_DIR / "public"
+STATS_DIR = ROOT_DIR / "stats"
+STATS_PATH = STATS_DIR / "current.json"
+SNAPSHOT_DIR = STATS_DIR / "snapshots"
+
+METRICS = ('quiz', 'exercises', 'hints', 'images', 'videos', 'formulas', 'lesson_elements', 'lesson_formulas')
+COUNTERS = ('chapters', 'active_chapters') + METRICS
+
+
+def chapter_counts(content: Dict[str, Any]) -> Dict[str, int]:
+    """Compteurs d'un chapitre à partir de son contenu (fichier ou ChapterData.content_dict())."""
+    exercises = [e for e in content.get('exercises') or [] if isinstance(e, dict)]
+    images = 0
+    for exercise in exercises:
+        images += len(exercise.get('images') or [])
+        images += sum(len(sq.get('images') or []) for sq in exercise.get('sub_questions') or [] if isinstance(sq, dict))
+    return {
+        'quiz': len(content.get('quiz') or []),
+        'exercises': len(exercises),
+        'hints': sum(len(exercise.get('hint') or []) for exercise in exercises),
+        'images': images,
+        'videos': len(content.get('videos') or []),
+        'formulas': count_formulas({key: content.get(key) for key in ('quiz', 'exercises')}),
+    }
+
+
+def _zero() -> Dict[str, int]:
+    return {counter: 0 for counter in COUNTERS}
+
+
+class StatsAggregator:
+    """Agrégats par chapitre, par classe et au total, mis à jour chapitre par chapitre."""
+
+    def __init__(self, path: Optional[Path] = STATS_PATH):
+        self.path = Path(path) if path else None
+        self.chapters: Dict[str, Dict[str, Any]] = {}
+        self.by_class: Dict[str, Dict[str, int]] = {}
+        self.totals = _zero()
+        self.updated: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: Path = STATS_PATH) -> 'StatsAggregator':
+        aggregator = cls(path)
+        if path and Path(path).exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                aggregator.chapters = data.get('chapters', {})
+                aggregator.by_class = data.get('by_class', {})
+                aggregator.totals = {**_zero(), **data.get('totals', {})}
+                aggregator.updated = data.get('updated')
+            except (OSError, json.JSONDecodeError):
+                aggregator.chapters = {}
+        return aggregator
+
+    # --- Mise à jour incrémentale -------------------------------------------
+
+    def _apply(self, row: Dict[str, Any], sign: int) -> None:
+        """Ajoute (sign=1) ou retire (sign=-1) un chapitre des totaux de sa classe et du total."""
+        class_totals = self.by_class.setdefault(row['class'], _zero())
+        for totals in (class_totals, self.totals):
+            totals['chapters'] += sign
+            totals['active_chapters'] += sign * int(bool(row['active']))
+            for metric in METRICS:
+                totals[metric] += sign * row.get(metric, 0)
+        self.updated = datetime.now().isoformat(timespec='seconds')
+
+    def is_current(self, chapter_id: str, version: str, lesson_path: Optional[Path] = None) -> bool:
+        """Les compteurs enregistrés correspondent-ils à cette version du chapitre et à
+        l'état actuel (date, taille) du fichier de sa leçon, qui n'est pas versionnée ?"""
+        row = self.chapters.get(chapter_id)
+        if not row or row.get('version') != version:
+            return False
+        lesson = row.get('lesson') or {}
+        return lesson.get('signature') == self._lesson_signature(lesson_path)
+
+    @staticmethod
+    def _lesson_signature(lesson_path: Optional[Path]) -> Optional[List[Any]]:
+        if not lesson_path or not lesson_path.exists():
+            return None
+        stat = lesson_path.stat()
+        return [str(lesson_path), stat.st_mtime_ns, stat.st_size]
+
+    def update_chapter(self, chapter_id: str, class_id: str, content: Dict[str, Any], active: bool,
+                       version: str = "", lesson_path: Optional[Path] = None) -> None:
+        """Remplace les compteurs d'un chapitre (après sa sauvegarde ou son chargement)."""
+        previous = self.chapters.get(chapter_id)
+        row: Dict[str, Any] = {'class': class_id, 'active': bool(active), 'version': version,
+                               **chapter_counts(content)}
+        row.update(self._lesson_counts(lesson_path, previous.get('lesson') if previous else None))
+        if previous:
+            self._apply(previous, -1)
+        self.chapters[chapter_id] = row
+        self._apply(row, 1)
+
+    @staticmethod
+    def _lesson_counts(lesson_path: Optional[Path], previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Éléments et formules de la leçon; relue uniquement si le fichier a changé."""
+        signature = StatsAggregator._lesson_signature(lesson_path)
+        if signature is None:
+            return {'lesson': None, 'lesson_elements': 0, 'lesson_formulas': 0}
+        if previous and previous.get('signature') == signature:
+            return {'lesson': previous, 'lesson_elements': previous['elements'], 'lesson_formulas': previous['formulas']}
+        try:
+            analysis = analyze_lesson(json.loads(lesson_path.read_text(encoding='utf-8')))
+        except (OSError, json.JSONDecodeError, AttributeError, TypeError):
+            return {'lesson': None, 'lesson_elements': 0, 'lesson_formulas': 0}
+        lesson = {'signature': signature, 'elements': analysis['total_elements'], 'formulas': analysis['formulas']}
+        return {'lesson': lesson, 'lesson_elements': lesson['elements'], 'lesson_formulas': lesson['formulas']}
+
+    def set_active(self, chapter_id: str, active: bool) -> None:
+        row = self.chapters.get(chapter_id)
+        if row and row['active'] != bool(active):
+            self._apply(row, -1)
+            row['active'] = bool(active)
+            self._apply(row, 1)
+
+    def remove_chapter(self, chapter_id: str) -> None:
+        row = self.chapters.pop(chapter_id, None)
+        if row:
+            self._apply(row, -1)
+
+    def retain(self, chapter_ids: Iterable[str]) -> None:
+        """Retire les chapitres qui ne sont plus dans le manifest."""
+        keep = set(chapter_ids)
+        for chapter_id in [cid for cid in self.chapters if cid not in keep]:
+            self.remove_chapter(chapter_id)
+
+    # --- Lecture et export ---------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'updated': self.updated,
+            'totals': self.totals,
+            'by_class': dict(sorted(self.by_class.items())),
+            'chapters': self.chapters,
+        }
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Lignes à plat (total, classes, chapitres) pour l'export CSV."""
+        rows = [{'scope': 'total', 'id': '', 'class': '', **self.totals}]
+        for class_id, totals in sorted(self.by_class.items()):
+            rows.append({'scope': 'class', 'id': class_id, 'class': class_id, **totals})
+        for chapter_id, row in sorted(self.chapters.items(), key=lambda item: (item[1]['class'], item[0])):
+            rows.append({'scope': 'chapter', 'id': chapter_id, 'class': row['class'], 'chapters': 1,
+                         'active_chapters': int(row['active']), **{metric: row.get(metric, 0) for metric in METRICS}})
+        return rows
+
+    def export(self, output, output_format: str = 'json') -> None:
+        if output_format == 'csv':
+            writer = csv.DictWriter(output, fieldnames=['scope', 'id', 'class', *COUNTERS])
+            writer.writeheader()
+            writer.writerows(self.rows())
+        else:
+            data = self.to_dict()
+            data['chapters'] = {cid: {k: v for k, v in row.items() if k != 'lesson'} for cid, row in self.chapters.items()}
+            json.dump(data, output, ensure_ascii=False, indent=2)
+            output.write('\n')
+
+    def snapshot(self, label: str = "", snapshot_dir: Path = SNAPSHOT_DIR) -> Path:
+        """Instantané horodaté des totaux (par classe et au total)."""
+        now = datetime.now()
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+        path = snapshot_dir / f"{now.strftime('%Y%m%d_%H%M%S')}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'created': now.isoformat(timespec='seconds'), 'label': label,
+                       'totals': self.totals, 'by_class': dict(sorted(self.by_class.items()))},
+                      f, ensure_ascii=False, indent=2)
+        return path
+
+
+def history(snapshot_dir: Path = SNAPSHOT_DIR) -> List[Dict[str, Any]]:
+    """Instantanés du plus ancien au plus récent."""
+    snapshots = []
+    for path in sorted(snapshot_dir.glob("*.json")) if snapshot_dir.exists() else []:
+        try:
+            snapshots.append(json.loads(path.read_text(encoding='utf-8')))
+        except (OSError, json.JSONDecodeError):
+            continue
+    return snapshots
+
+
+def rebuild(public_dir: Path = PUBLIC_DIR, path: Optional[Path] = STATS_PATH) -> StatsAggregator:
+    """Recalcule tous les agrégats depuis le manifest (initialisation ou réparation)."""
+    aggregator = StatsAggregator(path)
+    chapters_dir = public_dir / "chapters"
+    manifest = json.loads((public_dir / "manifest.json").read_text(encoding='utf-8'))
+    for class_id, entries in manifest.items():
+        for entry in entries:
+            chapter_path = chapters_dir / entry.get('file', '')
+            if not chapter_path.is_file():
+                continue
+            try:
+                content = json.loads(chapter_path.read_text(encoding='utf-8'))
+            except (OSError, json.JSONDecodeError):
+                continue
+            lesson_file = content.get('lessonFile')
+            aggregator.update_chapter(
+                entry['id'], class_id, content, entry.get('isActive', False), entry.get('version', ''),
+                chapter_path.parent / lesson_file if lesson_file else None
+            )
+    return aggregator
+
+
+def print_stats(aggregator: StatsAggregator) -> None:
+    labels = {'chapters': 'Chapitres', 'active_chapters': 'Actifs', 'quiz': 'Questions', 'exercises': 'Exercices',
+              'hints': 'Indices', 'images': 'Images', 'videos': 'Vidéos', 'formulas': 'Formules',
+              'lesson_elements': 'Éléments de leçon', 'lesson_formulas': 'Formules de leçon'}
+    print("=" * 70)
+    print(f"STATISTIQUES DU CORPUS (mise à jour: {aggregator.updated or 'jamais'})")
+    print("=" * 70)
+    for name, totals in [('TOTAL', aggregator.totals)] + sorted(aggregator.by_class.items()):
+        print(f"  {name:<6} " + " | ".join(f"{labels[c]}: {totals[c]}" for c in COUNTERS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statistiques incrémentales du corpus")
+    parser.add_argument('--stats', type=Path, default=STATS_PATH, help="Fichier des agrégats")
+    sub = parser.add_subparsers(dest='command')
+    sub.add_parser('show', help="Afficher les totaux par classe")
+    export = sub.add_parser('export', help="Exporter les agrégats")
+    export.add_argument('--format', choices=['json', 'csv'], default='json')
+    export.add_argument('--output', type=Path, help="Fichier de sortie (défaut: sortie standard)")
+    snapshot = sub.add_parser('snapshot', help="Enregistrer un instantané horodaté")
+    snapshot.add_argument('--label', default="")
+    history_parser = sub.add_parser('history', help="Évolution des totaux d'un instantané à l'autre")
+    history_parser.add_argument('--csv', action='store_true', help="Sortie CSV (une ligne par instantané)")
+    rebuild_parser = sub.add_parser('rebuild', help="Recalculer tous les agrégats depuis le manifest")
+    rebuild_parser.add_argument('--public', type=Path, default=PUBLIC_DIR)
+    args = parser.parse_args()
+
+    if args.command == 'rebuild':
+        aggregator = rebuild(args.public, args.stats)
+        aggregator.save()
+        print_stats(aggregator)
+        return 0
+
+    aggregator = StatsAggregator.load(args.stats)
+    if args.command == 'export':
+        output = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+        try:
+            aggregator.export(output, args.format)
+        finally:
+            if args.output:
+                output.close()
+    elif args.command == 'snapshot':
+        path = aggregator.snapshot(args.label, args.stats.parent / "snapshots")
+        print(f"✓ Instantané enregistré: {path}")
+    elif args.command == 'history':
+        snapshots = history(args.stats.parent / "snapshots")
+        if args.csv:
+            writer = csv.writer(sys.stdout)
+            writer.writerow(['created', 'label', *COUNTERS])
+            for item in snapshots:
+                writer.writerow([item['created'], item.get('label', ''), *(item['totals'].get(c, 0) for c in COUNTERS)])
+        else:
+            for item in snapshots:
+                totals = item['totals']
+                label = f" ({item['label']})" if item.get('label') else ""
+                print(f"  {item['created']}{label}: {totals['chapters']} chapitres, {totals['quiz']} questions, "
+                      f"{totals['exercises']} exercices, {totals['lesson_elements']} éléments de leçon")
+            print(f"✓ {len(snapshots)} instantané(s)")
+    else:
+        if not aggregator.chapters:
+            print("ℹ️  Aucune statistique enregistrée: lancez 'python corpus_stats.py rebuild'")
+            return 1
+        print_stats(aggregator)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
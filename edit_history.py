@@ -0,0 +1,153 @@
+"""
+Historique annuler/rétablir des listes éditées (questions, exercices, vidéos).
+
+Chaque élément de la liste a une version figée ("nœud"), copie indépendante de
+l'objet modifié par l'éditeur. Un nœud n'est jamais modifié: une étape de
+l'historique référence simplement l'ancien et le nouveau nœud de l'élément
+touché, et les nœuds sont partagés entre les étapes successives.
+
+- Modifier un élément crée une étape ('set', index, avant, après): seul le
+  nœud modifié est copié, jamais la liste ni le chapitre.
+- Un ajout, une suppression ou un réordonnancement crée une étape ('order',
+  avant, après) dont les tuples ne contiennent que des références aux nœuds
+  existants (plus le nœud de l'élément ajouté).
+- Annuler ou rétablir déplace un curseur et remplace un seul élément de la
+  liste (ou la réordonne pour une étape 'order').
+"""
+
+import copy
+import time
+from contextlib import contextmanager
+from typing import Any, List, Optional, Tuple
+
+# Configuration
+MAX_STEPS = 500
+COALESCE_SECONDS = 1.0  # Frappes successives sur le même élément = une seule étape
+
+
+class UndoHistory:
+    """Historique d'annulation d'une liste d'objets édités en place."""
+
+    def __init__(self, max_steps: int = MAX_STEPS):
+        self.max_steps = max_steps
+        self._live: List[Any] = []    # Objets de l'éditeur, dans l'ordre connu
+        self._nodes: List[Any] = []   # Version figée de chacun
+        self._steps: List[Tuple] = []
+        self._cursor = 0              # Nombre d'étapes appliquées
+        self._last_time = 0.0
+        self._paused = False
+
+    def reset(self, items: List[Any]) -> None:
+        """Nouvelle liste (chargement du chapitre): l'historique repart de zéro."""
+        self._live = list(items)
+        self._nodes = [copy.deepcopy(item) for item in items]
+        self._steps = []
+        self._cursor = 0
+
+    @property
+    def can_undo(self) -> bool:
+        return self._cursor > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self._cursor < len(self._steps)
+
+    @contextmanager
+    def paused(self):
+        """Les changements faits pendant le bloc (rechargement des widgets) ne créent pas d'étape."""
+        self._paused = True
+        try:
+            yield
+        finally:
+            self._paused = False
+
+    # --- Enregistrement ------------------------------------------------------
+
+    def _push(self, step: Tuple) -> None:
+        del self._steps[self._cursor:]
+        self._steps.append(step)
+        if len(self._steps) > self.max_steps:
+            del self._steps[0]
+        self._cursor = len(self._steps)
+        self._last_time = time.monotonic()
+
+    def record(self, items: List[Any], index: Optional[int] = None) -> bool:
+        """Enregistre l'état de la liste après une modification.
+
+        `index` désigne l'élément dont le contenu a pu changer; sans index, seule
+        la structure (ajout, suppression, ordre) est comparée. Retourne True si
+        une étape a été ajoutée.
+        """
+        if len(items) != len(self._live) or any(a is not b for a, b in zip(items, self._live)):
+            self._record_order(items)
+            return not self._paused
+        if index is None or not 0 <= index < len(items):
+            return False
+
+        before = self._nodes[index]
+        if items[index] == before:
+            return False
+        after = copy.deepcopy(items[index])
+        self._nodes[index] = after
+        if self._paused:
+            return False
+
+        last = self._steps[self._cursor - 1] if self._cursor else None
+        if (last and last[0] == 'set' and last[1] == index and self._cursor == len(self._steps)
+                and time.monotonic() - self._last_time < COALESCE_SECONDS):
+            self._steps[-1] = ('set', index, last[2], after)
+            self._last_time = time.monotonic()
+        else:
+            self._push(('set', index, before, after))
+        return True
+
+    def _record_order(self, items: List[Any]) -> None:
+        known = {id(obj): node for obj, node in zip(self._live, self._nodes)}
+        before = tuple(self._nodes)
+        self._live = list(items)
+        self._nodes = [known[id(obj)] if id(obj) in known else copy.deepcopy(obj) for obj in items]
+        if not self._paused:
+            self._push(('order', before, tuple(self._nodes)))
+
+    # --- Annuler / rétablir --------------------------------------------------
+
+    def _restore(self, items: List[Any], nodes: Tuple) -> None:
+        """Remet la liste dans l'ordre des nœuds donnés, en réutilisant les objets existants."""
+        live = {id(node): obj for obj, node in zip(self._live, self._nodes)}
+        items[:] = [live[id(node)] if id(node) in live else copy.deepcopy(node) for node in nodes]
+        self._live = list(items)
+        self._nodes = list(nodes)
+
+    def _apply(self, items: List[Any], step: Tuple, forward: bool) -> int:
+        if step[0] == 'set':
+            _, index, before, after = step
+            node = after if forward else before
+            items[index] = copy.deepcopy(node)
+            self._live[index] = items[index]
+            self._nodes[index] = node
+            return index
+        _, before, after = step
+        self._restore(items, after if forward else before)
+        return min(len(items) - 1, max(0, self._first_difference(before, after)))
+
+    @staticmethod
+    def _first_difference(a: Tuple, b: Tuple) -> int:
+        for i, (x, y) in enumerate(zip(a, b)):
+            if x is not y:
+                return i
+        return min(len(a), len(b))
+
+    def undo(self, items: List[Any]) -> Optional[int]:
+        """Annule la dernière étape sur `items` (modifiée en place). Retourne l'index à sélectionner."""
+        if not self.can_undo:
+            return None
+        self._cursor -= 1
+        self._last_time = 0.0
+        return self._apply(items, self._steps[self._cursor], forward=False)
+
+    def redo(self, items: List[Any]) -> Optional[int]:
+        if not self.can_redo:
+            return None
+        self._cursor += 1
+        self._last_time = 0.0
+        return self._apply(items, self._steps[self._cursor - 1], forward=True)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Journal d'édition en ajout seul (append-only) pour les chapitres en cours d'édition.
+
+Pendant l'édition d'un chapitre dans l'application d'administration, chaque
+modification est ajoutée au journal du chapitre sous la forme d'un petit
+enregistrement {"set": [section, index], "value": nouvelle valeur}: seul
+l'élément modifié (une question, un exercice, une vidéo...) est écrit, jamais
+le fichier complet. Une section dont la longueur change (ajout, suppression)
+est réécrite entière.
+
+- À la sauvegarde du chapitre, le journal est compacté: son contenu est déjà
+  dans le fichier du chapitre, il est simplement supprimé.
+- Au lancement suivant, les journaux restants (fermeture brutale, plantage)
+  sont rejoués sur les chapitres chargés. Si le fichier du chapitre a changé
+  depuis l'ouverture du journal, les positions enregistrées ne sont plus
+  fiables: le journal n'est rejoué, supprimé ou mis de côté (.stale) qu'après
+  confirmation.
+
+Utilisation:
+    python edit_journal.py status
+    python edit_journal.py discard [fichier_chapitre]
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Configuration
+ROOT_DIR = Path(__file__).parent
+JOURNAL_DIR = ROOT_DIR / ".edit_journal"
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+
+
+def _file_hash(path: Path) -> Optional[str]:
+    if not path.exists():
+        return None
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def apply_records(data: Dict[str, Any], records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Rejoue les enregistrements sur une copie du contenu d'un chapitre."""
+    data = copy.deepcopy(data)
+    for record in records:
+        path, value = record['set'], record['value']
+        if len(path) == 1:
+            data[path[0]] = value
+        else:
+            section, index = path
+            items = data.setdefault(section, [])
+            if index < len(items):
+                items[index] = value
+            elif index == len(items):
+                items.append(value)
+    return data
+
+
+class EditJournal:
+    """Journal des modifications non sauvegardées d'un fichier de chapitre."""
+
+    def __init__(self, chapter_file: Path, journal_dir: Path = JOURNAL_DIR):
+        self.chapter_file = Path(chapter_file)
+        key = hashlib.sha1(str(self.chapter_file.resolve()).encode('utf-8')).hexdigest()[:12]
+        self.path = Path(journal_dir) / f"{self.chapter_file.stem}.{key}.jsonl"
+        self._snapshot: Dict[str, Any] = {}
+
+    # --- Écriture ------------------------------------------------------------
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        header = None
+        if not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            header = {'file': str(self.chapter_file.resolve()), 'base': _file_hash(self.chapter_file),
+                      'created': datetime.now().isoformat(timespec='seconds')}
+        lines = [json.dumps(record, ensure_ascii=False) + '\n' for record in records]
+        if header:
+            lines.insert(0, json.dumps(header, ensure_ascii=False) + '\n')
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(''.join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def start(self, state: Dict[str, Any]) -> int:
+        """Mémorise l'état de départ de l'édition et retourne la position du journal,
+        à passer à truncate() si l'édition est annulée."""
+        self._snapshot = {
+            key: [_encode(item) for item in value] if isinstance(value, list) else _encode(value)
+            for key, value in state.items()
+        }
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def track(self, state: Dict[str, Any]) -> int:
+        """Journalise les éléments de `state` qui diffèrent du dernier état connu.
+
+        Les listes de même longueur sont comparées élément par élément; sinon la
+        section entière est réécrite. Retourne le nombre d'enregistrements ajoutés.
+        """
+        records = []
+        for key, value in state.items():
+            previous = self._snapshot.get(key)
+            if isinstance(value, list):
+                encoded = [_encode(item) for item in value]
+                if isinstance(previous, list) and len(previous) == len(encoded):
+                    records.extend({'set': [key, index], 'value': value[index]}
+                                   for index, item in enumerate(encoded) if item != previous[index])
+                elif encoded != previous:
+                    records.append({'set': [key], 'value': value})
+            else:
+                encoded = _encode(value)
+                if encoded != previous:
+                    records.append({'set': [key], 'value': value})
+            self._snapshot[key] = encoded
+        if records:
+            self._append(records)
+        return len(records)
+
+    # --- Lecture et compaction ----------------------------------------------
+
+    def read(self) -> Dict[str, Any]:
+        """Retourne {'header': ..., 'records': [...]}; une dernière ligne incomplète est ignorée."""
+        header, records = None, []
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Interruption pendant l'écriture
+                    if header is None:
+                        header = record
+                    elif 'set' in record:
+                        records.append(record)
+        return {'header': header or {}, 'records': records}
+
+    def has_records(self) -> bool:
+        return self.path.exists() and bool(self.read()['records'])
+
+    def is_stale(self) -> bool:
+        """Le fichier du chapitre a-t-il été modifié depuis l'ouverture du journal ?"""
+        base = self.read()['header'].get('base')
+        return base is not None and base != _file_hash(self.chapter_file)
+
+    def replay(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return apply_records(data, self.read()['records'])
+
+    def truncate(self, position: int) -> None:
+        """Revient à une position donnée (annulation de l'édition en cours)."""
+        if not self.path.exists():
+            return
+        if position <= 0:
+            self.compact()
+            return
+        with open(self.path, 'r+b') as f:
+            f.truncate(position)
+
+    def set_aside(self) -> Optional[Path]:
+        """Met de côté un journal qui ne peut plus être rejoué sans risque (fichier
+        modifié depuis): renommé en .stale, il n'est plus ni rejoué ni compacté."""
+        if not self.path.exists():
+            return None
+        target = self.path.with_name(f"{self.path.stem}.{datetime.now():%Y%m%d-%H%M%S}.stale")
+        self.path.rename(target)
+        return target
+
+    def compact(self) -> None:
+        """Le chapitre vient d'être sauvegardé: son fichier contient déjà tout le journal."""
+        if self.path.exists():
+            self.path.unlink()
+
+
+def pending_journals(journal_dir: Path = JOURNAL_DIR) -> List[EditJournal]:
+    """Journaux laissés par une session précédente, pour les fichiers de chapitre encore présents."""
+    journals = []
+    for path in sorted(Path(journal_dir).glob("*.jsonl")) if Path(journal_dir).exists() else []:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+        except (OSError, json.JSONDecodeError):
+            continue
+        journal = EditJournal(Path(header.get('file', '')), journal_dir)
+        if journal.path == path:
+            journals.append(journal)
+    return journals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Journaux d'édition des chapitres non sauvegardés")
+    parser.add_argument('command', choices=['status', 'discard'])
+    parser.add_argument('chapter_file', nargs='?', type=Path, help="Limiter à un fichier de chapitre")
+    parser.add_argument('--journal-dir', type=Path, default=JOURNAL_DIR)
+    args = parser.parse_args()
+
+    journals = pending_journals(args.journal_dir)
+    if args.chapter_file:
+        journals = [j for j in journals if j.chapter_file == args.chapter_file.resolve()]
+    if not journals:
+        print("✓ Aucune modification en attente")
+        return 0
+
+    for journal in journals:
+        content = journal.read()
+        if args.command == 'status':
+            stale = " (fichier modifié depuis)" if journal.is_stale() else ""
+            print(f"  ⚠️  {journal.chapter_file}: {len(content['records'])} modification(s) "
+                  f"depuis {content['header'].get('created', '?')}{stale}")
+        else:
+            journal.compact()
+            print(f"  🗑️  {journal.chapter_file}: journal supprimé")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
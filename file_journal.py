@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Journal d'écriture anticipée (write-ahead) pour les opérations de fichiers en masse.
+
+Une réorganisation (déplacements, renommages, réécriture du manifest) est
+d'abord décrite entièrement dans le journal, écrit sur disque avant toute
+modification. Chaque opération terminée y est ensuite marquée. Après une
+interruption, le journal permet de reprendre (roll forward) ou d'annuler
+(rollback) la transaction; les opérations sont idempotentes, une opération
+déjà faite mais non marquée est simplement reconnue comme faite.
+
+Les déplacements indépendants (sources et destinations distinctes) sont
+appliqués en parallèle; les réécritures de fichiers (manifest) viennent
+ensuite, pour que le manifest ne pointe jamais vers un fichier pas encore déplacé.
+
+Quand une transaction réécrit un manifest.json, ses fragments par classe
+(manifests/, lus en priorité par l'application) sont régénérés après la
+validation comme après l'annulation. La reprise et l'annulation d'une
+transaction interrompue se font sous le verrou du manifest (ManifestStore);
+pour une transaction neuve, ce verrou est pris par l'appelant.
+
+Utilisation:
+    journal = FileJournal(JOURNAL_PATH)
+    tx = journal.begin()
+    tx.move(old, new)
+    tx.write(MANIFEST_PATH, new_manifest_text)
+    tx.commit()        # ou tx.rollback() en cas d'erreur
+
+    python file_journal.py status|resume|rollback
+    python file_journal.py self-test   # rejoue une transaction interrompue dans un dossier temporaire
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from manifest_store import MANIFEST_PATH, ManifestLockError, manifest_lock, write_shards
+
+# Configuration
+ROOT_DIR = Path(__file__).parent
+JOURNAL_PATH = ROOT_DIR / ".structure_journal.jsonl"
+
+MAX_WORKERS = 8
+
+STATE_COMMITTED = 'committed'
+STATE_ROLLED_BACK = 'rolled_back'
+
+
+class JournalError(Exception):
+    """Erreur lors de l'application ou de l'annulation d'une transaction."""
+
+
+def _text_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _file_hash(path: Path) -> Optional[str]:
+    if not path.exists():
+        return None
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _staged_path(path: Path, suffix: str) -> Path:
+    return path.with_name(f".{path.name}.{suffix}")
+
+
+class Transaction:
+    """Ensemble d'opérations appliquées ensemble, ou pas du tout."""
+
+    def __init__(self, journal: 'FileJournal', txid: str, ops: Optional[List[Dict]] = None,
+                 done: Optional[set] = None):
+        self.journal = journal
+        self.txid = txid
+        self.ops: List[Dict] = ops or []
+        self.done = done or set()
+        self.started = bool(ops)
+
+    # --- Préparation ---------------------------------------------------------
+
+    def move(self, src: Path, dst: Path) -> None:
+        self._check_open()
+        self.ops.append({'op': 'move', 'src': str(src), 'dst': str(dst)})
+
+    def write(self, path: Path, content: str) -> None:
+        """Réécrit un fichier. L'ancien et le nouveau contenu sont conservés à côté
+        du fichier jusqu'à la fin de la transaction."""
+        self._check_open()
+        path = Path(path)
+        new_path = _staged_path(path, f"{self.txid}.new")
+        new_path.write_text(content, encoding='utf-8')
+        old_path = None
+        if path.exists():
+            old_path = _staged_path(path, f"{self.txid}.old")
+            shutil.copyfile(path, old_path)
+        self.ops.append({
+            'op': 'write', 'path': str(path), 'staged': str(new_path),
+            'backup': str(old_path) if old_path else None, 'hash': _text_hash(content),
+        })
+
+    def _check_open(self) -> None:
+        if self.started:
+            raise JournalError("La transaction a déjà commencé")
+
+    # --- Application ---------------------------------------------------------
+
+    def _apply_op(self, index: int) -> None:
+        op = self.ops[index]
+        if op['op'] == 'move':
+            src, dst = Path(op['src']), Path(op['dst'])
+            if not src.exists() and dst.exists():
+                pass  # Déjà déplacé avant l'interruption
+            elif not src.exists():
+                raise JournalError(f"Fichier introuvable: {src}")
+            elif dst.exists():
+                raise JournalError(f"Destination déjà existante: {dst}")
+            else:
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(src, dst)
+        else:
+            path, staged = Path(op['path']), Path(op['staged'])
+            if _file_hash(path) != op['hash']:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(staged, path.with_name(path.name + '.tmp'))
+                os.replace(path.with_name(path.name + '.tmp'), path)
+        self.journal._append({'tx': self.txid, 'done': index})
+        self.done.add(index)
+
+    def _undo_op(self, index: int) -> None:
+        op = self.ops[index]
+        if op['op'] == 'move':
+            src, dst = Path(op['src']), Path(op['dst'])
+            if dst.exists() and not src.exists():
+                src.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(dst, src)
+        else:
+            path = Path(op['path'])
+            if op['backup']:
+                shutil.copyfile(op['backup'], path.with_name(path.name + '.tmp'))
+                os.replace(path.with_name(path.name + '.tmp'), path)
+            elif path.exists():
+                path.unlink()
+
+    def _move_batches(self, indexes: List[int]) -> List[List[int]]:
+        """Regroupe les déplacements en lots sans chemin commun, applicables en parallèle."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        touched = set()
+        for index in indexes:
+            op = self.ops[index]
+            paths = {op['src'], op['dst']}
+            if touched & paths:
+                batches.append(current)
+                current, touched = [], set()
+            current.append(index)
+            touched |= paths
+        if current:
+            batches.append(current)
+        return batches
+
+    def apply(self) -> None:
+        """Écrit le plan dans le journal puis applique les opérations restantes."""
+        if not self.started:
+            self.journal._append({'tx': self.txid, 'begin': datetime.now().isoformat(timespec='seconds'),
+                                  'ops': self.ops}, sync=True)
+            self.started = True
+
+        pending = [i for i in range(len(self.ops)) if i not in self.done]
+        moves = [i for i in pending if self.ops[i]['op'] == 'move']
+        writes = [i for i in pending if self.ops[i]['op'] == 'write']
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            for batch in self._move_batches(moves):
+                # list() propage la première exception rencontrée
+                list(executor.map(self._apply_op, batch))
+        for index in writes:
+            self._apply_op(index)
+
+    def commit(self) -> None:
+        """Applique la transaction et la valide; en cas d'erreur, l'annule puis relance l'erreur."""
+        try:
+            self.apply()
+        except Exception:
+            self.rollback()
+            raise
+        self.journal._append({'tx': self.txid, 'state': STATE_COMMITTED}, sync=True)
+        self._cleanup()
+        self.journal._clear()
+        self.refresh_manifest_shards()
+
+    def rollback(self) -> None:
+        """Annule, dans l'ordre inverse, toutes les opérations (même non marquées)."""
+        for index in reversed(range(len(self.ops))):
+            self._undo_op(index)
+        if self.started:
+            self.journal._append({'tx': self.txid, 'state': STATE_ROLLED_BACK}, sync=True)
+        self._cleanup()
+        self.journal._clear()
+        self.refresh_manifest_shards()
+
+    def manifest_paths(self) -> List[Path]:
+        """Manifests réécrits par la transaction."""
+        return [Path(op['path']) for op in self.ops
+                if op['op'] == 'write' and Path(op['path']).name == MANIFEST_PATH.name]
+
+    def refresh_manifest_shards(self) -> List[str]:
+        """Régénère les fragments des manifests réécrits (ou restaurés). Retourne les classes réécrites."""
+        written = []
+        for path in self.manifest_paths():
+            if path.exists():
+                written += write_shards(json.loads(path.read_text(encoding='utf-8')), path)
+        return written
+
+    def _cleanup(self) -> None:
+        for op in self.ops:
+            if op['op'] == 'write':
+                for key in ('staged', 'backup'):
+                    if op[key] and Path(op[key]).exists():
+                        Path(op[key]).unlink()
+
+
+class FileJournal:
+    """Journal d'une transaction de fichiers (une seule transaction active à la fois)."""
+
+    def __init__(self, path: Path = JOURNAL_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def _append(self, record: Dict, sync: bool = False) -> None:
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _clear(self) -> None:
+        if self.path.exists():
+            self.path.unlink()
+
+    def begin(self) -> Transaction:
+        if self.pending() is not None:
+            raise JournalError(f"Une transaction inachevée existe déjà ({self.path}): reprenez-la ou annulez-la")
+        return Transaction(self, datetime.now().strftime('%Y%m%d%H%M%S%f'))
+
+    def pending(self) -> Optional[Transaction]:
+        """Transaction interrompue (plan écrit, ni validée ni annulée), ou None."""
+        if not self.path.exists():
+            return None
+        transaction = None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # Dernière ligne incomplète (interruption pendant l'écriture)
+                if 'ops' in record:
+                    transaction = Transaction(self, record['tx'], record['ops'])
+                elif transaction and 'done' in record:
+                    transaction.done.add(record['done'])
+                elif transaction and 'state' in record:
+                    transaction = None
+        if transaction is None:
+            self._clear()
+        return transaction
+
+    def resume(self) -> bool:
+        """Termine une transaction interrompue. Retourne False s'il n'y en a pas."""
+        transaction = self.pending()
+        if transaction is None:
+            return False
+        with self._manifest_locks(transaction):
+            transaction.commit()
+        return True
+
+    def rollback(self) -> bool:
+        transaction = self.pending()
+        if transaction is None:
+            return False
+        with self._manifest_locks(transaction):
+            transaction.rollback()
+        return True
+
+    @staticmethod
+    def _manifest_locks(transaction: Transaction) -> ExitStack:
+        """Verrous des manifests touchés, comme pour une écriture via ManifestStore."""
+        stack = ExitStack()
+        try:
+            for path in transaction.manifest_paths():
+                stack.enter_context(manifest_lock(path))
+        except BaseException:
+            stack.close()
+            raise
+        return stack
+
+
+def _interrupted_transaction(base: Path) -> FileJournal:
+    """Prépare sous `base` une réorganisation interrompue après le déplacement, avant la
+    réécriture du manifest: fichier déjà déplacé, manifest et fragments encore anciens."""
+    manifest_path = base / "public" / MANIFEST_PATH.name
+    chapter = base / "public" / "chapters" / "chapitre.json"
+    chapter.parent.mkdir(parents=True)
+    chapter.write_text('{}', encoding='utf-8')
+    old = {'tcs': [{'id': 'chapitre', 'file': 'chapitre.json'}]}
+    manifest_path.write_text(json.dumps(old), encoding='utf-8')
+    write_shards(old, manifest_path)
+
+    journal = FileJournal(base / "journal.jsonl")
+    transaction = journal.begin()
+    transaction.move(chapter, chapter.parent / "tcs" / chapter.name)
+    transaction.write(manifest_path, json.dumps({'tcs': [{'id': 'chapitre', 'file': 'tcs/chapitre.json'}]}))
+    journal._append({'tx': transaction.txid, 'begin': 'self-test', 'ops': transaction.ops}, sync=True)
+    transaction.started = True
+    transaction._apply_op(0)
+    return journal
+
+
+def self_test() -> List[str]:
+    """Reprend puis annule une transaction interrompue et vérifie le manifest et ses
+    fragments. Renvoie la description des vérifications en échec."""
+    failures = []
+    for command, expected in (('resume', 'tcs/chapitre.json'), ('rollback', 'chapitre.json')):
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            _interrupted_transaction(base)
+            # Nouveau journal, comme au redémarrage après l'interruption
+            journal = FileJournal(base / "journal.jsonl")
+            getattr(journal, command)()
+            public = base / "public"
+            manifest = json.loads((public / MANIFEST_PATH.name).read_text(encoding='utf-8'))
+            shard = json.loads((public / "manifests" / "tcs.json").read_text(encoding='utf-8'))
+            chapter = public / "chapters" / expected
+            if manifest['tcs'][0]['file'] != expected:
+                failures.append(f"{command}: manifest -> {manifest['tcs'][0]['file']}, attendu {expected}")
+            if shard != manifest['tcs']:
+                failures.append(f"{command}: fragment manifests/tcs.json différent du manifest")
+            if not chapter.exists():
+                failures.append(f"{command}: {chapter.relative_to(public)} introuvable")
+            if journal.pending() is not None:
+                failures.append(f"{command}: transaction toujours en attente")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprise ou annulation d'une réorganisation interrompue")
+    parser.add_argument('command', choices=['status', 'resume', 'rollback', 'self-test'])
+    parser.add_argument('--journal', type=Path, default=JOURNAL_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'self-test':
+        failures = self_test()
+        for failure in failures:
+            print(f"❌ {failure}")
+        print(f"{'❌' if failures else '✅'} Reprise et annulation d'une transaction interrompue"
+              f"{'' if failures else ': manifest et fragments à jour'}")
+        return 1 if failures else 0
+
+    journal = FileJournal(args.journal)
+    transaction = journal.pending()
+    if transaction is None:
+        print("✓ Aucune transaction en attente")
+        return 0
+
+    if args.command == 'status':
+        print(f"⚠️  Transaction {transaction.txid} interrompue: "
+              f"{len(transaction.done)}/{len(transaction.ops)} opération(s) appliquée(s)")
+        for index, op in enumerate(transaction.ops):
+            mark = '✓' if index in transaction.done else '·'
+            target = f"{op['src']} → {op['dst']}" if op['op'] == 'move' else op['path']
+            print(f"  {mark} {op['op']}: {target}")
+    else:
+        try:
+            if args.command == 'resume':
+                journal.resume()
+                print(f"✓ Transaction {transaction.txid} terminée")
+            else:
+                journal.rollback()
+                print(f"↩️  Transaction {transaction.txid} annulée")
+        except ManifestLockError as e:
+            print(f"❌ {e}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
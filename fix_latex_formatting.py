@@ -4,70 +4,127 @@ Script pour nettoyer le formatage LaTeX dans les fichiers JSON
 Supprime les espaces excessifs autour des formules mathématiques
 """
 
-import json
+import argparse
 import re
+from functools import lru_cache
 from pathlib import Path
 
+# Un seul balayage: une formule $...$ / $$...$$ ou un bloc de code ``` est recopié
+# tel quel, un bloc d'espaces (éventuellement suivi d'une ponctuation) est normalisé
+_SCANNER = re.compile(r'(```[\s\S]*?```|\$\$[\s\S]+?\$\$|\$[^$]+?\$)|(\s+)([.,](?!\.))?')
+# Élément de liste Markdown (son indentation est significative)
+_LIST_ITEM = re.compile(r'(?:[-*+]|\d+[.)]) ')
+
+
+def _replace(match):
+    math, spaces, punctuation = match.groups()
+    if math is not None:
+        return math
+    # Pas d'espace avant un point (hors points de suspension) ou une virgule;
+    # l'espace avant ; : ! ? est requis en typographie française
+    if punctuation is not None:
+        return punctuation
+    if '\n' in spaces:
+        # Saut de ligne suivi d'une indentation -> un espace. Les paragraphes et
+        # l'indentation des listes (Markdown) sont conservés, sans espaces en fin de ligne
+        newlines = spaces.count('\n')
+        indent = spaces[spaces.rindex('\n') + 1:]
+        if newlines == 1 and indent and not _LIST_ITEM.match(match.string, match.end()):
+            return ' '
+        return '\n' * newlines + indent
+    # Espaces multiples -> un espace
+    if len(spaces) > 1:
+        return ' '
+    return spaces
+
+
+@lru_cache(maxsize=65536)
+def _clean(text):
+    cleaned = _SCANNER.sub(_replace, text).strip()
+    return text if cleaned == text else cleaned
+
+
 def clean_latex_text(text):
     """
-    Nettoie le texte en supprimant les espaces excessifs autour des formules LaTeX
+    Nettoie le texte en supprimant les espaces excessifs autour des formules LaTeX.
+    Le contenu des formules n'est jamais modifié; une chaîne déjà propre est
+    renvoyée telle quelle (même objet) et chaque chaîne n'est traitée qu'une fois.
     """
     if not isinstance(text, str):
         return text
-    
-    # Supprimer les espaces avant/après les $ inline
-    # Pattern: espaces + $ + espaces + contenu + espaces + $ + espaces
-    text = re.sub(r'\s+\$\s+', ' $', text)
-    text = re.sub(r'\s+\$', '$', text)
-    text = re.sub(r'\$\s+', '$', text)
-    
-    # Nettoyer les patterns spécifiques comme "         $f$      \n"
-    text = re.sub(r'\s{2,}\$([^$]+)\$\s{2,}\n?', r' $\1$', text)
-    
-    # Nettoyer les sauts de ligne excessifs
-    text = re.sub(r'\n\s+', ' ', text)
-    
-    # Nettoyer les espaces multiples
-    text = re.sub(r' {2,}', ' ', text)
-    
-    # Nettoyer les espaces avant la ponctuation
-    text = re.sub(r'\s+([.,;:!?])', r'\1', text)
-    
-    return text.strip()
+    return _clean(text)
+
 
 def clean_json_recursive(obj):
     """
-    Parcourt récursivement un objet JSON et nettoie tous les textes
+    Parcourt récursivement un objet JSON et nettoie tous les textes.
+    Les sous-arbres inchangés sont renvoyés sans copie.
     """
     if isinstance(obj, dict):
-        return {key: clean_json_recursive(value) for key, value in obj.items()}
+        cleaned = {key: clean_json_recursive(value) for key, value in obj.items()}
+        if all(cleaned[key] is value for key, value in obj.items()):
+            return obj
+        return cleaned
     elif isinstance(obj, list):
-        return [clean_json_recursive(item) for item in obj]
+        cleaned = [clean_json_recursive(item) for item in obj]
+        if all(new is old for new, old in zip(cleaned, obj)):
+            return obj
+        return cleaned
     elif isinstance(obj, str):
         return clean_latex_text(obj)
     else:
         return obj
 
+
 def fix_json_file(file_path):
     """
     Corrige le formatage LaTeX dans un fichier JSON
+    (le fichier n'est réécrit que si son contenu change)
+    """
+    from transform_json import CleanLatexWhitespace, Pipeline, transform_file
+
+    print(f"📖 Lecture et nettoyage de {file_path}...")
+    result = transform_file(Path(file_path), Pipeline([CleanLatexWhitespace()]))
+
+    if result.error:
+        print(f"❌ Erreur: {result.error}")
+    elif result.written:
+        print("✅ Fichier corrigé avec succès!")
+    else:
+        print("ℹ️  Aucune modification nécessaire")
+
+
+def fix_chapters_tree(dry_run=False, jobs=None):
+    """
+    Nettoie tous les fichiers de public/chapters (chapitres et leçons) en parallèle
     """
-    print(f"📖 Lecture de {file_path}...")
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    print("🧹 Nettoyage du formatage LaTeX...")
-    cleaned_data = clean_json_recursive(data)
-    
-    print(f"💾 Sauvegarde dans {file_path}...")
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(cleaned_data, f, ensure_ascii=False, indent=2)
-    
-    print("✅ Fichier corrigé avec succès!")
+    from transform_json import CleanLatexWhitespace, Pipeline, collect_paths, run_pipeline
+
+    paths = collect_paths(["chapters/**/*.json"])
+    print(f"📖 {len(paths)} fichier(s) à analyser dans public/chapters...")
+    results = run_pipeline(paths, Pipeline([CleanLatexWhitespace()]), dry_run=dry_run, jobs=jobs)
+
+    for result in results:
+        if result.error:
+            print(f"  ❌ {result.path.name}: {result.error}")
+        elif result.diff:
+            print(result.diff, end='')
+    return results
+
 
 if __name__ == "__main__":
-    file_path = Path(__file__).parent / "public" / "chapters" / "2bse" / "2bse_derivation_et_etude_des_fonctions.json"
-    fix_json_file(file_path)
+    parser = argparse.ArgumentParser(description="Nettoyage du formatage LaTeX dans public/chapters")
+    parser.add_argument('file', nargs='?', type=Path, help="Ne traiter qu'un seul fichier")
+    parser.add_argument('--dry-run', action='store_true', help="Afficher le diff sans écrire")
+    parser.add_argument('--jobs', type=int, default=None, help="Nombre de processus")
+    args = parser.parse_args()
+
+    if args.file:
+        fix_json_file(args.file)
+    else:
+        results = fix_chapters_tree(dry_run=args.dry_run, jobs=args.jobs)
+        changed = sum(1 for r in results if r.changed)
+        action = "à corriger" if args.dry_run else "corrigé(s)"
+        print(f"\n✅ {changed}/{len(results)} fichier(s) {action}")
     print("\n🎓 Le formatage LaTeX a été nettoyé.")
     print("🔄 Rechargez la page dans votre navigateur pour voir les changements.")
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Génération de la liste de précache du Service Worker.
+
+Ce script:
+1. Lit public/manifest.json et sélectionne les chapitres actifs
+2. Associe à chaque URL (chapitre, leçon, formules KaTeX pré-rendues, image
+   référencée) une révision:
+   - la version calculée par l'outil d'administration pour les chapitres
+   - un hash du contenu pour les leçons, les images et l'app shell
+3. Injecte la liste et la version de cache dans sw.js (bloc généré)
+
+Le Service Worker sert ensuite en "cache-first" toute URL dont la révision
+n'a pas changé et ne retélécharge que ce qui a été modifié.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+# Configuration
+ROOT_DIR = Path(__file__).parent
+PUBLIC_DIR = ROOT_DIR / "public"
+CHAPTERS_DIR = PUBLIC_DIR / "chapters"
+MANIFEST_PATH = PUBLIC_DIR / "manifest.json"
+SERVICE_WORKER_PATH = ROOT_DIR / "sw.js"
+
+# Fichiers de l'app shell: URL -> fichier source
+SHELL_ASSETS = {
+    '/': ROOT_DIR / "index.html",
+    '/index.html': ROOT_DIR / "index.html",
+    '/icone.png': PUBLIC_DIR / "icone.png",
+    '/manifest.webmanifest': PUBLIC_DIR / "manifest.webmanifest",
+}
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp'}
+
+BLOCK_START = "// <precache>"
+BLOCK_END = "// </precache>"
+
+
+def file_hash(path: Path) -> str:
+    """Calcule un hash court du contenu d'un fichier."""
+    return hashlib.md5(path.read_bytes()).hexdigest()[:10]
+
+
+def iter_image_refs(obj: Any) -> Iterator[str]:
+    """Parcourt un document JSON et renvoie les chemins d'images référencés
+    (`images[].path` des exercices, `image.src` des leçons)."""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if key in ('path', 'src') and isinstance(value, str):
+                if Path(value.split('?')[0]).suffix.lower() in IMAGE_EXTENSIONS:
+                    yield value
+            else:
+                yield from iter_image_refs(value)
+    elif isinstance(obj, list):
+        for item in obj:
+            yield from iter_image_refs(item)
+
+
+def public_url(ref: str) -> str:
+    """Normalise une référence (relative à public/ ou absolue) en URL."""
+    return '/' + ref.lstrip('/')
+
+
+def url_to_file(url: str) -> Path:
+    return PUBLIC_DIR / url.lstrip('/')
+
+
+def add_katex_shard(entries: Dict[str, str], public_dir: Path, url: str) -> None:
+    """Ajoute le rendu KaTeX pré-calculé d'un document (prerender_katex.py) s'il existe."""
+    shard_path = public_dir / "katex" / url.lstrip('/')
+    if shard_path.exists():
+        entries[f"/katex{url}"] = file_hash(shard_path)
+
+
+def build_precache_manifest(manifest_path: Path = MANIFEST_PATH) -> Dict[str, Any]:
+    """Construit le manifeste de précache {url: révision} pour les chapitres actifs."""
+    public_dir = manifest_path.parent
+    chapters_dir = public_dir / "chapters"
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    entries: Dict[str, str] = {}
+    missing = []
+
+    for url, source in SHELL_ASSETS.items():
+        if source.exists():
+            entries[url] = file_hash(source)
+    katex_index = public_dir / "katex" / "index.json"
+    if katex_index.exists():
+        entries['/katex/index.json'] = file_hash(katex_index)
+
+    for class_name, chapters in manifest.items():
+        for chapter in chapters:
+            if not chapter.get('isActive'):
+                continue
+
+            chapter_file = chapters_dir / chapter['file']
+            if not chapter_file.exists():
+                missing.append(f"chapters/{chapter['file']}")
+                continue
+
+            # Réutiliser la version calculée par l'outil d'administration
+            version = chapter.get('version', '')
+            if not version or version == 'non-versionné':
+                version = file_hash(chapter_file)
+            entries[f"/chapters/{chapter['file']}"] = version
+            add_katex_shard(entries, public_dir, f"/chapters/{chapter['file']}")
+
+            with open(chapter_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            documents = [data]
+
+            lesson_file = data.get('lessonFile')
+            if lesson_file:
+                lesson_class = data.get('class', class_name)
+                lesson_path = chapters_dir / lesson_class / lesson_file
+                if lesson_path.exists():
+                    entries[f"/chapters/{lesson_class}/{lesson_file}"] = file_hash(lesson_path)
+                    add_katex_shard(entries, public_dir, f"/chapters/{lesson_class}/{lesson_file}")
+                    with open(lesson_path, 'r', encoding='utf-8') as f:
+                        documents.append(json.load(f))
+                else:
+                    missing.append(f"chapters/{lesson_class}/{lesson_file}")
+
+            for document in documents:
+                for ref in iter_image_refs(document):
+                    url = public_url(ref)
+                    image_path = public_dir / url.lstrip('/')
+                    if image_path.exists():
+                        entries[url] = file_hash(image_path)
+                    else:
+                        missing.append(url.lstrip('/'))
+
+    entries = dict(sorted(entries.items()))
+    canonical = json.dumps(entries, sort_keys=True, separators=(',', ':'))
+    return {
+        'version': hashlib.md5(canonical.encode('utf-8')).hexdigest()[:8],
+        'entries': entries,
+        'missing': sorted(set(missing)),
+    }
+
+
+def render_block(precache: Dict[str, Any]) -> str:
+    """Génère le bloc JavaScript injecté dans sw.js."""
+    entries_js = json.dumps(precache['entries'], indent=2, ensure_ascii=False)
+    return (
+        f"{BLOCK_START} Généré par generate_precache.py - ne pas modifier à la main\n"
+        f"const PRECACHE_VERSION = '{precache['version']}';\n"
+        f"const PRECACHE_MANIFEST = {entries_js};\n"
+        f"{BLOCK_END}"
+    )
+
+
+def write_service_worker(precache: Dict[str, Any], sw_path: Path = SERVICE_WORKER_PATH) -> bool:
+    """Remplace le bloc généré dans sw.js. Retourne True si le fichier a changé."""
+    content = sw_path.read_text(encoding='utf-8')
+    pattern = re.compile(re.escape(BLOCK_START) + r".*?" + re.escape(BLOCK_END), re.DOTALL)
+    if not pattern.search(content):
+        raise ValueError(f"Bloc {BLOCK_START} introuvable dans {sw_path}")
+
+    new_content = pattern.sub(lambda _: render_block(precache), content, count=1)
+    if new_content == content:
+        return False
+    sw_path.write_text(new_content, encoding='utf-8')
+    return True
+
+
+def regenerate(manifest_path: Path = MANIFEST_PATH, sw_path: Optional[Path] = None) -> Dict[str, Any]:
+    """Reconstruit le précache et met à jour sw.js (utilisé par l'outil d'administration)."""
+    precache = build_precache_manifest(manifest_path)
+    precache['changed'] = write_service_worker(precache, sw_path or SERVICE_WORKER_PATH)
+    return precache
+
+
+def main():
+    print("=" * 70)
+    print("GÉNÉRATION DU PRÉCACHE DU SERVICE WORKER")
+    print("=" * 70)
+
+    if not MANIFEST_PATH.exists():
+        print(f"❌ Erreur: Le fichier {MANIFEST_PATH} n'existe pas!")
+        return 1
+
+    precache = regenerate()
+
+    print(f"✓ {len(precache['entries'])} URL(s) en précache (version {precache['version']})")
+    for path in precache['missing']:
+        print(f"  ⚠️  Référence introuvable: {path}")
+
+    if precache['changed']:
+        print(f"💾 {SERVICE_WORKER_PATH.name} mis à jour")
+    else:
+        print(f"ℹ️  {SERVICE_WORKER_PATH.name} déjà à jour")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
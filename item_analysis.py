@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Analyse des questions de quiz à partir des réponses des élèves.
+
+Les réponses viennent de la base de progress_ingest.py (dernier envoi de chaque
+élève pour chaque chapitre). Seuls les envois faits sur la version actuelle du
+chapitre sont analysés: après une correction de la bonne réponse ou un
+réordonnancement des options, les anciennes réponses ne correspondent plus au
+corrigé; elles sont comptées à part (`excluded`). Pour chaque chapitre, une matrice élèves × questions
+des options choisies est construite, puis toutes les statistiques classiques
+sont calculées en une fois avec NumPy:
+1. Indice de difficulté (p-value): part de bonnes réponses parmi les répondants
+2. Discrimination: corrélation point-bisériale entre la réussite à la question
+   et le score sur les autres questions du quiz
+3. Distracteurs: taux de sélection de chaque option et score moyen des élèves
+   qui l'ont choisie (un distracteur choisi par moins de 5% ne sert à rien)
+4. Fidélité du quiz (KR-20)
+
+Les résultats sont écrits dans stats/items/<classe>/<chapitre>.json (item_stats.py),
+que l'application d'administration affiche à côté de chaque question.
+
+Utilisation:
+    python item_analysis.py [--class 1bsm] [--chapter suites]
+    python item_analysis.py bench [--students 30000 --items 20]
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from item_stats import SIDECAR_DIR, sidecar_path, write_sidecar
+from progress_ingest import DB_PATH, ProgressStore
+
+# Configuration
+ROOT_DIR = Path(__file__).parent
+PUBLIC_DIR = ROOT_DIR / "public"
+
+MIN_RESPONSES = 10          # En dessous, les indices ne sont pas signalés
+TOO_HARD = 0.2              # p-value
+TOO_EASY = 0.9
+LOW_DISCRIMINATION = 0.2    # Point-bisériale
+FUNCTIONAL_DISTRACTOR = 0.05
+
+
+def answer_key(questions: List[Dict[str, Any]]) -> np.ndarray:
+    """Matrice questions × options: True pour les bonnes réponses.
+
+    Une question d'ordonnancement a deux « options »: 0 = bon ordre, 1 = autre ordre.
+    """
+    width = max([2] + [len(q.get('options') or []) for q in questions])
+    key = np.zeros((len(questions), width), dtype=bool)
+    for i, question in enumerate(questions):
+        if question.get('type') == 'ordering':
+            key[i, 0] = True
+        else:
+            for j, option in enumerate(question.get('options') or []):
+                if isinstance(option, dict):
+                    key[i, j] = bool(option.get('isCorrect', option.get('is_correct')))
+    return key
+
+
+def response_matrix(questions: List[Dict[str, Any]], answers: List[Dict[str, Any]]) -> np.ndarray:
+    """Matrice élèves × questions de l'option choisie (-1: pas de réponse).
+
+    Les réponses sont celles de l'export (ExportedQuizResult.answers): indice de
+    l'option pour un QCM, indices des étapes dans l'ordre choisi pour un ordonnancement.
+    """
+    choices = np.full((len(answers), len(questions)), -1, dtype=np.int16)
+    columns = {question.get('id'): i for i, question in enumerate(questions)}
+    widths = [len(q.get('options') or []) for q in questions]
+    orders = [list(range(len(q.get('steps') or []))) if q.get('type') == 'ordering' else None
+              for q in questions]
+    for row, student_answers in enumerate(answers):
+        for question_id, answer in student_answers.items():
+            i = columns.get(question_id)
+            if i is None:
+                continue
+            if orders[i] is not None:
+                if isinstance(answer, list):
+                    choices[row, i] = 0 if answer == orders[i] else 1
+            elif isinstance(answer, int) and 0 <= answer < widths[i]:
+                choices[row, i] = answer
+    return choices
+
+
+def analyze(choices: np.ndarray, key: np.ndarray) -> Dict[str, np.ndarray]:
+    """Statistiques de toutes les questions et options, sans boucle Python."""
+    students, items = choices.shape
+    width = key.shape[1]
+    answered = choices >= 0
+    correct = answered & key[np.arange(items), np.where(answered, choices, 0)]
+
+    responses = answered.sum(axis=0)
+    safe_responses = np.maximum(responses, 1)
+    p_value = correct.sum(axis=0) / safe_responses
+
+    # Point-bisériale sur les répondants, contre le score aux autres questions
+    total = correct.sum(axis=1)
+    rest = (total[:, None] - correct).astype(np.float64)
+    weights = answered.astype(np.float64)
+    x = correct.astype(np.float64)
+    x_mean = (x * weights).sum(axis=0) / safe_responses
+    rest_mean = (rest * weights).sum(axis=0) / safe_responses
+    x_dev = (x - x_mean) * weights
+    rest_dev = (rest - rest_mean) * weights
+    denominator = np.sqrt((x_dev ** 2).sum(axis=0) * (rest_dev ** 2).sum(axis=0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        discrimination = np.where(denominator > 0, (x_dev * rest_dev).sum(axis=0) / denominator, np.nan)
+
+    # Options: comptage et score moyen (autres questions, en %) des élèves qui les choisissent
+    flat = (np.arange(items) * width + choices)[answered]
+    counts = np.bincount(flat, minlength=items * width).reshape(items, width)
+    rest_pct = rest / max(items - 1, 1)
+    score_sums = np.bincount(flat, weights=rest_pct[answered], minlength=items * width).reshape(items, width)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        option_rate = counts / safe_responses[:, None]
+        option_score = np.where(counts > 0, score_sums / np.maximum(counts, 1), np.nan)
+
+    # KR-20 (non-réponse = erreur)
+    p_all = correct.mean(axis=0) if students else np.zeros(items)
+    variance = total.var() if students else 0.0
+    kr20 = (items / (items - 1)) * (1 - (p_all * (1 - p_all)).sum() / variance) if items > 1 and variance > 0 else np.nan
+
+    return {
+        'responses': responses,
+        'response_rate': responses / max(students, 1),
+        'p_value': p_value,
+        'discrimination': discrimination,
+        'option_rate': option_rate,
+        'option_score': option_score,
+        'kr20': np.float64(kr20),
+    }
+
+
+def _round(value: Any, digits: int = 3) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits)
+
+
+def item_flags(p_value: float, discrimination: Optional[float], responses: int,
+               distractor_rates: List[float]) -> List[str]:
+    if responses < MIN_RESPONSES:
+        return []
+    flags = []
+    if p_value < TOO_HARD:
+        flags.append("trop difficile")
+    elif p_value > TOO_EASY:
+        flags.append("trop facile")
+    if discrimination is not None:
+        if discrimination < 0:
+            flags.append("discrimination négative (vérifier la bonne réponse)")
+        elif discrimination < LOW_DISCRIMINATION:
+            flags.append("peu discriminante")
+    unused = sum(1 for rate in distractor_rates if rate < FUNCTIONAL_DISTRACTOR)
+    if unused:
+        flags.append(f"{unused} distracteur(s) peu choisi(s)")
+    return flags
+
+
+def chapter_sidecar(chapter: Dict[str, Any], answers: List[Dict[str, Any]], excluded: int = 0) -> Dict[str, Any]:
+    """Statistiques d'un chapitre au format du fichier stats/items/...
+    `excluded`: envois ignorés car faits sur une autre version du chapitre."""
+    questions = [q for q in chapter.get('quiz') or [] if isinstance(q, dict)]
+    key = answer_key(questions)
+    stats = analyze(response_matrix(questions, answers), key)
+
+    items = {}
+    for i, question in enumerate(questions):
+        ordering = question.get('type') == 'ordering'
+        responses = int(stats['responses'][i])
+        width = 2 if ordering else len(question.get('options') or [])
+        options = [{
+            'rate': _round(stats['option_rate'][i, j]),
+            'mean_score': _round(stats['option_score'][i, j]),
+            'correct': bool(key[i, j]),
+        } for j in range(width)]
+        discrimination = _round(stats['discrimination'][i])
+        items[question.get('id', str(i))] = {
+            'responses': responses,
+            'response_rate': _round(stats['response_rate'][i]),
+            'p_value': _round(stats['p_value'][i]),
+            'discrimination': discrimination,
+            'options': options,
+            'flags': item_flags(float(stats['p_value'][i]), discrimination, responses,
+                                [] if ordering else [o['rate'] for o in options if not o['correct']]),
+        }
+    return {
+        'chapter': chapter.get('chapter', ''),
+        'version': chapter.get('version', ''),
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'students': len(answers),
+        'excluded': excluded,
+        'kr20': _round(stats['kr20']),
+        'items': items,
+    }
+
+
+def run(store: ProgressStore, public_dir: Path = PUBLIC_DIR, class_id: Optional[str] = None,
+        chapter_id: Optional[str] = None) -> List[Tuple[str, Dict[str, Any]]]:
+    """Calcule et écrit les statistiques de chaque chapitre ayant des réponses."""
+    chapters_dir = public_dir / "chapters"
+    manifest = json.loads((public_dir / "manifest.json").read_text(encoding='utf-8'))
+    written = []
+    for cls, entries in manifest.items():
+        if class_id and cls != class_id:
+            continue
+        for entry in entries:
+            if chapter_id and entry.get('id') != chapter_id:
+                continue
+            rows = store.conn.execute(
+                "SELECT version, quiz_answers FROM latest_results WHERE class_id = ? AND chapter_id = ?",
+                (cls, entry['id']),
+            ).fetchall()
+            if not rows:
+                continue
+            chapter_path = chapters_dir / entry['file']
+            chapter = json.loads(chapter_path.read_text(encoding='utf-8'))
+            # Réponses notées avec le corrigé actuel: envois de la même version seulement
+            version = chapter.get('version') or entry.get('version')
+            answers = [json.loads(answers_json) for answers_version, answers_json in rows
+                       if not version or answers_version == version]
+            data = chapter_sidecar(chapter, answers, excluded=len(rows) - len(answers))
+            write_sidecar(sidecar_path(chapter_path, chapters_dir), data)
+            written.append((entry['file'], data))
+    return written
+
+
+def benchmark(students: int, items: int, options: int = 4) -> float:
+    """Durée (s) de analyze() sur des réponses aléatoires."""
+    rng = np.random.default_rng(0)
+    key = np.zeros((items, options), dtype=bool)
+    key[np.arange(items), rng.integers(0, options, items)] = True
+    ability = rng.normal(size=(students, 1))
+    knows = rng.random((students, items)) < 1 / (1 + np.exp(-ability))
+    choices = np.where(knows, key.argmax(axis=1), rng.integers(0, options, (students, items))).astype(np.int16)
+    choices[rng.random((students, items)) < 0.05] = -1
+    started = time.perf_counter()
+    analyze(choices, key)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Difficulté, discrimination et distracteurs des questions de quiz")
+    parser.add_argument('command', nargs='?', choices=['analyze', 'bench'], default='analyze')
+    parser.add_argument('--db', type=Path, default=DB_PATH, help="Base de progress_ingest.py")
+    parser.add_argument('--public', type=Path, default=PUBLIC_DIR, help="Dossier public")
+    parser.add_argument('--class', dest='class_id', help="Limiter à une classe (ex: 1bsm)")
+    parser.add_argument('--chapter', help="Limiter à un chapitre (id du manifest)")
+    parser.add_argument('--students', type=int, default=30000, help="bench: nombre d'élèves")
+    parser.add_argument('--items', type=int, default=20, help="bench: nombre de questions")
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        seconds = benchmark(args.students, args.items)
+        print(f"⏱️  {args.students} élèves × {args.items} questions: {seconds * 1000:.1f} ms")
+        return 0
+
+    if not args.db.exists():
+        print(f"❌ Base introuvable: {args.db} (lancer d'abord progress_ingest.py ingest)", file=sys.stderr)
+        return 1
+    store = ProgressStore(args.db)
+    try:
+        written = run(store, args.public, args.class_id, args.chapter)
+    finally:
+        store.close()
+
+    for file, data in written:
+        flagged = sum(1 for item in data['items'].values() if item['flags'])
+        kr20 = '—' if data['kr20'] is None else f"{data['kr20']:.2f}"
+        excluded = f", {data['excluded']} envoi(s) d'une autre version ignoré(s)" if data['excluded'] else ""
+        print(f"  ✓ {file}: {data['students']} élève(s), KR-20 {kr20}, {flagged} question(s) à revoir{excluded}")
+    print(f"📋 {len(written)} chapitre(s) analysé(s) -> {SIDECAR_DIR.relative_to(ROOT_DIR)}/")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
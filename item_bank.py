@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Banque d'éléments partagés (questions de quiz, exercices) entre chapitres et classes.
+
+Une même question recopiée dans 1BSE, 1BSM et TCS oblige à corriger chaque
+copie et à re-versionner chaque chapitre. Avec la banque:
+1. L'élément est stocké une seule fois dans item_bank/<section>/<id>.json,
+   sous un identifiant stable (il ne change pas quand le contenu est corrigé)
+2. Dans un chapitre, l'élément porte une référence "bankRef": "<id>" à côté de
+   son identifiant local; l'application d'administration peut le modifier
+   comme les autres, la modification est reportée dans la banque
+3. La publication remplace le contenu de chaque élément référencé par celui de
+   la banque: les fichiers publiés restent des JSON "à plat", lisibles tels
+   quels par l'application web
+4. Seuls les chapitres dont un élément référencé a changé (hash du contenu
+   différent) sont réécrits et re-versionnés, dans le fichier et le manifest
+
+Utilisation:
+    python item_bank.py status
+    python item_bank.py share 1bse/1bse_la_derivation.json:quiz[3] 1bsm/1bsm_la_derivation.json:quiz[5]
+    python item_bank.py share --exact-duplicates
+    python item_bank.py publish [--dry-run]
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from generate_precache import regenerate as regenerate_precache
+from manifest_store import ManifestStore
+from transform_json import serialize, write_atomic
+
+# Configuration
+ROOT_DIR = Path(__file__).parent
+BANK_DIR = ROOT_DIR / "item_bank"
+CHAPTERS_DIR = ROOT_DIR / "public" / "chapters"
+MANIFEST_PATH = ROOT_DIR / "public" / "manifest.json"
+
+REF_KEY = 'bankRef'
+SECTIONS = {'quiz': 'q', 'exercises': 'exo'}  # Section du chapitre -> préfixe des identifiants
+LOCAL_KEYS = ('id', REF_KEY)  # Propres à chaque chapitre, hors du contenu partagé
+
+_LOCATION = re.compile(r'^(?P<file>.+\.json):(?P<section>\w+)\[(?P<index>\d+)\]$')
+
+
+class ItemBankError(Exception):
+    """Référence ou emplacement invalide."""
+
+
+def shared_content(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Contenu partagé d'un élément de chapitre (sans son id local ni sa référence)."""
+    return {key: value for key, value in item.items() if key not in LOCAL_KEYS}
+
+
+def content_hash(content: Dict[str, Any]) -> str:
+    canonical = json.dumps(shared_content(content), sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:12]
+
+
+def chapter_version(data: Dict[str, Any]) -> str:
+    """Version d'un chapitre, calculée comme ChapterData._calculate_content_version."""
+    content = {key: value for key, value in data.items() if key != 'version'}
+    content_string = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return f"v1.1.0-{hashlib.md5(content_string.encode('utf-8')).hexdigest()[:6]}"
+
+
+class ItemBank:
+    """Éléments partagés, un fichier JSON par élément."""
+
+    def __init__(self, bank_dir: Path = BANK_DIR):
+        self.bank_dir = Path(bank_dir)
+        self._cache: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+
+    def _path(self, section: str, item_id: str) -> Path:
+        if section not in SECTIONS:
+            raise ItemBankError(f"Section non partageable: {section}")
+        return self.bank_dir / section / f"{item_id}.json"
+
+    def get(self, section: str, item_id: str) -> Optional[Dict[str, Any]]:
+        key = (section, item_id)
+        if key not in self._cache:
+            path = self._path(section, item_id)
+            self._cache[key] = json.loads(path.read_text(encoding='utf-8')) if path.exists() else None
+        return self._cache[key]
+
+    def ids(self, section: str) -> List[str]:
+        directory = self.bank_dir / section
+        return sorted(path.stem for path in directory.glob("*.json")) if directory.exists() else []
+
+    def put(self, section: str, item: Dict[str, Any], item_id: Optional[str] = None) -> str:
+        """Ajoute ou met à jour un élément; retourne son identifiant.
+        Un nouvel identifiant est dérivé du hash du contenu initial, puis ne change plus."""
+        content = shared_content(item)
+        item_id = item_id or f"{SECTIONS[section]}-{content_hash(content)[:10]}"
+        if self.get(section, item_id) != content:
+            path = self._path(section, item_id)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(path, json.dumps(content, indent=2, ensure_ascii=False) + '\n')
+            self._cache[(section, item_id)] = content
+        return item_id
+
+
+def iter_references(data: Dict[str, Any]) -> Iterable[Tuple[str, int, Dict[str, Any]]]:
+    """(section, index, élément) des éléments d'un chapitre qui référencent la banque."""
+    for section in SECTIONS:
+        for index, item in enumerate(data.get(section) or []):
+            if isinstance(item, dict) and isinstance(item.get(REF_KEY), str):
+                yield section, index, item
+
+
+def resolve_chapter(data: Dict[str, Any], bank: ItemBank) -> Tuple[Dict[str, Any], Set[str], List[str]]:
+    """Remplace les éléments référencés par leur contenu dans la banque.
+    Retourne (contenu, références modifiées, références introuvables)."""
+    changed: Set[str] = set()
+    missing: List[str] = []
+    resolved = dict(data)
+    for section, index, item in list(iter_references(data)):
+        ref = item[REF_KEY]
+        content = bank.get(section, ref)
+        if content is None:
+            missing.append(ref)
+            continue
+        if content_hash(item) == content_hash(content):
+            continue
+        new_item = {'id': item['id']} if 'id' in item else {}
+        new_item.update(content)
+        new_item[REF_KEY] = ref
+        if resolved[section] is data[section]:
+            resolved[section] = list(data[section])
+        resolved[section][index] = new_item
+        changed.add(ref)
+    return resolved, changed, missing
+
+
+def conflicting_pushes(documents: Iterable[Tuple[str, Dict[str, Any]]],
+                       bank: Optional[ItemBank] = None) -> Dict[str, List[str]]:
+    """Éléments partagés modifiés différemment dans plusieurs documents sauvegardés ensemble.
+
+    `documents` est une suite de (nom, contenu du chapitre). Retourne {référence: noms};
+    reporter ces éléments dans la banque laisserait le dernier écraser les autres.
+    """
+    bank = bank or ItemBank()
+    pushes: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+    for name, data in documents:
+        for section, _, item in iter_references(data):
+            stored = bank.get(section, item[REF_KEY])
+            digest = content_hash(item)
+            if stored is None or content_hash(stored) != digest:
+                pushes[item[REF_KEY]][digest].append(name)
+    return {ref: sorted({name for names in versions.values() for name in names})
+            for ref, versions in pushes.items() if len(versions) > 1}
+
+
+def push_shared_items(data: Dict[str, Any], bank: Optional[ItemBank] = None) -> List[str]:
+    """Reporte dans la banque les éléments référencés modifiés dans ce chapitre.
+    Retourne les références mises à jour (les autres chapitres sont à republier)."""
+    bank = bank or ItemBank()
+    updated = []
+    for section, _, item in iter_references(data):
+        stored = bank.get(section, item[REF_KEY])
+        if stored is None or content_hash(stored) != content_hash(item):
+            bank.put(section, item, item[REF_KEY])
+            updated.append(item[REF_KEY])
+    return updated
+
+
+def chapter_files(chapters_dir: Path = CHAPTERS_DIR) -> List[Path]:
+    return sorted(
+        path for path in chapters_dir.rglob("*.json")
+        if 'lessons' not in path.relative_to(chapters_dir).parts and not path.name.endswith('.tmp.json')
+    )
+
+
+def publish(bank: Optional[ItemBank] = None, chapters_dir: Path = CHAPTERS_DIR,
+            manifest_path: Optional[Path] = MANIFEST_PATH, only: Optional[Set[str]] = None,
+            dry_run: bool = False) -> List[Dict[str, Any]]:
+    """Résout les références de tous les chapitres (ou de ceux qui référencent `only`).
+    Seuls les chapitres modifiés sont réécrits et re-versionnés."""
+    bank = bank or ItemBank()
+    results = []
+    for path in chapter_files(chapters_dir):
+        original = path.read_text(encoding='utf-8')
+        if REF_KEY not in original:
+            continue
+        data = json.loads(original)
+        if only is not None and not any(item[REF_KEY] in only for _, _, item in iter_references(data)):
+            continue
+        resolved, changed, missing = resolve_chapter(data, bank)
+        rel = path.relative_to(chapters_dir).as_posix()
+        for ref in missing:
+            print(f"  ⚠️  {rel}: élément partagé introuvable dans la banque: {ref}")
+        if not changed:
+            continue
+        resolved['version'] = chapter_version(resolved)
+        results.append({'file': rel, 'items': sorted(changed), 'version': resolved['version']})
+        if not dry_run:
+            write_atomic(path, serialize(resolved, original))
+
+    if results and not dry_run:
+        update_manifest_versions({result['file']: result['version'] for result in results}, manifest_path)
+    return results
+
+
+def update_manifest_versions(versions: Dict[str, str], manifest_path: Optional[Path] = MANIFEST_PATH) -> None:
+    """Reporte dans le manifest la nouvelle version des chapitres réécrits ({fichier: version}),
+    puis régénère le précache de sw.js, qui sert les chapitres en cache d'abord."""
+    if not versions or not manifest_path or not manifest_path.exists():
+        return
+    store = ManifestStore(manifest_path)
+    for entries in store.read().values():
+        for entry in entries:
+            if entry.get('file') in versions:
+                store.update_entry(entry['id'], {'version': versions[entry['file']]})
+    sw_path = manifest_path.parent.parent / "sw.js"
+    if sw_path.exists():
+        regenerate_precache(manifest_path, sw_path)
+
+
+def share(locations: List[Tuple[Path, str, int]], bank: Optional[ItemBank] = None,
+          chapters_dir: Path = CHAPTERS_DIR, manifest_path: Optional[Path] = MANIFEST_PATH) -> str:
+    """Place le premier élément dans la banque et y fait référencer tous les emplacements
+    (leur contenu devient celui du premier à la prochaine publication).
+    Les chapitres modifiés sont re-versionnés, dans le fichier et le manifest."""
+    bank = bank or ItemBank()
+    first_path, first_section, first_index = locations[0]
+    first = json.loads((chapters_dir / first_path).read_text(encoding='utf-8'))[first_section][first_index]
+    if first_section not in SECTIONS:
+        raise ItemBankError(f"Section non partageable: {first_section}")
+    ref = bank.put(first_section, first, first.get(REF_KEY))
+
+    by_file: Dict[Path, List[Tuple[str, int]]] = defaultdict(list)
+    for path, section, index in locations:
+        if section != first_section:
+            raise ItemBankError(f"Impossible de partager un élément entre {first_section} et {section}")
+        by_file[path].append((section, index))
+    versions: Dict[str, str] = {}
+    for path, targets in by_file.items():
+        file_path = chapters_dir / path
+        original = file_path.read_text(encoding='utf-8')
+        data = json.loads(original)
+        changed = False
+        for section, index in targets:
+            item = data[section][index]
+            if item.get(REF_KEY) != ref:
+                data[section][index] = {**{k: v for k, v in item.items() if k != REF_KEY}, REF_KEY: ref}
+                changed = True
+        if not changed:
+            continue
+        data['version'] = chapter_version(data)
+        versions[path.as_posix()] = data['version']
+        write_atomic(file_path, serialize(data, original))
+    update_manifest_versions(versions, manifest_path)
+    return ref
+
+
+def parse_location(value: str) -> Tuple[Path, str, int]:
+    match = _LOCATION.match(value)
+    if not match:
+        raise ItemBankError(f"Emplacement invalide (attendu: classe/fichier.json:quiz[3]): {value}")
+    return Path(match['file']), match['section'], int(match['index'])
+
+
+def exact_duplicate_groups(public_dir: Path) -> List[List[Tuple[Path, str, int]]]:
+    """Groupes de questions ou d'exercices identiques (hors lessons), via near_duplicates."""
+    from near_duplicates import collect_items, find_clusters
+    items = collect_items(public_dir, ('quiz', 'exercise'))
+    groups = []
+    for cluster in find_clusters(items, threshold=1.0):
+        locations = [parse_location(f"{item['file']}:{item['path']}") for item in cluster['items']]
+        contents = {content_hash(json.loads((public_dir / "chapters" / p).read_text(encoding='utf-8'))[s][i])
+                    for p, s, i in locations}
+        if len(contents) == 1:  # Jaccard de 1 après normalisation: vérifier l'identité réelle
+            groups.append(locations)
+    return groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banque d'éléments partagés entre chapitres")
+    parser.add_argument('--bank', type=Path, default=BANK_DIR, help="Dossier de la banque")
+    parser.add_argument('--chapters', type=Path, default=CHAPTERS_DIR, help="Dossier public/chapters")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('status', help="Références par élément et chapitres à republier")
+    share_parser = sub.add_parser('share', help="Partager un élément entre plusieurs emplacements")
+    share_parser.add_argument('locations', nargs='*', help="classe/fichier.json:quiz[3] ...")
+    share_parser.add_argument('--exact-duplicates', action='store_true',
+                              help="Partager toutes les questions et tous les exercices identiques")
+    publish_parser = sub.add_parser('publish', help="Résoudre les références dans les fichiers publiés")
+    publish_parser.add_argument('--dry-run', action='store_true', help="Afficher sans écrire")
+    args = parser.parse_args()
+
+    bank = ItemBank(args.bank)
+    try:
+        if args.command == 'status':
+            references: Dict[str, List[str]] = defaultdict(list)
+            stale: Set[str] = set()
+            for path in chapter_files(args.chapters):
+                data = json.loads(path.read_text(encoding='utf-8'))
+                rel = path.relative_to(args.chapters).as_posix()
+                for section, _, item in iter_references(data):
+                    references[item[REF_KEY]].append(rel)
+                    stored = bank.get(section, item[REF_KEY])
+                    if stored is None or content_hash(stored) != content_hash(item):
+                        stale.add(rel)
+            for ref, files in sorted(references.items()):
+                print(f"  {ref}: {len(files)} chapitre(s) ({', '.join(sorted(set(files)))})")
+            print(f"✓ {len(references)} élément(s) partagé(s), {len(stale)} chapitre(s) à republier")
+        elif args.command == 'share':
+            if args.exact_duplicates:
+                groups = exact_duplicate_groups(args.chapters.parent)
+            elif len(args.locations) >= 2:
+                groups = [[parse_location(value) for value in args.locations]]
+            else:
+                parser.error("share: au moins deux emplacements, ou --exact-duplicates")
+            for locations in groups:
+                ref = share(locations, bank, args.chapters, args.chapters.parent / "manifest.json")
+                print(f"  🔗 {ref}: {', '.join(f'{p.as_posix()}:{s}[{i}]' for p, s, i in locations)}")
+            print(f"✓ {len(groups)} élément(s) partagé(s); lancez 'publish' pour aligner les copies")
+        else:
+            results = publish(bank, args.chapters, args.chapters.parent / "manifest.json", dry_run=args.dry_run)
+            for result in results:
+                print(f"  {'·' if args.dry_run else '✓'} {result['file']} -> {result['version']} "
+                      f"({', '.join(result['items'])})")
+            print(f"✓ {len(results)} chapitre(s) {'à republier' if args.dry_run else 'republié(s)'}")
+    except (ItemBankError, KeyError, IndexError, json.JSONDecodeError) as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
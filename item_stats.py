@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Fichiers de statistiques des questions (stats/items/<classe>/<chapitre>.json).
+
+Écrits par item_analysis.py, lus par l'application d'administration. Ce module
+n'utilise que la bibliothèque standard: l'application peut afficher les
+statistiques sans que NumPy soit installé.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+# Configuration
+ROOT_DIR = Path(__file__).parent
+CHAPTERS_DIR = ROOT_DIR / "public" / "chapters"
+SIDECAR_DIR = ROOT_DIR / "stats" / "items"
+
+
+def sidecar_path(chapter_path: Path, chapters_dir: Path = CHAPTERS_DIR, sidecar_dir: Path = SIDECAR_DIR) -> Path:
+    """stats/items/<classe>/<fichier du chapitre>."""
+    return sidecar_dir / Path(chapter_path).resolve().relative_to(Path(chapters_dir).resolve())
+
+
+def load_sidecar(chapter_path: Path, chapters_dir: Path = CHAPTERS_DIR) -> Dict[str, Any]:
+    """Statistiques d'un chapitre ({} si absentes ou illisibles)."""
+    try:
+        return json.loads(sidecar_path(chapter_path, chapters_dir).read_text(encoding='utf-8'))
+    except (OSError, ValueError, json.JSONDecodeError):
+        return {}
+
+
+def write_sidecar(path: Path, data: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix('.tmp.json')
+    temp_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+    os.replace(temp_path, path)
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Réparation tolérante de fichiers JSON (chapitres, leçons, manifest).
+
+Un seul parcours du texte, en temps linéaire, qui recopie le document tel quel
+et corrige au passage les erreurs courantes d'édition à la main:
+- virgules en trop avant } ou ] (et virgules manquantes entre deux valeurs)
+- chaînes et clés entre guillemets simples, clés sans guillemets
+- échappements invalides (ex: "\\sqrt" au lieu de "\\\\sqrt") et sauts de ligne bruts
+  dans les chaînes; dans une chaîne qui contient un tel échappement, \\t, \\b, \\f
+  et \\r suivis d'une lettre (\\times, \\frac...) sont aussi lus comme des
+  commandes LaTeX, une chaîne sans échappement invalide étant recopiée telle quelle
+- littéraux Python (True, False, None) et commentaires // ou /* */
+- fin de fichier tronquée (chaîne, nombre, membre incomplet, accolades non fermées)
+
+Chaque correction est rapportée avec sa position dans le texte d'origine.
+Les types des valeurs ne sont jamais modifiés: true reste un booléen.
+
+Utilisation:
+    python json_repair.py public/manifest.json            # affiche les corrections
+    python json_repair.py public/manifest.json --write    # réécrit le fichier
+
+Réécrire manifest.json régénère aussi ses fragments par classe (manifests/).
+"""
+
+import argparse
+import bisect
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+from manifest_store import MANIFEST_PATH, write_shards
+
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+_NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?')
+# Début de nombre éventuellement incomplet ("1.", "2.5e", "-"), pour repérer une troncature
+_NUMBER_PREFIX = re.compile(r'-?\d*(?:\.\d*)?(?:[eE][+-]?\d*)?')
+_BAREWORD = re.compile(r'[A-Za-z_$][\w$-]*')
+_PLAIN_CHARS = {
+    '"': re.compile(r'[^"\\\x00-\x1f]*'),
+    "'": re.compile(r'[^\'"\\\x00-\x1f]*'),
+}
+_VALID_ESCAPES = set('"\\/bfnrtu')
+_HEX4 = re.compile(r'[0-9a-fA-F]{4}')
+# \frac, \beta, \times, \right...: commande LaTeX lue à tort comme un caractère
+# de contrôle (\n est exclu: "\nLe" est un saut de ligne courant dans le contenu).
+# Appliqué seulement aux chaînes qui contiennent aussi un échappement invalide.
+_LATEX_LIKE_ESCAPE = re.compile(r'\\[bfrt][A-Za-z]')
+_CONTROL_ESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t', '\b': '\\b', '\f': '\\f'}
+_PYTHON_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+_JSON_LITERALS = {'true', 'false', 'null'}
+
+# États d'un conteneur en cours de lecture
+_EXPECT_KEY = 'key'          # après { ou , dans un objet
+_EXPECT_COLON = 'colon'
+_EXPECT_VALUE = 'value'      # après : dans un objet, après [ ou , dans un tableau
+_EXPECT_COMMA = 'comma'      # après une valeur complète
+
+
+@dataclass
+class Repair:
+    """Une correction appliquée au texte d'origine."""
+    offset: int
+    kind: str
+    message: str
+
+
+@dataclass
+class RepairResult:
+    text: str
+    repairs: List[Repair] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.repairs)
+
+    def describe(self, source: str, limit: Optional[int] = None) -> List[str]:
+        """Formate les corrections avec leur ligne et colonne dans `source`."""
+        newlines = [i for i, ch in enumerate(source) if ch == '\n']
+        lines = []
+        for repair in self.repairs[:limit]:
+            line = bisect.bisect_left(newlines, repair.offset)
+            column = repair.offset - (newlines[line - 1] if line else -1)
+            lines.append(f"ligne {line + 1}, colonne {column}: {repair.message}")
+        return lines
+
+
+class JSONRepairError(ValueError):
+    """Le document ne peut pas être réparé automatiquement."""
+
+
+class _Frame:
+    __slots__ = ('closer', 'state', 'member_start', 'pending_comma')
+
+    def __init__(self, closer: str, state: str, member_start: int):
+        self.closer = closer
+        self.state = state
+        # Position dans la sortie où commence le membre en cours, virgule comprise
+        # (pour le retirer s'il est incomplet)
+        self.member_start = member_start
+        # Une virgule vient d'être écrite et aucun membre ne l'a encore suivie
+        self.pending_comma = False
+
+
+class _Repairer:
+    def __init__(self, text: str):
+        self.text = text
+        self.out: List[str] = []
+        self.repairs: List[Repair] = []
+        self.stack: List[_Frame] = []
+        self.done = False
+
+    def note(self, offset: int, kind: str, message: str) -> None:
+        self.repairs.append(Repair(offset, kind, message))
+
+    def cut_by_end(self, position: int) -> bool:
+        """Une valeur qui s'arrête pile en fin de texte, à l'intérieur d'un conteneur, est tronquée."""
+        return position == len(self.text) and bool(self.stack)
+
+    # --- Lecture des valeurs -------------------------------------------------
+
+    def read_string(self, pos: int, latex_escapes: bool = True) -> int:
+        """Recopie une chaîne (guillemets simples ou doubles) en JSON valide.
+
+        Les échappements \\t, \\b, \\f, \\r qui ressemblent à une commande LaTeX
+        ne sont doublés que si la chaîne contient un échappement invalide: sinon
+        la chaîne est relue avec latex_escapes=False et recopiée telle quelle.
+        """
+        text = self.text
+        start, out_start, repairs_start = pos, len(self.out), len(self.repairs)
+        latex_used = invalid_seen = False
+        quote = text[pos]
+        if quote == "'":
+            self.note(pos, 'quotes', "guillemets simples remplacés par des guillemets doubles")
+        plain = _PLAIN_CHARS[quote]
+        out = self.out
+        out.append('"')
+        pos += 1
+        end = len(text)
+        while True:
+            match = plain.match(text, pos)
+            out.append(match.group())
+            pos = match.end()
+            if pos >= end or text[pos] == quote:
+                if latex_used and not invalid_seen:
+                    del out[out_start:]
+                    del self.repairs[repairs_start:]
+                    return self.read_string(start, latex_escapes=False)
+                if pos >= end:
+                    self.note(pos, 'truncated', "chaîne non terminée fermée")
+                    out.append('"')
+                    return pos
+                out.append('"')
+                return pos + 1
+            ch = text[pos]
+            if ch == '"':
+                out.append('\\"')
+                pos += 1
+            elif ch == '\\':
+                nxt = text[pos + 1] if pos + 1 < end else ''
+                if quote == "'" and nxt == "'":
+                    out.append("'")
+                    pos += 2
+                elif latex_escapes and _LATEX_LIKE_ESCAPE.match(text, pos):
+                    self.note(pos, 'escape', f"commande LaTeX \\{nxt}... : barre oblique inverse doublée")
+                    out.append('\\\\')
+                    latex_used = True
+                    pos += 1
+                elif nxt and nxt in _VALID_ESCAPES and (nxt != 'u' or _HEX4.match(text, pos + 2)):
+                    out.append(text[pos:pos + 2])
+                    pos += 2
+                else:
+                    self.note(pos, 'escape', f"échappement invalide \\{nxt} doublé")
+                    out.append('\\\\')
+                    invalid_seen = True
+                    pos += 1
+            else:
+                self.note(pos, 'control', "caractère de contrôle échappé dans une chaîne")
+                out.append(_CONTROL_ESCAPES.get(ch, f'\\u{ord(ch):04x}'))
+                pos += 1
+
+    def read_scalar(self, pos: int, as_key: bool) -> Optional[int]:
+        """Nombre, littéral ou mot sans guillemets.
+
+        Renvoie la position suivante, -1 si rien n'est reconnu, ou None si la
+        valeur est coupée par la fin du texte.
+        """
+        text = self.text
+        if not as_key:
+            # "1.", "2.5e" ou "12" en fin de texte: nombre coupé, même si un préfixe est valide
+            prefix = _NUMBER_PREFIX.match(text, pos)
+            if prefix.end() > pos and self.cut_by_end(prefix.end()):
+                return None
+            match = _NUMBER.match(text, pos)
+            if match and match.end() > pos:
+                self.out.append(match.group())
+                return match.end()
+
+        match = _BAREWORD.match(text, pos)
+        if not match:
+            return -1
+        word = match.group()
+        if as_key:
+            self.note(pos, 'key', f"clé {word} mise entre guillemets")
+            self.out.append(json.dumps(word))
+        elif word in _JSON_LITERALS:
+            self.out.append(word)
+        elif word in _PYTHON_LITERALS:
+            self.note(pos, 'literal', f"{word} remplacé par {_PYTHON_LITERALS[word]}")
+            self.out.append(_PYTHON_LITERALS[word])
+        elif self.cut_by_end(match.end()) and any(lit.startswith(word) for lit in _JSON_LITERALS):
+            return None
+        else:
+            self.note(pos, 'unquoted', f"valeur {word} sans guillemets convertie en chaîne")
+            self.out.append(json.dumps(word))
+        return match.end()
+
+    # --- Structure -----------------------------------------------------------
+
+    def skip_comment(self, pos: int) -> int:
+        text = self.text
+        if text.startswith('//', pos):
+            end = text.find('\n', pos)
+            end = len(text) if end < 0 else end
+        else:
+            end = text.find('*/', pos + 2)
+            end = len(text) if end < 0 else end + 2
+        self.note(pos, 'comment', "commentaire supprimé")
+        return end
+
+    def write_comma(self, frame: _Frame) -> None:
+        frame.member_start = len(self.out)
+        self.out.append(',')
+        frame.pending_comma = True
+        frame.state = _EXPECT_KEY if frame.closer == '}' else _EXPECT_VALUE
+
+    def value_done(self) -> None:
+        if self.stack:
+            self.stack[-1].state = _EXPECT_COMMA
+        else:
+            self.done = True
+
+    def close(self, pos: int, closer: str) -> None:
+        frame = self.stack.pop()
+        if frame.pending_comma:
+            self.out[frame.member_start] = ''
+            self.note(pos, 'comma', "virgule en trop supprimée")
+        elif frame.state == _EXPECT_COLON or (frame.state == _EXPECT_VALUE and frame.closer == '}'):
+            del self.out[frame.member_start:]
+            self.note(pos, 'member', "membre sans valeur supprimé")
+        self.out.append(frame.closer)
+        if closer != frame.closer:
+            self.note(pos, 'bracket', f"{frame.closer} manquant ajouté")
+        self.value_done()
+
+    def run(self) -> RepairResult:
+        text = self.text
+        end = len(text)
+        pos = 0
+        out = self.out
+
+        while pos < end:
+            ws = _WHITESPACE.match(text, pos)
+            if ws.end() > pos:
+                out.append(ws.group())
+                pos = ws.end()
+                continue
+
+            ch = text[pos]
+            if ch == '/' and text.startswith(('//', '/*'), pos):
+                pos = self.skip_comment(pos)
+                continue
+
+            if self.done:
+                self.note(pos, 'trailing', "contenu après la fin du document ignoré")
+                break
+
+            frame = self.stack[-1] if self.stack else None
+            state = frame.state if frame else _EXPECT_VALUE
+
+            if ch in '}]':
+                if any(f.closer == ch for f in self.stack):
+                    # Fermer aussi les conteneurs restés ouverts à l'intérieur
+                    while self.stack[-1].closer != ch:
+                        self.close(pos, ch)
+                    self.close(pos, ch)
+                else:
+                    self.note(pos, 'bracket', f"{ch} inattendu ignoré")
+                pos += 1
+                continue
+
+            if ch == ',':
+                if state == _EXPECT_COMMA:
+                    self.write_comma(frame)
+                else:
+                    self.note(pos, 'comma', "virgule en trop supprimée")
+                pos += 1
+                continue
+
+            if ch == ':':
+                if state == _EXPECT_COLON:
+                    out.append(':')
+                    frame.state = _EXPECT_VALUE
+                else:
+                    self.note(pos, 'colon', "deux-points inattendu ignoré")
+                pos += 1
+                continue
+
+            if state == _EXPECT_COMMA:
+                # Deux valeurs consécutives
+                self.note(pos, 'comma', "virgule manquante ajoutée")
+                self.write_comma(frame)
+                continue
+
+            if state == _EXPECT_COLON:
+                self.note(pos, 'colon', "deux-points manquant ajouté")
+                out.append(':')
+                frame.state = _EXPECT_VALUE
+                continue
+
+            # pending_comma n'est levé qu'une fois un membre réellement écrit:
+            # un caractère ignoré ne doit pas laisser la virgule en place
+            if state == _EXPECT_KEY:
+                if ch in '"\'':
+                    pos = self.read_string(pos)
+                else:
+                    next_pos = self.read_scalar(pos, as_key=True)
+                    if next_pos == -1:
+                        self.note(pos, 'char', f"caractère {ch!r} ignoré")
+                        pos += 1
+                        continue
+                    pos = next_pos
+                frame.pending_comma = False
+                frame.state = _EXPECT_COLON
+                continue
+
+            # Une valeur est attendue
+            if ch in '{[':
+                if frame:
+                    frame.pending_comma = False
+                out.append(ch)
+                closer = '}' if ch == '{' else ']'
+                self.stack.append(_Frame(closer, _EXPECT_KEY if ch == '{' else _EXPECT_VALUE, len(out)))
+                pos += 1
+                continue
+            if ch in '"\'':
+                if frame:
+                    frame.pending_comma = False
+                pos = self.read_string(pos)
+                self.value_done()
+                continue
+            next_pos = self.read_scalar(pos, as_key=False)
+            if next_pos is None:
+                self.note(pos, 'truncated', "valeur tronquée supprimée")
+                del out[frame.member_start:]
+                frame.pending_comma = False
+                frame.state = _EXPECT_COMMA
+                break
+            if next_pos == -1:
+                self.note(pos, 'char', f"caractère {ch!r} ignoré")
+                pos += 1
+                continue
+            if frame:
+                frame.pending_comma = False
+            pos = next_pos
+            self.value_done()
+
+        if not self.done and not self.stack:
+            raise JSONRepairError("document vide ou sans valeur JSON")
+
+        # Fin de texte: fermer les conteneurs restés ouverts
+        while self.stack:
+            self.note(end, 'truncated', f"{self.stack[-1].closer} manquant ajouté en fin de fichier")
+            self.close(end, self.stack[-1].closer)
+
+        return RepairResult(''.join(out), self.repairs)
+
+
+def repair_json(content: str) -> RepairResult:
+    """Répare un document JSON en un seul parcours.
+
+    Lève JSONRepairError si le résultat n'est toujours pas un JSON valide.
+    """
+    result = _Repairer(content).run()
+    try:
+        json.loads(result.text)
+    except json.JSONDecodeError as e:
+        raise JSONRepairError(f"réparation impossible: {e}") from e
+    return result
+
+
+def load_json_tolerant(content: str) -> Tuple[Any, RepairResult]:
+    """Charge un document, en le réparant seulement si le chargement direct échoue."""
+    try:
+        return json.loads(content), RepairResult(content)
+    except json.JSONDecodeError:
+        result = repair_json(content)
+        return json.loads(result.text), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Réparation tolérante de fichiers JSON")
+    parser.add_argument('file', type=Path, help="Fichier JSON à réparer")
+    parser.add_argument('--write', action='store_true', help="Réécrire le fichier réparé")
+    args = parser.parse_args()
+
+    content = args.file.read_text(encoding='utf-8')
+    try:
+        data, result = load_json_tolerant(content)
+    except JSONRepairError as e:
+        print(f"❌ {args.file}: {e}")
+        return 1
+
+    if not result.changed:
+        print(f"✓ {args.file}: JSON valide, aucune correction nécessaire")
+        return 0
+
+    print(f"🔧 {args.file}: {len(result.repairs)} correction(s)")
+    for line in result.describe(content):
+        print(f"  • {line}")
+
+    if args.write:
+        with open(args.file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        print("💾 Fichier réécrit")
+        if args.file.name == MANIFEST_PATH.name and isinstance(data, dict):
+            written = write_shards(data, args.file)
+            print(f"💾 {len(written)} fragment(s) du manifest régénéré(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Analyse LaTeX de toutes les chaînes du contenu (chapitres, leçons, concours).
+
+Un tokenizer découpe chaque chaîne en texte et régions mathématiques
+($...$, $$...$$, \\(...\\), \\[...\\]) puis vérifie dans les formules:
+- délimiteurs non fermés ou dépareillés ($$...$)
+- \\left / \\right et \\begin / \\end non appariés
+- accolades orphelines ou non fermées
+- macros inconnues de KaTeX
+- arguments manquants (\\frac, \\sqrt, exposants, ...)
+
+Les résultats sont mis en cache par hash de chaîne: après une modification,
+seules les chaînes nouvelles ou modifiées sont réanalysées.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from validate_content import build_line_index, collect_files, iter_strings, line_for_path
+
+# Configuration
+PUBLIC_DIR = Path(__file__).parent / "public"
+CACHE_PATH = Path(__file__).parent / ".latex_lint_cache.json"
+
+# À incrémenter dès qu'une règle change: invalide le cache
+RULES_VERSION = 2
+
+KNOWN_MACROS: Set[str] = set("""
+alpha beta gamma delta epsilon varepsilon zeta eta theta vartheta iota kappa lambda mu nu xi pi varpi
+rho varrho sigma varsigma tau upsilon phi varphi chi psi omega
+Gamma Delta Theta Lambda Xi Pi Sigma Upsilon Phi Psi Omega
+frac dfrac tfrac cfrac binom dbinom tbinom sqrt root
+sin cos tan cot sec csc arcsin arccos arctan sinh cosh tanh coth
+ln log lg exp lim liminf limsup sup inf max min arg det deg dim gcd ker hom Pr mod bmod pmod pod
+sum prod coprod int iint iiint oint bigcup bigcap bigoplus bigotimes bigvee bigwedge limits nolimits
+infty partial nabla emptyset varnothing forall exists nexists neg lnot land lor wedge vee
+in notin ni subset subseteq subsetneq supset supseteq supsetneq cup cap setminus complement
+le leq ge geq neq ne equiv approx sim simeq cong propto ll gg prec succ preceq succeq
+lt gt leqslant geqslant nleq ngeq
+pm mp times div cdot cdots ldots dots vdots ddots circ bullet star ast oplus otimes odot
+mid nmid parallel perp top bot angle triangle square Box diamond
+to rightarrow leftarrow leftrightarrow Rightarrow Leftarrow Leftrightarrow implies impliedby iff
+longrightarrow longleftarrow longleftrightarrow Longrightarrow Longleftarrow Longleftrightarrow
+mapsto longmapsto uparrow downarrow updownarrow Uparrow Downarrow nearrow searrow nwarrow swarrow
+xrightarrow xleftarrow hookrightarrow hookleftarrow rightleftharpoons
+left right middle big Big bigg Bigg bigl bigr Bigl Bigr biggl biggr Biggl Biggr
+langle rangle lfloor rfloor lceil rceil vert Vert lvert rvert lVert rVert backslash
+vec overrightarrow overleftarrow overline underline widehat widetilde hat tilde bar dot ddot breve check acute grave
+overbrace underbrace overset underset stackrel
+mathbb mathcal mathscr mathfrak mathrm mathbf mathit mathsf mathtt boldsymbol bm
+text textbf textit textrm mbox operatorname displaystyle textstyle scriptstyle
+quad qquad enspace thinspace negthinspace hspace vspace space
+boxed cancel color textcolor colorbox fbox phantom
+begin end hline cline substack
+ell hbar imath jmath Re Im aleph wp prime
+because therefore dagger ddagger S P
+class htmlClass
+""".split())
+
+KNOWN_ENVIRONMENTS: Set[str] = set("""
+matrix pmatrix bmatrix Bmatrix vmatrix Vmatrix smallmatrix array cases dcases rcases
+aligned align align* gathered gather gather* equation equation* split alignedat
+""".split())
+
+# Nombre d'arguments obligatoires des commandes usuelles
+REQUIRED_ARGUMENTS: Dict[str, int] = {
+    'frac': 2, 'dfrac': 2, 'tfrac': 2, 'cfrac': 2, 'binom': 2, 'dbinom': 2, 'tbinom': 2,
+    'sqrt': 1, 'vec': 1, 'overrightarrow': 1, 'overline': 1, 'underline': 1, 'widehat': 1,
+    'hat': 1, 'bar': 1, 'tilde': 1, 'mathbb': 1, 'mathcal': 1, 'mathscr': 1, 'mathrm': 1,
+    'mathbf': 1, 'text': 1, 'textbf': 1, 'operatorname': 1, 'boxed': 1,
+    'overset': 2, 'underset': 2, 'xrightarrow': 1,
+}
+
+# Texte à trou "___réponse___" (cf. utils/lessonContentParser.tsx), converti en groupe
+_BLANK = re.compile(r'___(.+?)___')
+
+# Cas de non-régression vérifiés par --self-test: (chaîne, codes attendus)
+SELF_TEST_CASES: List[Tuple[str, List[str]]] = [
+    ('$a$$b$', []),
+    ('$$\\dfrac{1}{2}$$', []),
+    ('$\\frac{1}{2$', ['UNCLOSED_BRACE']),
+    # 2bse_nombres_complexes, exercice 4: "$$...$" fermée par un seul "$"
+    ('Essayons $\\delta = 2 + 3i$ :\n$$(2 + 3i)^2 = 4 + 12i + 9i^2 = 4 + 12i - 9 = -5 + 12i$\n\n'
+     'Essayons $\\delta = -2 + 3i$ :\n$$(-2 + 3i)^2 = 4 - 12i + 9i^2 = -5 - 12i$$',
+     ['MISMATCHED_DELIMITER']),
+]
+
+
+class Token(NamedTuple):
+    kind: str  # text, open, close, command, symbol, lbrace, rbrace, script, chars
+    value: str
+    offset: int
+
+
+@dataclass
+class LintIssue:
+    """Un problème LaTeX dans une chaîne d'un fichier."""
+    code: str
+    message: str
+    file: str = ""
+    path: str = ""
+    offset: int = 0
+    line: Optional[int] = None
+
+
+_TEXT_DELIMITER = re.compile(r'\\\$|\$\$|\$|\\\(|\\\[')
+_MATH_BODY = r'\\[A-Za-z]+\*?|\\[\s\S]?|[{}]|[\^_]|[^\\{}\^_$]+'
+_CLOSERS = {'$': '$', '$$': '$$', '\\(': '\\)', '\\[': '\\]'}
+# "$$" n'est un jeton que dans une formule ouverte par "$$": "$a$$b$" = deux formules
+_MATH_TOKEN = {
+    opener: re.compile((r'\$\$|' if opener == '$$' else '') + _MATH_BODY + r'|\$')
+    for opener in _CLOSERS
+}
+
+
+def tokenize(text: str) -> Iterator[Token]:
+    """Découpe une chaîne en jetons texte / délimiteurs / jetons mathématiques."""
+    pos, length = 0, len(text)
+    while pos < length:
+        match = _TEXT_DELIMITER.search(text, pos)
+        if not match:
+            yield Token('text', text[pos:], pos)
+            return
+        if match.start() > pos:
+            yield Token('text', text[pos:match.start()], pos)
+        opener = match.group()
+        if opener == '\\$':
+            yield Token('text', opener, match.start())
+            pos = match.end()
+            continue
+
+        yield Token('open', opener, match.start())
+        closer = _CLOSERS[opener]
+        pos = match.end()
+        closed = False
+        for m in _MATH_TOKEN[opener].finditer(text, pos):
+            value = m.group()
+            # Un "$" seul dans "$$...": fermeture dépareillée, signalée par lint()
+            if value == closer or (opener == '$$' and value == '$'):
+                yield Token('close', value, m.start())
+                pos = m.end()
+                closed = True
+                break
+            if value.startswith('\\'):
+                kind = 'command' if len(value) > 1 and value[1].isalpha() else 'symbol'
+            elif value == '{':
+                kind = 'lbrace'
+            elif value == '}':
+                kind = 'rbrace'
+            elif value in ('^', '_'):
+                kind = 'script'
+            else:
+                kind = 'chars'
+            yield Token(kind, value, m.start())
+        if not closed:
+            return
+
+
+class LatexLinter:
+    """Vérifie les formules d'une chaîne à partir des jetons de tokenize()."""
+
+    def __init__(self, extra_macros: Iterable[str] = ()):
+        self.known_macros = KNOWN_MACROS | set(extra_macros)
+
+    def lint(self, text: str) -> List[Tuple[str, str, int]]:
+        """Renvoie la liste des problèmes (code, message, position) d'une chaîne."""
+        issues: List[Tuple[str, str, int]] = []
+        if '___' in text:
+            # Remplacement de même longueur pour conserver les positions
+            text = _BLANK.sub(lambda m: '{  ' + m.group(1) + '  }', text)
+        tokens = list(tokenize(text))
+        index, count = 0, len(tokens)
+        while index < count:
+            token = tokens[index]
+            if token.kind != 'open':
+                index += 1
+                continue
+            end = index + 1
+            while end < count and tokens[end].kind not in ('close', 'open'):
+                end += 1
+            if end >= count or tokens[end].kind != 'close':
+                issues.append(('UNCLOSED_MATH', f'Formule ouverte par "{token.value}" jamais fermée', token.offset))
+            elif tokens[end].value != _CLOSERS[token.value]:
+                issues.append(('MISMATCHED_DELIMITER', f'Formule ouverte par "{token.value}" fermée par "{tokens[end].value}"', tokens[end].offset))
+            self._lint_math(tokens[index + 1:end], token, issues)
+            index = end + 1
+        return issues
+
+    def _lint_math(self, tokens: List[Token], opener: Token, issues: List[Tuple[str, str, int]]):
+        braces: List[Token] = []
+        lefts: List[Token] = []
+        environments: List[Tuple[str, int]] = []
+
+        def significant(i: int) -> Optional[Token]:
+            while i < len(tokens):
+                if tokens[i].kind != 'chars' or tokens[i].value.strip():
+                    return tokens[i]
+                i += 1
+            return None
+
+        for i, token in enumerate(tokens):
+            kind, value = token.kind, token.value
+            if kind == 'lbrace':
+                braces.append(token)
+            elif kind == 'rbrace':
+                if braces:
+                    braces.pop()
+                else:
+                    issues.append(('STRAY_BRACE', 'Accolade fermante "}" sans ouverture', token.offset))
+            elif kind == 'script':
+                nxt = significant(i + 1)
+                if nxt is None or nxt.kind in ('rbrace', 'script'):
+                    issues.append(('MISSING_SCRIPT_ARGUMENT', f'"{value}" sans argument', token.offset))
+            elif kind == 'command':
+                name = value[1:].rstrip('*')
+                if name not in self.known_macros:
+                    issues.append(('UNKNOWN_MACRO', f'Macro inconnue de KaTeX: \\{name}', token.offset))
+                if name == 'left':
+                    lefts.append(token)
+                elif name == 'right':
+                    if lefts:
+                        lefts.pop()
+                    else:
+                        issues.append(('UNMATCHED_RIGHT', '\\right sans \\left correspondant', token.offset))
+                elif name in ('begin', 'end'):
+                    env = self._environment_name(tokens, i)
+                    if env is None:
+                        issues.append(('MISSING_ENVIRONMENT', f'\\{name} sans nom d\'environnement', token.offset))
+                    elif name == 'begin':
+                        if env not in KNOWN_ENVIRONMENTS:
+                            issues.append(('UNKNOWN_ENVIRONMENT', f'Environnement inconnu de KaTeX: {env}', token.offset))
+                        environments.append((env, token.offset))
+                    elif not environments or environments[-1][0] != env:
+                        expected = environments[-1][0] if environments else None
+                        issues.append(('UNMATCHED_END', f'\\end{{{env}}} ne ferme pas ' + (f'\\begin{{{expected}}}' if expected else 'un environnement ouvert'), token.offset))
+                    else:
+                        environments.pop()
+                elif name in REQUIRED_ARGUMENTS:
+                    nxt = significant(i + 1)
+                    if nxt is None or nxt.kind in ('rbrace', 'script', 'close'):
+                        issues.append(('MISSING_ARGUMENT', f'\\{name} attend {REQUIRED_ARGUMENTS[name]} argument(s)', token.offset))
+
+        for token in braces:
+            issues.append(('UNCLOSED_BRACE', 'Accolade "{" jamais fermée dans la formule', token.offset))
+        for token in lefts:
+            issues.append(('UNMATCHED_LEFT', '\\left sans \\right correspondant', token.offset))
+        for env, offset in environments:
+            issues.append(('UNCLOSED_ENVIRONMENT', f'\\begin{{{env}}} sans \\end{{{env}}}', offset))
+
+    @staticmethod
+    def _environment_name(tokens: List[Token], i: int) -> Optional[str]:
+        """Lit le nom d'environnement qui suit \\begin ou \\end: {nom}."""
+        if i + 1 < len(tokens) and tokens[i + 1].kind == 'lbrace':
+            name = ''
+            for token in tokens[i + 2:]:
+                if token.kind == 'rbrace':
+                    return name.strip()
+                name += token.value
+        return None
+
+
+class LintCache:
+    """Cache des résultats par hash de chaîne, persisté entre deux exécutions.
+    Il est ignoré si les règles ou les macros autorisées (--allow) ont changé."""
+
+    def __init__(self, path: Optional[Path], known_macros: Iterable[str] = ()):
+        self.path = path
+        self.macros = hashlib.blake2b('\n'.join(sorted(known_macros)).encode('utf-8'),
+                                      digest_size=12).hexdigest()
+        self.entries: Dict[str, list] = {}
+        self.used: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        if path and path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('rules') == RULES_VERSION and data.get('macros') == self.macros:
+                    self.entries = data.get('entries', {})
+            except (OSError, json.JSONDecodeError):
+                self.entries = {}
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=12).hexdigest()
+
+    def lint(self, linter: LatexLinter, text: str) -> List[Tuple[str, str, int]]:
+        key = self.key(text)
+        self.used.add(key)
+        if key in self.entries:
+            self.hits += 1
+            return [tuple(issue) for issue in self.entries[key]]
+        self.misses += 1
+        issues = linter.lint(text)
+        self.entries[key] = [list(issue) for issue in issues]
+        return issues
+
+    def save(self):
+        """Sauvegarde le cache en ne gardant que les chaînes vues lors de cette analyse."""
+        if not self.path:
+            return
+        entries = {key: self.entries[key] for key in sorted(self.used)}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'rules': RULES_VERSION, 'macros': self.macros, 'entries': entries}, f,
+                      separators=(',', ':'))
+
+
+def lint_file(file_path: Path, public_dir: Path, linter: LatexLinter, cache: LintCache) -> List[LintIssue]:
+    """Analyse toutes les chaînes d'un fichier JSON."""
+    rel = file_path.relative_to(public_dir).as_posix()
+    text = file_path.read_text(encoding='utf-8')
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        return [LintIssue('JSON_SYNTAX', e.msg, rel, '', 0, e.lineno)]
+
+    issues: List[LintIssue] = []
+    for path, value in iter_strings(data):
+        if '$' not in value and '\\' not in value:
+            continue
+        for code, message, offset in cache.lint(linter, value):
+            issues.append(LintIssue(code, message, rel, path, offset))
+
+    if issues:
+        line_index = build_line_index(text)
+        for issue in issues:
+            if issue.line is None:
+                issue.line = line_for_path(line_index, issue.path)
+    return issues
+
+
+def lint_corpus(public_dir: Path = PUBLIC_DIR, cache_path: Optional[Path] = CACHE_PATH,
+                extra_macros: Iterable[str] = ()) -> Dict[str, object]:
+    """Analyse tout le contenu en flux, fichier par fichier."""
+    start = time.perf_counter()
+    linter = LatexLinter(extra_macros)
+    cache = LintCache(cache_path, linter.known_macros)
+    issues: List[LintIssue] = []
+    files = collect_files(public_dir)
+    for file_path in files:
+        issues.extend(lint_file(file_path, public_dir, linter, cache))
+    cache.save()
+    return {
+        'files': len(files),
+        'issues': issues,
+        'cache_hits': cache.hits,
+        'cache_misses': cache.misses,
+        'duration': time.perf_counter() - start,
+    }
+
+
+def self_test() -> List[str]:
+    """Rejoue SELF_TEST_CASES et renvoie la description des cas en échec."""
+    linter = LatexLinter()
+    failures = []
+    for text, expected in SELF_TEST_CASES:
+        codes = [code for code, _, _ in linter.lint(text)]
+        if codes != expected:
+            failures.append(f"{text[:60]!r}: attendu {expected}, obtenu {codes}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse LaTeX des chaînes du contenu pédagogique")
+    parser.add_argument('--public', type=Path, default=PUBLIC_DIR, help="Dossier public/ à analyser")
+    parser.add_argument('--no-cache', action='store_true', help="Ignorer et ne pas écrire le cache")
+    parser.add_argument('--allow', action='append', default=[], help="Macro supplémentaire autorisée (sans \\)")
+    parser.add_argument('--json', action='store_true', help="Sortie au format JSON")
+    parser.add_argument('--self-test', action='store_true', help="Vérifier les cas de non-régression du linter")
+    args = parser.parse_args()
+
+    if args.self_test:
+        failures = self_test()
+        for failure in failures:
+            print(f"❌ {failure}")
+        print(f"{'❌' if failures else '✅'} {len(SELF_TEST_CASES) - len(failures)}/{len(SELF_TEST_CASES)} cas de non-régression")
+        return 1 if failures else 0
+
+    report = lint_corpus(args.public, None if args.no_cache else CACHE_PATH, args.allow)
+    issues: List[LintIssue] = report['issues']
+
+    if args.json:
+        json.dump([issue.__dict__ for issue in issues], sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print("=" * 70)
+        print("ANALYSE LATEX DU CONTENU")
+        print("=" * 70)
+        for issue in issues:
+            location = f"{issue.file}:{issue.line}" if issue.line else issue.file
+            print(f"❌ [{issue.code}] {location}")
+            print(f"   🔍 Chemin: {issue.path} (position {issue.offset})")
+            print(f"   💬 {issue.message}")
+        print("=" * 70)
+        print(f"📄 {report['files']} fichiers analysés en {report['duration'] * 1000:.0f} ms")
+        print(f"♻️  Cache: {report['cache_hits']} chaîne(s) reprise(s), {report['cache_misses']} analysée(s)")
+        print(f"❌ {len(issues)} problème(s) LaTeX")
+
+    return 1 if issues else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Test de charge: une classe entière ouvre l'application en même temps.
+
+Chaque élève simulé rejoue les requêtes de l'application (AppContext.tsx,
+LessonView.tsx, ConcoursView.tsx):
+1. /manifests/index.json et /katex/index.json, puis le fragment du manifest de
+   sa classe (/manifests/<classe>.json, ou /manifest.json sans fragments), puis
+   tous les chapitres de sa classe avec leurs formules pré-rendues si l'index
+   les liste (/katex/...), six requêtes à la fois comme un navigateur
+2. Pour les chapitres actifs: la leçon et les images des chapitres et leçons
+3. /concours/index.json
+
+Le contenu de public/ est servi par un serveur HTTP local lancé dans un autre
+processus, sous plusieurs formes à comparer:
+- raw: les fichiers tels quels
+- min: JSON sans espaces
+- bundle: un seul fichier par classe (manifest de la classe + chapitres),
+  à la place du manifest (index et fragment) et des chapitres
+Avec --gzip, les réponses JSON sont compressées (Content-Encoding: gzip).
+--url permet de viser un serveur déjà démarré (ex: preview_server.py, forme raw).
+
+Les réponses en erreur (404 d'un fichier absent, connexion perdue) sont
+comptées à part avec leurs URL: elles n'entrent ni dans les latences, ni dans
+les octets, ni dans le temps d'affichage, pour comparer les formes à contenu égal.
+
+Utilisation:
+    python load_test.py [--students 40] [--variants raw,min,bundle] [--gzip]
+    python load_test.py --url http://127.0.0.1:8000 --students 40 --json
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import multiprocessing
+import random
+import statistics
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+from validate_content import iter_strings
+
+# Configuration
+PUBLIC_DIR = Path(__file__).parent / "public"
+VARIANTS = ('raw', 'min', 'bundle')
+BROWSER_CONNECTIONS = 6       # Connexions simultanées par élève (par hôte, comme un navigateur)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.svg', '.webp', '.gif')
+RAMP_SECONDS = 2.0            # Les élèves arrivent sur cette durée
+EXCLUDED_DIRS = ('backups',)
+OK_STATUSES = (200, 206, 304)
+
+
+def _url(path: Path, public_dir: Path) -> str:
+    return '/' + path.relative_to(public_dir).as_posix()
+
+
+def build_site(public_dir: Path = PUBLIC_DIR, variant: str = 'raw') -> Dict[str, bytes]:
+    """URL -> contenu servi pour une forme du site."""
+    site: Dict[str, bytes] = {}
+    for path in sorted(public_dir.rglob("*")):
+        rel = path.relative_to(public_dir)
+        if not path.is_file() or rel.parts[0] in EXCLUDED_DIRS or path.name.endswith('.tmp.json'):
+            continue
+        content = path.read_bytes()
+        if variant != 'raw' and path.suffix == '.json':
+            try:
+                data = json.loads(content.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                pass
+            else:
+                content = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        site[_url(path, public_dir)] = content
+
+    if variant == 'bundle':
+        manifest = json.loads(site['/manifest.json'])
+        for class_id, entries in manifest.items():
+            chapters = {}
+            for entry in entries:
+                content = site.get(f"/chapters/{entry['file']}")
+                if content is not None:
+                    chapters[entry['file']] = json.loads(content)
+            site[f"/bundles/{class_id}.json"] = json.dumps(
+                {'manifest': entries, 'chapters': chapters}, ensure_ascii=False, separators=(',', ':')
+            ).encode('utf-8')
+    return site
+
+
+def image_urls(data: Any) -> List[str]:
+    """Images référencées dans un chapitre ou une leçon."""
+    urls = []
+    for _, value in iter_strings(data):
+        if value.lower().endswith(IMAGE_EXTENSIONS) and ' ' not in value:
+            urls.append(value if value.startswith('/') else '/' + value)
+    return list(dict.fromkeys(urls))
+
+
+def student_plan(site: Dict[str, bytes], class_id: str, variant: str) -> List[List[Tuple[str, str]]]:
+    """Étapes (requêtes en parallèle dans une étape) d'un élève: [(catégorie, url), ...].
+    Les chapitres sont affichés à la fin de la troisième étape."""
+    # Comme AppContext.tsx: index des fragments, puis le seul fragment de la classe
+    shard_index = json.loads(site['/manifests/index.json']) if '/manifests/index.json' in site else None
+    shard = (shard_index or {}).get(class_id)
+    if shard_index is not None and shard and f"/manifests/{shard['file']}" in site:
+        entries = json.loads(site[f"/manifests/{shard['file']}"])
+        manifest = [('manifest', f"/manifests/{shard['file']}?v={shard['hash']}")]
+    else:
+        entries = json.loads(site['/manifest.json']).get(class_id, [])
+        manifest = []
+    # Comme utils/katexPrerender.ts: seuls les fichiers listés dans l'index sont demandés
+    katex_index = json.loads(site.get('/katex/index.json', b'{}'))
+    if variant == 'bundle':
+        first, manifest = [('bundle', f"/bundles/{class_id}.json"), ('katex', '/katex/index.json')], []
+    elif shard_index is not None:
+        first = [('manifest', '/manifests/index.json'), ('katex', '/katex/index.json')]
+    else:
+        # Déploiement sans fragments: manifest complet
+        first = [('manifest', '/manifest.json'), ('katex', '/katex/index.json')]
+    chapters = [] if variant == 'bundle' else [('chapter', f"/chapters/{entry['file']}") for entry in entries]
+    chapters += [('katex', f"/katex/chapters/{entry['file']}") for entry in entries
+                 if f"chapters/{entry['file']}" in katex_index]
+
+    details: List[Tuple[str, str]] = []
+    for entry in entries:
+        if not entry.get('isActive'):
+            continue
+        content = site.get(f"/chapters/{entry['file']}")
+        if content is None:
+            continue
+        chapter = json.loads(content)
+        details += [('picture', url) for url in image_urls(chapter)]
+        lesson_file = chapter.get('lessonFile')
+        if lesson_file:
+            lesson_url = f"/chapters/{class_id}/{lesson_file}"
+            details.append(('lesson', lesson_url))
+            if lesson_url.lstrip('/') in katex_index:
+                details.append(('katex', f"/katex{lesson_url}"))
+            if lesson_url in site:
+                details += [('picture', url) for url in image_urls(json.loads(site[lesson_url]))]
+    return [first, manifest, chapters, details, [('concours', '/concours/index.json')]]
+
+
+def make_handler(site: Dict[str, bytes], compress: bool):
+    compressed = {url: gzip.compress(content, 6) for url, content in site.items()
+                  if compress and url.endswith('.json')}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True  # En-têtes et corps sont écrits séparément
+
+        def do_GET(self):
+            url = unquote(urlsplit(self.path).path)
+            content = site.get(url)
+            if content is None:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(200)
+            if url in compressed and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                content = compressed[url]
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Type', 'application/json' if url.endswith('.json') else 'application/octet-stream')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def _serve(public_dir: Path, variant: str, compress: bool, port_queue) -> None:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(build_site(public_dir, variant), compress))
+    server.daemon_threads = True
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+async def fetch(pool: asyncio.Queue, host: str, port: int, url: str, gzip_ok: bool) -> Tuple[int, int, float]:
+    """GET sur une connexion keep-alive du pool de l'élève: (statut, octets reçus, secondes)."""
+    connection = await pool.get()
+    started = time.perf_counter()
+    try:
+        if connection is None:
+            connection = await asyncio.open_connection(host, port)
+        reader, writer = connection
+        accept = "Accept-Encoding: gzip\r\n" if gzip_ok else ""
+        # URL versionnée (?v=hash) conservée telle quelle, sinon paramètre anti-cache
+        path, _, query = url.partition('?')
+        target = f"{quote(path)}?{query or f't={int(time.time() * 1000)}'}"
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n{accept}\r\n".encode('latin-1'))
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        length, received = 0, 0
+        while (line := await reader.readline()) not in (b'\r\n', b''):
+            received += len(line)
+            if line.lower().startswith(b'content-length:'):
+                length = int(line.split(b':')[1])
+        await reader.readexactly(length)
+        return status, received + length, time.perf_counter() - started
+    except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+        connection = None
+        return 0, 0, time.perf_counter() - started
+    finally:
+        pool.put_nowait(connection)
+
+
+async def timed_fetch(pool: asyncio.Queue, host: str, port: int, url: str, gzip_ok: bool) -> Tuple[int, int, float, float]:
+    """fetch() suivi de l'instant où la réponse est complète."""
+    result = await fetch(pool, host, port, url, gzip_ok)
+    return (*result, time.perf_counter())
+
+
+async def simulate_student(site: Dict[str, bytes], class_id: str, variant: str, host: str, port: int,
+                           gzip_ok: bool, delay: float, records: List[Tuple[str, str, int, int, float]]) -> float:
+    """Rejoue les requêtes d'un élève; renvoie le temps jusqu'à l'affichage des chapitres
+    (dernière réponse réussie des trois premières étapes)."""
+    await asyncio.sleep(delay)
+    pool: asyncio.Queue = asyncio.Queue()
+    for _ in range(BROWSER_CONNECTIONS):
+        pool.put_nowait(None)
+    started = time.perf_counter()
+    ready = 0.0
+    for step, requests in enumerate(student_plan(site, class_id, variant)):
+        results = await asyncio.gather(*(timed_fetch(pool, host, port, url, gzip_ok) for _, url in requests))
+        for (category, url), (status, size, seconds, finished) in zip(requests, results):
+            records.append((category, url, status, size, seconds))
+            if step <= 2 and status in OK_STATUSES:
+                ready = max(ready, finished - started)
+    while not pool.empty():
+        connection = pool.get_nowait()
+        if connection:
+            connection[1].close()
+    return ready
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {'p50': None, 'p90': None, 'p99': None}
+    if len(values) == 1:
+        return {key: round(values[0] * 1000, 1) for key in ('p50', 'p90', 'p99')}
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return {'p50': round(cuts[49] * 1000, 1), 'p90': round(cuts[89] * 1000, 1), 'p99': round(cuts[98] * 1000, 1)}
+
+
+async def run_classroom(site: Dict[str, bytes], variant: str, host: str, port: int, students: int,
+                        classes: List[str], gzip_ok: bool, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    records: List[Tuple[str, str, int, int, float]] = []
+    started = time.perf_counter()
+    ready = await asyncio.gather(*(
+        simulate_student(site, classes[i % len(classes)], variant, host, port, gzip_ok,
+                         rng.uniform(0, RAMP_SECONDS), records)
+        for i in range(students)
+    ))
+    elapsed = time.perf_counter() - started
+
+    statuses: Dict[str, int] = {}
+    for record in records:
+        statuses[str(record[2])] = statuses.get(str(record[2]), 0) + 1
+    served = [record for record in records if record[2] in OK_STATUSES]
+    failed: Dict[str, Dict[str, Any]] = {}
+    for category, url, status, _, _ in records:
+        if status not in OK_STATUSES:
+            entry = failed.setdefault(url, {'category': category, 'status': status, 'requests': 0})
+            entry['requests'] += 1
+
+    by_category: Dict[str, Dict[str, Any]] = {}
+    for category in dict.fromkeys(record[0] for record in served):
+        rows = [record for record in served if record[0] == category]
+        by_category[category] = {
+            'requests': len(rows),
+            'bytes': sum(row[3] for row in rows),
+            **percentiles([row[4] for row in rows]),
+        }
+    return {
+        'variant': variant + ('+gzip' if gzip_ok else ''),
+        'students': students,
+        'seconds': round(elapsed, 2),
+        'requests': len(served),
+        'bytes': sum(record[3] for record in served),
+        'statuses': statuses,
+        'latency_ms': percentiles([record[4] for record in served]),
+        'ready_ms': percentiles(ready),
+        'by_category': by_category,
+        'failed': failed,
+    }
+
+
+def start_server(public_dir: Path, variant: str, compress: bool) -> Tuple[multiprocessing.Process, int]:
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(public_dir, variant, compress, port_queue), daemon=True)
+    process.start()
+    return process, port_queue.get(timeout=60)
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print("=" * 104)
+    print(f"{'Forme':<14} {'Requêtes':>9} {'Octets':>12} {'vs 1re':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+          f"{'Prêt p50':>9} {'Prêt p90':>9} {'Durée s':>8}")
+    print("=" * 104)
+    baseline = results[0]['bytes'] if results else 0
+    for result in results:
+        latency, ready = result['latency_ms'], result['ready_ms']
+        ratio = f"{result['bytes'] / baseline:.0%}" if baseline else "—"
+        print(f"{result['variant']:<14} {result['requests']:>9} {result['bytes']:>12,} {ratio:>7} "
+              f"{latency['p50']:>8} {latency['p90']:>8} {latency['p99']:>8} "
+              f"{ready['p50']:>9} {ready['p90']:>9} {result['seconds']:>8}")
+    for result in results:
+        print(f"\n📊 {result['variant']} — codes: "
+              f"{', '.join(f'{code}×{count}' for code, count in sorted(result['statuses'].items()))}")
+        for category, row in result['by_category'].items():
+            print(f"   {category:<10} {row['requests']:>6} requête(s) {row['bytes'] / 1024:>10.1f} KB  "
+                  f"p50 {row['p50']} ms  p90 {row['p90']} ms  p99 {row['p99']} ms")
+        if result['failed']:
+            print(f"   ⚠️  {len(result['failed'])} URL en erreur, hors latences et octets:")
+            for url, entry in sorted(result['failed'].items()):
+                print(f"      {entry['status']} ×{entry['requests']:<4} {url} ({entry['category']})")
+    print("=" * 104)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge: une classe ouvre l'application en même temps")
+    parser.add_argument('--public', type=Path, default=PUBLIC_DIR, help="Dossier public")
+    parser.add_argument('--students', type=int, default=40, help="Nombre d'élèves simultanés (défaut: 40)")
+    parser.add_argument('--class', dest='class_id', help="Classe des élèves (défaut: toutes, à tour de rôle)")
+    parser.add_argument('--variants', default=','.join(VARIANTS), help=f"Formes à comparer parmi {', '.join(VARIANTS)}")
+    parser.add_argument('--gzip', action='store_true', help="Compresser les réponses JSON")
+    parser.add_argument('--url', help="Viser un serveur déjà démarré (forme raw) au lieu du serveur intégré")
+    parser.add_argument('--json', action='store_true', help="Sortie au format JSON")
+    args = parser.parse_args()
+
+    variants = [variant.strip() for variant in args.variants.split(',') if variant.strip()]
+    unknown = [variant for variant in variants if variant not in VARIANTS]
+    if unknown:
+        print(f"❌ Forme(s) inconnue(s): {', '.join(unknown)}", file=sys.stderr)
+        return 1
+    if args.url:
+        variants = ['raw']
+
+    manifest = json.loads((args.public / "manifest.json").read_text(encoding='utf-8'))
+    classes = [args.class_id] if args.class_id else list(manifest)
+    results = []
+    for variant in variants:
+        site = build_site(args.public, variant)
+        if args.url:
+            target = urlsplit(args.url)
+            host, port, process = target.hostname, target.port or 80, None
+        else:
+            process, port = start_server(args.public, variant, args.gzip)
+            host = '127.0.0.1'
+        try:
+            results.append(asyncio.run(run_classroom(site, variant, host, port, args.students, classes, args.gzip)))
+        finally:
+            if process:
+                process.terminate()
+                process.join()
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print_results(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
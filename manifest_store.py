@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Lecture et écriture concurrentes sûres de manifest.json.
+
+Plusieurs sessions de l'application d'administration et des scripts
+(optimize_structure.py...) peuvent réécrire le manifest en même temps.
+1. Toute écriture se fait sous un verrou consultatif (flock/msvcrt), pris sur
+   un petit fichier de verrou hors de public/ pour ne pas être publié
+2. Concurrence optimiste: le hash du manifest lu est mémorisé; si le fichier
+   a changé depuis, nos modifications sont fusionnées entrée par entrée avec
+   la version sur disque (fusion à trois: base lue, notre version, disque)
+3. La mise à jour d'une seule entrée (activation, nouvelle version) relit le
+   manifest sous verrou et ne modifie que cette entrée: pas de fusion nécessaire
+4. Chaque écriture met aussi à jour les fragments par classe
+   public/manifests/<classe>.json et leur index public/manifests/index.json
+   ({classe: {file, hash}}): l'application ne télécharge que la liste de sa
+   classe, et seul le fragment de la classe modifiée est réécrit
+
+Utilisation:
+    store = ManifestStore(MANIFEST_PATH)
+    data = store.read()
+    store.update_entry('suites', {'isActive': True})
+    merged, conflicts = store.save(data)
+
+    python manifest_store.py shards    # Régénérer les fragments après une édition à la main
+"""
+
+import copy
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configuration
+MANIFEST_PATH = Path(__file__).parent / "public" / "manifest.json"
+LOCK_TIMEOUT = 10.0
+LOCK_RETRY_DELAY = 0.02
+SHARDS_DIRNAME = "manifests"
+SHARD_INDEX_NAME = "index.json"
+
+if sys.platform == 'win32':
+    import msvcrt
+
+    def _try_lock(f) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def _unlock(f) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _try_lock(f) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock(f) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class ManifestLockError(TimeoutError):
+    """Le verrou du manifest n'a pas pu être obtenu à temps."""
+
+
+def lock_path_for(path: Path) -> Path:
+    """Fichier de verrou propre à un manifest, dans le dossier temporaire du système."""
+    key = hashlib.sha1(str(Path(path).resolve()).encode('utf-8')).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"manifest-{key}.lock"
+
+
+@contextmanager
+def manifest_lock(path: Path, timeout: float = LOCK_TIMEOUT):
+    """Verrou exclusif entre processus sur un manifest."""
+    with open(lock_path_for(path), 'a+b') as f:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                _try_lock(f)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise ManifestLockError(f"Manifest verrouillé par un autre processus: {path}")
+                time.sleep(LOCK_RETRY_DELAY)
+        try:
+            yield
+        finally:
+            _unlock(f)
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    temp_path = path.with_suffix('.tmp.json')
+    with open(temp_path, 'wb') as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+
+def write_shards(data: Dict[str, List[Dict]], manifest_path: Path = MANIFEST_PATH) -> List[str]:
+    """Écrit les fragments par classe dont le contenu a changé, puis l'index.
+    Retourne les classes réécrites."""
+    shards_dir = Path(manifest_path).parent / SHARDS_DIRNAME
+    shards_dir.mkdir(exist_ok=True)
+    index_path = shards_dir / SHARD_INDEX_NAME
+    try:
+        index = json.loads(index_path.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        index = {}
+
+    new_index: Dict[str, Dict[str, str]] = {}
+    written = []
+    for class_id, entries in data.items():
+        content = json.dumps(entries, indent=2, ensure_ascii=False).encode('utf-8')
+        shard = {'file': f"{class_id}.json", 'hash': hashlib.sha256(content).hexdigest()[:12]}
+        new_index[class_id] = shard
+        # Fragments des autres classes inchangés: ni réécrits, ni invalidés dans le cache
+        if index.get(class_id) != shard or not (shards_dir / shard['file']).exists():
+            _write_atomic(shards_dir / shard['file'], content)
+            written.append(class_id)
+
+    for class_id, shard in index.items():
+        if class_id not in new_index and isinstance(shard, dict) and shard.get('file'):
+            (shards_dir / shard['file']).unlink(missing_ok=True)
+    if new_index != index:
+        _write_atomic(index_path, json.dumps(new_index, indent=2, ensure_ascii=False).encode('utf-8'))
+    return written
+
+
+def _entries_by_id(entries: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {entry.get('id'): entry for entry in entries}
+
+
+def merge_manifests(base: Dict[str, List[Dict]], ours: Dict[str, List[Dict]],
+                    theirs: Dict[str, List[Dict]]) -> Tuple[Dict[str, List[Dict]], List[str]]:
+    """Fusion à trois par entrée (clé: classe + id).
+
+    Nos champs modifiés depuis `base` sont appliqués à la version sur disque
+    (`theirs`); les entrées ajoutées ou supprimées de part et d'autre sont
+    conservées ou retirées. Si les deux côtés ont changé le même champ
+    différemment, notre valeur l'emporte et le conflit est signalé.
+    """
+    merged: Dict[str, List[Dict]] = {}
+    conflicts: List[str] = []
+
+    for class_id in list(theirs) + [c for c in ours if c not in theirs]:
+        base_entries = _entries_by_id(base.get(class_id, []))
+        our_list = ours.get(class_id, [])
+        our_entries = _entries_by_id(our_list)
+        result = [copy.deepcopy(entry) for entry in theirs.get(class_id, [])]
+        result_by_id = _entries_by_id(result)
+
+        # Entrées supprimées de notre côté
+        for entry_id in base_entries:
+            if entry_id not in our_entries and entry_id in result_by_id:
+                result.remove(result_by_id.pop(entry_id))
+
+        for position, (entry_id, entry) in enumerate(our_entries.items()):
+            base_entry = base_entries.get(entry_id)
+            if base_entry is None:
+                # Ajoutée de notre côté
+                if entry_id not in result_by_id:
+                    result_by_id[entry_id] = copy.deepcopy(entry)
+                    result.insert(min(position, len(result)), result_by_id[entry_id])
+                continue
+
+            changes = {k: v for k, v in entry.items() if base_entry.get(k) != v}
+            removed = [k for k in base_entry if k not in entry]
+            if not changes and not removed:
+                continue
+            target = result_by_id.get(entry_id)
+            if target is None:
+                conflicts.append(f"{class_id}/{entry_id}: supprimée sur le disque, modifiée ici (conservée)")
+                result_by_id[entry_id] = copy.deepcopy(entry)
+                result.insert(min(position, len(result)), result_by_id[entry_id])
+                continue
+            for key, value in changes.items():
+                if key in target and target[key] != base_entry.get(key) and target[key] != value:
+                    conflicts.append(f"{class_id}/{entry_id}.{key}: {target[key]!r} remplacé par {value!r}")
+                target[key] = value
+            for key in removed:
+                target.pop(key, None)
+
+        # Réordonnancement de notre côté: appliquer notre ordre aux entrées communes
+        common = [entry_id for entry_id in our_entries if entry_id in base_entries]
+        if common != [entry_id for entry_id in base_entries if entry_id in our_entries]:
+            order = {entry_id: i for i, entry_id in enumerate(our_entries)}
+            slots = [i for i, entry in enumerate(result) if entry.get('id') in order]
+            ordered = sorted((result[i] for i in slots), key=lambda e: order[e.get('id')])
+            for i, entry in zip(slots, ordered):
+                result[i] = entry
+
+        if class_id in ours or class_id in theirs:
+            merged[class_id] = result
+    return merged, conflicts
+
+
+class ManifestStore:
+    """Accès au manifest avec verrou et détection des écritures concurrentes."""
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = Path(path)
+        self.base: Optional[Dict[str, List[Dict]]] = None
+        self.base_hash: Optional[str] = None
+
+    def _read_disk(self) -> Tuple[Dict[str, List[Dict]], str]:
+        raw = self.path.read_bytes()
+        return json.loads(raw.decode('utf-8')), hashlib.sha256(raw).hexdigest()
+
+    def _write(self, data: Dict[str, List[Dict]]) -> str:
+        content = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        _write_atomic(self.path, content)
+        write_shards(data, self.path)
+        return hashlib.sha256(content).hexdigest()
+
+    def read(self) -> Dict[str, List[Dict]]:
+        """Lit le manifest et mémorise son contenu comme base des prochaines fusions."""
+        data, digest = self._read_disk()
+        self.base, self.base_hash = copy.deepcopy(data), digest
+        return data
+
+    def update_entry(self, entry_id: str, changes: Dict[str, Any]) -> bool:
+        """Modifie une seule entrée sur la version actuelle du disque. Retourne False si l'id est absent."""
+        with manifest_lock(self.path):
+            data, _ = self._read_disk()
+            for entries in data.values():
+                for entry in entries:
+                    if entry.get('id') == entry_id:
+                        if any(entry.get(k) != v for k, v in changes.items()):
+                            entry.update(changes)
+                            self._write(data)
+                        return True
+        return False
+
+    def save(self, data: Dict[str, List[Dict]]) -> Tuple[Dict[str, List[Dict]], List[str]]:
+        """Écrit le manifest; fusionne avec le disque s'il a changé depuis read().
+        Retourne (contenu écrit, conflits)."""
+        with manifest_lock(self.path):
+            conflicts: List[str] = []
+            merged = data
+            if self.path.exists():
+                current, digest = self._read_disk()
+                if self.base is not None and digest != self.base_hash:
+                    merged, conflicts = merge_manifests(self.base, data, current)
+            self.base_hash = self._write(merged)
+            self.base = copy.deepcopy(merged)
+        return merged, conflicts
+
+    def unchanged_since_read(self) -> bool:
+        """Le fichier est-il toujours celui lu par read() ? (à appeler sous verrou)"""
+        return self.path.exists() and self._read_disk()[1] == self.base_hash
+
+    def sync_shards(self) -> List[str]:
+        """Régénère les fragments depuis le manifest sur disque (après une édition à la main)."""
+        with manifest_lock(self.path):
+            data, _ = self._read_disk()
+            return write_shards(data, self.path)
+
+
+def main():
+    if sys.argv[1:] != ['shards']:
+        print("Utilisation: python manifest_store.py shards", file=sys.stderr)
+        return 1
+    written = ManifestStore(MANIFEST_PATH).sync_shards()
+    print(f"✓ {len(written)} fragment(s) réécrit(s){': ' + ', '.join(written) if written else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
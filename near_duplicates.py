@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Détection des quasi-doublons entre classes (questions de quiz, énoncés
+d'exercices, éléments de leçons).
+
+Les programmes de 1BSE/1BSM et 2BSE/2BSM se recouvrent (dérivation, suites,
+produit scalaire...) et du contenu y est recopié avec de petites variantes.
+1. Normalisation consciente du LaTeX: accents et casse ignorés dans le texte;
+   dans les formules, espacements (\\, \\quad, \\left...) ignorés et variantes
+   unifiées (\\dfrac = \\frac, \\leq = \\le, ≤ = \\le...)
+2. Chaque élément devient un ensemble de "shingles" (suites de SHINGLE_SIZE jetons)
+3. Signature MinHash de NUM_PERM valeurs, découpée en BANDS bandes (LSH):
+   seuls les éléments partageant une bande sont comparés, sans comparer
+   toutes les paires
+4. Les candidats sont vérifiés par l'indice de Jaccard exact des shingles et
+   regroupés en groupes de quasi-doublons
+
+Utilisation:
+    python near_duplicates.py [--threshold 0.8] [--kind quiz] [--cross-class] [--json]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import time
+import unicodedata
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from lint_latex import tokenize
+from validate_content import iter_strings
+
+# Configuration
+PUBLIC_DIR = Path(__file__).parent / "public"
+CACHE_PATH = Path(__file__).parent / ".near_duplicates_cache.json"
+
+SHINGLE_SIZE = 4
+MIN_TOKENS = 8          # Éléments trop courts ("Vrai", "$x=2$") ignorés
+NUM_PERM = 128
+BANDS = 32              # BANDS * ROWS = NUM_PERM; seuil LSH ≈ (1/BANDS)^(1/ROWS) ≈ 0.42
+ROWS = NUM_PERM // BANDS
+DEFAULT_THRESHOLD = 0.8
+SEED = 1
+# Signatures en cache invalidées dès qu'un de ces paramètres ou la normalisation change
+SIGNATURE_VERSION = f"1-{SHINGLE_SIZE}-{NUM_PERM}-{SEED}"
+
+KINDS = ('quiz', 'exercise', 'lesson')
+
+# Clés de leçon qui ne contiennent pas de texte affiché
+IGNORED_LESSON_KEYS = {'type', 'listType', 'id', 'src', 'path', 'image', 'icon', 'boxType'}
+
+# Commandes sans incidence sur le contenu d'une formule
+IGNORED_COMMANDS = {
+    'left', 'right', 'middle', 'big', 'Big', 'bigg', 'Bigg', 'bigl', 'bigr', 'Bigl', 'Bigr',
+    'biggl', 'biggr', 'Biggl', 'Biggr', 'displaystyle', 'textstyle', 'scriptstyle', 'limits',
+    'quad', 'qquad', 'enspace', 'thinspace', 'negthinspace', 'hspace', 'vspace', 'space',
+    'mathrm', 'text', 'mbox', 'textrm',
+}
+COMMAND_ALIASES = {
+    'dfrac': 'frac', 'tfrac': 'frac', 'cfrac': 'frac', 'dbinom': 'binom', 'tbinom': 'binom',
+    'leq': 'le', 'leqslant': 'le', 'geq': 'ge', 'geqslant': 'ge', 'ne': 'neq',
+    'rightarrow': 'to', 'longrightarrow': 'to', 'Rightarrow': 'implies', 'Longrightarrow': 'implies',
+    'Leftrightarrow': 'iff', 'Longleftrightarrow': 'iff', 'varepsilon': 'epsilon', 'varphi': 'phi',
+    'overrightarrow': 'vec', 'emptyset': 'varnothing', 'lbrace': '{', 'rbrace': '}',
+    'bm': 'mathbf', 'boldsymbol': 'mathbf', 'ldots': 'dots', 'cdots': 'dots',
+}
+# Symboles Unicode écrits hors formule ou dans une formule
+UNICODE_SYMBOLS = {
+    '≤': r'\le', '≥': r'\ge', '≠': r'\neq', '×': r'\times', '·': r'\cdot', '→': r'\to', '⇒': r'\implies',
+    '⇔': r'\iff', '∈': r'\in', '∉': r'\notin', '∞': r'\infty', '√': r'\sqrt', '∀': r'\forall',
+    '∃': r'\exists', '∅': r'\varnothing', '∪': r'\cup', '∩': r'\cap', '⊂': r'\subset',
+    'ℝ': 'R', 'ℕ': 'N', 'ℤ': 'Z', 'ℚ': 'Q', 'ℂ': 'C', 'π': r'\pi', 'α': r'\alpha', 'β': r'\beta',
+}
+
+_WORD = re.compile(r'\w+')
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(SEED)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+
+@dataclass
+class Item:
+    """Un élément comparé: question, exercice ou élément de leçon."""
+    kind: str
+    class_id: str
+    file: str
+    path: str
+    excerpt: str
+    key: str = ""
+    shingles: Set[int] = field(repr=False, default_factory=set)
+    signature: Tuple[int, ...] = field(repr=False, default=())
+
+    @property
+    def location(self) -> str:
+        return f"{self.file} {self.path}"
+
+
+# --- Normalisation -----------------------------------------------------------
+
+def fold_accents(text: str) -> str:
+    """Minuscules, sans accents."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Jetons comparables d'une chaîne: mots du texte et jetons des formules."""
+    for symbol, command in UNICODE_SYMBOLS.items():
+        if symbol in text:
+            text = text.replace(symbol, f' ${command}$ ')
+    tokens: List[str] = []
+    for token in tokenize(text):
+        if token.kind == 'text':
+            tokens.extend(_WORD.findall(fold_accents(token.value)))
+        elif token.kind in ('open', 'close'):
+            continue  # $, $$, \( et \[ sont équivalents
+        elif token.kind == 'command':
+            name = token.value[1:].rstrip('*')
+            if name not in IGNORED_COMMANDS:
+                tokens.append('\\' + COMMAND_ALIASES.get(name, name))
+        elif token.kind == 'symbol':
+            if token.value[1:].strip() and token.value[1:] not in ',;:!':
+                tokens.append(token.value)
+        elif token.kind == 'chars':
+            tokens.extend(c for c in token.value if not c.isspace())
+        else:
+            tokens.append(token.value)
+    return tokens
+
+
+def shingle_set(tokens: List[str]) -> Set[int]:
+    size = min(SHINGLE_SIZE, len(tokens))
+    return {
+        int.from_bytes(hashlib.blake2b('\x1f'.join(tokens[i:i + size]).encode('utf-8'), digest_size=8).digest(), 'big')
+        for i in range(len(tokens) - size + 1)
+    }
+
+
+def minhash(shingles: Set[int]) -> Tuple[int, ...]:
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in shingles) for a, b in _PERMUTATIONS)
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+# --- Extraction --------------------------------------------------------------
+
+def _lesson_strings(element: Any) -> Iterator[str]:
+    for path, value in iter_strings(element):
+        key = re.split(r'[.\[]', path)[-1]
+        if key not in IGNORED_LESSON_KEYS:
+            yield value
+
+
+def iter_file_texts(data: Any, is_lesson: bool) -> Iterator[Tuple[str, str, str]]:
+    """(type, chemin, texte) des éléments comparables d'un chapitre ou d'une leçon."""
+    if not isinstance(data, dict):
+        return
+    if is_lesson:
+        for s, section in enumerate(data.get('sections') or []):
+            for u, subsection in enumerate(section.get('subsections') or [] if isinstance(section, dict) else []):
+                for e, element in enumerate(subsection.get('elements') or [] if isinstance(subsection, dict) else []):
+                    yield 'lesson', f"sections[{s}].subsections[{u}].elements[{e}]", '\n'.join(_lesson_strings(element))
+        return
+    for i, question in enumerate(data.get('quiz') or []):
+        if isinstance(question, dict):
+            options = [o.get('text', '') for o in question.get('options') or [] if isinstance(o, dict)]
+            yield 'quiz', f"quiz[{i}]", '\n'.join([str(question.get('question', ''))] + [str(o) for o in options])
+    for i, exercise in enumerate(data.get('exercises') or []):
+        if isinstance(exercise, dict):
+            parts = [str(exercise.get('statement', ''))]
+            parts.extend(text for path, text in iter_strings(exercise.get('sub_questions') or [])
+                         if path.endswith('.text'))
+            yield 'exercise', f"exercises[{i}]", '\n'.join(parts)
+
+
+def extract_items(file_path: Path, public_dir: Path = PUBLIC_DIR) -> List[Item]:
+    """Éléments d'un fichier, avec leurs shingles et leur signature MinHash."""
+    relative = file_path.relative_to(public_dir / "chapters")
+    try:
+        data = json.loads(file_path.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️  {relative}: ignoré ({e})", file=sys.stderr)
+        return []
+    items = []
+    for kind, path, text in iter_file_texts(data, 'lessons' in relative.parts):
+        tokens = normalize_tokens(text)
+        if len(tokens) < MIN_TOKENS:
+            continue
+        key = hashlib.blake2b('\x1f'.join(tokens).encode('utf-8'), digest_size=12).hexdigest()
+        items.append(Item(kind, relative.parts[0], relative.as_posix(), path,
+                          ' '.join(text.split())[:100], key, shingle_set(tokens)))
+    return items
+
+
+class SignatureCache:
+    """Signatures MinHash par hash des jetons normalisés, persistées entre deux exécutions.
+    Chaque signature garde ses sources (type, fichier): une analyse partielle (--kind)
+    conserve celles des autres types tant que leur fichier existe."""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.entries: Dict[str, List[int]] = {}
+        self.sources: Dict[str, List[List[str]]] = {}
+        self.used: Dict[str, List[List[str]]] = defaultdict(list)
+        self.hits = 0
+        self.misses = 0
+        if path and path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == SIGNATURE_VERSION:
+                    self.entries = data.get('entries', {})
+                    self.sources = data.get('sources', {})
+            except (OSError, json.JSONDecodeError):
+                self.entries, self.sources = {}, {}
+
+    def fill(self, items: List[Item], pool: Optional[ProcessPoolExecutor] = None) -> None:
+        """Renseigne la signature de chaque élément; seules les nouvelles sont calculées."""
+        missing = {}
+        for item in items:
+            if [item.kind, item.file] not in self.used[item.key]:
+                self.used[item.key].append([item.kind, item.file])
+            if item.key in self.entries:
+                self.hits += 1
+            else:
+                self.misses += 1
+                missing.setdefault(item.key, item.shingles)
+        if missing:
+            signatures = (pool.map(minhash, missing.values(), chunksize=max(1, len(missing) // 64))
+                          if pool else map(minhash, missing.values()))
+            self.entries.update(zip(missing, (list(signature) for signature in signatures)))
+        for item in items:
+            item.signature = tuple(self.entries[item.key])
+
+    def save(self, public_dir: Path = PUBLIC_DIR, kinds: Tuple[str, ...] = KINDS):
+        """Sauvegarde le cache: éléments vus lors de cette analyse, et éléments des types
+        non analysés (`kinds`) dont un fichier source existe encore."""
+        if not self.path:
+            return
+        chapters_dir = public_dir / "chapters"
+        kept = {}
+        for key in sorted(set(self.used) | set(self.sources)):
+            sources = list(self.used.get(key, []))
+            sources += [[kind, file] for kind, file in self.sources.get(key, [])
+                        if kind not in kinds and [kind, file] not in sources and (chapters_dir / file).exists()]
+            if sources and key in self.entries:
+                kept[key] = sources
+        entries = {key: self.entries[key] for key in kept}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': SIGNATURE_VERSION, 'entries': entries, 'sources': kept}, f,
+                      separators=(',', ':'))
+
+
+# --- Recherche ---------------------------------------------------------------
+
+def candidate_pairs(items: List[Item]) -> Set[Tuple[int, int]]:
+    """Paires partageant au moins une bande de leur signature (même type d'élément)."""
+    pairs: Set[Tuple[int, int]] = set()
+    for band in range(BANDS):
+        buckets: Dict[Tuple, List[int]] = defaultdict(list)
+        for index, item in enumerate(items):
+            buckets[(item.kind, item.signature[band * ROWS:(band + 1) * ROWS])].append(index)
+        for members in buckets.values():
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    pairs.add((a, b))
+    return pairs
+
+
+def find_clusters(items: List[Item], threshold: float = DEFAULT_THRESHOLD,
+                  cross_class: bool = False) -> List[Dict[str, Any]]:
+    """Groupes d'éléments reliés par une similarité (Jaccard) ≥ threshold."""
+    parent = list(range(len(items)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    edges: List[Tuple[int, int, float]] = []
+    for a, b in candidate_pairs(items):
+        similarity = jaccard(items[a].shingles, items[b].shingles)
+        if similarity >= threshold:
+            edges.append((a, b, similarity))
+            parent[find(a)] = find(b)
+
+    groups: Dict[int, List[Tuple[int, int, float]]] = defaultdict(list)
+    for edge in edges:
+        groups[find(edge[0])].append(edge)
+
+    clusters = []
+    for group_edges in groups.values():
+        members = sorted({i for a, b, _ in group_edges for i in (a, b)},
+                         key=lambda i: (items[i].file, items[i].path))
+        classes = sorted({items[i].class_id for i in members})
+        if cross_class and len(classes) < 2:
+            continue
+        similarities = [s for _, _, s in group_edges]
+        clusters.append({
+            'kind': items[members[0]].kind,
+            'classes': classes,
+            'max_similarity': round(max(similarities), 3),
+            'min_similarity': round(min(similarities), 3),
+            'items': [{'file': items[i].file, 'path': items[i].path, 'excerpt': items[i].excerpt} for i in members],
+            'pairs': [{'a': items[a].location, 'b': items[b].location, 'similarity': round(s, 3)}
+                      for a, b, s in sorted(group_edges, key=lambda e: -e[2])],
+        })
+    clusters.sort(key=lambda c: (-len(c['items']), -c['max_similarity']))
+    return clusters
+
+
+def collect_items(public_dir: Path = PUBLIC_DIR, kinds: Tuple[str, ...] = KINDS,
+                  jobs: Optional[int] = None, cache: Optional[SignatureCache] = None) -> List[Item]:
+    """Éléments de tous les chapitres et leçons, avec leur signature MinHash."""
+    files = sorted(f for f in (public_dir / "chapters").rglob("*.json") if not f.name.endswith('.tmp.json'))
+    cache = cache or SignatureCache(None)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(extract_items, files, [public_dir] * len(files),
+                                    chunksize=max(1, len(files) // (jobs * 4))))
+            items = [item for file_items in results for item in file_items if item.kind in kinds]
+            cache.fill(items, pool)
+    else:
+        items = [item for f in files for item in extract_items(f, public_dir) if item.kind in kinds]
+        cache.fill(items)
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quasi-doublons (quiz, exercices, leçons) entre chapitres et classes")
+    parser.add_argument('--public', type=Path, default=PUBLIC_DIR, help="Dossier public/ à analyser")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Similarité minimale, entre 0 et 1 (défaut: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--kind', choices=KINDS, action='append', help="Limiter à un type d'élément (répétable)")
+    parser.add_argument('--cross-class', action='store_true', help="Seulement les groupes couvrant plusieurs classes")
+    parser.add_argument('--jobs', type=int, default=None, help="Nombre de processus (défaut: nombre de cœurs)")
+    parser.add_argument('--no-cache', action='store_true', help="Ignorer et ne pas écrire le cache des signatures")
+    parser.add_argument('--json', action='store_true', help="Sortie au format JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cache = SignatureCache(None if args.no_cache else CACHE_PATH)
+    kinds = tuple(args.kind or KINDS)
+    items = collect_items(args.public, kinds, args.jobs, cache)
+    cache.save(args.public, kinds)
+    clusters = find_clusters(items, args.threshold, args.cross_class)
+    duration = time.perf_counter() - start
+
+    if args.json:
+        json.dump({'items': len(items), 'threshold': args.threshold, 'clusters': clusters},
+                  sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return 0
+
+    print("=" * 70)
+    print("QUASI-DOUBLONS DU CONTENU")
+    print("=" * 70)
+    for number, cluster in enumerate(clusters, 1):
+        similarity = (f"{cluster['max_similarity']:.0%}" if cluster['min_similarity'] == cluster['max_similarity']
+                      else f"{cluster['min_similarity']:.0%}-{cluster['max_similarity']:.0%}")
+        print(f"\n{number}. [{cluster['kind']}] {len(cluster['items'])} éléments, "
+              f"similarité {similarity} ({', '.join(cluster['classes'])})")
+        for item in cluster['items']:
+            print(f"   • {item['file']} {item['path']}")
+            print(f"     {item['excerpt']}")
+    print("=" * 70)
+    print(f"🔎 {len(items)} éléments comparés en {duration * 1000:.0f} ms")
+    print(f"♻️  Cache: {cache.hits} signature(s) reprise(s), {cache.misses} calculée(s)")
+    print(f"📋 {len(clusters)} groupe(s) de quasi-doublons (seuil {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,11 +7,15 @@ Ce script:
 4. Vérifie la cohérence entre les fichiers JSON et le manifest
 """
 
+import copy
 import json
-import shutil
 from pathlib import Path
 from typing import Dict, List, Set
 
+from file_journal import FileJournal, JOURNAL_PATH
+from manifest_store import ManifestStore, manifest_lock
+from snapshot_store import SnapshotStore
+
 # Configuration
 PUBLIC_DIR = Path(__file__).parent / "public"
 CHAPTERS_DIR = PUBLIC_DIR / "chapters"
@@ -23,6 +27,7 @@ CLASSES = ["tcs", "1bse", "1bsm", "2bse", "2bsm"]
 class ChapterOptimizer:
     def __init__(self):
         self.manifest = None
+        self.manifest_store = ManifestStore(MANIFEST_PATH)
         self.all_ids: Set[str] = set()
         self.duplicates: Dict[str, List[str]] = {}
         self.stats = {
@@ -32,26 +37,19 @@ class ChapterOptimizer:
         }
     
     def create_backup(self):
-        """Crée une sauvegarde complète avant les modifications."""
+        """Crée une sauvegarde (incrémentale) du manifest et des chapitres avant les modifications.
+        Retourne l'identifiant de la sauvegarde dans le magasin snapshot_store."""
         print("\n📦 Création de la sauvegarde...")
-        timestamp = __import__('datetime').datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_path = BACKUP_DIR / timestamp
-        backup_path.mkdir(parents=True, exist_ok=True)
-        
-        # Sauvegarder le manifest
-        shutil.copy2(MANIFEST_PATH, backup_path / "manifest.json")
-        
-        # Sauvegarder le dossier chapters
-        chapters_backup = backup_path / "chapters"
-        shutil.copytree(CHAPTERS_DIR, chapters_backup, dirs_exist_ok=True)
+        snapshot = SnapshotStore(BACKUP_DIR).create(PUBLIC_DIR, label="optimize_structure")
+        stats = snapshot['stats']
         
-        print(f"✓ Sauvegarde créée: {backup_path}")
-        return backup_path
+        print(f"✓ Sauvegarde créée: {snapshot['id']} "
+              f"({stats['files']} fichiers, {stats['new_objects']} nouveau(x))")
+        return snapshot['id']
     
     def load_manifest(self):
         """Charge le manifest."""
-        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
-            self.manifest = json.load(f)
+        self.manifest = self.manifest_store.read()
         print(f"✓ Manifest chargé: {len(self.manifest)} classes")
     
     def detect_duplicate_ids(self):
@@ -112,16 +110,25 @@ class ChapterOptimizer:
             print(f"  ✓ {class_dir}")
     
     def reorganize_files(self):
-        """Réorganise les fichiers dans des sous-dossiers et met à jour le manifest."""
+        """Réorganise les fichiers dans des sous-dossiers et met à jour le manifest.
+        
+        Les déplacements et la réécriture du manifest forment une seule transaction
+        journalisée: en cas d'erreur tout est annulé, en cas d'interruption elle peut
+        être reprise (python file_journal.py resume).
+        """
         print("\n🔄 Réorganisation des fichiers...")
         
+        new_manifest = copy.deepcopy(self.manifest)
+        transaction = FileJournal(JOURNAL_PATH).begin()
+        planned = []
+        
         for class_name in CLASSES:
-            if class_name not in self.manifest:
+            if class_name not in new_manifest:
                 continue
             
             print(f"\n  📂 Classe: {class_name.upper()}")
             
-            for chapter in self.manifest[class_name]:
+            for chapter in new_manifest[class_name]:
                 old_file_path = CHAPTERS_DIR / chapter['file']
                 
                 # Nouveau chemin avec sous-dossier
@@ -131,24 +138,39 @@ class ChapterOptimizer:
                 if '/' not in file_name:
                     new_file_path = CHAPTERS_DIR / class_name / file_name
                     
-                    try:
-                        if old_file_path.exists():
-                            # Déplacer le fichier
-                            shutil.move(str(old_file_path), str(new_file_path))
-                            
-                            # Mettre à jour le chemin dans le manifest
-                            chapter['file'] = f"{class_name}/{file_name}"
-                            
-                            print(f"    ✓ {file_name} → {class_name}/{file_name}")
-                            self.stats['moved_files'] += 1
-                        else:
-                            print(f"    ⚠️  Fichier introuvable: {file_name}")
-                            self.stats['errors'] += 1
-                    except Exception as e:
-                        print(f"    ❌ Erreur: {file_name} - {e}")
+                    if old_file_path.exists():
+                        # Planifier le déplacement et mettre à jour le chemin dans le manifest
+                        transaction.move(old_file_path, new_file_path)
+                        chapter['file'] = f"{class_name}/{file_name}"
+                        planned.append(f"{file_name} → {class_name}/{file_name}")
+                    else:
+                        print(f"    ⚠️  Fichier introuvable: {file_name}")
                         self.stats['errors'] += 1
                 else:
                     print(f"    ℹ️  Déjà organisé: {file_name}")
+        
+        if not planned:
+            return
+        
+        # Le manifest est réécrit en entier: il ne doit pas avoir changé depuis sa lecture
+        with manifest_lock(MANIFEST_PATH):
+            if not self.manifest_store.unchanged_since_read():
+                transaction.rollback()
+                print("    ❌ Le manifest a été modifié par une autre session - relancez le script")
+                self.stats['errors'] += 1
+                return
+            transaction.write(MANIFEST_PATH, json.dumps(new_manifest, indent=2, ensure_ascii=False))
+            try:
+                transaction.commit()
+            except Exception as e:
+                print(f"    ❌ Erreur: {e} - aucun fichier n'a été déplacé")
+                self.stats['errors'] += 1
+                return
+        
+        self.manifest = self.manifest_store.read()
+        for move in planned:
+            print(f"    ✓ {move}")
+        self.stats['moved_files'] += len(planned)
     
     def verify_consistency(self):
         """Vérifie la cohérence entre les fichiers JSON et le manifest."""
@@ -195,8 +217,9 @@ class ChapterOptimizer:
     def save_manifest(self):
         """Sauvegarde le manifest mis à jour."""
         print("\n💾 Sauvegarde du manifest...")
-        with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
-            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+        self.manifest, conflicts = self.manifest_store.save(self.manifest)
+        for conflict in conflicts:
+            print(f"  ⚠️  Conflit fusionné: {conflict}")
         print("  ✓ Manifest sauvegardé")
     
     def print_summary(self):
@@ -231,17 +254,25 @@ def main():
         print(f"❌ Erreur: Le fichier {MANIFEST_PATH} n'existe pas!")
         return 1
     
+    # Terminer une réorganisation interrompue avant d'en commencer une autre
+    journal = FileJournal(JOURNAL_PATH)
+    if journal.pending() is not None:
+        print("\n⚠️  Une réorganisation précédente a été interrompue: reprise...")
+        journal.resume()
+        print("✓ Réorganisation précédente terminée")
+    
     # Créer l'optimiseur
     optimizer = ChapterOptimizer()
     
     # Créer une sauvegarde
-    backup_path = optimizer.create_backup()
+    backup_id = optimizer.create_backup()
+    restore_command = f"python snapshot_store.py restore {backup_id} --delete-extra"
     
     print("\n⚠️  Cette opération va:")
     print("  1. Corriger les IDs dupliqués dans le manifest")
     print("  2. Réorganiser les fichiers dans des sous-dossiers par classe")
     print("  3. Mettre à jour tous les chemins dans le manifest")
-    print(f"\n📦 Une sauvegarde a été créée: {backup_path}")
+    print(f"\n📦 Une sauvegarde a été créée: {backup_id}")
     
     response = input("\nContinuer? (oui/non): ")
     
@@ -273,13 +304,13 @@ def main():
         optimizer.print_summary()
         
         print("\n✅ Optimisation terminée avec succès!")
-        print(f"💡 En cas de problème, restaurez depuis: {backup_path}")
+        print(f"💡 En cas de problème, restaurez avec: {restore_command}")
         
         return 0
         
     except Exception as e:
         print(f"\n❌ Erreur fatale: {e}")
-        print(f"💡 Restaurez depuis la sauvegarde: {backup_path}")
+        print(f"💡 Restaurez la sauvegarde avec: {restore_command}")
         return 1
 
 if __name__ == "__main__":
@@ -0,0 +1,17 @@
+// Étape "prebuild": pré-rendu KaTeX des formules (prerender_katex.py).
+// Étape facultative: sans Python, ou si le pré-rendu échoue, le build continue
+// et le client rend les formules avec MathJax (public/katex/index.json absent).
+import { spawnSync } from 'child_process';
+
+const candidates = process.platform === 'win32' ? ['py', 'python', 'python3'] : ['python3', 'python'];
+
+for (const command of candidates) {
+  const result = spawnSync(command, ['prerender_katex.py'], { stdio: 'inherit' });
+  if (result.error) continue; // Interpréteur absent: essayer le suivant
+  if (result.status !== 0) {
+    console.warn('⚠️  Pré-rendu KaTeX en échec: les formules seront rendues par MathJax.');
+  }
+  process.exit(0);
+}
+
+console.warn('⚠️  Python introuvable: pré-rendu KaTeX ignoré (rendu MathJax côté client).');
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Pré-rendu KaTeX des formules du contenu pédagogique (étape de build).
+
+Ce script:
+1. Extrait toutes les formules $...$ et $$...$$ des chapitres, leçons et concours
+   (même expression régulière que components/MathContent.tsx)
+2. Rend une seule fois chaque formule distincte avec le paquet `katex` installé
+   dans node_modules (un seul processus Node pour tout le lot)
+3. Écrit, pour chaque fichier de contenu, un fichier public/katex/<chemin>.json
+   {hash de la formule: HTML} que le client consulte avant de lancer MathJax
+4. Écrit l'index public/katex/index.json {chemin: hash}: le client ne demande
+   que les fichiers qui y figurent
+
+Lancé automatiquement avant `npm run build` (script "prebuild" de package.json,
+via prebuild.mjs). Sans Node ou sans le paquet katex, le pré-rendu est ignoré
+avec un avertissement: le client rend alors les formules avec MathJax.
+
+Les rendus sont conservés dans un cache adressé par contenu: une formule déjà
+rendue (avec la même version de KaTeX) n'est jamais rendue à nouveau.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from validate_content import collect_files, iter_strings
+
+# Configuration
+ROOT_DIR = Path(__file__).parent
+PUBLIC_DIR = ROOT_DIR / "public"
+RENDER_CACHE_PATH = ROOT_DIR / ".katex_render_cache.json"
+SHARD_INDEX_NAME = "index.json"
+
+# Identique à processMarkdown() dans components/MathContent.tsx
+FORMULA_PATTERN = re.compile(r'\$\$([\s\S]+?)\$\$|\$([^$]+?)\$')
+
+NODE_RENDERER = r"""
+const katex = require('katex');
+let input = '';
+process.stdin.setEncoding('utf8');
+process.stdin.on('data', chunk => input += chunk);
+process.stdin.on('end', () => {
+  const rendered = {};
+  for (const { key, tex, display } of JSON.parse(input)) {
+    try {
+      rendered[key] = katex.renderToString(tex, { displayMode: display, throwOnError: true, strict: 'ignore', output: 'html' });
+    } catch (err) {
+      rendered[key] = null;
+    }
+  }
+  process.stdout.write(JSON.stringify({ version: katex.version, rendered }));
+});
+"""
+
+
+def cyrb53(text: str, seed: int = 0) -> int:
+    """Hash 53 bits identique à cyrb53() de utils/katexPrerender.ts (unités UTF-16)."""
+    mask = 0xFFFFFFFF
+    h1 = (0xdeadbeef ^ seed) & mask
+    h2 = (0x41c6ce57 ^ seed) & mask
+    data = text.encode('utf-16-le')
+    for i in range(0, len(data), 2):
+        ch = data[i] | (data[i + 1] << 8)
+        h1 = ((h1 ^ ch) * 2654435761) & mask
+        h2 = ((h2 ^ ch) * 1597334677) & mask
+    h1 = ((h1 ^ (h1 >> 16)) * 2246822507) & mask
+    h1 ^= ((h2 ^ (h2 >> 13)) * 3266489909) & mask
+    h2 = ((h2 ^ (h2 >> 16)) * 2246822507) & mask
+    h2 ^= ((h1 ^ (h1 >> 13)) * 3266489909) & mask
+    return 4294967296 * (2097151 & h2) + h1
+
+
+def formula_key(tex: str, display: bool) -> str:
+    """Adresse d'une formule: hash du mode d'affichage et du source TeX."""
+    return format(cyrb53(('D' if display else 'I') + tex), 'x')
+
+
+def iter_formulas(data) -> Iterator[Tuple[str, bool]]:
+    """Renvoie (source TeX, mode display) pour chaque formule d'un document."""
+    for _, value in iter_strings(data):
+        if '$' not in value:
+            continue
+        for match in FORMULA_PATTERN.finditer(value):
+            display = match.group(1) is not None
+            tex = match.group(1) if display else match.group(2)
+            # Les textes à trou sont transformés côté client avant le rendu
+            if '___' in tex:
+                continue
+            yield tex, display
+
+
+def katex_version() -> Optional[str]:
+    package_json = ROOT_DIR / "node_modules" / "katex" / "package.json"
+    if not package_json.exists():
+        return None
+    with open(package_json, 'r', encoding='utf-8') as f:
+        return json.load(f).get('version')
+
+
+def load_render_cache(version: str) -> Dict[str, Optional[str]]:
+    """Charge les rendus existants s'ils proviennent de la même version de KaTeX."""
+    if not RENDER_CACHE_PATH.exists():
+        return {}
+    try:
+        with open(RENDER_CACHE_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data.get('formulas', {}) if data.get('katexVersion') == version else {}
+
+
+def render_with_node(batch: List[Dict[str, object]]) -> Dict[str, Optional[str]]:
+    """Rend un lot de formules en un seul appel à Node."""
+    result = subprocess.run(
+        ['node', '-e', NODE_RENDERER],
+        input=json.dumps(batch), capture_output=True, text=True, encoding='utf-8',
+        cwd=ROOT_DIR, check=True
+    )
+    return json.loads(result.stdout)['rendered']
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    if path.exists() and path.read_text(encoding='utf-8') == content:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding='utf-8')
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-rendu KaTeX des formules du contenu")
+    parser.add_argument('--public', type=Path, default=PUBLIC_DIR, help="Dossier public/ à traiter")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("PRÉ-RENDU KATEX DES FORMULES")
+    print("=" * 70)
+
+    version = katex_version()
+    if not version:
+        print("⚠️  Paquet katex introuvable (lancez `npm install`): pré-rendu ignoré, rendu MathJax côté client.")
+        return 0
+    if not shutil.which('node'):
+        print("⚠️  Node introuvable: pré-rendu ignoré, rendu MathJax côté client.")
+        return 0
+
+    public_dir = args.public
+    output_dir = public_dir / "katex"
+
+    # 1. Extraction des formules par document
+    documents: Dict[Path, Dict[str, Tuple[str, bool]]] = {}
+    for file_path in collect_files(public_dir):
+        if output_dir in file_path.parents:
+            continue
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except json.JSONDecodeError as e:
+            print(f"  ⚠️  {file_path.relative_to(public_dir)} ignoré: {e}")
+            continue
+        formulas = {formula_key(tex, display): (tex, display) for tex, display in iter_formulas(data)}
+        if formulas:
+            documents[file_path] = formulas
+
+    all_formulas: Dict[str, Tuple[str, bool]] = {}
+    for formulas in documents.values():
+        all_formulas.update(formulas)
+    print(f"✓ {len(all_formulas)} formule(s) distincte(s) dans {len(documents)} fichier(s)")
+
+    # 2. Rendu des seules formules absentes du cache
+    cache = load_render_cache(version)
+    missing = [
+        {'key': key, 'tex': tex, 'display': display}
+        for key, (tex, display) in all_formulas.items() if key not in cache
+    ]
+    if missing:
+        print(f"🧮 Rendu de {len(missing)} nouvelle(s) formule(s) avec KaTeX {version}...")
+        try:
+            cache.update(render_with_node(missing))
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"❌ Erreur lors de l'appel à Node: {e}")
+            return 1
+    else:
+        print("♻️  Toutes les formules sont déjà rendues")
+
+    failed = sum(1 for key in all_formulas if cache.get(key) is None)
+    if failed:
+        print(f"  ⚠️  {failed} formule(s) non supportée(s) par KaTeX (rendues par MathJax côté client)")
+
+    # 3. Fichiers par document et cache de rendu (limité aux formules encore utilisées)
+    written = 0
+    index_path = output_dir / SHARD_INDEX_NAME
+    expected = {index_path}
+    index: Dict[str, str] = {}
+    for file_path, formulas in documents.items():
+        shard = {key: cache[key] for key in sorted(formulas) if cache.get(key) is not None}
+        if not shard:
+            continue
+        relative = file_path.relative_to(public_dir)
+        shard_path = output_dir / relative
+        content = json.dumps(shard, ensure_ascii=False, separators=(',', ':'))
+        expected.add(shard_path)
+        index[relative.as_posix()] = hashlib.md5(content.encode('utf-8')).hexdigest()[:10]
+        if write_if_changed(shard_path, content):
+            written += 1
+    if write_if_changed(index_path, json.dumps(dict(sorted(index.items())), separators=(',', ':'))):
+        written += 1
+
+    removed = 0
+    if output_dir.exists():
+        for stale in output_dir.rglob("*.json"):
+            if stale not in expected:
+                stale.unlink()
+                removed += 1
+
+    with open(RENDER_CACHE_PATH, 'w', encoding='utf-8') as f:
+        json.dump({'katexVersion': version, 'formulas': {key: cache.get(key) for key in sorted(all_formulas)}},
+                  f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"💾 {written} fichier(s) de formules mis à jour, {removed} supprimé(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Serveur de prévisualisation local de public/, proche du déploiement Vercel.
+
+Un serveur statique simple (python -m http.server, vite preview) n'envoie ni
+validateurs ni contenu compressé: impossible d'y évaluer le cache de sw.js ou
+la taille réelle des réponses (GUIDE_TEST_PWA.md). Ce serveur:
+1. Calcule un ETag par fichier: la version du manifest pour un chapitre dont
+   le contenu porte cette version, un hash du contenu sinon (recalculé
+   seulement si le fichier change)
+2. Sert fichier.br ou fichier.gz à la place du fichier quand il existe, est à
+   jour et que le navigateur l'accepte (Content-Encoding, Vary, ETag distinct)
+3. Répond 304 aux requêtes conditionnelles (If-None-Match, If-Modified-Since)
+4. Gère les requêtes partielles (Range, If-Range), utiles pour les PDF de
+   PDF/Concours servis sous /PDF/
+5. Applique les en-têtes de vercel.json (sw.js) et renvoie index.html pour
+   les routes de l'application (dist/ de vite build s'il existe)
+6. Relaie /api/ vers submission_receiver.py (--api), comme les fonctions de
+   api/ sur Vercel: l'envoi des travaux fonctionne sans Internet, à la même origine
+
+Utilisation:
+    python preview_server.py [--port 8000] [--host 0.0.0.0] [--api http://127.0.0.1:8787]
+"""
+
+import argparse
+import email.utils
+import hashlib
+import http.client
+import json
+import mimetypes
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+# Configuration
+ROOT_DIR = Path(__file__).parent
+PUBLIC_DIR = ROOT_DIR / "public"
+DIST_DIR = ROOT_DIR / "dist"
+VERCEL_CONFIG = ROOT_DIR / "vercel.json"
+DEFAULT_PORT = 8000
+API_PREFIX = '/api/'
+DEFAULT_API = 'http://127.0.0.1:8787'  # submission_receiver.py
+API_TIMEOUT = 30
+# En-têtes transmis entre le navigateur et le récepteur
+API_REQUEST_HEADERS = ('Content-Type', 'Content-Length', 'Origin', 'Access-Control-Request-Method',
+                       'Access-Control-Request-Headers')
+HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'transfer-encoding', 'content-length', 'server', 'date'}
+
+# URL -> fichier ou dossier hors de public/
+MOUNTS = {
+    '/sw.js': ROOT_DIR / "sw.js",
+    '/PDF/': ROOT_DIR / "PDF",
+}
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))   # Par ordre de préférence
+IMMUTABLE_PREFIXES = ('/assets/',)              # Fichiers nommés par hash (vite build)
+CONTENT_TYPES = {
+    '.json': 'application/json; charset=utf-8',
+    '.webmanifest': 'application/manifest+json; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.html': 'text/html; charset=utf-8',
+    '.svg': 'image/svg+xml',
+    '.pdf': 'application/pdf',
+}
+
+
+class ETagIndex:
+    """ETags des fichiers servis, recalculés seulement quand un fichier change."""
+
+    def __init__(self, public_dir: Path = PUBLIC_DIR):
+        self.public_dir = public_dir
+        self.lock = threading.Lock()
+        self.tags: Dict[Path, Tuple[Tuple[int, int], str]] = {}
+        self.versions: Dict[Path, str] = {}
+        self.manifest_stamp: Optional[Tuple[int, int]] = None
+
+    @staticmethod
+    def _stamp(path: Path) -> Tuple[int, int]:
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _chapter_versions(self) -> Dict[Path, str]:
+        """Fichier de chapitre -> version du manifest (relu s'il a changé)."""
+        manifest_path = self.public_dir / "manifest.json"
+        try:
+            stamp = self._stamp(manifest_path)
+        except OSError:
+            return {}
+        if stamp != self.manifest_stamp:
+            self.manifest_stamp = stamp
+            self.versions = {}
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+            except (OSError, json.JSONDecodeError):
+                return self.versions
+            for entries in manifest.values():
+                for entry in entries if isinstance(entries, list) else []:
+                    if isinstance(entry, dict) and entry.get('file') and entry.get('version'):
+                        path = (self.public_dir / "chapters" / entry['file']).resolve()
+                        self.versions[path] = entry['version']
+        return self.versions
+
+    def _compute(self, path: Path, content: bytes) -> str:
+        version = self._chapter_versions().get(path)
+        if version and version != 'non-versionné':
+            # La version du manifest n'est fiable que si le fichier la porte encore
+            try:
+                if json.loads(content.decode('utf-8')).get('version') == version:
+                    return version
+            except (UnicodeDecodeError, json.JSONDecodeError, AttributeError):
+                pass
+        return hashlib.sha256(content).hexdigest()[:16]
+
+    def get(self, path: Path) -> str:
+        stamp = self._stamp(path)
+        with self.lock:
+            cached = self.tags.get(path)
+            if cached and cached[0] == stamp:
+                return cached[1]
+            tag = self._compute(path, path.read_bytes())
+            self.tags[path] = (stamp, tag)
+            return tag
+
+
+def load_vercel_headers(config_path: Path = VERCEL_CONFIG) -> Dict[str, List[Tuple[str, str]]]:
+    """En-têtes de vercel.json pour les sources sans motif (ex: /sw.js)."""
+    try:
+        config = json.loads(config_path.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    headers = {}
+    for rule in config.get('headers', []):
+        source = rule.get('source', '')
+        if source and not re.search(r'[(:*]', source):
+            headers[source] = [(h['key'], h['value']) for h in rule.get('headers', [])]
+    return headers
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """'bytes=a-b' -> (début, fin incluse); None si absent, multiple ou invalide (réponse complète)."""
+    match = re.fullmatch(r'\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*', header or '')
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    if match.group(1):
+        start = int(match.group(1))
+        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+    else:
+        suffix = int(match.group(2))
+        if suffix == 0:
+            return (size, size - 1)  # Non satisfaisable
+        start, end = max(size - suffix, 0), size - 1
+    return start, end
+
+
+def accepted_encodings(header: str) -> List[str]:
+    accepted = []
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        quality = re.search(r'q\s*=\s*([\d.]+)', params)
+        if name and not (quality and float(quality.group(1)) == 0):
+            accepted.append(name.strip().lower())
+    return accepted
+
+
+def make_handler(public_dir: Path, dist_dir: Optional[Path], etags: ETagIndex,
+                 vercel_headers: Dict[str, List[Tuple[str, str]]], api: Optional[str] = DEFAULT_API):
+    roots = [root for root in (dist_dir, public_dir) if root and root.is_dir()]
+    api_target = urlsplit(api) if api else None
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+        server_version = 'MathPedagoPreview'
+
+        def resolve(self, url: str) -> Optional[Path]:
+            """URL -> fichier servi (None si introuvable ou hors des dossiers servis)."""
+            candidates = []
+            for prefix, target in MOUNTS.items():
+                if url == prefix or (prefix.endswith('/') and url.startswith(prefix)):
+                    candidates.append((target, url[len(prefix):] if prefix.endswith('/') else ''))
+            candidates += [(root, url.lstrip('/')) for root in roots]
+            for base, rel in candidates:
+                path = (base / rel).resolve() if rel else base.resolve()
+                if path.is_dir():
+                    path = path / "index.html"
+                if path.is_file() and (path == base.resolve() or base.resolve() in path.parents):
+                    return path
+            # Routes de l'application (rewrite "/(.*)" -> /index.html de vercel.json)
+            if '.' not in url.rsplit('/', 1)[-1]:
+                for root in roots:
+                    if (root / "index.html").is_file():
+                        return (root / "index.html").resolve()
+            return None
+
+        def choose_variant(self, path: Path) -> Tuple[Path, Optional[str]]:
+            accepted = accepted_encodings(self.headers.get('Accept-Encoding', ''))
+            mtime = path.stat().st_mtime_ns
+            for encoding, suffix in ENCODINGS:
+                variant = path.with_name(path.name + suffix)
+                if encoding in accepted and variant.is_file() and variant.stat().st_mtime_ns >= mtime:
+                    return variant, encoding
+            return path, None
+
+        def not_modified(self, etag: str, last_modified: float) -> bool:
+            if_none_match = self.headers.get('If-None-Match')
+            if if_none_match is not None:
+                tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+                return '*' in tags or etag in tags
+            if_modified_since = self.headers.get('If-Modified-Since')
+            if if_modified_since:
+                try:
+                    return int(last_modified) <= email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+                except (TypeError, ValueError):
+                    return False
+            return False
+
+        def send_error_json(self, status: int, message: str) -> None:
+            body = json.dumps({'error': message}).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        def proxy_api(self) -> None:
+            """Relaie la requête vers le récepteur (--api) et renvoie sa réponse telle quelle."""
+            if api_target is None:
+                self.send_error_json(404, 'Not found')
+                return
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else None
+            headers = {name: self.headers[name] for name in API_REQUEST_HEADERS if self.headers.get(name)}
+            connection = http.client.HTTPConnection(api_target.hostname, api_target.port or 80, timeout=API_TIMEOUT)
+            try:
+                connection.request(self.command, api_target.path.rstrip('/') + self.path, body=body, headers=headers)
+                response = connection.getresponse()
+                content = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                self.send_error_json(502, f'Submission receiver unavailable ({api_target.geturl()}): {e}')
+                return
+            finally:
+                connection.close()
+            self.send_response(response.status)
+            for name, value in response.getheaders():
+                if name.lower() not in HOP_BY_HOP_HEADERS:
+                    self.send_header(name, value)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(content)
+
+        def do_POST(self):
+            if self.path.startswith(API_PREFIX):
+                self.proxy_api()
+            else:
+                self.send_error_json(405, 'Method not allowed')
+
+        def do_OPTIONS(self):
+            if self.path.startswith(API_PREFIX):
+                self.proxy_api()
+            else:
+                self.send_error_json(405, 'Method not allowed')
+
+        def do_HEAD(self):
+            self.do_GET()
+
+        def do_GET(self):
+            if self.path.startswith(API_PREFIX):
+                self.proxy_api()
+                return
+            url = unquote(urlsplit(self.path).path)
+            path = self.resolve(url)
+            if path is None:
+                self.send_error_json(404, 'Not found')
+                return
+
+            source, encoding = self.choose_variant(path)
+            stat = source.stat()
+            etag = f'"{etags.get(path)}{"-" + encoding if encoding else ""}"'
+            headers = [
+                ('ETag', etag),
+                ('Last-Modified', email.utils.formatdate(stat.st_mtime, usegmt=True)),
+                ('Cache-Control', 'public, max-age=31536000, immutable'
+                 if url.startswith(IMMUTABLE_PREFIXES) else 'no-cache'),
+                ('Vary', 'Accept-Encoding'),
+            ]
+            headers += vercel_headers.get(url, [])
+            if not any(name.lower() == 'content-type' for name, _ in headers):
+                content_type = CONTENT_TYPES.get(path.suffix.lower()) or mimetypes.guess_type(path.name)[0]
+                headers.append(('Content-Type', content_type or 'application/octet-stream'))
+
+            if self.not_modified(etag, stat.st_mtime):
+                self.send_response(304)
+                for name, value in headers:
+                    if name != 'Content-Type':
+                        self.send_header(name, value)
+                self.end_headers()
+                return
+
+            size = stat.st_size
+            start, end, status = 0, size - 1, 200
+            if encoding:
+                headers.append(('Content-Encoding', encoding))
+            else:
+                headers.append(('Accept-Ranges', 'bytes'))
+                requested = parse_range(self.headers.get('Range', ''), size)
+                if_range = self.headers.get('If-Range')
+                if requested and (not if_range or if_range.strip() == etag):
+                    if requested[0] >= size or requested[0] > requested[1]:
+                        self.send_response(416)
+                        self.send_header('Content-Range', f'bytes */{size}')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    start, end, status = requested[0], requested[1], 206
+                    headers.append(('Content-Range', f'bytes {start}-{end}/{size}'))
+
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(end - start + 1))
+            self.end_headers()
+            if self.command == 'HEAD':
+                return
+            with open(source, 'rb') as f:
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = f.read(min(remaining, 1 << 16))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prévisualisation locale de public/ (ETag, .br/.gz, 304, Range)")
+    parser.add_argument('--host', default='127.0.0.1', help="Adresse d'écoute (0.0.0.0 pour le réseau local)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--public', type=Path, default=PUBLIC_DIR, help="Dossier public")
+    parser.add_argument('--dist', type=Path, default=DIST_DIR, help="Sortie de vite build (servie en priorité si présente)")
+    parser.add_argument('--api', default=DEFAULT_API,
+                        help="Récepteur des travaux vers lequel relayer /api/ ('' pour désactiver)")
+    args = parser.parse_args()
+
+    if not args.public.is_dir():
+        print(f"❌ Dossier introuvable: {args.public}", file=sys.stderr)
+        return 1
+    handler = make_handler(args.public, args.dist if args.dist.is_dir() else None,
+                           ETagIndex(args.public), load_vercel_headers(), args.api or None)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    server.daemon_threads = True
+    served = ', '.join(str(p) for p in (args.dist, args.public) if p.is_dir())
+    print(f"🌐 http://{args.host}:{args.port}/ ({served}; /PDF/ -> {MOUNTS['/PDF/']})")
+    if args.api:
+        print(f"📮 {API_PREFIX} -> {args.api} (python submission_receiver.py serve)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
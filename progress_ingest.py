@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Import des progressions envoyées par les élèves (api/submit-work.ts).
+
+Chaque envoi arrive par e-mail en pièce jointe progression_<nom>_<ts>.json
+(ExportedProgressFile de types.ts). Ce script charge un dossier de ces
+fichiers dans une base SQLite locale:
+1. Les fichiers sont lus en parallèle (un processus par cœur); un fichier
+   déjà importé (même chemin, taille et date) n'est pas relu
+2. Un même envoi téléchargé plusieurs fois (contenu identique) n'est compté
+   qu'une fois; les renvois d'un élève pour un chapitre sont conservés, mais
+   seul le plus récent entre dans les statistiques
+3. Élève, classe et chapitre sont indexés; le chapitre est retrouvé dans le
+   manifest par son titre (ou sa version)
+4. report: complétion de la leçon, score du quiz et exercices traités par chapitre
+
+Utilisation:
+    python progress_ingest.py ingest ~/Téléchargements/progressions [--jobs 4]
+    python progress_ingest.py report [--class 1bsm] [--json | --csv rapport.csv]
+    python progress_ingest.py student "Nom Prénom"
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from near_duplicates import fold_accents
+
+# Configuration
+ROOT_DIR = Path(__file__).parent
+PUBLIC_DIR = ROOT_DIR / "public"
+DB_PATH = ROOT_DIR / ".progress.sqlite3"
+FILE_PATTERN = "progression_*.json"
+
+# Libellés envoyés dans studentLevel (CLASS_OPTIONS de constants.ts)
+CLASS_LABELS = {
+    'Tronc Commun Scientifique': 'tcs',
+    '1ère Bac Sciences Expérimentales': '1bse',
+    '1ère Bac Sciences Mathématiques': '1bsm',
+    '2ème Bac Sciences Mathématiques': '2bsm',
+    '2ème Bac Sciences Expérimentales': '2bse',
+}
+TREATED_FEEDBACK = ('Facile', 'Moyen', 'Difficile')  # 'Non traité' exclu
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    submission_id INTEGER REFERENCES submissions(id),
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    student_key TEXT NOT NULL,
+    student_name TEXT NOT NULL,
+    class_id TEXT NOT NULL,
+    class_label TEXT,
+    submitted_at INTEGER NOT NULL,
+    submission_date TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    submission_id INTEGER NOT NULL REFERENCES submissions(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    student_key TEXT NOT NULL,
+    class_id TEXT NOT NULL,
+    chapter_id TEXT NOT NULL,
+    chapter_title TEXT NOT NULL,
+    version TEXT,
+    submitted_at INTEGER NOT NULL,
+    lesson_completed INTEGER,
+    lesson_total INTEGER,
+    lesson_percentage REAL,
+    quiz_score REAL,
+    quiz_correct INTEGER,
+    quiz_total INTEGER,
+    quiz_duration INTEGER,
+    hints_used INTEGER,
+    quiz_answers TEXT,
+    exercises_treated INTEGER,
+    exercises_feedback TEXT,
+    exercises_duration INTEGER,
+    videos_watched INTEGER,
+    videos_total INTEGER,
+    total_duration INTEGER,
+    PRIMARY KEY (submission_id, position)
+);
+CREATE INDEX IF NOT EXISTS results_student ON results(student_key, class_id, chapter_id, submitted_at);
+CREATE INDEX IF NOT EXISTS results_chapter ON results(class_id, chapter_id);
+CREATE INDEX IF NOT EXISTS submissions_student ON submissions(student_key);
+-- Dernier envoi de chaque élève pour chaque chapitre
+CREATE VIEW IF NOT EXISTS latest_results AS
+    SELECT * FROM results r
+    WHERE r.submitted_at = (
+        SELECT MAX(submitted_at) FROM results
+        WHERE student_key = r.student_key AND class_id = r.class_id AND chapter_id = r.chapter_id
+    );
+"""
+
+RESULT_COLUMNS = (
+    'chapter_title', 'version', 'lesson_completed', 'lesson_total', 'lesson_percentage',
+    'quiz_score', 'quiz_correct', 'quiz_total', 'quiz_duration', 'hints_used', 'quiz_answers',
+    'exercises_treated', 'exercises_feedback', 'exercises_duration',
+    'videos_watched', 'videos_total', 'total_duration',
+)
+
+
+def student_key(name: str) -> str:
+    """Identifiant stable d'un élève: minuscules, sans accents ni espaces superflus."""
+    return ' '.join(re.findall(r'[a-z0-9]+', fold_accents(name)))
+
+
+def _number(value: Any) -> Optional[float]:
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _raw_score(value: Any) -> Tuple[Optional[int], Optional[int]]:
+    """'7 / 10' -> (7, 10)."""
+    match = re.match(r'\s*(\d+)\s*/\s*(\d+)\s*$', value) if isinstance(value, str) else None
+    return (int(match.group(1)), int(match.group(2))) if match else (None, None)
+
+
+def parse_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Un ExportedChapterResult -> colonnes de la table results."""
+    lesson = result.get('lesson') if isinstance(result.get('lesson'), dict) else {}
+    quiz = result.get('quiz') if isinstance(result.get('quiz'), dict) else {}
+    videos = result.get('videos') if isinstance(result.get('videos'), dict) else {}
+    feedback = result.get('exercisesFeedback') if isinstance(result.get('exercisesFeedback'), dict) else {}
+    answers = quiz.get('answers') if isinstance(quiz.get('answers'), dict) else {}
+    correct, total = _raw_score(quiz.get('scoreRaw'))
+    return {
+        'chapter_title': str(result.get('chapter', '')).strip(),
+        'version': result.get('version') if isinstance(result.get('version'), str) else None,
+        'lesson_completed': _number(lesson.get('completed')),
+        'lesson_total': _number(lesson.get('total')),
+        'lesson_percentage': _number(lesson.get('percentage')),
+        'quiz_score': _number(quiz.get('score')),
+        'quiz_correct': correct,
+        'quiz_total': total,
+        'quiz_duration': _number(quiz.get('durationSeconds')),
+        'hints_used': _number(quiz.get('hintsUsed')),
+        'quiz_answers': json.dumps(answers, ensure_ascii=False, sort_keys=True),
+        'exercises_treated': sum(1 for value in feedback.values() if value in TREATED_FEEDBACK),
+        'exercises_feedback': json.dumps(feedback, ensure_ascii=False, sort_keys=True),
+        'exercises_duration': _number(result.get('exercisesDurationSeconds')),
+        'videos_watched': _number(videos.get('watchedCount')),
+        'videos_total': _number(videos.get('totalCount')),
+        'total_duration': _number(result.get('totalDurationSeconds')),
+    }
+
+
+def parse_file(path_str: str) -> Dict[str, Any]:
+    """Lit un fichier de progression (exécuté dans un processus de travail)."""
+    path = Path(path_str)
+    try:
+        raw = path.read_bytes()
+        data = json.loads(raw.decode('utf-8-sig'))
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        return {'path': path_str, 'error': str(e)}
+    if not isinstance(data, dict) or not isinstance(data.get('results'), list):
+        return {'path': path_str, 'error': "pas un fichier de progression (results manquant)"}
+    name = str(data.get('studentName', '')).strip()
+    if not name:
+        return {'path': path_str, 'error': "studentName manquant"}
+
+    level = str(data.get('studentLevel', '')).strip()
+    timestamp = _number(data.get('timestamp'))
+    if timestamp is None:
+        # Anciens envois: l'horodatage n'est que dans le nom du fichier
+        match = re.search(r'_(\d{12,})\.json$', path.name)
+        timestamp = int(match.group(1)) if match else path.stat().st_mtime_ns // 1_000_000
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return {
+        'path': path_str,
+        'content_hash': hashlib.sha256(canonical.encode('utf-8')).hexdigest(),
+        'student_key': student_key(name),
+        'student_name': name,
+        'class_id': CLASS_LABELS.get(level, level.lower()),
+        'class_label': level,
+        'submitted_at': int(timestamp),
+        'submission_date': data.get('submissionDate') if isinstance(data.get('submissionDate'), str) else None,
+        'results': [parse_result(result) for result in data['results'] if isinstance(result, dict)],
+    }
+
+
+def chapter_index(public_dir: Path = PUBLIC_DIR) -> Dict[Tuple[str, str], str]:
+    """(classe, titre normalisé) et (classe, version) -> id du chapitre dans le manifest."""
+    index: Dict[Tuple[str, str], str] = {}
+    try:
+        manifest = json.loads((public_dir / "manifest.json").read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return index
+    for class_id, entries in manifest.items():
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict) or not entry.get('id'):
+                continue
+            if entry.get('version'):
+                index[(class_id, entry['version'])] = entry['id']
+            try:
+                content = json.loads((public_dir / "chapters" / entry['file']).read_text(encoding='utf-8'))
+            except (OSError, json.JSONDecodeError, KeyError, TypeError):
+                continue
+            if isinstance(content, dict) and content.get('chapter'):
+                index[(class_id, student_key(content['chapter']))] = entry['id']
+    return index
+
+
+class ProgressStore:
+    """Base SQLite des envois des élèves."""
+
+    def __init__(self, db_path: Path = DB_PATH):
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def new_files(self, paths: Iterable[Path]) -> List[Tuple[Path, os.stat_result]]:
+        """Fichiers absents de la base ou modifiés depuis leur import."""
+        known = {row['path']: (row['size'], row['mtime_ns'])
+                 for row in self.conn.execute("SELECT path, size, mtime_ns FROM files")}
+        pending = []
+        for path in paths:
+            stat = path.stat()
+            if known.get(str(path)) != (stat.st_size, stat.st_mtime_ns):
+                pending.append((path, stat))
+        return pending
+
+    def add(self, parsed: Dict[str, Any], stat: os.stat_result,
+            chapters: Dict[Tuple[str, str], str]) -> Optional[bool]:
+        """Enregistre un fichier lu. True: nouvel envoi, False: doublon, None: erreur."""
+        submission_id, error, created = None, parsed.get('error'), None
+        if not error:
+            row = self.conn.execute("SELECT id FROM submissions WHERE content_hash = ?",
+                                    (parsed['content_hash'],)).fetchone()
+            created = row is None
+            if created:
+                cursor = self.conn.execute(
+                    "INSERT INTO submissions (content_hash, student_key, student_name, class_id, class_label, "
+                    "submitted_at, submission_date) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    tuple(parsed[key] for key in ('content_hash', 'student_key', 'student_name', 'class_id',
+                                                  'class_label', 'submitted_at', 'submission_date')),
+                )
+                submission_id = cursor.lastrowid
+                for position, result in enumerate(parsed['results']):
+                    chapter_id = (chapters.get((parsed['class_id'], student_key(result['chapter_title'])))
+                                  or chapters.get((parsed['class_id'], result['version'] or ''))
+                                  or student_key(result['chapter_title']).replace(' ', '-'))
+                    self.conn.execute(
+                        f"INSERT INTO results (submission_id, position, student_key, class_id, chapter_id, "
+                        f"submitted_at, {', '.join(RESULT_COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * (6 + len(RESULT_COLUMNS)))})",
+                        (submission_id, position, parsed['student_key'], parsed['class_id'], chapter_id,
+                         parsed['submitted_at'], *(result[column] for column in RESULT_COLUMNS)),
+                    )
+            else:
+                submission_id = row['id']
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, submission_id, error) VALUES (?, ?, ?, ?, ?)",
+            (parsed['path'], stat.st_size, stat.st_mtime_ns, submission_id, error),
+        )
+        return created
+
+    def ingest(self, directory: Path, jobs: Optional[int] = None,
+               public_dir: Path = PUBLIC_DIR) -> Dict[str, Any]:
+        """Importe les nouveaux fichiers d'un dossier (récursivement), en une transaction."""
+        started = time.perf_counter()
+        files = sorted(path.resolve() for path in Path(directory).rglob(FILE_PATTERN) if path.is_file())
+        pending = self.new_files(files)
+        paths = [str(path) for path, _ in pending]
+
+        jobs = jobs or os.cpu_count() or 1
+        if jobs > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                parsed = list(pool.map(parse_file, paths, chunksize=max(1, len(paths) // (jobs * 4))))
+        else:
+            parsed = [parse_file(path) for path in paths]
+
+        chapters = chapter_index(public_dir) if pending else {}
+        summary = {'files': len(files), 'skipped': len(files) - len(pending),
+                   'submissions': 0, 'duplicates': 0, 'errors': []}
+        with self.conn:
+            for item, (_, stat) in zip(parsed, pending):
+                created = self.add(item, stat, chapters)
+                if created is None:
+                    summary['errors'].append((item['path'], item['error']))
+                else:
+                    summary['submissions' if created else 'duplicates'] += 1
+        summary['seconds'] = round(time.perf_counter() - started, 2)
+        return summary
+
+    def chapter_report(self, class_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Statistiques par chapitre sur le dernier envoi de chaque élève."""
+        query = "SELECT * FROM latest_results"
+        params: Tuple = ()
+        if class_id:
+            query += " WHERE class_id = ?"
+            params = (class_id,)
+        grouped: Dict[Tuple[str, str], List[sqlite3.Row]] = {}
+        for row in self.conn.execute(query + " ORDER BY class_id, chapter_id", params):
+            grouped.setdefault((row['class_id'], row['chapter_id']), []).append(row)
+
+        def mean(values: List[float]) -> Optional[float]:
+            return round(statistics.fmean(values), 1) if values else None
+
+        report = []
+        for (cls, chapter_id), rows in grouped.items():
+            scores = [row['quiz_score'] for row in rows if row['quiz_score'] is not None]
+            lessons = [row['lesson_percentage'] for row in rows if row['lesson_percentage'] is not None]
+            quiz_done = [row for row in rows if row['quiz_total']]
+            durations = [row['total_duration'] / 60 for row in rows if row['total_duration'] is not None]
+            report.append({
+                'class': cls,
+                'chapter_id': chapter_id,
+                'chapter': rows[-1]['chapter_title'],
+                'students': len(rows),
+                'submissions': self.conn.execute(
+                    "SELECT COUNT(*) FROM results WHERE class_id = ? AND chapter_id = ?", (cls, chapter_id)
+                ).fetchone()[0],
+                'lesson_avg_pct': mean(lessons),
+                'lesson_completed_pct': round(100 * sum(1 for p in lessons if p >= 100) / len(lessons), 1) if lessons else None,
+                'quiz_avg_score': mean(scores),
+                'quiz_median_score': round(statistics.median(scores), 1) if scores else None,
+                'quiz_pass_pct': round(100 * sum(1 for s in scores if s >= 50) / len(scores), 1) if scores else None,
+                'quiz_answered_pct': mean([100 * len(json.loads(row['quiz_answers'])) / row['quiz_total']
+                                           for row in quiz_done]),
+                'exercises_avg_treated': mean([row['exercises_treated'] for row in rows]),
+                'avg_minutes': mean(durations),
+            })
+        return report
+
+    def student_history(self, name: str) -> List[sqlite3.Row]:
+        return list(self.conn.execute(
+            "SELECT r.*, s.student_name, s.submission_date FROM results r "
+            "JOIN submissions s ON s.id = r.submission_id "
+            "WHERE r.student_key = ? ORDER BY r.class_id, r.chapter_id, r.submitted_at",
+            (student_key(name),),
+        ))
+
+
+def print_report(report: List[Dict[str, Any]]) -> None:
+    def fmt(value: Optional[float], suffix: str = '') -> str:
+        return '—' if value is None else f"{value:g}{suffix}"
+
+    print("=" * 100)
+    print(f"{'Chapitre':<44} {'Élèves':>6} {'Envois':>6} {'Leçon':>7} {'Quiz moy.':>9} {'Méd.':>6} {'≥50%':>6} {'Exos':>5} {'Min.':>6}")
+    print("=" * 100)
+    current = None
+    for row in report:
+        if row['class'] != current:
+            current = row['class']
+            print(f"\n📚 {current.upper()}")
+        print(f"  {row['chapter'][:42]:<42} {row['students']:>6} {row['submissions']:>6} "
+              f"{fmt(row['lesson_avg_pct'], '%'):>7} {fmt(row['quiz_avg_score'], '%'):>9} "
+              f"{fmt(row['quiz_median_score'], '%'):>6} {fmt(row['quiz_pass_pct'], '%'):>6} "
+              f"{fmt(row['exercises_avg_treated']):>5} {fmt(row['avg_minutes']):>6}")
+    print("=" * 100)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import et statistiques des progressions envoyées par les élèves")
+    parser.add_argument('--db', type=Path, default=DB_PATH, help="Fichier de la base")
+    sub = parser.add_subparsers(dest='command', required=True)
+    ingest = sub.add_parser('ingest', help="Importer les nouveaux fichiers progression_*.json d'un dossier")
+    ingest.add_argument('directory', type=Path)
+    ingest.add_argument('--public', type=Path, default=PUBLIC_DIR, help="Dossier public (manifest et chapitres)")
+    ingest.add_argument('--jobs', type=int, default=None, help="Nombre de processus (défaut: nombre de cœurs)")
+    report = sub.add_parser('report', help="Complétion et scores par chapitre")
+    report.add_argument('--class', dest='class_id', help="Limiter à une classe (ex: 1bsm)")
+    report.add_argument('--json', action='store_true', help="Sortie au format JSON")
+    report.add_argument('--csv', type=Path, help="Écrire le rapport dans un fichier CSV")
+    student = sub.add_parser('student', help="Historique des envois d'un élève")
+    student.add_argument('name')
+    args = parser.parse_args()
+
+    if args.command == 'ingest' and not args.directory.is_dir():
+        print(f"❌ Dossier introuvable: {args.directory}", file=sys.stderr)
+        return 1
+
+    store = ProgressStore(args.db)
+    try:
+        if args.command == 'ingest':
+            summary = store.ingest(args.directory, args.jobs, args.public)
+            for path, error in summary['errors']:
+                print(f"  ⚠️  {Path(path).name}: {error}")
+            print(f"✓ {summary['files']} fichier(s): {summary['submissions']} envoi(s) importé(s), "
+                  f"{summary['duplicates']} doublon(s), {summary['skipped']} déjà importé(s), "
+                  f"{len(summary['errors'])} erreur(s) en {summary['seconds']}s")
+        elif args.command == 'report':
+            rows = store.chapter_report(args.class_id)
+            if args.json:
+                json.dump(rows, sys.stdout, indent=2, ensure_ascii=False)
+                print()
+            elif args.csv:
+                with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['class'])
+                    writer.writeheader()
+                    writer.writerows(rows)
+                print(f"✓ {len(rows)} chapitre(s) -> {args.csv}")
+            else:
+                print_report(rows)
+        else:
+            rows = store.student_history(args.name)
+            if not rows:
+                print(f"❌ Aucun envoi pour {args.name}")
+                return 1
+            print(f"👤 {rows[0]['student_name']}")
+            for row in rows:
+                print(f"  [{row['class_id']}] {row['chapter_title'][:50]:<50} "
+                      f"quiz {row['quiz_correct'] if row['quiz_correct'] is not None else '—'}"
+                      f"/{row['quiz_total'] if row['quiz_total'] is not None else '—'} "
+                      f"leçon {row['lesson_percentage'] if row['lesson_percentage'] is not None else '—'}% "
+                      f"— {row['submission_date'] or row['submitted_at']}")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Sauvegardes incrémentales et dédupliquées du contenu (manifest + chapitres).
+
+Chaque fichier est stocké une seule fois dans objects/, sous le hash de son
+contenu. Une sauvegarde ("snapshot") n'est qu'un petit fichier d'index
+{chemin relatif: hash, taille, date de modification}. Pour une arborescence
+inchangée, seules les métadonnées sont relues: la sauvegarde prend quelques
+millisecondes et ne coûte que la taille de l'index.
+
+Les objets sont copiés et non liés physiquement (hardlink): plusieurs scripts
+réécrivent les fichiers en place, ce qui modifierait aussi la sauvegarde.
+
+Utilisation:
+    python snapshot_store.py create [--label texte]
+    python snapshot_store.py list
+    python snapshot_store.py restore <id> [--delete-extra]
+    python snapshot_store.py prune --keep 10
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from manifest_store import write_shards
+
+# Configuration
+PUBLIC_DIR = Path(__file__).parent / "public"
+CHAPTERS_DIR = PUBLIC_DIR / "chapters"
+MANIFEST_PATH = PUBLIC_DIR / "manifest.json"
+BACKUP_DIR = PUBLIC_DIR / "backups"
+
+CHUNK_SIZE = 1 << 20
+
+
+def content_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_files(base_dir: Path = PUBLIC_DIR) -> List[Path]:
+    """Fichiers sauvegardés par défaut: le manifest et tout le dossier chapters."""
+    files = [base_dir / "manifest.json"]
+    files.extend(
+        path for path in sorted((base_dir / "chapters").rglob("*"))
+        if path.is_file() and not path.name.endswith('.tmp.json')
+    )
+    return [path for path in files if path.exists()]
+
+
+class SnapshotStore:
+    """Magasin de sauvegardes adressé par contenu (objects/ + snapshots/*.json)."""
+
+    def __init__(self, root: Path = BACKUP_DIR):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.snapshots_dir = self.root / "snapshots"
+
+    # --- Objets --------------------------------------------------------------
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    def _store_object(self, source: Path, digest: str) -> bool:
+        """Copie le fichier dans objects/ s'il n'y est pas déjà. Retourne True si ajouté."""
+        target = self.object_path(digest)
+        if target.exists():
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp = target.with_suffix('.tmp')
+        shutil.copyfile(source, temp)
+        os.replace(temp, target)
+        return True
+
+    # --- Index des sauvegardes ----------------------------------------------
+
+    def snapshot_ids(self) -> List[str]:
+        if not self.snapshots_dir.exists():
+            return []
+        return sorted(path.stem for path in self.snapshots_dir.glob("*.json"))
+
+    def load(self, snapshot_id: str) -> Dict:
+        path = self.snapshots_dir / f"{snapshot_id}.json"
+        if not path.exists():
+            raise FileNotFoundError(f"Sauvegarde introuvable: {snapshot_id}")
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def latest(self) -> Optional[Dict]:
+        ids = self.snapshot_ids()
+        return self.load(ids[-1]) if ids else None
+
+    def create(self, base_dir: Path = PUBLIC_DIR, files: Optional[Iterable[Path]] = None,
+               label: str = "") -> Dict:
+        """Crée une sauvegarde des fichiers donnés (chemins relatifs à base_dir).
+
+        Les fichiers dont la taille et la date de modification n'ont pas changé
+        depuis la dernière sauvegarde ne sont ni relus ni recopiés.
+        """
+        base_dir = Path(base_dir)
+        previous = self.latest()
+        known = previous['files'] if previous and previous.get('base') == str(base_dir.resolve()) else {}
+
+        entries: Dict[str, Dict] = {}
+        added = 0
+        added_bytes = 0
+        for path in (default_files(base_dir) if files is None else files):
+            rel = path.relative_to(base_dir).as_posix()
+            stat = path.stat()
+            entry = known.get(rel)
+            if not (entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+                    and self.object_path(entry['hash']).exists()):
+                digest = content_hash(path)
+                if self._store_object(path, digest):
+                    added += 1
+                    added_bytes += stat.st_size
+                entry = {'hash': digest}
+            entries[rel] = {'hash': entry['hash'], 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+        now = datetime.now()
+        snapshot_id = now.strftime('%Y%m%d_%H%M%S_%f')
+        snapshot = {
+            'id': snapshot_id,
+            'created': now.isoformat(timespec='seconds'),
+            'label': label,
+            'base': str(base_dir.resolve()),
+            'files': entries,
+            'stats': {'files': len(entries), 'new_objects': added, 'new_bytes': added_bytes},
+        }
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        temp = self.snapshots_dir / f"{snapshot_id}.tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp, self.snapshots_dir / f"{snapshot_id}.json")
+        return snapshot
+
+    def list(self) -> List[Dict]:
+        """Résumé des sauvegardes, de la plus ancienne à la plus récente."""
+        summaries = []
+        for snapshot_id in self.snapshot_ids():
+            snapshot = self.load(snapshot_id)
+            summaries.append({
+                'id': snapshot_id,
+                'created': snapshot['created'],
+                'label': snapshot.get('label', ''),
+                'files': len(snapshot['files']),
+                'size': sum(entry['size'] for entry in snapshot['files'].values()),
+                'new_bytes': snapshot.get('stats', {}).get('new_bytes', 0),
+            })
+        return summaries
+
+    def restore(self, snapshot_id: str, target_dir: Optional[Path] = None,
+                delete_extra: bool = False) -> Dict[str, int]:
+        """Restaure une sauvegarde. Seuls les fichiers différents sont réécrits.
+
+        Avec delete_extra, les fichiers du manifest et de chapters/ absents de
+        la sauvegarde sont supprimés. Les fragments du manifest (manifests/) ne
+        sont pas sauvegardés: ils sont régénérés depuis le manifest restauré.
+        """
+        snapshot = self.load(snapshot_id)
+        target_dir = Path(target_dir or snapshot['base'])
+        stats = {'restored': 0, 'unchanged': 0, 'deleted': 0, 'shards': 0}
+
+        for rel, entry in snapshot['files'].items():
+            target = target_dir / rel
+            if target.exists():
+                stat = target.stat()
+                if stat.st_size == entry['size'] and (stat.st_mtime_ns == entry['mtime_ns']
+                                                      or content_hash(target) == entry['hash']):
+                    stats['unchanged'] += 1
+                    continue
+            source = self.object_path(entry['hash'])
+            if not source.exists():
+                raise FileNotFoundError(f"Objet manquant pour {rel}: {entry['hash']}")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            temp = target.with_name(target.name + '.restore')
+            shutil.copyfile(source, temp)
+            os.replace(temp, target)
+            stats['restored'] += 1
+
+        if delete_extra:
+            for path in default_files(target_dir):
+                if path.relative_to(target_dir).as_posix() not in snapshot['files']:
+                    path.unlink()
+                    stats['deleted'] += 1
+
+        manifest_path = target_dir / MANIFEST_PATH.name
+        if manifest_path.exists():
+            data = json.loads(manifest_path.read_text(encoding='utf-8'))
+            stats['shards'] = len(write_shards(data, manifest_path))
+        return stats
+
+    def prune(self, keep: int) -> Dict[str, int]:
+        """Conserve les `keep` sauvegardes les plus récentes et supprime les objets orphelins."""
+        ids = self.snapshot_ids()
+        removed_snapshots = ids[:-keep] if keep > 0 else ids
+        for snapshot_id in removed_snapshots:
+            (self.snapshots_dir / f"{snapshot_id}.json").unlink()
+
+        referenced = set()
+        for snapshot_id in self.snapshot_ids():
+            referenced.update(entry['hash'] for entry in self.load(snapshot_id)['files'].values())
+
+        removed_objects = 0
+        freed = 0
+        if self.objects_dir.exists():
+            for path in self.objects_dir.glob("*/*"):
+                if path.name not in referenced:
+                    freed += path.stat().st_size
+                    path.unlink()
+                    removed_objects += 1
+        return {'snapshots': len(removed_snapshots), 'objects': removed_objects, 'bytes': freed}
+
+
+def format_size(size: int) -> str:
+    for unit in ('o', 'Ko', 'Mo'):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} Go"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sauvegardes dédupliquées du manifest et des chapitres")
+    parser.add_argument('--store', type=Path, default=BACKUP_DIR, help="Dossier du magasin de sauvegardes")
+    sub = parser.add_subparsers(dest='command', required=True)
+    create = sub.add_parser('create', help="Créer une sauvegarde")
+    create.add_argument('--label', default='', help="Description de la sauvegarde")
+    sub.add_parser('list', help="Lister les sauvegardes")
+    restore = sub.add_parser('restore', help="Restaurer une sauvegarde")
+    restore.add_argument('snapshot_id')
+    restore.add_argument('--delete-extra', action='store_true',
+                         help="Supprimer les fichiers absents de la sauvegarde")
+    prune = sub.add_parser('prune', help="Supprimer les anciennes sauvegardes")
+    prune.add_argument('--keep', type=int, default=10, help="Nombre de sauvegardes à conserver")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.store)
+
+    if args.command == 'create':
+        snapshot = store.create(label=args.label)
+        stats = snapshot['stats']
+        print(f"✓ Sauvegarde {snapshot['id']}: {stats['files']} fichier(s), "
+              f"{stats['new_objects']} nouveau(x) ({format_size(stats['new_bytes'])})")
+    elif args.command == 'list':
+        summaries = store.list()
+        if not summaries:
+            print("ℹ️  Aucune sauvegarde")
+        for s in summaries:
+            label = f" - {s['label']}" if s['label'] else ""
+            print(f"  {s['id']}  {s['files']:4d} fichier(s)  {format_size(s['size']):>8}  "
+                  f"(+{format_size(s['new_bytes'])}){label}")
+    elif args.command == 'restore':
+        try:
+            stats = store.restore(args.snapshot_id, delete_extra=args.delete_extra)
+        except FileNotFoundError as e:
+            print(f"❌ Erreur: {e}")
+            return 1
+        print(f"✓ {stats['restored']} fichier(s) restauré(s), {stats['unchanged']} inchangé(s), "
+              f"{stats['deleted']} supprimé(s), {stats['shards']} fragment(s) du manifest régénéré(s)")
+    elif args.command == 'prune':
+        stats = store.prune(args.keep)
+        print(f"✓ {stats['snapshots']} sauvegarde(s) et {stats['objects']} objet(s) supprimés "
+              f"({format_size(stats['bytes'])} libérés)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Réception locale des travaux envoyés par les élèves (remplace api/submit-work.ts).
+
+Pour les tests et les établissements sans Internet: un serveur HTTP asyncio
+accepte le même POST /api/submit-work (studentName, chapterTitle, progressData)
+et renvoie les mêmes réponses JSON que la fonction Vercel, mais enregistre les
+envois au lieu de les envoyer par e-mail.
+1. Les envois validés sont placés dans une file; une seule tâche d'écriture
+   les ajoute par lots au journal submissions/submissions-AAAAMMJJ.jsonl
+   (une ligne par envoi, jamais réécrite), avec un seul fsync par lot: tout ce
+   qui arrive pendant un fsync part dans le lot suivant
+2. La réponse 200 n'est envoyée qu'une fois le lot écrit sur disque; en cas
+   d'arrêt, un envoi non confirmé est renvoyé par l'application (3 essais)
+3. File pleine (fin de cours): le serveur attend un peu puis répond 503 avec
+   Retry-After au lieu d'accumuler les envois en mémoire
+4. export: écrit les pièces jointes progression_<nom>_<ts>.json que
+   progress_ingest.py sait importer
+
+L'application envoie vers l'URL relative /api/submit-work: elle doit donc être
+servie par un serveur qui relaie /api/ vers ce récepteur (même origine):
+- preview_server.py (relais /api/ vers http://127.0.0.1:8787 par défaut, --api)
+- npm run dev avec API_PROXY=http://127.0.0.1:8787 (server.proxy de vite.config.ts)
+Un client d'une autre origine est aussi accepté (CORS, pré-requête OPTIONS).
+
+Utilisation:
+    python submission_receiver.py serve [--host 0.0.0.0 --port 8787]
+    python preview_server.py --host 0.0.0.0       # dans un autre terminal
+    python submission_receiver.py export ~/progressions
+    python submission_receiver.py bench [--requests 5000 --concurrency 100]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Configuration
+ROOT_DIR = Path(__file__).parent
+SUBMISSIONS_DIR = ROOT_DIR / "submissions"
+ENDPOINT = "/api/submit-work"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+
+MAX_BODY_BYTES = 4_500_000   # Limite de Vercel pour le corps d'une requête
+QUEUE_LIMIT = 2000           # Envois en attente d'écriture
+BATCH_MAX = 500              # Envois par écriture (un fsync)
+ENQUEUE_TIMEOUT = 2.0        # Attente maximale d'une place dans la file avant 503
+RETRY_AFTER = 1              # Secondes, en-tête Retry-After des 503
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'Access-Control-Max-Age': '86400',
+}
+
+MISSING_FIELDS = {'error': 'Missing required fields: studentName, chapterTitle, or progressData'}
+
+
+@dataclass
+class Submission:
+    """Un envoi validé, en attente d'écriture."""
+    record: Dict[str, Any]
+    done: asyncio.Future = field(repr=False)
+
+
+def attachment_name(student_name: str, timestamp: int) -> str:
+    """Même nom de fichier que la pièce jointe de api/submit-work.ts."""
+    return f"progression_{re.sub(r'[^a-z0-9]', '_', student_name, flags=re.IGNORECASE).lower()}_{timestamp}.json"
+
+
+class SubmissionLog:
+    """Journal en ajout seul, un fichier JSONL par jour."""
+
+    def __init__(self, directory: Path = SUBMISSIONS_DIR):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def segment(self, when: Optional[datetime] = None) -> Path:
+        return self.directory / f"submissions-{(when or datetime.now()):%Y%m%d}.jsonl"
+
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        """Écrit un lot en une fois et attend qu'il soit sur disque."""
+        data = ''.join(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n' for record in records)
+        with open(self.segment(), 'a', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        for path in sorted(self.directory.glob("submissions-*.jsonl")):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Dernière ligne incomplète après un arrêt brutal
+
+    def export(self, target: Path) -> int:
+        """Écrit les pièces jointes absentes de target; renvoie leur nombre."""
+        target.mkdir(parents=True, exist_ok=True)
+        written = 0
+        for record in self.records():
+            content = json.dumps(record['progressData'], indent=2, ensure_ascii=False)
+            path = target / record['filename']
+            if path.exists() and path.read_text(encoding='utf-8') != content:
+                # Deux élèves de même nom dans la même milliseconde
+                path = path.with_name(f"{path.stem}_{record['messageId'][:8]}.json")
+            if path.exists():
+                continue
+            path.write_text(content, encoding='utf-8')
+            written += 1
+        return written
+
+
+class SubmissionReceiver:
+    """Serveur HTTP minimal compatible avec api/submit-work.ts."""
+
+    def __init__(self, log: SubmissionLog, queue_limit: int = QUEUE_LIMIT, batch_max: int = BATCH_MAX):
+        self.log = log
+        self.batch_max = batch_max
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_limit)
+        self.stats = {'accepted': 0, 'rejected': 0, 'busy': 0, 'batches': 0}
+
+    async def writer(self) -> None:
+        """Écrit les envois en attente par lots (group commit)."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_max and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await loop.run_in_executor(None, self.log.append, [item.record for item in batch])
+            except OSError as e:
+                for item in batch:
+                    if not item.done.done():
+                        item.done.set_exception(e)
+            else:
+                self.stats['batches'] += 1
+                for item in batch:
+                    if not item.done.done():
+                        item.done.set_result(None)
+            for _ in batch:
+                self.queue.task_done()
+
+    async def submit(self, body: bytes) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """Traite le corps d'un POST comme le fait api/submit-work.ts."""
+        try:
+            payload = json.loads(body.decode('utf-8')) if body else {}
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            payload = {}
+        if not isinstance(payload, dict):
+            payload = {}
+        student_name, chapter_title = payload.get('studentName'), payload.get('chapterTitle')
+        progress_data = payload.get('progressData')
+        if not student_name or not chapter_title or not progress_data:
+            self.stats['rejected'] += 1
+            return 400, MISSING_FIELDS, {}
+
+        try:
+            if isinstance(progress_data, str):
+                progress_data = json.loads(progress_data)
+            timestamp = int(time.time() * 1000)
+            message_id = str(uuid.uuid4())
+            submission = Submission({
+                'messageId': message_id,
+                'receivedAt': timestamp,
+                'filename': attachment_name(str(student_name), timestamp),
+                'studentName': student_name,
+                'chapterTitle': chapter_title,
+                'progressData': progress_data,
+            }, asyncio.get_running_loop().create_future())
+            try:
+                await asyncio.wait_for(self.queue.put(submission), ENQUEUE_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.stats['busy'] += 1
+                return 503, {'error': 'Server busy, retry later'}, {'Retry-After': str(RETRY_AFTER)}
+            await submission.done
+        except Exception as e:
+            return 500, {'error': 'Failed to send email', 'details': str(e), 'name': type(e).__name__}, {}
+
+        self.stats['accepted'] += 1
+        return 200, {'success': True, 'messageId': message_id, 'message': 'Work submitted successfully'}, {}
+
+    async def respond(self, writer: asyncio.StreamWriter, status: int, payload: Optional[Dict[str, Any]],
+                      headers: Dict[str, str], keep_alive: bool) -> None:
+        body = b'' if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        if payload is not None:
+            lines.append("Content-Type: application/json; charset=utf-8")
+        lines += [f"Content-Length: {len(body)}",
+                  f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Une connexion HTTP/1.1 (plusieurs requêtes si keep-alive)."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.respond(writer, 400, {'error': 'Bad request'}, {}, False)
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+                if 'chunked' in headers.get('transfer-encoding', '').lower():
+                    await self.respond(writer, 411, {'error': 'Length required'}, {}, False)
+                    break
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY_BYTES:
+                    await self.respond(writer, 413, {'error': 'Payload too large'}, {}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                if target.split('?')[0] != ENDPOINT:
+                    status, payload, extra = 404, {'error': 'Not found'}, {}
+                elif method == 'OPTIONS':
+                    status, payload, extra = 204, None, dict(CORS_HEADERS)
+                elif method != 'POST':
+                    status, payload, extra = 405, {'error': 'Method not allowed'}, {'Allow': 'POST, OPTIONS'}
+                else:
+                    status, payload, extra = await self.submit(body)
+                if status != 404:
+                    extra.setdefault('Access-Control-Allow-Origin', '*')
+                await self.respond(writer, status, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> None:
+        writer_task = asyncio.create_task(self.writer())
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        print(f"📮 Réception des travaux sur http://{host}:{port}{ENDPOINT} -> {self.log.directory}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            writer_task.cancel()
+            print(f"✓ {self.stats['accepted']} envoi(s) enregistré(s) en {self.stats['batches']} écriture(s), "
+                  f"{self.stats['rejected']} refusé(s), {self.stats['busy']} réponse(s) 503")
+
+
+async def bench(host: str, port: int, requests: int, concurrency: int) -> Dict[str, Any]:
+    """Envoie `requests` travaux fictifs avec `concurrency` connexions keep-alive."""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    counter = iter(range(requests))
+
+    async def client() -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i in counter:
+                body = json.dumps({
+                    'studentName': f"Élève {i % 40}",
+                    'chapterTitle': "Chapitre de test",
+                    'progressData': {'studentName': f"Élève {i % 40}", 'timestamp': i, 'results': []},
+                }).encode('utf-8')
+                started = time.perf_counter()
+                writer.write(f"POST {ENDPOINT} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+                await writer.drain()
+                status = int((await reader.readline()).split()[1])
+                length = 0
+                while (line := await reader.readline()) not in (b'\r\n', b''):
+                    if line.lower().startswith(b'content-length:'):
+                        length = int(line.split(b':')[1])
+                await reader.readexactly(length)
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': len(latencies),
+        'seconds': round(elapsed, 2),
+        'per_second': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(quantiles[49] * 1000, 1),
+        'p95_ms': round(quantiles[94] * 1000, 1),
+        'p99_ms': round(quantiles[98] * 1000, 1),
+        'statuses': statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Réception locale des travaux des élèves (api/submit-work)")
+    parser.add_argument('--dir', type=Path, default=SUBMISSIONS_DIR, help="Dossier du journal des envois")
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help="Démarrer le serveur")
+    serve.add_argument('--host', default=DEFAULT_HOST, help=f"Adresse d'écoute (défaut: {DEFAULT_HOST}; 0.0.0.0 pour le réseau local)")
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--queue', type=int, default=QUEUE_LIMIT, help="Envois en attente avant 503")
+    export = sub.add_parser('export', help="Écrire les pièces jointes progression_*.json")
+    export.add_argument('target', type=Path)
+    bench_parser = sub.add_parser('bench', help="Mesurer le débit d'un serveur démarré")
+    bench_parser.add_argument('--host', default=DEFAULT_HOST)
+    bench_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    bench_parser.add_argument('--requests', type=int, default=5000)
+    bench_parser.add_argument('--concurrency', type=int, default=100)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        receiver = SubmissionReceiver(SubmissionLog(args.dir), queue_limit=args.queue)
+        try:
+            asyncio.run(receiver.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == 'export':
+        written = SubmissionLog(args.dir).export(args.target)
+        print(f"✓ {written} fichier(s) écrit(s) dans {args.target} (python progress_ingest.py ingest {args.target})")
+    else:
+        result = asyncio.run(bench(args.host, args.port, args.requests, args.concurrency))
+        print(f"⏱️  {result['requests']} envoi(s) en {result['seconds']}s: {result['per_second']}/s, "
+              f"p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, p99 {result['p99_ms']} ms")
+        print(f"   Codes: {', '.join(f'{code}×{count}' for code, count in sorted(result['statuses'].items()))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
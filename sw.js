@@ -1,5 +1,56 @@
-const STATIC_CACHE_NAME = 'le-centre-scientifique-static-v3';
-const DYNAMIC_CACHE_NAME = 'le-centre-scientifique-dynamic-v3';
+// <precache> Généré par generate_precache.py - ne pas modifier à la main
+const PRECACHE_VERSION = '9e996a48';
+const PRECACHE_MANIFEST = {
+  "/": "21ccacf668",
+  "/chapters/1bsm/1bsm_arithmetique_dans_z.json": "v1.1.0-78c4bb",
+  "/chapters/1bsm/1bsm_calcul_trigonometrique.json": "v1.1.0-aee707",
+  "/chapters/1bsm/1bsm_denombrement.json": "v1.1.0-47538d",
+  "/chapters/1bsm/1bsm_ensembles_et_applications.json": "v1.1.0-d1cb8c",
+  "/chapters/1bsm/1bsm_generalites_sur_les_fonctions.json": "v1.1.0-2fee98",
+  "/chapters/1bsm/1bsm_la_derivation.json": "v1.1.0-f41aef",
+  "/chapters/1bsm/1bsm_le_barycentre_dans_le_plan.json": "v1.1.0-b01773",
+  "/chapters/1bsm/1bsm_le_produit_scalaire_dans_le_plan.json": "v1.1.0-549e38",
+  "/chapters/1bsm/1bsm_les_suites_numeriques.json": "v1.1.0-13f3b0",
+  "/chapters/1bsm/1bsm_limites_dune_fonction.json": "v1.1.0-f6b96f",
+  "/chapters/1bsm/1bsm_logique_mathematique.json": "v1.1.0-f09e73",
+  "/chapters/1bsm/lessons/1bsm_arithmetique_dans_z.json": "4e99ce8be9",
+  "/chapters/1bsm/lessons/1bsm_calcul_trigonometrique.json": "f999316d0c",
+  "/chapters/1bsm/lessons/1bsm_denombrement.json": "0e30d36d01",
+  "/chapters/1bsm/lessons/1bsm_ensembles_et_applications.json": "ca6c1c3566",
+  "/chapters/1bsm/lessons/1bsm_generalites_sur_les_fonctions.json": "2c016b7ea4",
+  "/chapters/1bsm/lessons/1bsm_la_derivation.json": "05b9334d30",
+  "/chapters/1bsm/lessons/1bsm_le_barycentre_dans_le_plan.json": "0cf847fef9",
+  "/chapters/1bsm/lessons/1bsm_le_produit_scalaire_dans_le_plan.json": "5c19006a08",
+  "/chapters/1bsm/lessons/1bsm_les_suites_numeriques.json": "b18dac8186",
+  "/chapters/1bsm/lessons/1bsm_limites_dune_fonction.json": "a428db5fce",
+  "/chapters/1bsm/lessons/1bsm_logique_mathematique.json": "3687cb8c19",
+  "/chapters/1bsm/lessons/pictures/Sinus.svg_7.png": "c9ddf887f0",
+  "/chapters/2bse/2bse_derivation_et_etude_des_fonctions.json": "v1.1.0-b2669e",
+  "/chapters/2bse/2bse_fonctions_exponentielles.json": "v1.1.0-85a0fc",
+  "/chapters/2bse/2bse_limites_et_continuite.json": "v1.1.0-992590",
+  "/chapters/2bse/2bse_limites_suites.json": "v1.1.0-aeba18",
+  "/chapters/2bse/2bse_nombres_complexes.json": "v1.1.0-ca6bb5",
+  "/chapters/2bse/lessons/2bse_derivation_et_etude_des_fonctions.json": "ac34787592",
+  "/chapters/2bse/lessons/2bse_fonctions_exponentielles.json": "40097b5af9",
+  "/chapters/2bse/lessons/2bse_limites_suites.json": "5e3c19955d",
+  "/chapters/2bse/lessons/2bse_nombres_complexes.json": "7e05cac965",
+  "/chapters/2bsm/2bsm_limites_et_continuite.json": "v1.1.0-77fa85",
+  "/icone.png": "c3960c7b4a",
+  "/index.html": "21ccacf668",
+  "/manifest.webmanifest": "bba400bfa4",
+  "/pictures/1bsm/1bsm-generalites-sur-les-fonctions/img_20251111T125509260Z_test__2_.png": "22c3b73101",
+  "/pictures/1bsm/1bsm-generalites-sur-les-fonctions/img_20251111T184628249Z_test__3_.png": "000ae5b89e",
+  "/pictures/1bsm/logique-mathematique/img_20251030T083607411Z_Screenshot_2025_10_27_180409.png": "0d0794e173",
+  "/pictures/1bsm/logique-mathematique/img_20251030T084340179Z_Screenshot_2025_10_27_183319.png": "b229784d41"
+};
+// </precache>
+
+const CACHE_PREFIX = 'le-centre-scientifique-';
+const STATIC_CACHE_NAME = `${CACHE_PREFIX}static-${PRECACHE_VERSION}`;
+const DYNAMIC_CACHE_NAME = `${CACHE_PREFIX}dynamic-v3`;
+// Cache de contenu persistant d'une version à l'autre: chaque entrée est indexée
+// par sa révision, seules les URLs modifiées sont retéléchargées.
+const CONTENT_CACHE_NAME = `${CACHE_PREFIX}content`;
 
 // Fichiers de l'application shell à mettre en cache
 const STATIC_ASSETS = [
@@ -9,6 +60,41 @@ const STATIC_ASSETS = [
   '/manifest.webmanifest'
 ];
 
+// Clé de cache d'une URL précachée (URL + révision)
+const revisionedKey = (pathname) =>
+  `${pathname}?__rev=${encodeURIComponent(PRECACHE_MANIFEST[pathname])}`;
+
+// Télécharge uniquement les entrées du précache absentes du cache de contenu
+const precacheContent = async () => {
+  const cache = await caches.open(CONTENT_CACHE_NAME);
+  const pathnames = Object.keys(PRECACHE_MANIFEST).filter(p => !STATIC_ASSETS.includes(p));
+  let fetched = 0;
+
+  await Promise.all(pathnames.map(async pathname => {
+    const key = revisionedKey(pathname);
+    if (await cache.match(key)) return;
+    try {
+      const response = await fetch(pathname, { cache: 'no-cache' });
+      if (response.ok) {
+        await cache.put(key, response);
+        fetched++;
+      }
+    } catch (err) {
+      console.warn('[Service Worker] Précache impossible pour', pathname, err);
+    }
+  }));
+
+  console.log(`[Service Worker] Précache: ${fetched}/${pathnames.length} ressource(s) téléchargée(s)`);
+};
+
+// Supprime les révisions qui ne figurent plus dans le précache
+const pruneContentCache = async () => {
+  const cache = await caches.open(CONTENT_CACHE_NAME);
+  const expected = new Set(Object.keys(PRECACHE_MANIFEST).map(p => new URL(revisionedKey(p), self.location.origin).href));
+  const keys = await cache.keys();
+  await Promise.all(keys.filter(request => !expected.has(request.url)).map(request => cache.delete(request)));
+};
+
 // Installation du Service Worker
 self.addEventListener('install', event => {
   console.log('[Service Worker] Installation...');
@@ -16,7 +102,7 @@ self.addEventListener('install', event => {
     caches.open(STATIC_CACHE_NAME).then(cache => {
       console.log('[Service Worker] Mise en cache des ressources statiques');
       return cache.addAll(STATIC_ASSETS);
-    })
+    }).then(precacheContent)
   );
   self.skipWaiting();
 });
@@ -24,15 +110,16 @@ self.addEventListener('install', event => {
 // Activation du Service Worker
 self.addEventListener('activate', event => {
   console.log('[Service Worker] Activation...');
+  const currentCaches = [STATIC_CACHE_NAME, DYNAMIC_CACHE_NAME, CONTENT_CACHE_NAME];
   event.waitUntil(
     caches.keys().then(keyList => {
       return Promise.all(keyList.map(key => {
-        if (key !== STATIC_CACHE_NAME && key !== DYNAMIC_CACHE_NAME && key.startsWith('center-scientific-of-mathematics')) {
+        if (!currentCaches.includes(key) && (key.startsWith(CACHE_PREFIX) || key.startsWith('center-scientific-of-mathematics'))) {
           console.log('[Service Worker] Suppression de l\'ancien cache', key);
           return caches.delete(key);
         }
       }));
-    }).then(() => {
+    }).then(pruneContentCache).then(() => {
         console.log('[Service Worker] Anciens caches supprimés.');
         return self.clients.claim();
     })
@@ -53,18 +140,49 @@ const networkFirstForChapters = async (request) => {
   } catch (err) {
     console.warn('[Service Worker] Network failed; trying cache.', err);
   }
-  
+
   // Fallback sur le cache si le réseau échoue
   const cache = await caches.open(DYNAMIC_CACHE_NAME);
   const cachedResponse = await cache.match(request);
-  
+
   if (cachedResponse) {
     return cachedResponse;
   }
-  
+
   throw new Error('No network and no cache available');
 };
 
+// Stratégie de cache: "Cache First" pour le contenu précaché (révision inchangée)
+const cacheFirstForPrecached = async (pathname) => {
+  const cache = await caches.open(CONTENT_CACHE_NAME);
+  const key = revisionedKey(pathname);
+  const cachedResponse = await cache.match(key);
+  if (cachedResponse) {
+    return cachedResponse;
+  }
+
+  const networkResponse = await fetch(pathname);
+  if (networkResponse.ok) {
+    cache.put(key, networkResponse.clone());
+  }
+  return networkResponse;
+};
+
+// Stratégie de cache: "Cache First" pour les URL versionnées (le contenu d'une URL ne change jamais)
+const cacheFirstVersioned = async (request) => {
+  const cache = await caches.open(DYNAMIC_CACHE_NAME);
+  const cachedResponse = await cache.match(request);
+  if (cachedResponse) {
+    return cachedResponse;
+  }
+
+  const networkResponse = await fetch(request);
+  if (networkResponse.ok) {
+    cache.put(request, networkResponse.clone());
+  }
+  return networkResponse;
+};
+
 // Stratégie de cache: "Cache First" pour les ressources statiques
 const cacheFirst = async (request) => {
     const cacheResponse = await caches.match(request);
@@ -74,15 +192,30 @@ const cacheFirst = async (request) => {
 // Interception des requêtes fetch
 self.addEventListener('fetch', event => {
   const { request } = event;
+  if (request.method !== 'GET') return;
   const url = new URL(request.url);
+  if (url.origin !== self.location.origin) return;
 
-  // Pour les chapitres et le manifest, utiliser "network-first" (toujours frais)
-  if (url.pathname.startsWith('/chapters/') || url.pathname === '/manifest.json') {
+  // Le manifest et l'index des fragments restent en "network-first": ils portent les versions
+  if (url.pathname === '/manifest.json' || url.pathname === '/manifests/index.json') {
     event.respondWith(networkFirstForChapters(request));
-  } 
+  }
+  // Fragment du manifest d'une classe, versionné par hash (?v=...): "cache-first"
+  else if (url.pathname.startsWith('/manifests/') && url.searchParams.has('v')) {
+    event.respondWith(cacheFirstVersioned(request));
+  }
+  // Contenu précaché (chapitres actifs, leçons, images): "cache-first" par révision,
+  // les paramètres de requête (ex: ?t=...) sont ignorés
+  else if (Object.prototype.hasOwnProperty.call(PRECACHE_MANIFEST, url.pathname) && !STATIC_ASSETS.includes(url.pathname)) {
+    event.respondWith(cacheFirstForPrecached(url.pathname));
+  }
+  // Autres chapitres: "network-first" (toujours frais)
+  else if (url.pathname.startsWith('/chapters/')) {
+    event.respondWith(networkFirstForChapters(request));
+  }
   // Pour les assets statiques de l'app shell, utiliser "cache-first"
   else if (STATIC_ASSETS.some(asset => url.pathname === new URL(asset, self.location.origin).pathname)) {
     event.respondWith(cacheFirst(request));
   }
   // Le navigateur gère le reste (CDN, etc.)
-});
\ No newline at end of file
+});
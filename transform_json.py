@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Pipeline de transformations en masse des fichiers JSON du contenu.
+
+Remplace les scripts ponctuels (fix_latex_formatting.py, remove_preamble.py...)
+qui codaient chacun un chemin de fichier et un parcours récursif:
+1. Une transformation est un "visiteur" appliqué aux objets et aux chaînes
+   d'un document (nettoyage LaTeX, suppression de clés, renommage de champs)
+2. Les visiteurs sont enchaînés en un seul parcours par document
+3. Les fichiers sélectionnés par un glob sont traités en parallèle
+4. Seuls les fichiers dont le contenu change réellement sont réécrits;
+   le mode --dry-run affiche le diff sans rien écrire
+
+Exemples:
+    python transform_json.py --clean-latex "chapters/2bse/*.json"
+    python transform_json.py --remove-key preamble --where type=example-box "chapters/**/lessons/*.json"
+    python transform_json.py --rename is_correct=isCorrect --dry-run "chapters/**/*.json"
+"""
+
+import argparse
+import difflib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fix_latex_formatting import clean_latex_text
+
+# Configuration
+PUBLIC_DIR = Path(__file__).parent / "public"
+
+# Littéral chaîne JSON (clé ou valeur), dans l'ordre du document
+_STRING_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"')
+
+
+class Transform:
+    """Visiteur de base: renvoie l'objet tel quel s'il n'y a rien à modifier.
+
+    Les sous-classes surchargent visit_dict et/ou visit_string. Renvoyer l'objet
+    reçu (et non une copie) signale qu'il est inchangé.
+    """
+
+    name = "transform"
+
+    def visit_dict(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        return obj
+
+    def visit_string(self, value: str) -> str:
+        return value
+
+
+class CleanLatexWhitespace(Transform):
+    """Supprime les espaces superflus autour des formules (fix_latex_formatting)."""
+
+    name = "clean-latex"
+
+    def visit_string(self, value: str) -> str:
+        return clean_latex_text(value)
+
+
+@dataclass
+class RemoveKeys(Transform):
+    """Supprime des clés, éventuellement seulement dans les objets correspondant à `where`."""
+
+    keys: Sequence[str]
+    where: Dict[str, Any] = field(default_factory=dict)
+    name = "remove-key"
+
+    def visit_dict(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        if not any(key in obj for key in self.keys):
+            return obj
+        if any(obj.get(k) != v for k, v in self.where.items()):
+            return obj
+        return {k: v for k, v in obj.items() if k not in self.keys}
+
+
+@dataclass
+class RenameKeys(Transform):
+    """Renomme des champs en conservant leur position dans l'objet."""
+
+    mapping: Dict[str, str]
+    where: Dict[str, Any] = field(default_factory=dict)
+    name = "rename"
+
+    def visit_dict(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        if not any(key in obj for key in self.mapping):
+            return obj
+        if any(obj.get(k) != v for k, v in self.where.items()):
+            return obj
+        renamed = {}
+        for key, value in obj.items():
+            new_key = self.mapping.get(key, key)
+            # Ne pas écraser un champ déjà présent sous le nouveau nom
+            if new_key != key and new_key in obj:
+                new_key = key
+            renamed[new_key] = value
+        return renamed
+
+
+class Pipeline:
+    """Applique une suite de visiteurs en un seul parcours du document."""
+
+    def __init__(self, transforms: Sequence[Transform]):
+        self.transforms = list(transforms)
+
+    def apply(self, obj: Any) -> Any:
+        if isinstance(obj, dict):
+            changed = False
+            items = {}
+            for key, value in obj.items():
+                new_value = self.apply(value)
+                changed = changed or new_value is not value
+                items[key] = new_value
+            result = items if changed else obj
+            for transform in self.transforms:
+                result = transform.visit_dict(result)
+            return result
+        if isinstance(obj, list):
+            new_items = [self.apply(item) for item in obj]
+            if any(new is not old for new, old in zip(new_items, obj)):
+                return new_items
+            return obj
+        if isinstance(obj, str):
+            result = obj
+            for transform in self.transforms:
+                result = transform.visit_string(result)
+            return result
+        return obj
+
+
+@dataclass
+class FileResult:
+    path: Path
+    changed: bool = False
+    written: bool = False
+    diff: str = ""
+    error: Optional[str] = None
+
+
+def detect_indent(text: str) -> Optional[int]:
+    """Retrouve l'indentation d'origine pour ne pas reformater tout le fichier."""
+    for line in text.splitlines()[1:]:
+        stripped = line.lstrip(' ')
+        if stripped:
+            return len(line) - len(stripped) or None
+    return None
+
+
+class _StructureChanged(Exception):
+    pass
+
+
+def _string_pairs(old: Any, new: Any, pairs: List[Tuple[str, str]]) -> None:
+    """Liste (ancienne, nouvelle) chaîne pour chaque clé et valeur, dans l'ordre du texte."""
+    if isinstance(old, dict):
+        if not isinstance(new, dict) or list(old) != list(new):
+            raise _StructureChanged
+        for key, value in old.items():
+            pairs.append((key, key))
+            _string_pairs(value, new[key], pairs)
+    elif isinstance(old, list):
+        if not isinstance(new, list) or len(old) != len(new):
+            raise _StructureChanged
+        for old_item, new_item in zip(old, new):
+            _string_pairs(old_item, new_item, pairs)
+    elif isinstance(old, str):
+        if not isinstance(new, str):
+            raise _StructureChanged
+        pairs.append((old, new))
+    elif type(old) is not type(new) or old != new:
+        raise _StructureChanged
+
+
+def patch_strings(original: str, data: Any, transformed: Any) -> Optional[str]:
+    """Remplace en place les seules chaînes modifiées, sans reformater le fichier.
+
+    Renvoie None si la structure a changé (clés ajoutées, supprimées ou renommées).
+    """
+    pairs: List[Tuple[str, str]] = []
+    try:
+        _string_pairs(data, transformed, pairs)
+    except _StructureChanged:
+        return None
+
+    tokens = list(_STRING_TOKEN.finditer(original))
+    if len(tokens) != len(pairs):
+        return None
+
+    chunks = []
+    position = 0
+    for token, (old, new) in zip(tokens, pairs):
+        if old is new or old == new:
+            continue
+        chunks.append(original[position:token.start()])
+        chunks.append(json.dumps(new, ensure_ascii=False))
+        position = token.end()
+    chunks.append(original[position:])
+    return ''.join(chunks)
+
+
+def serialize(data: Any, original: str) -> str:
+    indent = detect_indent(original)
+    if indent is None:
+        text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    else:
+        text = json.dumps(data, ensure_ascii=False, indent=indent)
+    return text + '\n' if original.endswith('\n') else text
+
+
+def write_atomic(path: Path, content: str) -> None:
+    """Écrit dans un fichier temporaire puis le renomme (comme ChapterData.save_to_file)."""
+    temp_path = path.with_suffix('.tmp.json')
+    with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+
+def transform_file(path: Path, pipeline: Pipeline, dry_run: bool = False, root: Optional[Path] = None) -> FileResult:
+    """Transforme un fichier; il n'est réécrit que si ses octets changent."""
+    result = FileResult(path)
+    try:
+        original = path.read_text(encoding='utf-8')
+        data = json.loads(original)
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        result.error = str(e)
+        return result
+
+    transformed = pipeline.apply(data)
+    if transformed is data:
+        return result
+
+    content = patch_strings(original, data, transformed)
+    if content is None:
+        content = serialize(transformed, original)
+    if content == original:
+        return result
+
+    result.changed = True
+    if dry_run:
+        label = str(path.relative_to(root)) if root else str(path)
+        result.diff = ''.join(difflib.unified_diff(
+            original.splitlines(keepends=True), content.splitlines(keepends=True),
+            fromfile=f"a/{label}", tofile=f"b/{label}"
+        ))
+    else:
+        write_atomic(path, content)
+        result.written = True
+    return result
+
+
+def _transform_file_task(args: Tuple[Path, Pipeline, bool, Path]) -> FileResult:
+    return transform_file(*args)
+
+
+def collect_paths(patterns: Sequence[str], root: Path = PUBLIC_DIR) -> List[Path]:
+    """Résout les globs (relatifs à public/) en liste de fichiers JSON triée."""
+    paths = set()
+    for pattern in patterns:
+        for path in root.glob(pattern):
+            if path.is_file() and path.suffix == '.json' and not path.name.endswith('.tmp.json'):
+                paths.add(path)
+    return sorted(paths)
+
+
+def run_pipeline(paths: Sequence[Path], pipeline: Pipeline, dry_run: bool = False,
+                 jobs: Optional[int] = None, root: Path = PUBLIC_DIR) -> List[FileResult]:
+    """Traite les fichiers en parallèle (un processus par cœur par défaut)."""
+    tasks = [(path, pipeline, dry_run, root) for path in paths]
+    if jobs == 1 or len(tasks) < 2:
+        return [_transform_file_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(_transform_file_task, tasks, chunksize=4))
+
+
+def parse_pairs(values: Sequence[str], option: str) -> Dict[str, Any]:
+    """Convertit ["a=b", ...] en dict; les valeurs JSON (true, 1...) sont décodées."""
+    pairs = {}
+    for item in values:
+        if '=' not in item:
+            raise argparse.ArgumentTypeError(f"{option} attend la forme clé=valeur: {item}")
+        key, value = item.split('=', 1)
+        try:
+            pairs[key] = json.loads(value)
+        except json.JSONDecodeError:
+            pairs[key] = value
+    return pairs
+
+
+def build_pipeline(args: argparse.Namespace) -> Pipeline:
+    where = parse_pairs(args.where, '--where')
+    transforms: List[Transform] = []
+    if args.clean_latex:
+        transforms.append(CleanLatexWhitespace())
+    if args.remove_key:
+        transforms.append(RemoveKeys(args.remove_key, where))
+    if args.rename:
+        mapping = {old: str(new) for old, new in parse_pairs(args.rename, '--rename').items()}
+        transforms.append(RenameKeys(mapping, where))
+    return Pipeline(transforms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transformations en masse des fichiers JSON du contenu")
+    parser.add_argument('patterns', nargs='*', default=["chapters/**/*.json"],
+                        help="Globs relatifs à public/ (défaut: chapters/**/*.json)")
+    parser.add_argument('--public', type=Path, default=PUBLIC_DIR, help="Dossier public/ de référence")
+    parser.add_argument('--clean-latex', action='store_true', help="Nettoyer les espaces autour des formules")
+    parser.add_argument('--remove-key', action='append', default=[], metavar='CLÉ', help="Supprimer une clé")
+    parser.add_argument('--rename', action='append', default=[], metavar='ANCIEN=NOUVEAU', help="Renommer une clé")
+    parser.add_argument('--where', action='append', default=[], metavar='CLÉ=VALEUR',
+                        help="Limiter --remove-key/--rename aux objets ayant ce champ")
+    parser.add_argument('--dry-run', action='store_true', help="Afficher le diff sans écrire")
+    parser.add_argument('--jobs', type=int, default=None, help="Nombre de processus (défaut: nombre de cœurs)")
+    args = parser.parse_args()
+
+    pipeline = build_pipeline(args)
+    if not pipeline.transforms:
+        parser.error("aucune transformation demandée (--clean-latex, --remove-key, --rename)")
+
+    paths = collect_paths(args.patterns, args.public)
+    if not paths:
+        print("ℹ️  Aucun fichier ne correspond aux motifs donnés")
+        return 0
+
+    results = run_pipeline(paths, pipeline, args.dry_run, args.jobs, args.public)
+
+    for result in results:
+        if result.error:
+            print(f"  ❌ {result.path.relative_to(args.public)}: {result.error}")
+        elif result.diff:
+            sys.stdout.write(result.diff)
+
+    changed = sum(1 for r in results if r.changed)
+    errors = sum(1 for r in results if r.error)
+    action = "à modifier" if args.dry_run else "modifié(s)"
+    print(f"\n✓ {len(results)} fichier(s) analysé(s), {changed} {action}, {errors} erreur(s)")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+/**
+ * Formules KaTeX pré-rendues au build (prerender_katex.py).
+ *
+ * Pour chaque fichier de contenu, public/katex/<chemin>.json associe le hash
+ * d'une formule à son HTML KaTeX. MathContent remplace les formules connues
+ * par ce HTML et ne lance MathJax que pour celles qui restent.
+ *
+ * public/katex/index.json liste les fichiers générés ({chemin: hash}): seuls
+ * ceux-ci sont demandés, sans requête vaine quand le pré-rendu est absent.
+ */
+import 'katex/dist/katex.min.css';
+
+// Identique à processMarkdown() dans components/MathContent.tsx
+const FORMULA_REGEX = /\$\$([\s\S]+?)\$\$|\$([^\$]+?)\$/g;
+
+const renderedFormulas = new Map<string, string>();
+const loadedShards = new Map<string, Promise<void>>();
+let shardIndex: Promise<Record<string, string>> | null = null;
+
+/**
+ * Hash 53 bits (cyrb53), calculé sur les unités UTF-16 comme en Python.
+ */
+const cyrb53 = (text: string, seed = 0): number => {
+    let h1 = 0xdeadbeef ^ seed;
+    let h2 = 0x41c6ce57 ^ seed;
+    for (let i = 0; i < text.length; i++) {
+        const ch = text.charCodeAt(i);
+        h1 = Math.imul(h1 ^ ch, 2654435761);
+        h2 = Math.imul(h2 ^ ch, 1597334677);
+    }
+    h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507);
+    h1 ^= Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+    h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507);
+    h2 ^= Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+    return 4294967296 * (2097151 & h2) + (h1 >>> 0);
+};
+
+export const formulaKey = (tex: string, display: boolean): string =>
+    cyrb53((display ? 'D' : 'I') + tex).toString(16);
+
+/**
+ * Charge (une seule fois) l'index des fichiers de formules pré-rendues.
+ * Sans pré-rendu (ou si le serveur renvoie autre chose que du JSON), l'index est vide.
+ */
+const loadShardIndex = (): Promise<Record<string, string>> => {
+    if (!shardIndex) {
+        shardIndex = fetch('/katex/index.json')
+            .then(response => {
+                const isJson = (response.headers.get('content-type') || '').includes('json');
+                return response.ok && isJson ? response.json() : {};
+            })
+            .catch(() => ({}));
+    }
+    return shardIndex;
+};
+
+/**
+ * Charge (une seule fois) les formules pré-rendues d'un fichier de contenu.
+ * @param contentUrl URL du fichier JSON (ex: /chapters/1bsm/lessons/x.json?t=123)
+ */
+export const preloadFormulaShard = (contentUrl: string): Promise<void> => {
+    const path = contentUrl.split('?')[0].replace(/^\/+/, '');
+
+    let pending = loadedShards.get(path);
+    if (!pending) {
+        pending = loadShardIndex()
+            .then(index => {
+                const hash = index[path];
+                if (!hash) {
+                    return {};
+                }
+                return fetch(`/katex/${path}?v=${hash}`).then(response => (response.ok ? response.json() : {}));
+            })
+            .then((shard: Record<string, string>) => {
+                Object.entries(shard).forEach(([key, html]) => renderedFormulas.set(key, html));
+            })
+            .catch(() => {
+                // Pas de pré-rendu disponible: MathJax prendra le relais
+            });
+        loadedShards.set(path, pending);
+    }
+    return pending;
+};
+
+/**
+ * Remplace les formules pré-rendues dans un contenu déjà traité.
+ * `complete` indique qu'il ne reste aucune formule à confier à MathJax.
+ */
+export const applyPrerenderedMath = (content: string): { html: string; complete: boolean } => {
+    if (renderedFormulas.size === 0 || !content.includes('$')) {
+        return { html: content, complete: !/\$|\\\(|\\\[/.test(content) };
+    }
+
+    let complete = true;
+    const html = content.replace(FORMULA_REGEX, (match, displayTex: string | undefined, inlineTex: string | undefined) => {
+        const display = displayTex !== undefined;
+        const rendered = renderedFormulas.get(formulaKey(display ? displayTex : inlineTex!, display));
+        if (rendered === undefined) {
+            complete = false;
+            return match;
+        }
+        return `<span class="tex2jax_ignore katex-prerendered">${rendered}</span>`;
+    });
+
+    return { html, complete: complete && !/\\\(|\\\[/.test(html) };
+};
@@ -0,0 +1,586 @@
+#!/usr/bin/env python3
+"""
+Validation approfondie de tout le contenu pédagogique (chapitres, leçons, concours).
+
+Reprend les règles de utils/jsonValidator.ts et les complète:
+- champs obligatoires des chapitres, forme des options de quiz,
+  exactement une bonne réponse par QCM
+- résolution des `lessonFile` et existence des images référencées
+- identifiants dupliqués (quiz, exercices, vidéos, chapitres du manifest)
+- délimiteurs mathématiques non équilibrés dans toutes les chaînes
+
+Les fichiers sont analysés en parallèle; les numéros de ligne ne sont calculés
+que pour les fichiers qui présentent au moins un problème.
+"""
+
+import argparse
+import bisect
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from generate_precache import iter_image_refs
+
+# Configuration
+PUBLIC_DIR = Path(__file__).parent / "public"
+MANIFEST_PATH = PUBLIC_DIR / "manifest.json"
+
+REQUIRED_CHAPTER_FIELDS = ('class', 'chapter', 'quiz', 'exercises')
+VALID_ELEMENT_TYPES = [
+    'p', 'table', 'definition-box', 'theorem-box', 'proposition-box',
+    'property-box', 'example-box', 'remark-box', 'practice-box', 'explain-box'
+]
+VALID_LIST_TYPES = ['bullet', 'numbered', 'number']
+
+# Fichiers de documentation qui ne suivent aucun schéma de contenu
+SKIPPED_FILES = {'guide_concours.json'}
+
+MALFORMED_COMMANDS = [
+    (re.compile(r'\\frac[^{]'), '\\frac doit être suivi de {numérateur}{dénominateur}', 'MALFORMED_FRAC'),
+    (re.compile(r'\\sqrt[^[{]'), '\\sqrt doit être suivi de {contenu} ou [n]{contenu}', 'MALFORMED_SQRT'),
+    (re.compile(r'\\dfrac[^{]'), '\\dfrac doit être suivi de {numérateur}{dénominateur}', 'MALFORMED_DFRAC'),
+]
+UNESCAPED_DOLLAR = re.compile(r'(?<!\\)\$')
+
+
+@dataclass
+class ValidationIssue:
+    """Un problème détecté dans un fichier de contenu."""
+    severity: str  # 'error' ou 'warning'
+    code: str
+    message: str
+    file: str = ""
+    path: str = ""
+    line: Optional[int] = None
+    suggestion: str = ""
+
+
+class IssueCollector:
+    """Accumule les problèmes d'un fichier."""
+    def __init__(self, file: str):
+        self.file = file
+        self.issues: List[ValidationIssue] = []
+
+    def error(self, code: str, message: str, path: str = "", suggestion: str = ""):
+        self.issues.append(ValidationIssue('error', code, message, self.file, path, None, suggestion))
+
+    def warning(self, code: str, message: str, path: str = "", suggestion: str = ""):
+        self.issues.append(ValidationIssue('warning', code, message, self.file, path, None, suggestion))
+
+
+# -----------------------------------------------------------------------------
+# Chemins JSON et numéros de ligne
+# -----------------------------------------------------------------------------
+
+def join_path(parent: str, key: Any) -> str:
+    """Construit un chemin au format de jsonValidator.ts: sections[0].elements[2]."""
+    if isinstance(key, int):
+        return f"{parent}[{key}]"
+    return f"{parent}.{key}" if parent else str(key)
+
+
+def iter_strings(obj: Any, path: str = "") -> Iterator[Tuple[str, str]]:
+    """Parcourt un document JSON et renvoie toutes les chaînes avec leur chemin."""
+    if isinstance(obj, str):
+        yield path, obj
+    elif isinstance(obj, dict):
+        for key, value in obj.items():
+            yield from iter_strings(value, join_path(path, key))
+    elif isinstance(obj, list):
+        for index, item in enumerate(obj):
+            yield from iter_strings(item, join_path(path, index))
+
+
+_JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\],:]|[^\s{}\[\],:"]+')
+
+
+def build_line_index(text: str) -> Dict[str, int]:
+    """Associe chaque chemin JSON au numéro de ligne où commence sa valeur."""
+    newlines = [m.start() for m in re.finditer('\n', text)]
+    index: Dict[str, int] = {}
+    # Pile de conteneurs: [chemin, est_objet, clé ou indice courant, attend_une_clé]
+    stack: List[list] = []
+
+    def current_path() -> str:
+        container_path, is_object, key, _ = stack[-1]
+        return join_path(container_path, key)
+
+    for match in _JSON_TOKEN.finditer(text):
+        token = match.group()
+        if token in (':',):
+            stack[-1][3] = False
+            continue
+        if token == ',':
+            if stack:
+                if stack[-1][1]:
+                    stack[-1][3] = True
+                else:
+                    stack[-1][2] += 1
+            continue
+        if token in ('}', ']'):
+            stack.pop()
+            continue
+
+        if stack and stack[-1][1] and stack[-1][3]:
+            # Clé d'objet
+            stack[-1][2] = json.loads(token) if token.startswith('"') else token
+            continue
+
+        path = current_path() if stack else ""
+        index.setdefault(path, bisect.bisect_right(newlines, match.start()) + 1)
+        if token == '{':
+            stack.append([path, True, None, True])
+        elif token == '[':
+            stack.append([path, False, 0, False])
+
+    return index
+
+
+def line_for_path(index: Dict[str, int], path: str) -> Optional[int]:
+    """Retrouve la ligne d'un chemin, en remontant vers le parent s'il est absent."""
+    while True:
+        if path in index:
+            return index[path]
+        if not path:
+            return None
+        cut = max(path.rfind('.'), path.rfind('['))
+        path = path[:cut] if cut > 0 else ""
+
+
+# -----------------------------------------------------------------------------
+# Règles de validation
+# -----------------------------------------------------------------------------
+
+def validate_math_formulas(text: str, path: str, collector: IssueCollector):
+    """Vérifie les délimiteurs mathématiques d'une chaîne (cf. validateMathFormulas)."""
+    if '$' not in text and '\\' not in text:
+        return
+
+    dollar_count = len(UNESCAPED_DOLLAR.findall(text))
+    if dollar_count % 2:
+        collector.error(
+            'UNCLOSED_MATH_DELIMITER',
+            f'Formule mathématique non fermée: nombre impair de "$" ({dollar_count})',
+            path, 'Assurez-vous que chaque "$" d\'ouverture a un "$" de fermeture'
+        )
+
+    for opening, closing, code in (('\\(', '\\)', 'UNCLOSED_PAREN_DELIMITER'),
+                                   ('\\[', '\\]', 'UNCLOSED_BRACKET_DELIMITER')):
+        open_count, close_count = text.count(opening), text.count(closing)
+        if open_count != close_count:
+            collector.error(
+                code,
+                f'Formule mathématique non fermée: {opening} ({open_count}) et {closing} ({close_count}) ne correspondent pas',
+                path, f'Vérifiez que chaque "{opening}" a un "{closing}" correspondant'
+            )
+
+    # Accolades dans chaque région $...$
+    regions = UNESCAPED_DOLLAR.split(text)
+    for math_text in regions[1:len(regions) - (dollar_count % 2):2]:
+        open_braces = math_text.count('{') - math_text.count('\\{')
+        close_braces = math_text.count('}') - math_text.count('\\}')
+        if open_braces != close_braces:
+            collector.error(
+                'UNBALANCED_BRACES',
+                f'Accolades non équilibrées dans la formule mathématique: {{ ({open_braces}) et }} ({close_braces})',
+                path, f'Vérifiez la formule: "{math_text[:50]}..."'
+            )
+
+    for pattern, message, code in MALFORMED_COMMANDS:
+        if pattern.search(text):
+            collector.error(code, f'Erreur LaTeX: {message}', path)
+
+
+def check_duplicate_ids(items: Any, path: str, collector: IssueCollector):
+    """Signale les identifiants répétés dans une liste d'objets."""
+    if not isinstance(items, list):
+        return
+    seen: Dict[str, int] = {}
+    for index, item in enumerate(items):
+        item_id = item.get('id') if isinstance(item, dict) else None
+        if not item_id:
+            continue
+        if item_id in seen:
+            collector.error(
+                'DUPLICATE_ID',
+                f'Identifiant "{item_id}" déjà utilisé par {path}[{seen[item_id]}]',
+                f'{path}[{index}].id'
+            )
+        else:
+            seen[item_id] = index
+
+
+def validate_quiz_question(question: Any, path: str, collector: IssueCollector):
+    """Vérifie une question de quiz (QCM ou ordonnancement)."""
+    if not isinstance(question, dict):
+        collector.error('INVALID_QUESTION', "La question n'est pas un objet valide", path)
+        return
+
+    if not question.get('question'):
+        collector.error('MISSING_QUESTION', 'La question manque la propriété "question"', f'{path}.question')
+
+    question_type = question.get('type', 'mcq')
+    if question_type == 'ordering':
+        steps = question.get('steps')
+        if not isinstance(steps, list) or not steps:
+            collector.error('MISSING_STEPS', 'Une question "ordering" doit avoir un tableau "steps" non vide', f'{path}.steps')
+        return
+
+    options = question.get('options')
+    if not isinstance(options, list):
+        collector.error('MISSING_OPTIONS', 'La question manque la propriété "options" de type tableau', f'{path}.options')
+        return
+
+    correct_count = 0
+    for opt_index, option in enumerate(options):
+        opt_path = f'{path}.options[{opt_index}]'
+        if not isinstance(option, dict):
+            collector.error(
+                'INVALID_OPTION_SHAPE', 'Une option doit être un objet {"text", "isCorrect"}', opt_path,
+                'Remplacez la chaîne par {"text": "...", "isCorrect": false}'
+            )
+            continue
+        if not isinstance(option.get('text'), str):
+            collector.error('INVALID_OPTION_SHAPE', 'L\'option manque la propriété "text" de type chaîne', f'{opt_path}.text')
+        is_correct = option.get('isCorrect', option.get('is_correct'))
+        if not isinstance(is_correct, bool):
+            collector.error(
+                'INVALID_OPTION_SHAPE', f'"isCorrect" doit être un booléen, reçu: {json.dumps(is_correct)}',
+                f'{opt_path}.isCorrect'
+            )
+        elif is_correct:
+            correct_count += 1
+
+    if question_type == 'mcq' and correct_count != 1:
+        collector.error(
+            'MCQ_CORRECT_COUNT', f'Un QCM doit avoir exactement une bonne réponse (trouvé: {correct_count})',
+            f'{path}.options'
+        )
+    check_duplicate_ids(options, f'{path}.options', collector)
+
+
+def validate_chapter(data: Any, file_path: Path, public_dir: Path, collector: IssueCollector):
+    """Vérifie un fichier de chapitre (quiz, exercices, vidéos, leçon associée)."""
+    if not isinstance(data, dict):
+        collector.error('INVALID_ROOT_TYPE', 'Le JSON doit être un objet')
+        return
+
+    for field_name in REQUIRED_CHAPTER_FIELDS:
+        if field_name not in data:
+            collector.error('MISSING_FIELD', f'Propriété obligatoire manquante: "{field_name}"', field_name)
+
+    quiz = data.get('quiz', [])
+    if isinstance(quiz, list):
+        for index, question in enumerate(quiz):
+            validate_quiz_question(question, f'quiz[{index}]', collector)
+        check_duplicate_ids(quiz, 'quiz', collector)
+
+    exercises = data.get('exercises', [])
+    if isinstance(exercises, list):
+        for index, exercise in enumerate(exercises):
+            if isinstance(exercise, dict) and not exercise.get('statement'):
+                collector.warning('MISSING_STATEMENT', 'Exercice sans propriété "statement"', f'exercises[{index}].statement')
+        check_duplicate_ids(exercises, 'exercises', collector)
+
+    check_duplicate_ids(data.get('videos', []), 'videos', collector)
+
+    lesson_file = data.get('lessonFile')
+    if lesson_file:
+        lesson_path = public_dir / "chapters" / str(data.get('class', file_path.parent.name)) / lesson_file
+        if not lesson_path.exists():
+            collector.error(
+                'LESSON_FILE_NOT_FOUND', f'Fichier de leçon introuvable: {lesson_path.relative_to(public_dir).as_posix()}',
+                'lessonFile'
+            )
+
+
+def validate_lesson_element(element: Any, path: str, collector: IssueCollector):
+    """Vérifie un élément de leçon (cf. validateLessonElement)."""
+    if not isinstance(element, dict):
+        collector.error('INVALID_ELEMENT_TYPE', "L'élément n'est pas un objet valide", path)
+        return
+
+    element_type = element.get('type')
+    if element_type and element_type not in VALID_ELEMENT_TYPES:
+        collector.error(
+            'INVALID_ELEMENT_TYPE', f'Type d\'élément invalide: "{element_type}"', f'{path}.type',
+            f'Types valides: {", ".join(VALID_ELEMENT_TYPES)}'
+        )
+
+    list_type = element.get('listType')
+    if list_type and element_type == 'p':
+        collector.error(
+            'TYPE_P_WITH_LISTTYPE', 'Un élément avec "listType" ne peut pas avoir "type": "p"', f'{path}.type',
+            'Retirez la propriété "type": "p" de cet élément.'
+        )
+
+    content = element.get('content')
+    if content is not None:
+        if list_type and not isinstance(content, list):
+            collector.error(
+                'LISTTYPE_REQUIRES_ARRAY', f'Avec "listType", "content" doit être un tableau, reçu: {type(content).__name__}',
+                f'{path}.content'
+            )
+        elif not list_type and element_type == 'p' and not isinstance(content, str):
+            collector.error('PARAGRAPH_REQUIRES_STRING', 'Pour un paragraphe, "content" doit être une chaîne', f'{path}.content')
+
+        if isinstance(content, list):
+            for index, item in enumerate(content):
+                if not isinstance(item, (str, dict)):
+                    collector.error(
+                        'INVALID_ARRAY_ITEM', f'L\'élément {index} du tableau "content" doit être une chaîne ou un objet',
+                        f'{path}.content[{index}]'
+                    )
+
+    if element_type in ('practice-box', 'explain-box') and isinstance(content, list):
+        solution = element.get('solution')
+        if not isinstance(solution, list):
+            collector.warning('MISSING_SOLUTION', f'{element_type} devrait avoir une propriété "solution" de type tableau', f'{path}.solution')
+        elif len(solution) != len(content):
+            collector.warning(
+                'SOLUTION_MISMATCH',
+                f'Le nombre de solutions ({len(solution)}) ne correspond pas au nombre de questions ({len(content)})',
+                f'{path}.solution'
+            )
+
+    if list_type and list_type not in VALID_LIST_TYPES:
+        collector.error('INVALID_LISTTYPE', f'"listType" invalide: "{list_type}"', f'{path}.listType')
+
+
+def validate_lesson(data: Any, collector: IssueCollector):
+    """Vérifie la structure sections/subsections/elements d'une leçon."""
+    if not isinstance(data, dict):
+        collector.error('INVALID_ROOT_TYPE', 'Le JSON doit être un objet')
+        return
+
+    lesson = data.get('lesson', data)
+    sections = lesson.get('sections')
+    if not isinstance(sections, list):
+        collector.error('MISSING_SECTIONS', 'La leçon doit avoir une propriété "sections" de type tableau', 'sections')
+        return
+
+    for s_index, section in enumerate(sections):
+        section_path = f'sections[{s_index}]'
+        subsections = section.get('subsections') if isinstance(section, dict) else None
+        if not isinstance(subsections, list):
+            collector.error('MISSING_SUBSECTIONS', f'La section {s_index} doit avoir une propriété "subsections" de type tableau', f'{section_path}.subsections')
+            continue
+        for ss_index, subsection in enumerate(subsections):
+            subsection_path = f'{section_path}.subsections[{ss_index}]'
+            elements = subsection.get('elements') if isinstance(subsection, dict) else None
+            if not isinstance(elements, list):
+                collector.error('MISSING_ELEMENTS', f'La sous-section {ss_index} de la section {s_index} doit avoir une propriété "elements" de type tableau', f'{subsection_path}.elements')
+                continue
+            for e_index, element in enumerate(elements):
+                validate_lesson_element(element, f'{subsection_path}.elements[{e_index}]', collector)
+
+
+def validate_concours(data: Any, collector: IssueCollector):
+    """Vérifie un fichier de quiz de concours."""
+    if not isinstance(data, dict):
+        collector.error('INVALID_ROOT_TYPE', 'Le JSON doit être un objet')
+        return
+    for field_name in ('id', 'quiz'):
+        if field_name not in data:
+            collector.error('MISSING_FIELD', f'Propriété obligatoire manquante: "{field_name}"', field_name)
+    quiz = data.get('quiz', [])
+    if isinstance(quiz, list):
+        for index, question in enumerate(quiz):
+            validate_quiz_question(question, f'quiz[{index}]', collector)
+        check_duplicate_ids(quiz, 'quiz', collector)
+
+
+def validate_concours_index(data: Any, public_dir: Path, collector: IssueCollector):
+    """Vérifie que chaque fichier référencé par concours/index.json existe."""
+    for c_index, concours in enumerate(data.get('concours', []) if isinstance(data, dict) else []):
+        for e_index, examen in enumerate(concours.get('examens', [])):
+            for f_index, fichier in enumerate(examen.get('fichiers', [])):
+                ref = fichier.get('file', '')
+                if not (public_dir / ref.lstrip('/')).exists():
+                    collector.error(
+                        'CONCOURS_FILE_NOT_FOUND', f'Fichier de concours introuvable: {ref}',
+                        f'concours[{c_index}].examens[{e_index}].fichiers[{f_index}].file'
+                    )
+
+
+def file_kind(file_path: Path, public_dir: Path) -> str:
+    """Détermine le type de contenu d'un fichier selon son emplacement."""
+    parts = file_path.relative_to(public_dir).parts
+    if file_path.name in SKIPPED_FILES:
+        return 'document'
+    if parts[0] == 'concours':
+        return 'concours-index' if file_path.name == 'index.json' else 'concours'
+    if 'lessons' in parts:
+        return 'lesson'
+    return 'chapter'
+
+
+def validate_file(file_path: Path, public_dir: Path = PUBLIC_DIR) -> List[Dict[str, Any]]:
+    """Valide un fichier et renvoie ses problèmes (dictionnaires, pour le pool de processus)."""
+    rel = file_path.relative_to(public_dir).as_posix()
+    collector = IssueCollector(rel)
+
+    try:
+        text = file_path.read_text(encoding='utf-8')
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        collector.issues.append(ValidationIssue('error', 'JSON_SYNTAX', e.msg, rel, '', e.lineno))
+        return [asdict(issue) for issue in collector.issues]
+    except (OSError, UnicodeDecodeError) as e:
+        collector.error('READ_ERROR', f'Lecture impossible: {e}')
+        return [asdict(issue) for issue in collector.issues]
+
+    kind = file_kind(file_path, public_dir)
+    if kind == 'document':
+        return []
+    if kind == 'chapter':
+        validate_chapter(data, file_path, public_dir, collector)
+    elif kind == 'lesson':
+        validate_lesson(data, collector)
+    elif kind == 'concours':
+        validate_concours(data, collector)
+    elif kind == 'concours-index':
+        validate_concours_index(data, public_dir, collector)
+
+    for path, text_value in iter_strings(data):
+        validate_math_formulas(text_value, path, collector)
+
+    for ref in iter_image_refs(data):
+        if not (public_dir / ref.lstrip('/')).exists():
+            collector.error('IMAGE_NOT_FOUND', f'Image introuvable: {ref}', suggestion='Vérifiez le chemin relatif à public/')
+
+    if collector.issues:
+        line_index = build_line_index(text)
+        for issue in collector.issues:
+            if issue.line is None:
+                issue.line = line_for_path(line_index, issue.path)
+    return [asdict(issue) for issue in collector.issues]
+
+
+def validate_manifest(manifest_path: Path) -> List[ValidationIssue]:
+    """Vérifie le manifest: fichiers présents et identifiants uniques entre classes."""
+    collector = IssueCollector(manifest_path.name)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    manifest = json.loads(text)
+    chapters_dir = manifest_path.parent / "chapters"
+
+    seen: Dict[str, str] = {}
+    for class_name, chapters in manifest.items():
+        for index, chapter in enumerate(chapters):
+            path = f'{class_name}[{index}]'
+            chapter_id = chapter.get('id', '')
+            if chapter_id in seen:
+                collector.error('DUPLICATE_ID', f'Identifiant de chapitre "{chapter_id}" déjà utilisé par {seen[chapter_id]}', f'{path}.id')
+            else:
+                seen[chapter_id] = path
+            if not (chapters_dir / chapter.get('file', '')).is_file():
+                collector.error('CHAPTER_FILE_NOT_FOUND', f'Fichier manquant: {chapter.get("file")}', f'{path}.file')
+
+    if collector.issues:
+        line_index = build_line_index(text)
+        for issue in collector.issues:
+            issue.line = line_for_path(line_index, issue.path)
+    return collector.issues
+
+
+def collect_files(public_dir: Path) -> List[Path]:
+    """Liste tous les fichiers JSON de chapitres, leçons et concours."""
+    files = list((public_dir / "chapters").rglob("*.json")) + list((public_dir / "concours").rglob("*.json"))
+    return sorted(f for f in files if not f.name.endswith('.tmp.json'))
+
+
+def validate_corpus(public_dir: Path = PUBLIC_DIR, jobs: Optional[int] = None,
+                    start_method: Optional[str] = None) -> Dict[str, Any]:
+    """Valide tout le contenu en parallèle et renvoie le rapport complet.
+
+    Depuis un processus multithread (interface Qt), passer start_method='spawn':
+    un fork n'y copie que le thread appelant et peut bloquer les processus fils.
+    """
+    start = time.perf_counter()
+    files = collect_files(public_dir)
+    issues: List[ValidationIssue] = []
+
+    manifest_path = public_dir / "manifest.json"
+    if manifest_path.exists():
+        issues.extend(validate_manifest(manifest_path))
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(files) > 1:
+        context = multiprocessing.get_context(start_method) if start_method else None
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+            results = pool.map(validate_file, files, [public_dir] * len(files),
+                               chunksize=max(1, len(files) // (jobs * 4)))
+            for file_issues in results:
+                issues.extend(ValidationIssue(**issue) for issue in file_issues)
+    else:
+        for file_path in files:
+            issues.extend(ValidationIssue(**issue) for issue in validate_file(file_path, public_dir))
+
+    errors = [issue for issue in issues if issue.severity == 'error']
+    warnings = [issue for issue in issues if issue.severity == 'warning']
+    return {
+        'valid': not errors,
+        'files': len(files),
+        'errors': errors,
+        'warnings': warnings,
+        'duration': time.perf_counter() - start,
+    }
+
+
+def format_issue(issue: ValidationIssue) -> str:
+    """Formate un problème comme formatValidationError côté TypeScript."""
+    severity = '❌ ERREUR' if issue.severity == 'error' else '⚠️ AVERTISSEMENT'
+    location = f"{issue.file}:{issue.line}" if issue.line else issue.file
+    parts = [f"{severity} [{issue.code}] {location}"]
+    if issue.path:
+        parts.append(f"   🔍 Chemin: {issue.path}")
+    parts.append(f"   💬 {issue.message}")
+    if issue.suggestion:
+        parts.append(f"   💡 Solution: {issue.suggestion}")
+    return "\n".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validation approfondie du contenu pédagogique")
+    parser.add_argument('--public', type=Path, default=PUBLIC_DIR, help="Dossier public/ à analyser")
+    parser.add_argument('--jobs', type=int, default=None, help="Nombre de processus (défaut: nombre de cœurs)")
+    parser.add_argument('--json', action='store_true', help="Sortie du rapport au format JSON")
+    parser.add_argument('--errors-only', action='store_true', help="Ne pas afficher les avertissements")
+    args = parser.parse_args()
+
+    report = validate_corpus(args.public, args.jobs)
+
+    if args.json:
+        output = {
+            'valid': report['valid'],
+            'files': report['files'],
+            'duration': round(report['duration'], 3),
+            'errors': [asdict(issue) for issue in report['errors']],
+            'warnings': [] if args.errors_only else [asdict(issue) for issue in report['warnings']],
+        }
+        json.dump(output, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print("=" * 70)
+        print("VALIDATION DU CONTENU PÉDAGOGIQUE")
+        print("=" * 70)
+        shown = report['errors'] + ([] if args.errors_only else report['warnings'])
+        for issue in shown:
+            print(format_issue(issue))
+        print("=" * 70)
+        print(f"📄 {report['files']} fichiers analysés en {report['duration'] * 1000:.0f} ms")
+        print(f"❌ {len(report['errors'])} erreur(s) | ⚠️  {len(report['warnings'])} avertissement(s)")
+
+    return 0 if report['valid'] else 1
+
+
+if __name__ == "__main__":
+    exit(main())
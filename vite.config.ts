@@ -14,7 +14,9 @@ export default defineConfig(({ mode }) => {
         watch: {
           usePolling: false,
           interval: 100
-        }
+        },
+        // API_PROXY=http://127.0.0.1:8787: envoi des travaux vers submission_receiver.py
+        ...(env.API_PROXY ? { proxy: { '/api': { target: env.API_PROXY, changeOrigin: true } } } : {})
       },
       plugins: [react()],
       define: {